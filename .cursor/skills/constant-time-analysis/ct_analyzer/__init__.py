@@ -13,18 +13,24 @@ from .analyzer import (
     Compiler,
     GCCCompiler,
     GoCompiler,
+    LimitEvent,
     OutputFormat,
     RustCompiler,
     Severity,
+    ToolLimits,
     Violation,
+    ViolationTable,
     analyze_assembly,
+    analyze_many_async,
     analyze_source,
+    analyze_source_async,
     detect_language,
     format_report,
     get_compiler,
     get_native_arch,
     normalize_arch,
 )
+from .binary_analyzer import analyze_binary
 
 __version__ = "0.1.0"
 __all__ = [
@@ -35,12 +41,18 @@ __all__ = [
     "Compiler",
     "GCCCompiler",
     "GoCompiler",
+    "LimitEvent",
     "OutputFormat",
     "RustCompiler",
     "Severity",
+    "ToolLimits",
     "Violation",
+    "ViolationTable",
     "analyze_assembly",
+    "analyze_binary",
+    "analyze_many_async",
     "analyze_source",
+    "analyze_source_async",
     "detect_language",
     "format_report",
     "get_compiler",
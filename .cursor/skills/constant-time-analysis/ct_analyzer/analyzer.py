@@ -29,16 +29,20 @@ Examples:
     python ct_analyzer/analyzer.py --warnings crypto.c
 """
 
-import argparse
-import json
+import mmap
 import os
 import re
-import subprocess
 import sys
-import tempfile
+from array import array
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
 from enum import Enum
-from pathlib import Path
+from typing import TypeVar
+
+try:
+    from .rulepacks import RULE_PACKS, RulePackError, TargetTables
+except ImportError:
+    from rulepacks import RULE_PACKS, RulePackError, TargetTables
 
 
 class Severity(Enum):
@@ -50,9 +54,11 @@ class OutputFormat(Enum):
     TEXT = "text"
     JSON = "json"
     GITHUB = "github"
+    NDJSON = "ndjson"
+    SARIF = "sarif"
 
 
-@dataclass
+@dataclass(slots=True)
 class Violation:
     """A detected constant-time violation."""
 
@@ -66,6 +72,345 @@ class Violation:
     severity: Severity
 
 
+_SEVERITY_CODES = {Severity.ERROR: 0, Severity.WARNING: 1}
+_SEVERITIES = (Severity.ERROR, Severity.WARNING)
+_ADDRESS_UPPER = 0x80
+
+
+class ViolationTable(Sequence):
+    """
+    Columnar storage for violations.
+
+    Function, file, mnemonic and reason strings are interned into a shared
+    table and stored as integer ids; line numbers, addresses and severities
+    are packed into arrays and instruction text into one UTF-8 buffer. A
+    row costs tens of bytes instead of a few hundred for a Violation object.
+
+    Violation objects are materialized on access, so modifying one does not
+    change the table; assign it back (table[i] = violation) instead.
+
+    Severity counts are kept up to date as rows are added. Row indexes by
+    function, mnemonic and severity are built on first lookup and then
+    extended incrementally, so lookups cost O(k) in the rows returned.
+    """
+
+    INDEXED_COLUMNS = ("function", "mnemonic", "severity")
+
+    def __init__(self, violations: Iterable[Violation] = ()):
+        self._strings: list[str] = []
+        self._string_ids: dict[str, int] = {}
+        self._function = array("I")
+        self._file = array("I")
+        self._mnemonic = array("I")
+        self._reason = array("I")
+        self._line = array("i")  # -1 for no line
+        self._address = array("Q")
+        self._address_width = bytearray()  # hex digits (0 = empty), | 0x80 if uppercase
+        self._address_other: dict[int, str] = {}  # rows whose address is not plain hex
+        self._text = bytearray()
+        self._text_start = array("Q")
+        self._text_length = array("I")
+        self._text_dead = 0  # bytes of _text no row refers to any more
+        self._severity = bytearray()
+        self._severity_counts = [0] * len(_SEVERITIES)
+        # column -> {value id or severity code: rows}, covering rows < _indexed
+        self._indexes: dict[str, dict[int, array]] = {c: {} for c in self.INDEXED_COLUMNS}
+        self._indexed = 0
+        for violation in violations:
+            self.append(violation)
+
+    def _intern(self, value: str) -> int:
+        index = self._string_ids.get(value)
+        if index is None:
+            index = self._string_ids[value] = len(self._strings)
+            self._strings.append(sys.intern(value))
+        return index
+
+    def _encode_address(self, row: int, address: str) -> tuple[int, int]:
+        """Pack an address as (value, width); anything but plain 0x-hex is kept aside."""
+        self._address_other.pop(row, None)
+        if not address:
+            return 0, 0
+        digits = address[2:]
+        if (
+            address[:2] == "0x"
+            and 0 < len(digits) <= 16
+            and all(c in "0123456789abcdefABCDEF" for c in digits)
+            and (digits.islower() or digits.isupper() or digits.isdigit())
+        ):
+            width = len(digits) | (_ADDRESS_UPPER if digits.isupper() else 0)
+            return int(digits, 16), width
+        self._address_other[row] = address
+        return 0, 0
+
+    def _decode_address(self, row: int) -> str:
+        width = self._address_width[row]
+        if not width:
+            return self._address_other.get(row, "")
+        digits = format(self._address[row], f"0{width & ~_ADDRESS_UPPER}x")
+        return "0x" + (digits.upper() if width & _ADDRESS_UPPER else digits)
+
+    def add(
+        self,
+        function: str,
+        file: str,
+        line: int | None,
+        address: str,
+        instruction: str,
+        mnemonic: str,
+        reason: str,
+        severity: Severity,
+    ) -> None:
+        """Append a row without building a Violation object."""
+        row = len(self._severity)
+        self._function.append(self._intern(function))
+        self._file.append(self._intern(file))
+        self._mnemonic.append(self._intern(mnemonic))
+        self._reason.append(self._intern(reason))
+        self._line.append(-1 if line is None else line)
+        value, width = self._encode_address(row, address)
+        self._address.append(value)
+        self._address_width.append(width)
+        encoded = instruction.encode("utf-8", errors="surrogatepass")
+        self._text_start.append(len(self._text))
+        self._text_length.append(len(encoded))
+        self._text += encoded
+        code = _SEVERITY_CODES[severity]
+        self._severity.append(code)
+        self._severity_counts[code] += 1
+
+    def append(self, violation: Violation) -> None:
+        self.add(
+            violation.function,
+            violation.file,
+            violation.line,
+            violation.address,
+            violation.instruction,
+            violation.mnemonic,
+            violation.reason,
+            violation.severity,
+        )
+
+    def extend(self, violations: Iterable[Violation]) -> None:
+        if violations is self:
+            # The merge below reads the columns it appends to
+            violations = ViolationTable()
+            violations.extend(self)
+        if not isinstance(violations, ViolationTable):
+            for violation in violations:
+                self.append(violation)
+            return
+        # Column-wise merge, remapping the other table's string ids
+        remap = array("I", (self._intern(value) for value in violations._strings))
+        offset = len(self._severity)
+        text_offset = len(self._text)
+        for column in ("_function", "_file", "_mnemonic", "_reason"):
+            getattr(self, column).extend(remap[i] for i in getattr(violations, column))
+        self._line.extend(violations._line)
+        self._address.extend(violations._address)
+        self._address_width += violations._address_width
+        for row, address in violations._address_other.items():
+            self._address_other[offset + row] = address
+        self._text_start.extend(start + text_offset for start in violations._text_start)
+        self._text_length.extend(violations._text_length)
+        self._text += violations._text
+        self._text_dead += violations._text_dead
+        self._severity += violations._severity
+        for code, count in enumerate(violations._severity_counts):
+            self._severity_counts[code] += count
+
+    def set_location(self, index: int, file: str, line: int | None) -> None:
+        """Update the source location of one row in place."""
+        self._file[index] = self._intern(file)
+        self._line[index] = -1 if line is None else line
+
+    def severity_count(self, severity: Severity) -> int:
+        """Number of rows with the given severity, in O(1)."""
+        return self._severity_counts[_SEVERITY_CODES[severity]]
+
+    def _column_ids(self, column: str):
+        return self._severity if column == "severity" else getattr(self, f"_{column}")
+
+    def _index(self, column: str) -> dict[int, array]:
+        """Get the row index for a column, indexing rows added since the last lookup."""
+        end = len(self)
+        if self._indexed < end:
+            for name in self.INDEXED_COLUMNS:
+                index = self._indexes[name]
+                ids = self._column_ids(name)
+                for row in range(self._indexed, end):
+                    rows = index.get(ids[row])
+                    if rows is None:
+                        rows = index[ids[row]] = array("I")
+                    rows.append(row)
+            self._indexed = end
+        return self._indexes[column]
+
+    def rows(
+        self,
+        function: str | None = None,
+        mnemonic: str | None = None,
+        severity: Severity | None = None,
+    ) -> list[int]:
+        """Row numbers matching every given criterion, in table order."""
+        keys = []
+        if function is not None:
+            keys.append(("function", self._string_ids.get(function)))
+        if mnemonic is not None:
+            keys.append(("mnemonic", self._string_ids.get(mnemonic)))
+        if severity is not None:
+            keys.append(("severity", _SEVERITY_CODES[severity]))
+        if not keys:
+            return list(range(len(self)))
+
+        candidates = []
+        for column, key in keys:
+            rows = self._index(column).get(key) if key is not None else None
+            if not rows:
+                return []
+            candidates.append(rows)
+        candidates.sort(key=len)
+        result = candidates[0]
+        for rows in candidates[1:]:
+            members = set(rows)
+            result = [row for row in result if row in members]
+        return list(result)
+
+    def select(
+        self,
+        function: str | None = None,
+        mnemonic: str | None = None,
+        severity: Severity | None = None,
+    ) -> list[Violation]:
+        """Violations matching every given criterion, in table order."""
+        return [self._materialize(row) for row in self.rows(function, mnemonic, severity)]
+
+    def counts_by(self, column: str) -> dict[str, int]:
+        """Number of rows per function or mnemonic."""
+        return {self._strings[key]: len(rows) for key, rows in self._index(column).items()}
+
+    def filter_functions(self, predicate: Callable[[str], object]) -> "ViolationTable":
+        """New table with the rows whose function name satisfies predicate."""
+        rows = sorted(
+            row
+            for key, bucket in self._index("function").items()
+            if predicate(self._strings[key])
+            for row in bucket
+        )
+        return ViolationTable(self._materialize(row) for row in rows)
+
+    def _materialize(self, row: int) -> Violation:
+        line = self._line[row]
+        start = self._text_start[row]
+        strings = self._strings
+        return Violation(
+            function=strings[self._function[row]],
+            file=strings[self._file[row]],
+            line=None if line < 0 else line,
+            address=self._decode_address(row),
+            instruction=self._text[start : start + self._text_length[row]].decode(
+                "utf-8", errors="surrogatepass"
+            ),
+            mnemonic=strings[self._mnemonic[row]],
+            reason=strings[self._reason[row]],
+            severity=_SEVERITIES[self._severity[row]],
+        )
+
+    def __len__(self) -> int:
+        return len(self._severity)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._materialize(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("violation index out of range")
+        return self._materialize(index)
+
+    def __setitem__(self, index: int, violation: Violation) -> None:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("violation index out of range")
+        self._severity_counts[self._severity[index]] -= 1
+        self._severity_counts[_SEVERITY_CODES[violation.severity]] += 1
+        # Rewritten rows may move between index buckets; rebuild on next lookup
+        self._indexes = {c: {} for c in self.INDEXED_COLUMNS}
+        self._indexed = 0
+        self._function[index] = self._intern(violation.function)
+        self.set_location(index, violation.file, violation.line)
+        self._mnemonic[index] = self._intern(violation.mnemonic)
+        self._reason[index] = self._intern(violation.reason)
+        self._address[index], self._address_width[index] = self._encode_address(
+            index, violation.address
+        )
+        encoded = violation.instruction.encode("utf-8", errors="surrogatepass")
+        start, length = self._text_start[index], self._text_length[index]
+        if len(encoded) <= length:
+            # Fits in the row's old span
+            self._text[start : start + len(encoded)] = encoded
+            self._text_dead += length - len(encoded)
+        else:
+            self._text_start[index] = len(self._text)
+            self._text += encoded
+            self._text_dead += length
+        self._text_length[index] = len(encoded)
+        if self._text_dead > len(self._text) // 2:
+            self._compact_text()
+        self._severity[index] = _SEVERITY_CODES[violation.severity]
+
+    def _compact_text(self) -> None:
+        """Rebuild the instruction buffer without the spans of rewritten rows."""
+        text = bytearray()
+        for row in range(len(self)):
+            start = self._text_start[row]
+            self._text_start[row] = len(text)
+            text += self._text[start : start + self._text_length[row]]
+        self._text = text
+        self._text_dead = 0
+
+    def __iter__(self) -> Iterator[Violation]:
+        for row in range(len(self)):
+            yield self._materialize(row)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, (ViolationTable, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"ViolationTable({list(self)!r})"
+
+
+@dataclass
+class LimitEvent:
+    """A toolchain stage stopped by a ToolLimits timeout or resource limit."""
+
+    stage: str
+    kind: str  # "timeout", "cpu" or "memory"
+    limit: float
+    elapsed: float
+    command: str
+
+    def to_dict(self) -> dict:
+        return {
+            "stage": self.stage,
+            "kind": self.kind,
+            "limit": self.limit,
+            "elapsed": round(self.elapsed, 3),
+            "command": self.command,
+        }
+
+    def describe(self) -> str:
+        if self.kind == "timeout":
+            return f"{self.stage} stage timed out after {self.limit:g}s"
+        if self.kind == "cpu":
+            return f"{self.stage} stage exceeded its limit of {self.limit:g}s CPU time"
+        megabytes = self.limit / (1024 * 1024)
+        return f"{self.stage} stage exceeded its limit of {megabytes:g} MB of address space"
+
+
 @dataclass
 class AnalysisReport:
     """Report from analyzing a compiled binary."""
@@ -76,278 +421,51 @@ class AnalysisReport:
     source_file: str
     total_functions: int
     total_instructions: int
-    violations: list[Violation] = field(default_factory=list)
+    violations: ViolationTable = field(default_factory=ViolationTable)
+    # Set when a toolchain timeout or resource limit cut analysis short
+    limit_exceeded: LimitEvent | None = None
+    # Violations left out of the report because a baseline records them
+    suppressed: int = 0
+    # Seconds spent per analyzed file in batch runs, for --shard weighting
+    timings: dict[str, float] | None = None
+    # Batch files that could not be analyzed, with the reason; they fail the report
+    failed_files: dict[str, str] | None = None
+
+    def __setattr__(self, name, value):
+        # Lists of Violation objects are accepted and stored columnar
+        if name == "violations" and not isinstance(value, ViolationTable):
+            value = ViolationTable(value)
+        super().__setattr__(name, value)
 
     @property
     def error_count(self) -> int:
-        return sum(1 for v in self.violations if v.severity == Severity.ERROR)
+        return self.violations.severity_count(Severity.ERROR)
 
     @property
     def warning_count(self) -> int:
-        return sum(1 for v in self.violations if v.severity == Severity.WARNING)
+        return self.violations.severity_count(Severity.WARNING)
 
     @property
     def passed(self) -> bool:
-        return self.error_count == 0
+        return self.error_count == 0 and self.limit_exceeded is None and not self.failed_files
 
+    def by_function(self, function: str) -> list[Violation]:
+        """Violations in one function."""
+        return self.violations.select(function=function)
 
-# Architecture-specific dangerous instructions
-# Based on research from Trail of Bits and the cryptocoding guidelines
+    def by_mnemonic(self, mnemonic: str) -> list[Violation]:
+        """Violations for one (uppercase) mnemonic."""
+        return self.violations.select(mnemonic=mnemonic)
+
+    def by_severity(self, severity: Severity) -> list[Violation]:
+        """Violations of one severity."""
+        return self.violations.select(severity=severity)
 
-DANGEROUS_INSTRUCTIONS = {
-    # x86_64 / amd64
-    "x86_64": {
-        "errors": {
-            # Integer division - variable time based on operand values (KyberSlash attack vector)
-            "div": "DIV has data-dependent timing; execution time varies based on operand values",
-            "idiv": "IDIV has data-dependent timing; execution time varies based on operand values",
-            "divb": "DIVB has data-dependent timing; execution time varies based on operand values",
-            "divw": "DIVW has data-dependent timing; execution time varies based on operand values",
-            "divl": "DIVL has data-dependent timing; execution time varies based on operand values",
-            "divq": "DIVQ has data-dependent timing; execution time varies based on operand values",
-            "idivb": "IDIVB has data-dependent timing; execution time varies based on operand values",
-            "idivw": "IDIVW has data-dependent timing; execution time varies based on operand values",
-            "idivl": "IDIVL has data-dependent timing; execution time varies based on operand values",
-            "idivq": "IDIVQ has data-dependent timing; execution time varies based on operand values",
-            # Floating-point division - variable latency
-            "divss": "DIVSS (scalar single FP division) has variable latency",
-            "divsd": "DIVSD (scalar double FP division) has variable latency",
-            "divps": "DIVPS (packed single FP division) has variable latency",
-            "divpd": "DIVPD (packed double FP division) has variable latency",
-            "vdivss": "VDIVSS (AVX scalar single FP division) has variable latency",
-            "vdivsd": "VDIVSD (AVX scalar double FP division) has variable latency",
-            "vdivps": "VDIVPS (AVX packed single FP division) has variable latency",
-            "vdivpd": "VDIVPD (AVX packed double FP division) has variable latency",
-            # Square root - variable latency
-            "sqrtss": "SQRTSS has variable latency based on operand values",
-            "sqrtsd": "SQRTSD has variable latency based on operand values",
-            "sqrtps": "SQRTPS has variable latency based on operand values",
-            "sqrtpd": "SQRTPD has variable latency based on operand values",
-            "vsqrtss": "VSQRTSS has variable latency based on operand values",
-            "vsqrtsd": "VSQRTSD has variable latency based on operand values",
-            "vsqrtps": "VSQRTPS has variable latency based on operand values",
-            "vsqrtpd": "VSQRTPD has variable latency based on operand values",
-        },
-        "warnings": {
-            # Conditional branches - may leak timing if condition depends on secret data
-            "je": "conditional branch may leak timing information if condition depends on secret data",
-            "jne": "conditional branch may leak timing information if condition depends on secret data",
-            "jz": "conditional branch may leak timing information if condition depends on secret data",
-            "jnz": "conditional branch may leak timing information if condition depends on secret data",
-            "ja": "conditional branch may leak timing information if condition depends on secret data",
-            "jae": "conditional branch may leak timing information if condition depends on secret data",
-            "jb": "conditional branch may leak timing information if condition depends on secret data",
-            "jbe": "conditional branch may leak timing information if condition depends on secret data",
-            "jg": "conditional branch may leak timing information if condition depends on secret data",
-            "jge": "conditional branch may leak timing information if condition depends on secret data",
-            "jl": "conditional branch may leak timing information if condition depends on secret data",
-            "jle": "conditional branch may leak timing information if condition depends on secret data",
-            "jo": "conditional branch may leak timing information if condition depends on secret data",
-            "jno": "conditional branch may leak timing information if condition depends on secret data",
-            "js": "conditional branch may leak timing information if condition depends on secret data",
-            "jns": "conditional branch may leak timing information if condition depends on secret data",
-            "jp": "conditional branch may leak timing information if condition depends on secret data",
-            "jnp": "conditional branch may leak timing information if condition depends on secret data",
-            "jc": "conditional branch may leak timing information if condition depends on secret data",
-            "jnc": "conditional branch may leak timing information if condition depends on secret data",
-        },
-    },
-    # ARM64 / AArch64
-    "arm64": {
-        "errors": {
-            # Division - early termination optimization makes these variable-time
-            # Note: Even with DIT (Data Independent Timing) enabled, division is NOT constant-time
-            "udiv": "UDIV has early termination optimization; execution time depends on operand values",
-            "sdiv": "SDIV has early termination optimization; execution time depends on operand values",
-            # Floating-point division
-            "fdiv": "FDIV (FP division) has variable latency based on operand values",
-            # Square root
-            "fsqrt": "FSQRT has variable latency based on operand values",
-        },
-        "warnings": {
-            # Conditional branches
-            "b.eq": "conditional branch may leak timing information if condition depends on secret data",
-            "b.ne": "conditional branch may leak timing information if condition depends on secret data",
-            "b.cs": "conditional branch may leak timing information if condition depends on secret data",
-            "b.cc": "conditional branch may leak timing information if condition depends on secret data",
-            "b.mi": "conditional branch may leak timing information if condition depends on secret data",
-            "b.pl": "conditional branch may leak timing information if condition depends on secret data",
-            "b.vs": "conditional branch may leak timing information if condition depends on secret data",
-            "b.vc": "conditional branch may leak timing information if condition depends on secret data",
-            "b.hi": "conditional branch may leak timing information if condition depends on secret data",
-            "b.ls": "conditional branch may leak timing information if condition depends on secret data",
-            "b.ge": "conditional branch may leak timing information if condition depends on secret data",
-            "b.lt": "conditional branch may leak timing information if condition depends on secret data",
-            "b.gt": "conditional branch may leak timing information if condition depends on secret data",
-            "b.le": "conditional branch may leak timing information if condition depends on secret data",
-            "beq": "conditional branch may leak timing information if condition depends on secret data",
-            "bne": "conditional branch may leak timing information if condition depends on secret data",
-            "bcs": "conditional branch may leak timing information if condition depends on secret data",
-            "bcc": "conditional branch may leak timing information if condition depends on secret data",
-            "bmi": "conditional branch may leak timing information if condition depends on secret data",
-            "bpl": "conditional branch may leak timing information if condition depends on secret data",
-            "bvs": "conditional branch may leak timing information if condition depends on secret data",
-            "bvc": "conditional branch may leak timing information if condition depends on secret data",
-            "bhi": "conditional branch may leak timing information if condition depends on secret data",
-            "bls": "conditional branch may leak timing information if condition depends on secret data",
-            "bge": "conditional branch may leak timing information if condition depends on secret data",
-            "blt": "conditional branch may leak timing information if condition depends on secret data",
-            "bgt": "conditional branch may leak timing information if condition depends on secret data",
-            "ble": "conditional branch may leak timing information if condition depends on secret data",
-            # Compare and branch
-            "cbz": "compare-and-branch may leak timing information if value depends on secret data",
-            "cbnz": "compare-and-branch may leak timing information if value depends on secret data",
-            "tbz": "test-bit-and-branch may leak timing information if value depends on secret data",
-            "tbnz": "test-bit-and-branch may leak timing information if value depends on secret data",
-        },
-    },
-    # ARM 32-bit
-    "arm": {
-        "errors": {
-            "udiv": "UDIV has early termination optimization; execution time depends on operand values",
-            "sdiv": "SDIV has early termination optimization; execution time depends on operand values",
-            "vdiv.f32": "VDIV.F32 has variable latency",
-            "vdiv.f64": "VDIV.F64 has variable latency",
-            "vsqrt.f32": "VSQRT.F32 has variable latency",
-            "vsqrt.f64": "VSQRT.F64 has variable latency",
-        },
-        "warnings": {
-            "beq": "conditional branch may leak timing information if condition depends on secret data",
-            "bne": "conditional branch may leak timing information if condition depends on secret data",
-            "bcs": "conditional branch may leak timing information if condition depends on secret data",
-            "bcc": "conditional branch may leak timing information if condition depends on secret data",
-            "bmi": "conditional branch may leak timing information if condition depends on secret data",
-            "bpl": "conditional branch may leak timing information if condition depends on secret data",
-            "bvs": "conditional branch may leak timing information if condition depends on secret data",
-            "bvc": "conditional branch may leak timing information if condition depends on secret data",
-            "bhi": "conditional branch may leak timing information if condition depends on secret data",
-            "bls": "conditional branch may leak timing information if condition depends on secret data",
-            "bge": "conditional branch may leak timing information if condition depends on secret data",
-            "blt": "conditional branch may leak timing information if condition depends on secret data",
-            "bgt": "conditional branch may leak timing information if condition depends on secret data",
-            "ble": "conditional branch may leak timing information if condition depends on secret data",
-        },
-    },
-    # RISC-V 64-bit
-    "riscv64": {
-        "errors": {
-            "div": "DIV has variable-time execution based on operand values",
-            "divu": "DIVU has variable-time execution based on operand values",
-            "divw": "DIVW has variable-time execution based on operand values",
-            "divuw": "DIVUW has variable-time execution based on operand values",
-            "rem": "REM has variable-time execution based on operand values",
-            "remu": "REMU has variable-time execution based on operand values",
-            "remw": "REMW has variable-time execution based on operand values",
-            "remuw": "REMUW has variable-time execution based on operand values",
-            "fdiv.s": "FDIV.S has variable latency",
-            "fdiv.d": "FDIV.D has variable latency",
-            "fsqrt.s": "FSQRT.S has variable latency",
-            "fsqrt.d": "FSQRT.D has variable latency",
-        },
-        "warnings": {
-            "beq": "conditional branch may leak timing information if condition depends on secret data",
-            "bne": "conditional branch may leak timing information if condition depends on secret data",
-            "blt": "conditional branch may leak timing information if condition depends on secret data",
-            "bge": "conditional branch may leak timing information if condition depends on secret data",
-            "bltu": "conditional branch may leak timing information if condition depends on secret data",
-            "bgeu": "conditional branch may leak timing information if condition depends on secret data",
-        },
-    },
-    # PowerPC 64-bit Little Endian
-    "ppc64le": {
-        "errors": {
-            "divw": "DIVW has variable-time execution",
-            "divwu": "DIVWU has variable-time execution",
-            "divd": "DIVD has variable-time execution",
-            "divdu": "DIVDU has variable-time execution",
-            "divwe": "DIVWE has variable-time execution",
-            "divweu": "DIVWEU has variable-time execution",
-            "divde": "DIVDE has variable-time execution",
-            "divdeu": "DIVDEU has variable-time execution",
-            "fdiv": "FDIV has variable latency",
-            "fdivs": "FDIVS has variable latency",
-            "fsqrt": "FSQRT has variable latency",
-            "fsqrts": "FSQRTS has variable latency",
-        },
-        "warnings": {
-            "beq": "conditional branch may leak timing information if condition depends on secret data",
-            "bne": "conditional branch may leak timing information if condition depends on secret data",
-            "blt": "conditional branch may leak timing information if condition depends on secret data",
-            "bge": "conditional branch may leak timing information if condition depends on secret data",
-            "bgt": "conditional branch may leak timing information if condition depends on secret data",
-            "ble": "conditional branch may leak timing information if condition depends on secret data",
-        },
-    },
-    # IBM z/Architecture (s390x)
-    "s390x": {
-        "errors": {
-            "d": "D (divide) has variable-time execution",
-            "dr": "DR (divide register) has variable-time execution",
-            "dl": "DL (divide logical) has variable-time execution",
-            "dlr": "DLR (divide logical register) has variable-time execution",
-            "dlg": "DLG (divide logical 64-bit) has variable-time execution",
-            "dlgr": "DLGR (divide logical register 64-bit) has variable-time execution",
-            "dsg": "DSG (divide single 64-bit) has variable-time execution",
-            "dsgr": "DSGR (divide single register 64-bit) has variable-time execution",
-            "dsgf": "DSGF (divide single 64x32) has variable-time execution",
-            "dsgfr": "DSGFR (divide single register 64x32) has variable-time execution",
-            "ddb": "DDB (divide FP) has variable latency",
-            "ddbr": "DDBR (divide FP register) has variable latency",
-            "sqdb": "SQDB (square root FP) has variable latency",
-            "sqdbr": "SQDBR (square root FP register) has variable latency",
-        },
-        "warnings": {
-            "je": "conditional branch may leak timing information if condition depends on secret data",
-            "jne": "conditional branch may leak timing information if condition depends on secret data",
-            "jh": "conditional branch may leak timing information if condition depends on secret data",
-            "jl": "conditional branch may leak timing information if condition depends on secret data",
-            "jhe": "conditional branch may leak timing information if condition depends on secret data",
-            "jle": "conditional branch may leak timing information if condition depends on secret data",
-            "jo": "conditional branch may leak timing information if condition depends on secret data",
-            "jno": "conditional branch may leak timing information if condition depends on secret data",
-            "jp": "conditional branch may leak timing information if condition depends on secret data",
-            "jnp": "conditional branch may leak timing information if condition depends on secret data",
-            "jm": "conditional branch may leak timing information if condition depends on secret data",
-            "jnm": "conditional branch may leak timing information if condition depends on secret data",
-            "jz": "conditional branch may leak timing information if condition depends on secret data",
-            "jnz": "conditional branch may leak timing information if condition depends on secret data",
-        },
-    },
-    # i386 / x86 32-bit
-    "i386": {
-        "errors": {
-            "div": "DIV has data-dependent timing; execution time varies based on operand values",
-            "idiv": "IDIV has data-dependent timing; execution time varies based on operand values",
-            "divb": "DIVB has data-dependent timing",
-            "divw": "DIVW has data-dependent timing",
-            "divl": "DIVL has data-dependent timing",
-            "idivb": "IDIVB has data-dependent timing",
-            "idivw": "IDIVW has data-dependent timing",
-            "idivl": "IDIVL has data-dependent timing",
-            "fdiv": "FDIV has variable latency",
-            "fdivp": "FDIVP has variable latency",
-            "fidiv": "FIDIV has variable latency",
-            "fdivr": "FDIVR has variable latency",
-            "fdivrp": "FDIVRP has variable latency",
-            "fidivr": "FIDIVR has variable latency",
-            "fsqrt": "FSQRT has variable latency",
-        },
-        "warnings": {
-            "je": "conditional branch may leak timing information if condition depends on secret data",
-            "jne": "conditional branch may leak timing information if condition depends on secret data",
-            "jz": "conditional branch may leak timing information if condition depends on secret data",
-            "jnz": "conditional branch may leak timing information if condition depends on secret data",
-            "ja": "conditional branch may leak timing information if condition depends on secret data",
-            "jae": "conditional branch may leak timing information if condition depends on secret data",
-            "jb": "conditional branch may leak timing information if condition depends on secret data",
-            "jbe": "conditional branch may leak timing information if condition depends on secret data",
-            "jg": "conditional branch may leak timing information if condition depends on secret data",
-            "jge": "conditional branch may leak timing information if condition depends on secret data",
-            "jl": "conditional branch may leak timing information if condition depends on secret data",
-            "jle": "conditional branch may leak timing information if condition depends on secret data",
-        },
-    },
-}
+
+# Architecture-specific dangerous instructions: architecture -> {"errors": {mnemonic: reason},
+# "warnings": {...}}, read from the architecture's rule pack (rules/native/) on first lookup.
+# Based on research from Trail of Bits and the cryptocoding guidelines
+DANGEROUS_INSTRUCTIONS = TargetTables("instructions")
 
 # Architecture aliases
 ARCH_ALIASES = {
@@ -379,7 +497,7 @@ def get_native_arch() -> str:
 
 def detect_language(source_file: str) -> str:
     """Detect the programming language from file extension."""
-    ext = Path(source_file).suffix.lower()
+    ext = os.path.splitext(source_file)[1].lower()
     language_map = {
         ".c": "c",
         ".h": "c",
@@ -431,9 +549,486 @@ def is_bytecode_language(language: str) -> bool:
 is_scripting_language = is_bytecode_language
 
 
+# =============================================================================
+# Instruction Lookup
+# =============================================================================
+
+# ARM condition codes; HS and LO are the unified-syntax names of CS and CC
+ARM_CONDITIONS = tuple("eq ne cs hs cc lo mi pl vs vc hi ls ge lt gt le".split())
+_ARM_CONDITION_ALIASES = {"cs": "hs", "hs": "cs", "cc": "lo", "lo": "cc"}
+# Thumb-2 encoding-width qualifiers (beq.w, udiv.w)
+_THUMB_QUALIFIERS = (".w", ".n")
+# AT&T operand-size suffixes: byte, word, long, quad, and short (x87 memory operands)
+_ATT_SIZE_SUFFIXES = ("b", "w", "l", "q", "s")
+
+# (severity, reason) of a flagged instruction
+InstructionRule = tuple[Severity, str]
+
+
+def _arm_spellings(key: str, conditional: bool) -> list[str]:
+    """
+    Spellings of an ARM table key that listings print for the same instruction.
+
+    Conditional branches (beq, b.cs) gain their condition-code alias (b.hs).
+    With conditional set (32-bit ARM), other instructions gain every
+    condition code between mnemonic and data-type suffix (udiveq,
+    vdivne.f64), and dotless spellings gain the Thumb-2 width qualifiers.
+    """
+    stem, dot, suffix = key.partition(".")
+    if stem == "b" and suffix in ARM_CONDITIONS:
+        spellings = [key]
+        if suffix in _ARM_CONDITION_ALIASES:
+            spellings.append("b." + _ARM_CONDITION_ALIASES[suffix])
+    elif stem[:1] == "b" and stem[1:] in ARM_CONDITIONS and not dot:
+        spellings = [key]
+        if stem[1:] in _ARM_CONDITION_ALIASES:
+            spellings.append("b" + _ARM_CONDITION_ALIASES[stem[1:]])
+    elif conditional:
+        spellings = [key] + [stem + condition + dot + suffix for condition in ARM_CONDITIONS]
+    else:
+        return []
+    if conditional:
+        spellings += [s + q for s in spellings if "." not in s for q in _THUMB_QUALIFIERS]
+    return spellings[1:]
+
+
+def _spellings(arch: str, key: str, severity: Severity) -> list[str]:
+    """Other spellings of a DANGEROUS_INSTRUCTIONS key for the same instruction."""
+    if arch in ("x86_64", "i386"):
+        # divl, fdivs; branches take no size suffix
+        if severity != Severity.ERROR:
+            return []
+        return [key + suffix for suffix in _ATT_SIZE_SUFFIXES]
+    if arch in ("arm", "arm64"):
+        return _arm_spellings(key, conditional=arch == "arm")
+    return []
+
+
+@dataclass
+class InstructionRules:
+    """
+    An architecture's instruction tables compiled for lookup.
+
+    Every spelling of a flagged instruction maps to its (severity, reason),
+    so the parsers classify a mnemonic with a single dictionary probe.
+    """
+
+    errors: dict[str, InstructionRule]
+    # errors plus warnings
+    everything: dict[str, InstructionRule]
+    # folded spelling -> the table key it was derived from
+    keys: dict[str, str] = field(default_factory=dict)
+    _encoded: dict[bool, dict[bytes, InstructionRule]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def compile(
+        cls, arch: str, errors: dict[str, str], warnings: dict[str, str]
+    ) -> "InstructionRules":
+        """
+        Build the lookup for one architecture's error and warning tables.
+
+        Table keys take precedence over folded spellings, and errors over
+        warnings, for the (severity, reason) of a spelling.
+        """
+        tables = ((Severity.ERROR, errors), (Severity.WARNING, warnings))
+        everything: dict[str, InstructionRule] = {}
+        keys: dict[str, str] = {}
+        for severity, table in tables:
+            for key, reason in table.items():
+                everything.setdefault(key, (severity, reason))
+        for severity, table in tables:
+            for key, reason in table.items():
+                for spelling in _spellings(arch, key, severity):
+                    # Suffixed keys (idivl) fold to their stem (idiv) too
+                    if spelling not in everything or len(key) < len(spelling):
+                        keys.setdefault(spelling, key)
+                    everything.setdefault(spelling, (severity, reason))
+        errors_only = {
+            mnemonic: rule for mnemonic, rule in everything.items() if rule[0] == Severity.ERROR
+        }
+        return cls(errors_only, everything, keys)
+
+    def canonical(self, mnemonic: str) -> str:
+        """
+        The table key of a lowercase mnemonic (idivl -> idiv, udiveq -> udiv).
+
+        Decoders that spell the same instruction differently report the
+        same mnemonic this way. Unfolded mnemonics are returned unchanged.
+        """
+        return self.keys.get(mnemonic, mnemonic)
+
+    def table(self, include_warnings: bool = False) -> dict[str, InstructionRule]:
+        """Lowercase mnemonic -> (severity, reason) of the instructions to flag."""
+        return self.everything if include_warnings else self.errors
+
+    def encoded(self, include_warnings: bool = False) -> dict[bytes, InstructionRule]:
+        """table() keyed by ASCII-encoded mnemonic, for the byte-level parser."""
+        encoded = self._encoded.get(include_warnings)
+        if encoded is None:
+            table = self.table(include_warnings)
+            encoded = self._encoded[include_warnings] = {m.encode(): r for m, r in table.items()}
+        return encoded
+
+
+def instruction_rules(arch: str) -> InstructionRules:
+    """
+    The compiled DANGEROUS_INSTRUCTIONS lookup for an architecture.
+
+    Built on first use and shared by every parser for the architecture,
+    until rule packs are added. An unsupported architecture gets an empty
+    lookup.
+    """
+    arch = normalize_arch(arch)
+
+    def build() -> InstructionRules:
+        instructions = DANGEROUS_INSTRUCTIONS.get(arch, {})
+        return InstructionRules.compile(
+            arch, instructions.get("errors", {}), instructions.get("warnings", {})
+        )
+
+    return RULE_PACKS.compiled(("instructions", arch), build)
+
+
+# =============================================================================
+# Toolchain Subprocesses
+# =============================================================================
+
+T = TypeVar("T")
+
+# Toolchain stages; ToolLimits timeouts are set per stage
+STAGE_PROBE = "probe"  # --version availability checks
+STAGE_COMPILE = "compile"  # source to assembly, class files, DLLs or JavaScript
+STAGE_DISASSEMBLE = "disassemble"  # objdump, javap, dis, --print-bytecode, VLD, ...
+STAGE_SYMBOLIZE = "symbolize"  # addr2line
+TOOL_STAGES = (STAGE_PROBE, STAGE_COMPILE, STAGE_DISASSEMBLE, STAGE_SYMBOLIZE)
+
+
+@dataclass
+class ToolRun:
+    """A toolchain subprocess requested by a step generator."""
+
+    cmd: list[str]
+    env: dict[str, str] | None = None
+    cwd: str | None = None
+    stage: str = STAGE_COMPILE
+    # Files the tool reads that are not on its command line (for the tool store)
+    inputs: tuple[str, ...] = ()
+
+
+@dataclass
+class ToolLimits:
+    """
+    Wall-clock and resource limits for toolchain subprocesses.
+
+    Timeouts are per stage (see TOOL_STAGES), falling back to
+    default_timeout. memory and cpu are applied to each subprocess as
+    RLIMIT_AS (bytes) and RLIMIT_CPU (seconds). JVM and V8 based tools
+    reserve large address ranges up front, so memory limits for them must be
+    generous.
+    """
+
+    timeouts: dict[str, float] = field(default_factory=dict)
+    default_timeout: float | None = None
+    memory: int | None = None
+    cpu: int | None = None
+
+    def timeout_for(self, stage: str) -> float | None:
+        return self.timeouts.get(stage, self.default_timeout)
+
+    def preexec_fn(self) -> Callable[[], None] | None:
+        """Function that applies the resource limits in the child, or None."""
+        if self.memory is None and self.cpu is None:
+            return None
+        import resource
+
+        memory, cpu = self.memory, self.cpu
+
+        def apply_limits() -> None:
+            if memory is not None:
+                resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+            if cpu is not None:
+                # SIGXCPU at the soft limit, SIGKILL a second later
+                resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+
+        return apply_limits
+
+
+class ToolLimitExceeded(RuntimeError):
+    """Raised by the step drivers when a ToolLimits limit stops a subprocess."""
+
+    def __init__(self, event: LimitEvent):
+        super().__init__(f"{event.describe()}: {event.command}")
+        self.event = event
+
+
+# Signs in a failed tool's stderr that an RLIMIT_AS allocation failed; compiler
+# drivers report a child killed by a failed allocation as "terminated program"
+_OUT_OF_MEMORY = re.compile(
+    r"out of memory|memory exhausted|cannot allocate memory|bad_alloc|MemoryError"
+    r"|OutOfMemoryError|Could not reserve enough space|signal terminated program",
+    re.IGNORECASE,
+)
+
+
+def _resource_event(
+    request: ToolRun, limits: ToolLimits, returncode: int, stderr: str, elapsed: float
+) -> LimitEvent | None:
+    """Attribute a failed subprocess to a resource limit, if one was likely the cause."""
+    import signal
+
+    if returncode == 0:
+        return None
+    command = " ".join(request.cmd)
+    if limits.cpu is not None and returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        return LimitEvent(request.stage, "cpu", limits.cpu, elapsed, command)
+    if limits.memory is not None and (returncode < 0 or _OUT_OF_MEMORY.search(stderr)):
+        return LimitEvent(request.stage, "memory", limits.memory, elapsed, command)
+    return None
+
+
+# Toolchain interactions are written as step generators: they yield a ToolRun
+# for each subprocess they need, are sent the finished CompletedProcess (text
+# mode, output captured) or have the OSError thrown in if the tool cannot be
+# started (ToolLimitExceeded if it hit a limit), and return their result.
+# run_steps() drives them with blocking subprocesses, run_steps_async() with
+# asyncio subprocesses. (subprocess is imported by the drivers, not at startup.)
+ToolSteps = Generator[ToolRun, "subprocess.CompletedProcess", T]
+
+# replay.ToolStore that records or replays every tool run, see set_tool_store()
+_tool_store = None
+
+
+def set_tool_store(store) -> object:
+    """
+    Record or replay every toolchain subprocess through a replay.ToolStore.
+
+    Args:
+        store: The store, or None to run tools normally
+
+    Returns:
+        The previously installed store
+    """
+    global _tool_store
+    previous, _tool_store = _tool_store, store
+    return previous
+
+
+def run_steps(steps: ToolSteps[T], limits: ToolLimits | None = None) -> T:
+    """
+    Run a step generator to completion with blocking subprocesses.
+
+    Raises:
+        ToolLimitExceeded: A subprocess hit a timeout or resource limit and
+            the generator did not handle it
+    """
+    try:
+        request = next(steps)
+        while True:
+            try:
+                completed = run_tool(request, limits)
+            except (OSError, ToolLimitExceeded) as e:
+                request = steps.throw(e)
+            else:
+                request = steps.send(completed)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+def run_tool(request: ToolRun, limits: ToolLimits | None = None) -> "subprocess.CompletedProcess":
+    """
+    Run one ToolRun to completion, killing its whole process group on timeout.
+
+    Raises:
+        OSError: The tool could not be started
+        ToolLimitExceeded: The tool hit a timeout or resource limit
+    """
+    import signal
+    import subprocess
+    import time
+
+    store = _tool_store
+    if store is not None:
+        recording, replayed = store.replay(request)
+        if replayed is not None:
+            return replayed
+
+    timeout = limits.timeout_for(request.stage) if limits else None
+    started = time.monotonic()
+    process = subprocess.Popen(
+        request.cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=request.env,
+        cwd=request.cwd,
+        preexec_fn=limits.preexec_fn() if limits else None,
+        # Own process group, so compiler drivers' children die with them
+        start_new_session=True,
+    )
+    try:
+        stdout, stderr = process.communicate(timeout=timeout)
+    except BaseException as e:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        process.communicate()
+        if isinstance(e, subprocess.TimeoutExpired):
+            elapsed = time.monotonic() - started
+            event = LimitEvent(request.stage, "timeout", timeout, elapsed, " ".join(request.cmd))
+            raise ToolLimitExceeded(event) from None
+        raise
+    if limits is not None:
+        event = _resource_event(
+            request, limits, process.returncode, stderr, time.monotonic() - started
+        )
+        if event is not None:
+            raise ToolLimitExceeded(event)
+    completed = subprocess.CompletedProcess(request.cmd, process.returncode, stdout, stderr)
+    if store is not None:
+        store.record(recording, completed)
+    return completed
+
+
+async def run_steps_async(
+    steps: ToolSteps[T],
+    limit=None,
+    timeout: float | None = None,
+    limits: ToolLimits | None = None,
+) -> T:
+    """
+    Run a step generator to completion with asyncio subprocesses.
+
+    Args:
+        steps: Step generator
+        limit: asyncio.Semaphore bounding concurrently running subprocesses
+        timeout: Seconds the subprocesses may run in total; time spent waiting
+            for the semaphore does not count
+        limits: Per-stage timeouts and resource limits
+
+    Returns:
+        The generator's result
+
+    Raises:
+        TimeoutError: The subprocesses ran longer than timeout
+        ToolLimitExceeded: A subprocess hit a ToolLimits limit and the
+            generator did not handle it
+    """
+    import asyncio
+
+    remaining = timeout
+    loop = asyncio.get_running_loop()
+    try:
+        request = next(steps)
+        while True:
+            stage_timeout = limits.timeout_for(request.stage) if limits else None
+            # The job budget wins ties, so it is reported as a TimeoutError
+            by_stage = stage_timeout is not None and (
+                remaining is None or stage_timeout < remaining
+            )
+            if limit is not None:
+                await limit.acquire()
+            started = loop.time()
+            event = None
+            try:
+                completed = await _run_tool_async(
+                    request, stage_timeout if by_stage else remaining, limits
+                )
+            except TimeoutError:
+                if not by_stage:
+                    raise TimeoutError(f"Toolchain did not finish within {timeout}s") from None
+                command = " ".join(request.cmd)
+                event = LimitEvent(
+                    request.stage, "timeout", stage_timeout, loop.time() - started, command
+                )
+            except OSError as e:
+                # The tool could not be started (e.g. FileNotFoundError)
+                request = steps.throw(e)
+                continue
+            finally:
+                if limit is not None:
+                    limit.release()
+                if remaining is not None:
+                    remaining -= loop.time() - started
+            if event is None and limits is not None:
+                event = _resource_event(
+                    request, limits, completed.returncode, completed.stderr, loop.time() - started
+                )
+            if event is not None:
+                request = steps.throw(ToolLimitExceeded(event))
+            else:
+                request = steps.send(completed)
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        # Runs cleanup (temporary files) in the generator after a cancellation
+        steps.close()
+
+
+async def _run_tool_async(
+    request: ToolRun, timeout: float | None, limits: ToolLimits | None = None
+) -> "subprocess.CompletedProcess":
+    """Run one ToolRun, killing its whole process group on cancellation or timeout."""
+    import asyncio
+    import signal
+    import subprocess
+
+    store = _tool_store
+    if store is not None:
+        recording, replayed = store.replay(request)
+        if replayed is not None:
+            return replayed
+
+    if timeout is not None and timeout <= 0:
+        raise TimeoutError
+    process = await asyncio.create_subprocess_exec(
+        *request.cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=request.env,
+        cwd=request.cwd,
+        preexec_fn=limits.preexec_fn() if limits else None,
+        # Own process group, so compiler drivers' children die with them
+        start_new_session=True,
+    )
+    try:
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError from None
+    except BaseException:
+        # Timed out or cancelled
+        if process.returncode is None:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        raise
+    completed = subprocess.CompletedProcess(
+        request.cmd,
+        process.returncode,
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+    )
+    # Runs cut short by a resource limit are not stored
+    if store is not None and (
+        limits is None
+        or _resource_event(request, limits, completed.returncode, completed.stderr, 0.0) is None
+    ):
+        store.record(recording, completed)
+    return completed
+
+
 class Compiler:
     """Base class for compiler interfaces."""
 
+    # Flags that add source line tables (.file/.loc directives) to the
+    # assembly without changing the generated code; see debug_info
+    DEBUG_FLAGS: list[str] = []
+
     def __init__(self, name: str, path: str | None = None):
         self.name = name
         self.path = path or name
@@ -447,18 +1042,31 @@ class Compiler:
         extra_flags: list[str] = None,
     ) -> tuple[bool, str]:
         """Compile source to assembly. Returns (success, error_message)."""
+        return run_steps(
+            self.assembly_steps(source_file, output_file, arch, optimization, extra_flags)
+        )
+
+    def assembly_steps(
+        self,
+        source_file: str,
+        output_file: str,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] = None,
+    ) -> ToolSteps[tuple[bool, str]]:
+        """Step generator behind compile_to_assembly()."""
         raise NotImplementedError
 
     def is_available(self) -> bool:
         """Check if the compiler is available on the system."""
+        return run_steps(self.availability_steps())
+
+    def availability_steps(self) -> ToolSteps[bool]:
+        """Step generator behind is_available()."""
         try:
-            subprocess.run(
-                [self.path, "--version"],
-                capture_output=True,
-                check=True,
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+            result = yield ToolRun([self.path, "--version"], stage=STAGE_PROBE)
+            return result.returncode == 0
+        except FileNotFoundError:
             return False
 
 
@@ -475,17 +1083,19 @@ class GCCCompiler(Compiler):
         "s390x": ["-march=z13"],
     }
 
+    DEBUG_FLAGS = ["-g1"]
+
     def __init__(self, path: str | None = None):
         super().__init__("gcc", path or "gcc")
 
-    def compile_to_assembly(
+    def assembly_steps(
         self,
         source_file: str,
         output_file: str,
         arch: str,
         optimization: str,
         extra_flags: list[str] = None,
-    ) -> tuple[bool, str]:
+    ) -> ToolSteps[tuple[bool, str]]:
         arch = normalize_arch(arch)
         arch_flags = self.ARCH_FLAGS.get(arch, [])
 
@@ -503,7 +1113,7 @@ class GCCCompiler(Compiler):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr
             return True, ""
@@ -524,17 +1134,19 @@ class ClangCompiler(Compiler):
         "s390x": "s390x-unknown-linux-gnu",
     }
 
+    DEBUG_FLAGS = ["-gline-tables-only"]
+
     def __init__(self, path: str | None = None):
         super().__init__("clang", path or "clang")
 
-    def compile_to_assembly(
+    def assembly_steps(
         self,
         source_file: str,
         output_file: str,
         arch: str,
         optimization: str,
         extra_flags: list[str] = None,
-    ) -> tuple[bool, str]:
+    ) -> ToolSteps[tuple[bool, str]]:
         arch = normalize_arch(arch)
         target = self.ARCH_TARGETS.get(arch)
 
@@ -551,7 +1163,7 @@ class ClangCompiler(Compiler):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr
             return True, ""
@@ -575,25 +1187,23 @@ class GoCompiler(Compiler):
     def __init__(self, path: str | None = None):
         super().__init__("go", path or "go")
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         try:
-            subprocess.run(
-                [self.path, "version"],
-                capture_output=True,
-                check=True,
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+            result = yield ToolRun([self.path, "version"], stage=STAGE_PROBE)
+            return result.returncode == 0
+        except FileNotFoundError:
             return False
 
-    def compile_to_assembly(
+    def assembly_steps(
         self,
         source_file: str,
         output_file: str,
         arch: str,
         optimization: str,
         extra_flags: list[str] = None,
-    ) -> tuple[bool, str]:
+    ) -> ToolSteps[tuple[bool, str]]:
+        import tempfile
+
         arch = normalize_arch(arch)
         goarch = self.ARCH_MAP.get(arch, arch)
 
@@ -622,13 +1232,13 @@ class GoCompiler(Compiler):
             cmd.append(source_file)
 
             try:
-                result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+                result = yield ToolRun(cmd, env=env)
                 if result.returncode != 0:
                     return False, result.stderr
 
                 # Now disassemble
                 disasm_cmd = [self.path, "tool", "objdump", binary_path]
-                result = subprocess.run(disasm_cmd, capture_output=True, text=True)
+                result = yield ToolRun(disasm_cmd, stage=STAGE_DISASSEMBLE)
                 if result.returncode != 0:
                     return False, result.stderr
 
@@ -656,14 +1266,14 @@ class RustCompiler(Compiler):
     def __init__(self, path: str | None = None):
         super().__init__("rustc", path or "rustc")
 
-    def compile_to_assembly(
+    def assembly_steps(
         self,
         source_file: str,
         output_file: str,
         arch: str,
         optimization: str,
         extra_flags: list[str] = None,
-    ) -> tuple[bool, str]:
+    ) -> ToolSteps[tuple[bool, str]]:
         arch = normalize_arch(arch)
         target = self.ARCH_TARGETS.get(arch)
 
@@ -689,7 +1299,7 @@ class RustCompiler(Compiler):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr
             return True, ""
@@ -712,14 +1322,14 @@ class SwiftCompiler(Compiler):
     def __init__(self, path: str | None = None):
         super().__init__("swiftc", path or "swiftc")
 
-    def compile_to_assembly(
+    def assembly_steps(
         self,
         source_file: str,
         output_file: str,
         arch: str,
         optimization: str,
         extra_flags: list[str] = None,
-    ) -> tuple[bool, str]:
+    ) -> ToolSteps[tuple[bool, str]]:
         arch = normalize_arch(arch)
         target = self.ARCH_TARGETS.get(arch)
 
@@ -744,7 +1354,7 @@ class SwiftCompiler(Compiler):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr
             return True, ""
@@ -780,6 +1390,172 @@ def get_compiler(name: str, language: str) -> Compiler:
         return ClangCompiler()
 
 
+class _SourceLocation:
+    """
+    Source-location state of an assembly parse, shared by the text and bytes parsers.
+
+    Tracks the current file:line, the span of lines seen in the current
+    function's file, and how many violations came before the first location.
+    """
+
+    __slots__ = ("file", "line", "function_file", "first_line", "last_line", "unlocated")
+
+    def __init__(self):
+        self.file = self.line = None
+        # Source file of the current function and the lines of it seen there
+        self.function_file = self.first_line = self.last_line = None
+        self.unlocated = None
+
+    def move(self, file: str, line: int, violations: int) -> None:
+        """Locate the instructions that follow; violations is the count found so far."""
+        self.file = file
+        self.line = line
+        if self.function_file is None:
+            self.function_file = file
+        if file == self.function_file:
+            if self.first_line is None or line < self.first_line:
+                self.first_line = line
+            if self.last_line is None or line > self.last_line:
+                self.last_line = line
+        if self.unlocated is None:
+            self.unlocated = violations
+
+    def start_function(self) -> None:
+        """Begin a new function's span."""
+        self.function_file = self.first_line = self.last_line = None
+
+    def function_record(self, name: str, instructions: int) -> dict:
+        """
+        Parser summary of the current function.
+
+        When location info was seen, "file" is the source file of the function's
+        first location and "lines" spans the lines of that file seen in it.
+        """
+        record = {"name": name, "instructions": instructions}
+        if self.first_line is not None:
+            record["file"] = self.function_file
+            record["lines"] = (self.first_line, self.last_line)
+        return record
+
+    def result(self, violations: int) -> tuple[int, tuple[str, int] | None]:
+        """(unlocated, location) as returned by the parsers."""
+        unlocated = violations if self.unlocated is None else self.unlocated
+        location = (self.file, self.line) if self.file is not None else None
+        return unlocated, location
+
+
+def _match_function_start(line: str) -> re.Match | None:
+    """Match a stripped assembly line that starts a function (group 1 is the name)."""
+    return (
+        # GCC/Clang: function_name:
+        re.match(r"^([a-zA-Z_][a-zA-Z0-9_]*):$", line)
+        or
+        # Go objdump: TEXT symbol_name(SB) file
+        re.match(r"^TEXT\s+([^\s(]+)\(SB\)", line)
+        or
+        # With .type directive
+        re.match(r"\.type\s+([a-zA-Z_][a-zA-Z0-9_]*),\s*@function", line)
+    )
+
+
+def compile_function_filter(pattern: str | None) -> Callable[[str], bool] | None:
+    """
+    Compile a --func regex into a predicate on function names.
+
+    The search result is cached per name: the parsers ask once per function
+    start, and a .type directive and its label both name the same function.
+    Returns None when there is no pattern, meaning every function is selected.
+    """
+    if not pattern:
+        return None
+    search = re.compile(pattern).search
+    cache: dict[str, bool] = {}
+
+    def matches(name: str) -> bool:
+        selected = cache.get(name)
+        if selected is None:
+            selected = cache[name] = search(name) is not None
+        return selected
+
+    return matches
+
+
+# Byte-level equivalents of the AssemblyParser.parse patterns
+_LOCATION_BYTES = re.compile(rb"#\s*([^:]+):(\d+)")
+_LABEL_BYTES = re.compile(rb"([a-zA-Z_][a-zA-Z0-9_]*):$")
+_GO_TEXT_BYTES = re.compile(rb"TEXT\s+([^\s(]+)\(SB\)")
+_TYPE_BYTES = re.compile(rb"\.type\s+([a-zA-Z_][a-zA-Z0-9_]*),\s*@function")
+_ADDRESS_BYTES = re.compile(rb"0x([0-9a-fA-F]+)")
+_HEX_BYTES = re.compile(rb"[0-9a-fA-F]{2,}$")
+
+# Debug line directives (-g): `.file N "path"` fills the file table, DWARF 5
+# splits it as `.file N "dir" "name" md5 0x...`; `.loc N LINE [COLUMN] ...`
+# then locates the instructions that follow
+_FILE_DIRECTIVE_BYTES = re.compile(
+    rb'[ \t]*\.file[ \t]+(\d+)[ \t]+"((?:[^"\\]|\\.)*)"(?:[ \t]+"((?:[^"\\]|\\.)*)")?'
+)
+_STRING_ESCAPE_BYTES = re.compile(rb"\\([0-7]{1,3}|.)", re.DOTALL)
+_LOC_DIRECTIVES = (".loc ", ".loc\t")
+_LOC_DIRECTIVES_BYTES = (b".loc ", b".loc\t")
+
+
+def _assembler_string(raw: bytes) -> str:
+    """Decode the contents of a quoted assembler string (backslash and octal escapes)."""
+    if b"\\" in raw:
+        raw = _STRING_ESCAPE_BYTES.sub(
+            lambda m: bytes([int(m.group(1), 8) & 0xFF]) if m.group(1).isdigit() else m.group(1),
+            raw,
+        )
+    return raw.decode("utf-8", errors="replace")
+
+
+def _file_directive(line: bytes) -> tuple[int, str] | None:
+    """
+    The (number, path) entry a `.file` directive adds to the file table.
+
+    A relative DWARF 5 name is joined to its directory. The unnumbered
+    `.file "a.c"` only names the object for the symbol table: None.
+    """
+    match = _FILE_DIRECTIVE_BYTES.match(line)
+    if match is None:
+        return None
+    number, first, second = match.groups()
+    path = _assembler_string(first)
+    if second is not None:
+        path = os.path.join(path, _assembler_string(second))
+    # One str per file, shared by every violation located in it
+    return int(number), sys.intern(path)
+
+
+def _loc_directive(fields: Sequence) -> tuple[int, int] | None:
+    """(file number, line) of a split `.loc` directive; None for line 0 (no source line)."""
+    if len(fields) < 3 or not fields[1].isdigit() or not fields[2].isdigit():
+        return None
+    row = int(fields[2])
+    return (int(fields[1]), row) if row else None
+
+
+def _file_table(data) -> dict[int, str]:
+    """
+    The `.file` table of a whole assembly buffer.
+
+    Chunks of a split file are parsed on their own, but their `.loc`
+    directives index a table the compiler emits once, near the start.
+    """
+    files = {}
+    size = len(data)
+    position = data.find(b".file")
+    while position >= 0:
+        start = data.rfind(b"\n", 0, position) + 1
+        end = data.find(b"\n", position)
+        end = size if end < 0 else end
+        entry = _file_directive(data[start:end].strip())
+        if entry is not None:
+            files[entry[0]] = entry[1]
+        position = data.find(b".file", end)
+    return files
+
+
 class AssemblyParser:
     """Parser for assembly output from various compilers."""
 
@@ -801,21 +1577,63 @@ class AssemblyParser:
             arch_instructions = DANGEROUS_INSTRUCTIONS[self.arch]
             self.errors = arch_instructions.get("errors", {})
             self.warnings = arch_instructions.get("warnings", {})
+        self.rules = instruction_rules(self.arch)
+
+    def classify(
+        self, mnemonic: str, include_warnings: bool = False
+    ) -> tuple[Severity, str] | None:
+        """
+        Classify a single lowercase mnemonic.
+        Returns (severity, reason), or None if the instruction is safe.
+        """
+        return self.rules.table(include_warnings).get(mnemonic)
 
     def parse(
-        self, assembly_text: str, include_warnings: bool = False
-    ) -> tuple[list[dict], list[Violation]]:
+        self,
+        assembly_text: str,
+        include_warnings: bool = False,
+        on_violation: Callable[[Violation], None] | None = None,
+        function_filter: Callable[[str], bool] | None = None,
+    ) -> tuple[list[dict], ViolationTable]:
         """
         Parse assembly text and detect violations.
-        Returns (functions, violations).
+        Returns (functions, violations). on_violation, if given, is called
+        with each violation as soon as it is found. function_filter, if
+        given, selects functions by name (see compile_function_filter); the
+        instructions of other functions are skipped without being classified.
+        """
+        functions, violations, _unlocated, _location = self._parse_text(
+            assembly_text, include_warnings, on_violation, function_filter
+        )
+        return functions, violations
+
+    def _parse_text(
+        self,
+        assembly_text: str,
+        include_warnings: bool = False,
+        on_violation: Callable[[Violation], None] | None = None,
+        function_filter: Callable[[str], bool] | None = None,
+        source_files: dict[int, str] | None = None,
+    ) -> tuple[list[dict], ViolationTable, int, tuple[str, int] | None]:
         """
+        Parse assembly text, also reporting the source-location state.
+
+        Returns (functions, violations, unlocated, location) where unlocated
+        is the number of leading violations seen before the first file:line
+        comment or .loc directive and location is the last (file, line)
+        seen. Chunks of a split file use these to inherit the location of
+        the preceding chunk, and source_files to start with the whole
+        file's .file table (see _file_table).
+        """
+        rules = self.rules.table(include_warnings)
         functions = []
-        violations = []
+        violations = ViolationTable()
+        files = dict(source_files or ())
 
         current_function = None
-        current_file = None
-        current_line = None
+        location = _SourceLocation()
         instruction_count = 0
+        selected = function_filter is None or function_filter("<unknown>")
 
         for line in assembly_text.split("\n"):
             line = line.strip()
@@ -825,36 +1643,35 @@ class AssemblyParser:
                 # Check for file/line info in comments
                 file_match = re.search(r"#\s*([^:]+):(\d+)", line)
                 if file_match:
-                    current_file = file_match.group(1)
-                    current_line = int(file_match.group(2))
+                    location.move(file_match.group(1), int(file_match.group(2)), len(violations))
                 continue
 
             # Detect function start (various formats)
-            func_match = (
-                # GCC/Clang: function_name:
-                re.match(r"^([a-zA-Z_][a-zA-Z0-9_]*):$", line)
-                or
-                # Go objdump: TEXT symbol_name(SB) file
-                re.match(r"^TEXT\s+([^\s(]+)\(SB\)", line)
-                or
-                # With .type directive
-                re.match(r"\.type\s+([a-zA-Z_][a-zA-Z0-9_]*),\s*@function", line)
-            )
+            func_match = _match_function_start(line)
 
             if func_match:
-                if current_function:
-                    functions.append(
-                        {
-                            "name": current_function,
-                            "instructions": instruction_count,
-                        }
-                    )
+                if current_function and selected:
+                    functions.append(location.function_record(current_function, instruction_count))
                 current_function = func_match.group(1)
+                location.start_function()
                 instruction_count = 0
+                selected = function_filter is None or function_filter(current_function)
                 continue
 
-            # Skip directives
             if line.startswith("."):
+                # Debug line directives locate the instructions that follow
+                if line.startswith(_LOC_DIRECTIVES):
+                    loc = _loc_directive(line.split(None, 3))
+                    if loc is not None and loc[0] in files:
+                        location.move(files[loc[0]], loc[1], len(violations))
+                elif line.startswith(".file"):
+                    entry = _file_directive(line.encode("utf-8", errors="replace"))
+                    if entry is not None:
+                        files[entry[0]] = entry[1]
+                continue
+
+            # Skip functions excluded by the filter
+            if not selected:
                 continue
 
             # Parse instruction
@@ -879,6 +1696,9 @@ class AssemblyParser:
                 if part.startswith("0x") or re.match(r"^[0-9a-fA-F]{2,}$", part):
                     continue
                 if ":" in part and not part.endswith(":"):  # file:line reference
+                    path, _, number = part.rpartition(":")
+                    if number.isdigit():
+                        location.move(path, int(number), len(violations))
                     continue
                 # This should be the mnemonic
                 mnemonic = part.lower().rstrip(":")
@@ -890,88 +1710,453 @@ class AssemblyParser:
             instruction_count += 1
 
             # Check for violations
-            if mnemonic in self.errors:
-                violations.append(
-                    Violation(
-                        function=current_function or "<unknown>",
-                        file=current_file or "",
-                        line=current_line,
-                        address=address,
-                        instruction=instruction,
-                        mnemonic=mnemonic.upper(),
-                        reason=self.errors[mnemonic],
-                        severity=Severity.ERROR,
-                    )
-                )
-            elif include_warnings and mnemonic in self.warnings:
-                violations.append(
-                    Violation(
-                        function=current_function or "<unknown>",
-                        file=current_file or "",
-                        line=current_line,
-                        address=address,
-                        instruction=instruction,
-                        mnemonic=mnemonic.upper(),
-                        reason=self.warnings[mnemonic],
-                        severity=Severity.WARNING,
-                    )
-                )
-
-        # Don't forget the last function
-        if current_function:
-            functions.append(
-                {
-                    "name": current_function,
-                    "instructions": instruction_count,
-                }
+            rule = rules.get(mnemonic)
+            if rule is None:
+                continue
+            violations.add(
+                function=current_function or "<unknown>",
+                file=location.file or "",
+                line=location.line,
+                address=address,
+                instruction=instruction,
+                mnemonic=mnemonic.upper(),
+                reason=rule[1],
+                severity=rule[0],
             )
 
-        return functions, violations
+            if on_violation is not None:
+                on_violation(violations[-1])
 
+        # Don't forget the last function
+        if current_function and selected:
+            functions.append(location.function_record(current_function, instruction_count))
 
-def analyze_source(
-    source_file: str,
-    arch: str = None,
-    compiler: str = None,
-    optimization: str = "O2",
-    include_warnings: bool = False,
-    function_filter: str = None,
-    extra_flags: list[str] = None,
-) -> AnalysisReport:
-    """
-    Analyze a source file for constant-time violations.
+        return functions, violations, *location.result(len(violations))
 
-    Args:
-        source_file: Path to the source file to analyze
-        arch: Target architecture (default: native, ignored for scripting languages)
-        compiler: Compiler to use (default: auto-detect from language)
-        optimization: Optimization level (default: O2, ignored for scripting languages)
-        include_warnings: Include warning-level violations
-        function_filter: Regex pattern to filter functions
-        extra_flags: Extra flags to pass to the compiler (ignored for scripting languages)
+    def parse_bytes(
+        self,
+        lines: Iterable[bytes],
+        include_warnings: bool = False,
+        on_violation: Callable[[Violation], None] | None = None,
+        function_filter: Callable[[str], bool] | None = None,
+    ) -> tuple[list[dict], ViolationTable]:
+        """
+        Parse assembly given as raw byte lines (e.g. from a memory-mapped file).
 
-    Returns:
-        AnalysisReport with results
-    """
-    source_path = Path(source_file)
-    if not source_path.exists():
-        raise FileNotFoundError(f"Source file not found: {source_file}")
+        Equivalent to parse() for ASCII input, but only function names, file
+        names and the lines that produce violations are decoded to str.
+        """
+        functions, violations, _unlocated, _location = self._parse_bytes(
+            lines, include_warnings, on_violation, function_filter
+        )
+        return functions, violations
 
-    language = detect_language(source_file)
+    def _parse_bytes(
+        self,
+        lines: Iterable[bytes],
+        include_warnings: bool = False,
+        on_violation: Callable[[Violation], None] | None = None,
+        function_filter: Callable[[str], bool] | None = None,
+        source_files: dict[int, str] | None = None,
+    ) -> tuple[list[dict], ViolationTable, int, tuple[str, int] | None]:
+        """Bytes counterpart of _parse_text; see there for the arguments and return value."""
+        rules = self.rules.encoded(include_warnings)
 
-    # Route scripting/bytecode languages to specialized analyzers
-    if is_bytecode_language(language):
-        try:
-            from .script_analyzers import get_script_analyzer
-        except ImportError:
-            from script_analyzers import get_script_analyzer
+        functions = []
+        violations = ViolationTable()
+        files = dict(source_files or ())
 
-        analyzer = get_script_analyzer(language)
-        if analyzer is None:
-            raise RuntimeError(f"No analyzer available for language: {language}")
+        current_function = None
+        location = _SourceLocation()
+        instruction_count = 0
+        selected = function_filter is None or function_filter("<unknown>")
 
-        if not analyzer.is_available():
-            runtime_map = {
+        for raw in lines:
+            line = raw.strip()
+
+            if not line or line[:1] in b"#;" or line.startswith(b"//"):
+                file_match = _LOCATION_BYTES.search(line)
+                if file_match:
+                    file = file_match.group(1).decode("utf-8", errors="replace")
+                    location.move(file, int(file_match.group(2)), len(violations))
+                continue
+
+            func_match = (
+                _LABEL_BYTES.match(line) or _GO_TEXT_BYTES.match(line) or _TYPE_BYTES.match(line)
+            )
+            if func_match:
+                if current_function and selected:
+                    functions.append(location.function_record(current_function, instruction_count))
+                current_function = func_match.group(1).decode("utf-8", errors="replace")
+                location.start_function()
+                instruction_count = 0
+                selected = function_filter is None or function_filter(current_function)
+                continue
+
+            if line[:1] == b".":
+                if line.startswith(_LOC_DIRECTIVES_BYTES):
+                    loc = _loc_directive(line.split(None, 3))
+                    if loc is not None and loc[0] in files:
+                        location.move(files[loc[0]], loc[1], len(violations))
+                elif line.startswith(b".file"):
+                    entry = _file_directive(line)
+                    if entry is not None:
+                        files[entry[0]] = entry[1]
+                continue
+
+            if not selected:
+                continue
+
+            mnemonic = b""
+            for part in line.split():
+                if part.startswith(b"0x") or _HEX_BYTES.match(part):
+                    continue
+                if b":" in part and not part.endswith(b":"):
+                    path, _, number = part.rpartition(b":")
+                    if number.isdigit():
+                        file = path.decode("utf-8", errors="replace")
+                        location.move(file, int(number), len(violations))
+                    continue
+                mnemonic = part.lower().rstrip(b":")
+                break
+
+            if not mnemonic:
+                continue
+
+            instruction_count += 1
+
+            rule = rules.get(mnemonic)
+            if rule is None:
+                continue
+            severity, reason = rule
+
+            addr_match = _ADDRESS_BYTES.search(line)
+            violations.add(
+                function=current_function or "<unknown>",
+                file=location.file or "",
+                line=location.line,
+                address="0x" + addr_match.group(1).decode() if addr_match else "",
+                instruction=line.decode("utf-8", errors="replace"),
+                mnemonic=mnemonic.decode().upper(),
+                reason=reason,
+                severity=severity,
+            )
+            if on_violation is not None:
+                on_violation(violations[-1])
+
+        if current_function and selected:
+            functions.append(location.function_record(current_function, instruction_count))
+
+        return functions, violations, *location.result(len(violations))
+
+
+# Files at least this large are split at function boundaries and parsed in parallel
+PARALLEL_PARSE_THRESHOLD = 64 * 1024 * 1024
+
+# Candidate function-start lines; each hit is confirmed with _match_function_start
+_BOUNDARY_CANDIDATE = re.compile(
+    rb"^[ \t]*(?:[A-Za-z_][A-Za-z0-9_]*:[ \t\r]*$|TEXT[ \t]|\.type[ \t])", re.MULTILINE
+)
+
+
+def _function_boundaries(data, parts: int) -> list[int]:
+    """
+    Find offsets that split data into about `parts` chunks at function starts.
+
+    Each chunk begins on a line the parser treats as a function start, so
+    parsing the chunks independently yields the same functions as parsing
+    the whole buffer.
+    """
+    size = len(data)
+    offsets = [0]
+    for k in range(1, parts):
+        pos = max(size * k // parts, offsets[-1] + 1)
+        while pos < size:
+            candidate = _BOUNDARY_CANDIDATE.search(data, pos)
+            if candidate is None:
+                pos = size
+                break
+            start = candidate.start()
+            end = data.find(b"\n", start)
+            end = size if end < 0 else end
+            line = data[start:end].decode("utf-8", errors="replace").strip()
+            if _match_function_start(line):
+                break
+            pos = end + 1
+        if pos >= size:
+            break
+        offsets.append(start)
+    offsets.append(size)
+    return offsets
+
+
+def _mmap_lines(data: mmap.mmap, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Yield the lines of a memory-mapped file between two line-start offsets."""
+    end = len(data) if end is None else end
+    data.seek(start)
+    readline = data.readline
+    while data.tell() < end:
+        yield readline()
+
+
+def _parse_file_chunk(
+    assembly_file: str,
+    start: int,
+    end: int,
+    arch: str,
+    compiler: str,
+    include_warnings: bool,
+    mmap_input: bool = True,
+    function_filter: str | None = None,
+    source_files: dict[int, str] | None = None,
+):
+    """
+    Worker: parse one byte range of an assembly file.
+
+    The columnar ViolationTable pickles as a handful of arrays, which keeps
+    shipping results back cheap even for violation-heavy inputs. The
+    function filter travels as its pattern and is compiled in the worker;
+    source_files is the whole file's .file table.
+    """
+    parser = AssemblyParser(arch, compiler)
+    selects = compile_function_filter(function_filter)
+    with open(assembly_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if mmap_input:
+                lines = _mmap_lines(data, start, end)
+                functions, violations, unlocated, location = parser._parse_bytes(
+                    lines, include_warnings, function_filter=selects, source_files=source_files
+                )
+            else:
+                text = data[start:end].decode("utf-8")
+                functions, violations, unlocated, location = parser._parse_text(
+                    text, include_warnings, function_filter=selects, source_files=source_files
+                )
+    return functions, violations, unlocated, location
+
+
+def parse_assembly_file(
+    assembly_file: str,
+    arch: str,
+    compiler: str = "unknown",
+    include_warnings: bool = False,
+    jobs: int | None = None,
+    min_parallel_size: int = PARALLEL_PARSE_THRESHOLD,
+    mmap_input: bool = True,
+    on_violation: Callable[[Violation], None] | None = None,
+    function_filter: str | None = None,
+) -> tuple[list[dict], ViolationTable]:
+    """
+    Parse an assembly file, splitting large files across processes.
+
+    By default the file is memory-mapped and tokenized as bytes, so the
+    text is never decoded or held in memory as a whole; only lines that
+    produce violations become str. Pass mmap_input=False to read it as
+    text and use AssemblyParser.parse instead.
+
+    Args:
+        assembly_file: Path to the assembly file
+        arch: Target architecture
+        compiler: Compiler name recorded on the parser
+        include_warnings: Include warning-level violations
+        jobs: Number of worker processes (default: CPU count)
+        min_parallel_size: Files smaller than this are parsed in-process
+        mmap_input: Parse the memory-mapped bytes rather than decoded text
+        on_violation: Called with each violation in file order; a split file
+            reports each chunk as soon as it and all earlier chunks are done
+        function_filter: Regex pattern selecting the functions to analyze
+
+    Returns:
+        (functions, violations), identical to AssemblyParser.parse
+    """
+    arch = normalize_arch(arch)
+    jobs = jobs or os.cpu_count() or 1
+    size = os.path.getsize(assembly_file)
+
+    if size == 0:
+        return [], ViolationTable()
+    if jobs <= 1 or size < min_parallel_size or arch not in DANGEROUS_INSTRUCTIONS:
+        parser = AssemblyParser(arch, compiler)
+        selects = compile_function_filter(function_filter)
+        if not mmap_input:
+            with open(assembly_file) as f:
+                return parser.parse(f.read(), include_warnings, on_violation, selects)
+        with open(assembly_file, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return parser.parse_bytes(
+                    _mmap_lines(data), include_warnings, on_violation, selects
+                )
+
+    # Several chunks per worker keeps the pool busy when function sizes vary
+    with open(assembly_file, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offsets = _function_boundaries(data, jobs * 4)
+            source_files = _file_table(data)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    ranges = list(zip(offsets, offsets[1:]))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as pool:
+        results = pool.map(
+            _parse_file_chunk,
+            [assembly_file] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+            [arch] * len(ranges),
+            [compiler] * len(ranges),
+            [include_warnings] * len(ranges),
+            [mmap_input] * len(ranges),
+            [function_filter] * len(ranges),
+            [source_files] * len(ranges),
+        )
+
+        functions = []
+        violations = ViolationTable()
+        location = None
+        for chunk_functions, chunk_violations, unlocated, chunk_location in results:
+            # Leading violations carry the file:line state of the previous chunk
+            if location is not None:
+                for index in range(unlocated):
+                    chunk_violations.set_location(index, *location)
+            functions.extend(chunk_functions)
+            violations.extend(chunk_violations)
+            location = chunk_location or location
+            if on_violation is not None:
+                for violation in chunk_violations:
+                    on_violation(violation)
+
+    return functions, violations
+
+
+# (kind, compiler name, language) -> (tool, available). Probing a toolchain
+# runs `--version` subprocesses; a long-running server pays for it once.
+_toolchains: dict[tuple[str, str | None, str], tuple[object, bool]] = {}
+
+
+def get_toolchain(kind: str, name: str | None, language: str) -> tuple[object, bool]:
+    """
+    Get a cached compiler or script analyzer and whether it is available.
+
+    Args:
+        kind: "compiler" or "script"
+        name: Compiler name (None to pick the language default; unused for scripts)
+        language: Detected source language
+
+    Returns:
+        (tool, available); tool is None for a script language without an analyzer
+    """
+    return run_steps(_toolchain_steps(kind, name, language))
+
+
+def _toolchain_steps(
+    kind: str, name: str | None, language: str
+) -> ToolSteps[tuple[object, bool]]:
+    """Step generator behind get_toolchain()."""
+    key = (kind, name, language)
+    entry = _toolchains.get(key)
+    if entry is None:
+        if kind == "script":
+            try:
+                from .script_analyzers import get_script_analyzer
+            except ImportError:
+                from script_analyzers import get_script_analyzer
+
+            tool = get_script_analyzer(language)
+        else:
+            tool = get_compiler(name, language)
+        available = tool is not None and (yield from tool.availability_steps())
+        entry = _toolchains[key] = (tool, available)
+    return entry
+
+
+def clear_toolchain_cache() -> None:
+    """Forget probed toolchains, e.g. after installing a compiler."""
+    _toolchains.clear()
+
+
+def analyze_source(
+    source_file: str,
+    arch: str = None,
+    compiler: str = None,
+    optimization: str = "O2",
+    include_warnings: bool = False,
+    function_filter: str = None,
+    extra_flags: list[str] = None,
+    on_violation: Callable[[Violation], None] | None = None,
+    limits: ToolLimits | None = None,
+    changed_lines: list[tuple[int, int]] | None = None,
+    debug_info: bool = False,
+) -> AnalysisReport:
+    """
+    Analyze a source file for constant-time violations.
+
+    Args:
+        source_file: Path to the source file to analyze
+        arch: Target architecture (default: native, ignored for scripting languages)
+        compiler: Compiler to use (default: auto-detect from language)
+        optimization: Optimization level (default: O2, ignored for scripting languages)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        extra_flags: Extra flags to pass to the compiler (ignored for scripting languages)
+        on_violation: Called with each reported violation as it is found
+            (after analysis for scripting languages)
+        limits: Per-stage timeouts and resource limits for the toolchain
+        changed_lines: Inclusive (first, last) source line ranges; only
+            violations in functions overlapping them are reported (see
+            restrict_to_changed_lines)
+        debug_info: Compile with the compiler's line-table flags (DEBUG_FLAGS,
+            e.g. gcc -g1) so every violation carries its source file and line
+
+    Returns:
+        AnalysisReport with results; if a limit stopped the toolchain, an
+        empty failing report with limit_exceeded set
+    """
+    return run_steps(
+        _analyze_source_steps(
+            source_file,
+            arch,
+            compiler,
+            optimization,
+            include_warnings,
+            function_filter,
+            extra_flags,
+            on_violation,
+            changed_lines,
+            debug_info,
+        ),
+        limits,
+    )
+
+
+def _analyze_source_steps(
+    source_file: str,
+    arch: str | None,
+    compiler: str | None,
+    optimization: str,
+    include_warnings: bool,
+    function_filter: str | None,
+    extra_flags: list[str] | None,
+    on_violation: Callable[[Violation], None] | None,
+    changed_lines: list[tuple[int, int]] | None = None,
+    debug_info: bool = False,
+) -> ToolSteps[AnalysisReport]:
+    """Step generator behind analyze_source() and analyze_source_async()."""
+    if not os.path.exists(source_file):
+        raise FileNotFoundError(f"Source file not found: {source_file}")
+
+    language = detect_language(source_file)
+
+    # Route scripting/bytecode languages to specialized analyzers
+    if is_bytecode_language(language):
+        try:
+            analyzer, available = yield from _toolchain_steps("script", None, language)
+        except ToolLimitExceeded as e:
+            return _limited_report(source_file, language, "unknown", "unknown", e.event)
+        if analyzer is None:
+            raise RuntimeError(f"No analyzer available for language: {language}")
+
+        if not available:
+            runtime_map = {
                 "php": "PHP",
                 "javascript": "Node.js",
                 "typescript": "Node.js",
@@ -986,68 +2171,269 @@ def analyze_source(
                 f"{runtime} is not available. Please install it to analyze {language} files."
             )
 
-        return analyzer.analyze(
-            str(source_path.absolute()),
-            include_warnings=include_warnings,
-            function_filter=function_filter,
-        )
+        try:
+            report = yield from analyzer.analyze_steps(
+                os.path.abspath(source_file),
+                include_warnings=include_warnings,
+                function_filter=function_filter,
+            )
+        except ToolLimitExceeded as e:
+            return _limited_report(source_file, language, analyzer.name, "unknown", e.event)
+        if changed_lines is not None:
+            report.violations = restrict_to_changed_lines(
+                report.violations, changed_lines, source_file=source_file
+            )
+        if on_violation is not None:
+            for violation in report.violations:
+                on_violation(violation)
+        return report
 
     # Compiled languages use assembly analysis
     arch = normalize_arch(arch or get_native_arch())
 
-    compiler_obj = get_compiler(compiler, language)
-    if not compiler_obj.is_available():
+    try:
+        compiler_obj, available = yield from _toolchain_steps("compiler", compiler, language)
+    except ToolLimitExceeded as e:
+        return _limited_report(source_file, arch, compiler or "unknown", optimization, e.event)
+    if not available:
         raise RuntimeError(f"Compiler not available: {compiler_obj.name}")
 
-    # Compile to assembly
+    try:
+        assembly_text = yield from _assembly_text_steps(
+            compiler_obj, source_file, arch, optimization, extra_flags, debug_info
+        )
+    except ToolLimitExceeded as e:
+        return _limited_report(source_file, arch, compiler_obj.name, optimization, e.event)
+
+    # Parse and analyze; filtered-out functions are skipped by the parser
+    parser = AssemblyParser(arch, compiler_obj.name)
+    functions, violations = parser.parse(
+        assembly_text,
+        include_warnings,
+        on_violation if changed_lines is None else None,
+        compile_function_filter(function_filter),
+    )
+    if changed_lines is not None:
+        # Function spans are only known once parsing ends
+        violations = restrict_to_changed_lines(violations, changed_lines, functions, source_file)
+        if on_violation is not None:
+            for violation in violations:
+                on_violation(violation)
+
+    return AnalysisReport(
+        architecture=arch,
+        compiler=compiler_obj.name,
+        optimization=optimization,
+        source_file=str(source_file),
+        total_functions=len(functions),
+        total_instructions=sum(f["instructions"] for f in functions),
+        violations=violations,
+    )
+
+
+def _assembly_text_steps(
+    compiler_obj: "Compiler",
+    source_file: str,
+    arch: str,
+    optimization: str,
+    extra_flags: list[str] | None,
+    debug_info: bool = False,
+) -> ToolSteps[str]:
+    """
+    Compile a source file to assembly and return the text.
+
+    Raises:
+        RuntimeError: Compilation failed
+        ToolLimitExceeded: The compiler hit a timeout or resource limit
+    """
+    import tempfile
+
     with tempfile.NamedTemporaryFile(mode="w", suffix=".s", delete=False) as asm_file:
         asm_path = asm_file.name
 
+    if debug_info and compiler_obj.DEBUG_FLAGS:
+        # Ahead of the caller's flags, so an explicit -g level still wins
+        extra_flags = [*compiler_obj.DEBUG_FLAGS, *(extra_flags or [])]
+
     try:
-        success, error = compiler_obj.compile_to_assembly(
-            str(source_path.absolute()),
+        success, error = yield from compiler_obj.assembly_steps(
+            os.path.abspath(source_file),
             asm_path,
             arch,
             optimization,
             extra_flags,
         )
-
         if not success:
             raise RuntimeError(f"Compilation failed: {error}")
 
         with open(asm_path) as f:
-            assembly_text = f.read()
-
-        # Parse and analyze
-        parser = AssemblyParser(arch, compiler_obj.name)
-        functions, violations = parser.parse(assembly_text, include_warnings)
-
-        # Filter functions if requested
-        if function_filter:
-            pattern = re.compile(function_filter)
-            violations = [v for v in violations if pattern.search(v.function)]
-            functions = [f for f in functions if pattern.search(f["name"])]
-
-        return AnalysisReport(
-            architecture=arch,
-            compiler=compiler_obj.name,
-            optimization=optimization,
-            source_file=str(source_file),
-            total_functions=len(functions),
-            total_instructions=sum(f["instructions"] for f in functions),
-            violations=violations,
-        )
+            return f.read()
 
     finally:
         if os.path.exists(asm_path):
             os.unlink(asm_path)
 
 
+def restrict_to_changed_lines(
+    violations: Iterable[Violation],
+    changed_lines: list[tuple[int, int]],
+    functions: Iterable[dict] = (),
+    source_file: str | None = None,
+) -> list[Violation]:
+    """
+    Keep the violations in functions that overlap changed source lines.
+
+    A function's line span comes from the parser's function records
+    ("lines") when it saw location info there; functions whose records
+    place them in a file other than source_file (runtime or library code
+    linked in) are dropped. Functions known only through the lines of their
+    violations (bytecode line tables) are widened to reach the neighbouring
+    such functions, so a change between two of them is attributed to both
+    rather than to neither. Functions without any line information are kept.
+
+    Args:
+        violations: Violations of one source file, in report order
+        changed_lines: Inclusive (first, last) line ranges
+        functions: Parser function records
+        source_file: The analyzed source file
+
+    Returns:
+        The selected violations, in order
+    """
+    violations = list(violations)
+    spans = {}
+    source_name = os.path.basename(source_file) if source_file else None
+    for f in functions:
+        if "lines" in f:
+            elsewhere = source_name and os.path.basename(f["file"]) != source_name
+            spans[f["name"]] = (0, -1) if elsewhere else f["lines"]
+    seen: dict[str, list[int]] = {}
+    for v in violations:
+        if v.line and v.line > 0 and v.function not in spans:
+            span = seen.setdefault(v.function, [v.line, v.line])
+            span[0], span[1] = min(span[0], v.line), max(span[1], v.line)
+    ordered = sorted(seen.items(), key=lambda item: item[1])
+    for index, (name, (first, last)) in enumerate(ordered):
+        start = ordered[index - 1][1][1] + 1 if index else 1
+        end = ordered[index + 1][1][0] - 1 if index + 1 < len(ordered) else sys.maxsize
+        spans[name] = (min(start, first), max(end, last))
+
+    changed = {
+        name
+        for name, (first, last) in spans.items()
+        if any(start <= last and first <= end for start, end in changed_lines)
+    }
+    return [v for v in violations if v.function in changed or v.function not in spans]
+
+
+def _limited_report(
+    source_file: str, architecture: str, compiler: str, optimization: str, event: LimitEvent
+) -> AnalysisReport:
+    """Report for an analysis cut short by a toolchain limit."""
+    return AnalysisReport(
+        architecture=architecture,
+        compiler=compiler,
+        optimization=optimization,
+        source_file=str(source_file),
+        total_functions=0,
+        total_instructions=0,
+        limit_exceeded=event,
+    )
+
+
+async def analyze_source_async(
+    source_file: str,
+    arch: str = None,
+    compiler: str = None,
+    optimization: str = "O2",
+    include_warnings: bool = False,
+    function_filter: str = None,
+    extra_flags: list[str] = None,
+    on_violation: Callable[[Violation], None] | None = None,
+    limit=None,
+    timeout: float | None = None,
+    limits: ToolLimits | None = None,
+    changed_lines: list[tuple[int, int]] | None = None,
+    debug_info: bool = False,
+) -> AnalysisReport:
+    """
+    Asynchronous analyze_source(): toolchains run as asyncio subprocesses.
+
+    Cancelling the task kills the running toolchain process group and
+    removes temporary files.
+
+    Args:
+        source_file, arch, compiler, optimization, include_warnings,
+        function_filter, extra_flags, on_violation, limits, changed_lines,
+        debug_info: As for analyze_source()
+        limit: asyncio.Semaphore shared between jobs to bound how many
+            toolchain subprocesses run at once
+        timeout: Seconds the toolchain may run for this file
+
+    Returns:
+        AnalysisReport with results
+
+    Raises:
+        TimeoutError: The toolchain ran longer than timeout
+    """
+    return await run_steps_async(
+        _analyze_source_steps(
+            source_file,
+            arch,
+            compiler,
+            optimization,
+            include_warnings,
+            function_filter,
+            extra_flags,
+            on_violation,
+            changed_lines,
+            debug_info,
+        ),
+        limit=limit,
+        timeout=timeout,
+        limits=limits,
+    )
+
+
+async def analyze_many_async(
+    source_files: Iterable[str],
+    concurrency: int | None = None,
+    timeout: float | None = None,
+    **options,
+) -> list[AnalysisReport | BaseException]:
+    """
+    Analyze many source files concurrently from one event loop.
+
+    Args:
+        source_files: Paths to analyze
+        concurrency: Maximum toolchain subprocesses running at once
+            (default: CPU count)
+        timeout: Per-file toolchain timeout in seconds
+        **options: Keyword arguments for analyze_source_async()
+
+    Returns:
+        One entry per file, in order: its AnalysisReport, or the exception
+        that analysis raised (e.g. RuntimeError, TimeoutError). Cancelling
+        the call cancels every job and kills their subprocesses.
+    """
+    import asyncio
+
+    limit = asyncio.Semaphore(concurrency or os.cpu_count() or 1)
+    jobs = [
+        analyze_source_async(path, limit=limit, timeout=timeout, **options)
+        for path in source_files
+    ]
+    return await asyncio.gather(*jobs, return_exceptions=True)
+
+
 def analyze_assembly(
     assembly_file: str,
     arch: str,
     include_warnings: bool = False,
     function_filter: str = None,
+    jobs: int | None = None,
+    mmap_input: bool = True,
+    on_violation: Callable[[Violation], None] | None = None,
 ) -> AnalysisReport:
     """
     Analyze pre-compiled assembly for constant-time violations.
@@ -1057,22 +2443,24 @@ def analyze_assembly(
         arch: Target architecture
         include_warnings: Include warning-level violations
         function_filter: Regex pattern to filter functions
+        jobs: Worker processes for very large files (default: CPU count)
+        mmap_input: Tokenize the memory-mapped bytes instead of decoded text
+        on_violation: Called with each reported violation as it is found
 
     Returns:
         AnalysisReport with results
     """
     arch = normalize_arch(arch)
 
-    with open(assembly_file) as f:
-        assembly_text = f.read()
-
-    parser = AssemblyParser(arch, "unknown")
-    functions, violations = parser.parse(assembly_text, include_warnings)
-
-    if function_filter:
-        pattern = re.compile(function_filter)
-        violations = [v for v in violations if pattern.search(v.function)]
-        functions = [f for f in functions if pattern.search(f["name"])]
+    functions, violations = parse_assembly_file(
+        assembly_file,
+        arch,
+        include_warnings=include_warnings,
+        jobs=jobs,
+        mmap_input=mmap_input,
+        on_violation=on_violation,
+        function_filter=function_filter,
+    )
 
     return AnalysisReport(
         architecture=arch,
@@ -1085,47 +2473,133 @@ def analyze_assembly(
     )
 
 
+def violation_from_dict(record: dict) -> Violation:
+    """Rebuild a Violation from violation_to_dict() output."""
+    return Violation(
+        function=record["function"],
+        file=record["file"],
+        line=record["line"],
+        address=record["address"],
+        instruction=record["instruction"],
+        mnemonic=record["mnemonic"],
+        reason=record["reason"],
+        severity=Severity(record["severity"]),
+    )
+
+
+def violation_to_dict(v: Violation) -> dict:
+    """JSON-serializable form of a violation."""
+    return {
+        "function": v.function,
+        "file": v.file,
+        "line": v.line,
+        "address": v.address,
+        "instruction": v.instruction,
+        "mnemonic": v.mnemonic,
+        "reason": v.reason,
+        "severity": v.severity.value,
+    }
+
+
+def format_violation_text(v: Violation) -> list[str]:
+    """Lines describing one violation in the text report."""
+    severity_marker = "ERROR" if v.severity == Severity.ERROR else "WARN"
+    lines = [f"[{severity_marker}] {v.mnemonic}", f"  Function: {v.function}"]
+    if v.file:
+        file_info = f"  File: {v.file}"
+        if v.line:
+            file_info += f":{v.line}"
+        lines.append(file_info)
+    if v.address:
+        lines.append(f"  Address: {v.address}")
+    lines.append(f"  Reason: {v.reason}")
+    lines.append("")
+    return lines
+
+
+def format_violation_github(v: Violation) -> str:
+    """GitHub Actions workflow command annotating one violation."""
+    level = "error" if v.severity == Severity.ERROR else "warning"
+    file_ref = f"file={v.file}" if v.file else ""
+    line_ref = f",line={v.line}" if v.line else ""
+    return f"::{level} {file_ref}{line_ref}::{v.mnemonic} in {v.function}: {v.reason}"
+
+
+def format_limit_text(event: LimitEvent) -> str:
+    """Text report line for an analysis cut short by a toolchain limit."""
+    return f"ANALYSIS INCOMPLETE: {event.describe()} ({event.command})"
+
+
+def format_limit_github(report: AnalysisReport) -> str:
+    """GitHub Actions error for an analysis cut short by a toolchain limit."""
+    return f"::error file={report.source_file}::{report.limit_exceeded.describe()}"
+
+
+def format_failures_text(failed_files: dict[str, str]) -> list[str]:
+    """Text report lines for the files a batch run could not analyze."""
+    lines = [f"ANALYSIS FAILED for {len(failed_files)} file(s):"]
+    for path, reason in failed_files.items():
+        # Compiler output follows on indented lines
+        lines.append(f"  {path}: " + reason.strip().replace("\n", "\n    "))
+    return lines
+
+
+def format_failures_github(failed_files: dict[str, str]) -> list[str]:
+    """GitHub Actions errors for the files a batch run could not analyze."""
+    return [
+        f"::error file={path}::Analysis failed: {reason.splitlines()[0] if reason else ''}"
+        for path, reason in failed_files.items()
+    ]
+
+
 def format_report(report: AnalysisReport, format_type: OutputFormat) -> str:
     """Format an analysis report for output."""
 
     if format_type == OutputFormat.JSON:
-        return json.dumps(
-            {
-                "architecture": report.architecture,
-                "compiler": report.compiler,
-                "optimization": report.optimization,
-                "source_file": report.source_file,
-                "total_functions": report.total_functions,
-                "total_instructions": report.total_instructions,
-                "error_count": report.error_count,
-                "warning_count": report.warning_count,
-                "passed": report.passed,
-                "violations": [
-                    {
-                        "function": v.function,
-                        "file": v.file,
-                        "line": v.line,
-                        "address": v.address,
-                        "instruction": v.instruction,
-                        "mnemonic": v.mnemonic,
-                        "reason": v.reason,
-                        "severity": v.severity.value,
-                    }
-                    for v in report.violations
-                ],
-            },
-            indent=2,
-        )
+        document = {
+            "architecture": report.architecture,
+            "compiler": report.compiler,
+            "optimization": report.optimization,
+            "source_file": report.source_file,
+            "total_functions": report.total_functions,
+            "total_instructions": report.total_instructions,
+            "error_count": report.error_count,
+            "warning_count": report.warning_count,
+            "passed": report.passed,
+            "suppressed": report.suppressed,
+            "limit_exceeded": report.limit_exceeded and report.limit_exceeded.to_dict(),
+            "violations": [violation_to_dict(v) for v in report.violations],
+        }
+        if report.timings is not None:
+            document["timings"] = report.timings
+        if report.failed_files:
+            document["failed_files"] = report.failed_files
+        import json
+
+        return json.dumps(document, indent=2)
+
+    elif format_type in (OutputFormat.NDJSON, OutputFormat.SARIF):
+        import io
 
-    elif format_type == OutputFormat.GITHUB:
-        lines = []
+        try:
+            from .report_writers import get_report_writer
+        except ImportError:
+            from report_writers import get_report_writer
+
+        buffer = io.StringIO()
+        writer = get_report_writer(format_type, buffer, report.source_file)
+        writer.start()
         for v in report.violations:
-            level = "error" if v.severity == Severity.ERROR else "warning"
-            file_ref = f"file={v.file}" if v.file else ""
-            line_ref = f",line={v.line}" if v.line else ""
-            lines.append(
-                f"::{level} {file_ref}{line_ref}::{v.mnemonic} in {v.function}: {v.reason}"
-            )
+            writer.write(v)
+        writer.finish(report)
+        return buffer.getvalue().rstrip("\n")
+
+    elif format_type == OutputFormat.GITHUB:
+        lines = [format_violation_github(v) for v in report.violations]
+        if report.limit_exceeded:
+            lines.append(format_limit_github(report))
+        if report.failed_files:
+            lines.extend(format_failures_github(report.failed_files))
         return "\n".join(lines)
 
     else:  # TEXT
@@ -1140,23 +2614,18 @@ def format_report(report: AnalysisReport, format_type: OutputFormat) -> str:
         lines.append(f"Functions analyzed: {report.total_functions}")
         lines.append(f"Instructions analyzed: {report.total_instructions}")
         lines.append("")
+        if report.limit_exceeded:
+            lines.append(format_limit_text(report.limit_exceeded))
+            lines.append("")
+        if report.failed_files:
+            lines.extend(format_failures_text(report.failed_files))
+            lines.append("")
 
         if report.violations:
             lines.append("VIOLATIONS FOUND:")
             lines.append("-" * 40)
             for v in report.violations:
-                severity_marker = "ERROR" if v.severity == Severity.ERROR else "WARN"
-                lines.append(f"[{severity_marker}] {v.mnemonic}")
-                lines.append(f"  Function: {v.function}")
-                if v.file:
-                    file_info = f"  File: {v.file}"
-                    if v.line:
-                        file_info += f":{v.line}"
-                    lines.append(file_info)
-                if v.address:
-                    lines.append(f"  Address: {v.address}")
-                lines.append(f"  Reason: {v.reason}")
-                lines.append("")
+                lines.extend(format_violation_text(v))
         else:
             lines.append("No violations found.")
 
@@ -1164,11 +2633,164 @@ def format_report(report: AnalysisReport, format_type: OutputFormat) -> str:
         status = "PASSED" if report.passed else "FAILED"
         lines.append(f"Result: {status}")
         lines.append(f"Errors: {report.error_count}, Warnings: {report.warning_count}")
+        if report.suppressed:
+            lines.append(f"Suppressed by baseline: {report.suppressed}")
 
         return "\n".join(lines)
 
 
-def main():
+def _limits_from_args(parser: "argparse.ArgumentParser", args) -> ToolLimits | None:
+    """ToolLimits for the --timeout/--stage-timeout/--memory-limit/--cpu-limit options."""
+    timeouts = {}
+    for option in args.stage_timeout:
+        stage, _, seconds = option.partition("=")
+        if stage not in TOOL_STAGES:
+            parser.error(f"unknown stage in --stage-timeout: {stage}")
+        try:
+            timeouts[stage] = float(seconds)
+        except ValueError:
+            parser.error(f"--stage-timeout expects STAGE=SECONDS, got: {option}")
+    options = (args.timeout, args.memory_limit, args.cpu_limit)
+    if not timeouts and all(option is None for option in options):
+        return None
+    return ToolLimits(
+        timeouts=timeouts,
+        default_timeout=args.timeout,
+        memory=args.memory_limit * 1024 * 1024 if args.memory_limit is not None else None,
+        cpu=args.cpu_limit,
+    )
+
+
+def _is_batch(args) -> bool:
+    """Whether the command line names many sources: a git diff or a directory."""
+    if args.changed_since is not None:
+        return True
+    return args.source_file is not None and os.path.isdir(args.source_file)
+
+
+def _batch_label(args) -> str:
+    """Report name for a batch run."""
+    if args.changed_since is not None:
+        label = f"changes since {args.changed_since}"
+        if args.source_file:
+            label += f" in {args.source_file}"
+    else:
+        label = args.source_file
+    return f"{label} (shard {args.shard})" if args.shard else label
+
+
+def _batch_targets(args) -> dict[str, list[tuple[int, int]] | None]:
+    """Sources of a batch run, mapped to their changed line ranges (None: whole file)."""
+    try:
+        from .changes import changed_lines_since, scan_sources, select_sources
+        from .sharding import load_timings, select_shard
+    except ImportError:
+        from changes import changed_lines_since, scan_sources, select_sources
+        from sharding import load_timings, select_shard
+
+    if args.changed_since is not None:
+        paths = [args.source_file] if args.source_file else None
+        targets = select_sources(changed_lines_since(args.changed_since, paths))
+    else:
+        targets = scan_sources(args.source_file)
+    if args.shard:
+        timings = load_timings(args.timings) if args.timings else {}
+        targets = select_shard(targets, args.shard, timings)
+    return targets
+
+
+def _analyze_batch(
+    args,
+    analyze: Callable[..., AnalysisReport],
+    on_violation: Callable[[Violation], None] | None,
+    limits: ToolLimits | None,
+    retain: bool = True,
+) -> AnalysisReport:
+    """
+    Analyze the sources of a batch run into one combined report.
+
+    Without retain the combined report has no violations; each file's are
+    dropped once on_violation has seen them.
+    """
+    import dataclasses
+    import time
+
+    targets = _batch_targets(args)
+    timings = {}
+    failed_files = {}
+    reports = []
+    violations = []
+    for path, ranges in targets.items():
+        name = os.path.relpath(path)
+        # --compiler and --extra-flags name a C/C++ toolchain; other languages keep theirs
+        native_c = detect_language(path) in ("c", "cpp")
+
+        # Without debug info violations carry no file; name the analyzed one
+        def located(violation: Violation, name: str = name) -> Violation:
+            return violation if violation.file else dataclasses.replace(violation, file=name)
+
+        forward = on_violation and (lambda v, located=located: on_violation(located(v)))
+        started = time.perf_counter()
+        try:
+            report = analyze(
+                path,
+                arch=args.arch,
+                compiler=args.compiler if native_c else None,
+                optimization=args.opt_level,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                extra_flags=args.extra_flags if native_c else None,
+                on_violation=forward,
+                limits=limits,
+                changed_lines=ranges,
+                # Selecting changed functions needs their source lines
+                debug_info=args.debug_info or ranges is not None,
+            )
+        except (OSError, RuntimeError, ValueError) as e:
+            # One file that does not compile (or is not recorded) must not
+            # stop the rest; the report fails and names it
+            failed_files[name] = str(e) or type(e).__name__
+            continue
+        finally:
+            timings[name] = round(time.perf_counter() - started, 3)
+        if retain:
+            violations.extend(located(v) for v in report.violations)
+        report.violations = ViolationTable()
+        reports.append(report)
+
+    return AnalysisReport(
+        architecture=", ".join(sorted({r.architecture for r in reports})) or "unknown",
+        compiler=", ".join(sorted({r.compiler for r in reports})) or "unknown",
+        optimization=args.opt_level,
+        source_file=_batch_label(args),
+        total_functions=sum(r.total_functions for r in reports),
+        total_instructions=sum(r.total_instructions for r in reports),
+        violations=violations,
+        limit_exceeded=next((r.limit_exceeded for r in reports if r.limit_exceeded), None),
+        timings=timings,
+        failed_files=failed_files or None,
+    )
+
+
+def main(argv: list[str] | None = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        try:
+            from .server import serve_main
+        except ImportError:
+            from server import serve_main
+
+        return serve_main(argv[1:])
+    if argv[:1] == ["merge"]:
+        try:
+            from .sharding import merge_main
+        except ImportError:
+            from sharding import merge_main
+
+        return merge_main(argv[1:])
+
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Analyze code for constant-time violations",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1179,6 +2801,11 @@ Examples:
   %(prog)s --arch arm64 crypto.go            # Analyze Go for ARM64
   %(prog)s --warnings crypto.c               # Include branch warnings
   %(prog)s --json crypto.c                   # Output as JSON
+  %(prog)s --debug-info crypto.c             # Report source lines via line tables
+  %(prog)s --compilers gcc,clang crypto.c    # Compare gcc and clang per function
+  %(prog)s --opt-levels O2,O3,Os crypto.c    # Compare optimization levels
+  %(prog)s --watch src/                      # Re-analyze on save, print new/fixed
+  %(prog)s --sarif -o ct.sarif crypto.c      # Stream a SARIF log to a file
   %(prog)s CryptoUtils.java                  # Analyze Java (JVM bytecode)
   %(prog)s CryptoUtils.kt                    # Analyze Kotlin (JVM bytecode)
   %(prog)s CryptoUtils.cs                    # Analyze C# (CIL bytecode)
@@ -1186,6 +2813,14 @@ Examples:
   %(prog)s crypto.php                        # Analyze PHP (uses VLD/opcache)
   %(prog)s crypto.ts                         # Analyze TypeScript (transpiles first)
   %(prog)s crypto.js                         # Analyze JavaScript (V8 bytecode)
+  %(prog)s --binary libcrypto.a              # Analyze a prebuilt ELF object/archive
+  %(prog)s serve &                           # Start a warm analysis server
+  %(prog)s --server crypto.c                 # Analyze through the running server
+  %(prog)s --tool-cache .ct-tools crypto.c   # Reuse stored compiler runs
+  %(prog)s --replay .ct-tools crypto.c       # Analyze without running any tool
+  %(prog)s --rules team.json crypto.c        # Add rules from a custom rule pack
+  %(prog)s --json --shard 1/4 src/ > s1.json # Analyze one quarter of a source tree
+  %(prog)s merge s1.json s2.json s3.json s4.json # Combine the shard reports
 
 Supported languages:
   Native compiled: C, C++, Go, Rust, Swift
@@ -1199,7 +2834,12 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
 """,
     )
 
-    parser.add_argument("source_file", help="Source file to analyze")
+    parser.add_argument(
+        "source_file",
+        nargs="?",
+        help="Source file or directory to analyze (with --changed-since: path to diff; "
+        "with --watch: path to watch, default the current directory)",
+    )
     parser.add_argument("--arch", "-a", help="Target architecture (default: native)")
     parser.add_argument("--compiler", "-c", help="Compiler to use (gcc, clang, go, rustc)")
     parser.add_argument(
@@ -1214,9 +2854,103 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
     parser.add_argument("--func", "-f", help="Regex pattern to filter functions")
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
     parser.add_argument("--github", action="store_true", help="Output GitHub Actions annotations")
+    parser.add_argument(
+        "--ndjson", action="store_true", help="Stream newline-delimited JSON, one violation per line"
+    )
+    parser.add_argument("--sarif", action="store_true", help="Stream a SARIF 2.1.0 log")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write text/GitHub output as violations are found (summary at the end)",
+    )
+    parser.add_argument("--output", "-o", help="Write the report to a file instead of stdout")
     parser.add_argument(
         "--assembly", action="store_true", help="Input is already assembly (requires --arch)"
     )
+    parser.add_argument(
+        "--binary",
+        action="store_true",
+        help="Input is a prebuilt ELF object, archive or shared library",
+    )
+    parser.add_argument(
+        "--decoder",
+        choices=["objdump", "native"],
+        default="objdump",
+        help="Backend for --binary: objdump disassembly or native machine-code scan",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, help="Maximum number of parallel jobs (default: CPU count)"
+    )
+    parser.add_argument(
+        "--server",
+        nargs="?",
+        const="",
+        metavar="SOCKET",
+        help="Send the request to a running `serve` process (falls back to a local run)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REV",
+        help="Analyze only sources changed since a git revision, limited to changed functions",
+    )
+    tools = parser.add_mutually_exclusive_group()
+    tools.add_argument(
+        "--record", metavar="DIR", help="Run the toolchain and store every run in DIR"
+    )
+    tools.add_argument(
+        "--replay", metavar="DIR", help="Serve toolchain runs from DIR without running any tool"
+    )
+    tools.add_argument(
+        "--tool-cache",
+        metavar="DIR",
+        help="Serve toolchain runs stored in DIR, running and storing the others",
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Analyze only the I-th of N deterministic parts of a batch (1 <= I <= N)",
+    )
+    parser.add_argument(
+        "--timings",
+        metavar="FILE",
+        help="JSON report of a previous batch run (e.g. from `merge`) to balance shards by",
+    )
+    parser.add_argument(
+        "--baseline",
+        metavar="FILE",
+        help="Report only violations not recorded in this baseline file",
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Record the current violations in the --baseline file instead of reporting them",
+    )
+    parser.add_argument(
+        "--timeout", type=float, metavar="SECONDS", help="Wall-clock limit for each toolchain step"
+    )
+    parser.add_argument(
+        "--stage-timeout",
+        action="append",
+        default=[],
+        metavar="STAGE=SECONDS",
+        help=f"Wall-clock limit for one stage ({', '.join(TOOL_STAGES)}); overrides --timeout",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        metavar="MB",
+        help="Address-space limit for toolchain processes",
+    )
+    parser.add_argument(
+        "--cpu-limit", type=int, metavar="SECONDS", help="CPU-time limit for toolchain processes"
+    )
+    parser.add_argument(
+        "--rules",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Rule pack (or directory of packs) to merge over the built-in rules; repeatable",
+    )
     parser.add_argument(
         "--list-arch", action="store_true", help="List supported architectures and exit"
     )
@@ -1227,8 +2961,94 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
         default=[],
         help="Extra flags to pass to the compiler",
     )
+    parser.add_argument(
+        "--compilers",
+        metavar="LIST",
+        help="Analyze with several compilers at once (e.g. gcc,clang) and report the "
+        "violations unique to each, per function",
+    )
+    parser.add_argument(
+        "--opt-levels",
+        metavar="LIST",
+        help="Analyze at several optimization levels at once (e.g. O2,O3); with --compilers, "
+        "every combination",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running: re-analyze sources as they are saved and print the new and "
+        "fixed violations",
+    )
+    parser.add_argument(
+        "--debug-info",
+        "-g",
+        action="store_true",
+        help="Compile C/C++ with line tables (gcc -g1, clang -gline-tables-only) so "
+        "violations carry source lines; implied by --changed-since",
+    )
+
+    args = parser.parse_args(argv)
+    limits = _limits_from_args(parser, args)
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline requires --baseline FILE")
+    if args.changed_since is not None and (args.assembly or args.binary):
+        parser.error("--changed-since cannot be combined with --assembly or --binary")
+    if args.shard and (args.assembly or args.binary or not _is_batch(args)):
+        parser.error("--shard needs a batch: a source directory or --changed-since")
+    if args.shard:
+        try:
+            from .sharding import parse_shard
+        except ImportError:
+            from sharding import parse_shard
+        try:
+            parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
+    if args.watch:
+        if args.assembly or args.binary or args.changed_since is not None or args.shard:
+            parser.error(
+                "--watch analyzes source files; it cannot be combined with --assembly, "
+                "--binary, --changed-since or --shard"
+            )
+        if args.compilers or args.opt_levels or args.server is not None or args.replay:
+            parser.error(
+                "--watch cannot be combined with --compilers, --opt-levels, --server or --replay"
+            )
+        if args.json or args.github or args.sarif or args.stream or args.baseline:
+            parser.error("--watch reports deltas as text or --ndjson only")
+        if args.source_file is None:
+            args.source_file = os.curdir
+    if args.source_file is None and args.changed_since is None and not args.list_arch:
+        parser.error("the following arguments are required: source_file")
+    configurations = None
+    if args.compilers is not None or args.opt_levels is not None:
+        try:
+            from .differential import parse_names
+        except ImportError:
+            from differential import parse_names
+
+        if args.compilers is not None and args.compiler:
+            parser.error("--compilers cannot be combined with --compiler")
+        compilers = parse_names(args.compilers) if args.compilers else [args.compiler]
+        levels = parse_names(args.opt_levels) if args.opt_levels else [args.opt_level]
+        configurations = [(compiler, level) for compiler in compilers for level in levels]
+        if len(configurations) < 2:
+            parser.error("--compilers and --opt-levels need at least two configurations")
+        if args.assembly or args.binary or _is_batch(args):
+            parser.error(
+                "--compilers and --opt-levels analyze one source file; they cannot be "
+                "combined with --assembly, --binary or a batch"
+            )
+        if args.github or args.ndjson or args.sarif or args.stream or args.baseline:
+            parser.error("--compilers and --opt-levels report as text or --json only")
 
-    args = parser.parse_args()
+    try:
+        RULE_PACKS.load_environment()
+        for path in args.rules:
+            RULE_PACKS.add(path)
+    except (RulePackError, OSError) as e:
+        print(f"Error: cannot load rules: {e}", file=sys.stderr)
+        return 1
 
     if args.list_arch:
         print("Supported Architectures:")
@@ -1244,22 +3064,167 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
         output_format = OutputFormat.JSON
     elif args.github:
         output_format = OutputFormat.GITHUB
+    elif args.ndjson:
+        output_format = OutputFormat.NDJSON
+    elif args.sarif:
+        output_format = OutputFormat.SARIF
     else:
         output_format = OutputFormat.TEXT
 
+    if args.stream and output_format == OutputFormat.JSON:
+        print("Error: --json cannot be streamed; use --ndjson", file=sys.stderr)
+        return 1
+    stream = args.stream or output_format in (OutputFormat.NDJSON, OutputFormat.SARIF)
+    if args.assembly and not args.arch:
+        print("Error: --arch is required when analyzing assembly files", file=sys.stderr)
+        return 1
+
+    store = None
+    for mode, directory in (
+        ("record", args.record),
+        ("replay", args.replay),
+        ("cache", args.tool_cache),
+    ):
+        if directory:
+            try:
+                from .replay import ToolStore
+            except ImportError:
+                from replay import ToolStore
+
+            store = ToolStore(directory, mode)
+    previous_store = set_tool_store(store) if store is not None else None
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    writer = None
     try:
-        if args.assembly:
-            if not args.arch:
-                print("Error: --arch is required when analyzing assembly files", file=sys.stderr)
-                return 1
-            report = analyze_assembly(
+        if args.watch:
+            try:
+                from .watch import watch
+            except ImportError:
+                from watch import watch
+
+            try:
+                watch(
+                    [args.source_file],
+                    out,
+                    output_format,
+                    arch=args.arch,
+                    compiler=args.compiler,
+                    optimization=args.opt_level,
+                    include_warnings=args.warnings,
+                    function_filter=args.func,
+                    extra_flags=args.extra_flags,
+                    limits=limits,
+                    debug_info=args.debug_info,
+                )
+            except KeyboardInterrupt:
+                pass
+            return 0
+
+        if configurations is not None:
+            try:
+                from .differential import compare_configurations, format_comparison
+            except ImportError:
+                from differential import compare_configurations, format_comparison
+
+            comparison = compare_configurations(
+                args.source_file,
+                configurations,
+                arch=args.arch,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                extra_flags=args.extra_flags,
+                limits=limits,
+                debug_info=args.debug_info,
+            )
+            print(format_comparison(comparison, output_format), file=out)
+            return 0 if comparison.passed else 1
+
+        baseline = None
+        if args.baseline and not args.update_baseline:
+            try:
+                from .baseline import Baseline
+            except ImportError:
+                from baseline import Baseline
+
+            baseline = Baseline.load(args.baseline)
+        # Batch runs name each violation's file; a single run's may lack one
+        baseline_file = "" if _is_batch(args) else args.source_file
+
+        on_violation = None
+        suppressed = [0]
+        if stream and not args.update_baseline:
+            try:
+                from .report_writers import get_report_writer
+            except ImportError:
+                from report_writers import get_report_writer
+
+            label = _batch_label(args) if _is_batch(args) else args.source_file
+            writer = get_report_writer(output_format, out, label)
+            writer.start()
+            on_violation = writer.write
+            if baseline is not None:
+                is_new, write = baseline.filter(baseline_file), writer.write
+
+                def on_violation(violation: Violation) -> None:
+                    if is_new(violation):
+                        write(violation)
+                    else:
+                        suppressed[0] += 1
+
+        source_analyzer, assembly_analyzer = analyze_source, analyze_assembly
+        if args.server is not None and not args.binary and RULE_PACKS.customized:
+            # The server keeps its own tables; only a local run applies these packs
+            print(
+                "Note: custom rule packs are not sent to the server; analyzing locally",
+                file=sys.stderr,
+            )
+        elif args.server is not None and not args.binary:
+            try:
+                from .server import AnalysisClient, ServerUnavailable
+            except ImportError:
+                from server import AnalysisClient, ServerUnavailable
+
+            client = AnalysisClient(args.server or None)
+            try:
+                client.ping()
+                source_analyzer, assembly_analyzer = client.analyze_source, client.analyze_assembly
+            except ServerUnavailable as e:
+                print(f"Note: {e}; analyzing locally", file=sys.stderr)
+
+        if args.binary:
+            try:
+                from .binary_analyzer import analyze_binary
+            except ImportError:
+                from binary_analyzer import analyze_binary
+
+            report = analyze_binary(
+                args.source_file,
+                arch=args.arch,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                decoder=args.decoder,
+                jobs=args.jobs,
+                limits=limits,
+            )
+            if on_violation is not None:
+                for violation in report.violations:
+                    on_violation(violation)
+        elif args.assembly:
+            report = assembly_analyzer(
                 args.source_file,
                 args.arch,
                 include_warnings=args.warnings,
                 function_filter=args.func,
+                jobs=args.jobs,
+                on_violation=on_violation,
+            )
+        elif _is_batch(args):
+            report = _analyze_batch(
+                args, source_analyzer, on_violation, limits, retain=writer is None
             )
         else:
-            report = analyze_source(
+            report = source_analyzer(
                 args.source_file,
                 arch=args.arch,
                 compiler=args.compiler,
@@ -1267,18 +3232,66 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
                 include_warnings=args.warnings,
                 function_filter=args.func,
                 extra_flags=args.extra_flags,
+                on_violation=on_violation,
+                limits=limits,
+                debug_info=args.debug_info,
             )
 
-        print(format_report(report, output_format))
+        if args.update_baseline:
+            try:
+                from .baseline import Baseline
+            except ImportError:
+                from baseline import Baseline
+
+            Baseline.from_violations(report.violations, baseline_file).save(args.baseline)
+            print(
+                f"Recorded {len(report.violations)} violations in {args.baseline}",
+                file=sys.stderr,
+            )
+            return 0
+        if writer is not None:
+            # The writer counted what it streamed; the rows are not needed
+            report.violations = ViolationTable()
+            report.suppressed = suppressed[0]
+            writer.finish(report)
+            return 0 if writer.passed(report) else 1
+
+        if baseline is not None:
+            new_violations = baseline.new_violations(report.violations, baseline_file)
+            report.suppressed = len(report.violations) - len(new_violations)
+            report.violations = new_violations
+        print(format_report(report, output_format), file=out)
         return 0 if report.passed else 1
 
-    except (FileNotFoundError, RuntimeError, subprocess.CalledProcessError) as e:
-        if output_format == OutputFormat.JSON:
-            print(json.dumps({"error": str(e)}))
+    except (FileNotFoundError, RuntimeError, ValueError) as e:
+        if writer is not None:
+            # Close the streamed document rather than leave it truncated
+            writer.abort(str(e))
+        elif output_format in (OutputFormat.JSON, OutputFormat.NDJSON):
+            import json
+
+            error = {"error": str(e)}
+            if output_format == OutputFormat.NDJSON:
+                error = {"type": "error", **error}
+            print(json.dumps(error), file=out)
         else:
             print(f"Error: {e}", file=sys.stderr)
         return 1
 
+    except BaseException as e:
+        if writer is not None:
+            writer.abort(str(e) or type(e).__name__)
+        raise
+
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if store is not None:
+            set_tool_store(previous_store)
+
 
 if __name__ == "__main__":
+    # Sibling modules fall back to "from analyzer import ..." when run as a
+    # script; alias this module so they share its classes and enums
+    sys.modules.setdefault("analyzer", sys.modules[__name__])
     sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Baseline suppression for constant-time analysis.
+
+A baseline records the violations a project has already accepted, so CI
+only reports (and fails on) violations introduced since:
+
+    ct-analyzer --baseline ct-baseline.bin --update-baseline crypto.c
+    ct-analyzer --baseline ct-baseline.bin crypto.c
+
+Each violation is reduced to a 64-bit fingerprint of its source file
+(relative to the repository root), function, mnemonic and normalized
+instruction text (numbers such as stack offsets, branch targets and local
+label numbers are masked), plus its occurrence number among identical
+instructions in the same function. Addresses and line numbers are left
+out, so unrelated edits elsewhere do not invalidate the baseline, and the
+same function name in two files is told apart.
+
+The file is a short header followed by the fingerprints as a sorted array
+of little-endian unsigned 64-bit integers. Loading it is a single read with
+no parsing, and lookups are binary searches in place.
+"""
+
+import hashlib
+import os
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import Violation
+except ImportError:
+    from analyzer import Violation
+
+
+BASELINE_MAGIC = b"CTBASE2\n"
+# Baselines fingerprinted without the source file
+_OLD_MAGIC = (b"CTBASE1\n",)
+
+# Numeric literals that are not part of a register name (%r8, xmm0, x19)
+_NUMBER = re.compile(r"(?<![\w.$%])-?(?:0x[0-9a-fA-F]+|\d+)\b")
+# Compiler-generated local labels (.L12, .LBB0_3, .Ltmp4), renumbered by unrelated edits
+_LOCAL_LABEL = re.compile(r"\.l(?:bb|tmp)?\d+(?:_\d+)?\b")
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_instruction(instruction: str) -> str:
+    """Instruction text with comments dropped, numbers masked and spacing collapsed."""
+    instruction = instruction.split("#", 1)[0].split(";", 1)[0]
+    instruction = _LOCAL_LABEL.sub(".lN", instruction.lower())
+    instruction = _NUMBER.sub("N", instruction)
+    return _SPACE.sub(" ", instruction).strip()
+
+
+def repository_root(start: str | None = None) -> str:
+    """The enclosing git work tree of start (default: the working directory), or start."""
+    start = os.path.abspath(start or os.getcwd())
+    directory = start
+    while True:
+        if os.path.exists(os.path.join(directory, ".git")):
+            return directory
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return start
+        directory = parent
+
+
+def relative_source(file: str, root: str) -> str:
+    """A violation's file as a root-relative path with "/" separators ("" if unknown)."""
+    if not file:
+        return ""
+    return os.path.relpath(os.path.abspath(file), root).replace(os.sep, "/")
+
+
+def _hash(file: str, function: str, mnemonic: str, instruction: str, occurrence: int) -> int:
+    key = "\0".join((file, function, mnemonic, instruction, str(occurrence)))
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def fingerprint(violation: Violation, occurrence: int = 0, root: str | None = None) -> int:
+    """Stable 64-bit fingerprint of a violation; root defaults to repository_root()."""
+    file = relative_source(violation.file, root or repository_root())
+    instruction = normalize_instruction(violation.instruction)
+    return _hash(file, violation.function, violation.mnemonic.upper(), instruction, occurrence)
+
+
+class Fingerprinter:
+    """
+    Fingerprints violations one at a time, numbering repeats.
+
+    The occurrence number tells apart identical instructions in one function
+    (e.g. two `divl` by the same stack slot), so violations must be fed in
+    report order.
+
+    Args:
+        default_file: File of violations that carry none (no debug info),
+            typically the analyzed source
+        root: Directory file paths are made relative to (default: the
+            repository root)
+    """
+
+    def __init__(self, default_file: str = "", root: str | None = None):
+        self.default_file = default_file
+        self.root = root or repository_root()
+        self._seen: dict[tuple[str, str, str, str], int] = {}
+        self._normalized: dict[str, str] = {}
+        self._files: dict[str, str] = {}
+
+    def __call__(self, violation: Violation) -> int:
+        instruction = self._normalized.get(violation.instruction)
+        if instruction is None:
+            instruction = normalize_instruction(violation.instruction)
+            self._normalized[violation.instruction] = instruction
+        path = violation.file or self.default_file
+        file = self._files.get(path)
+        if file is None:
+            file = self._files[path] = relative_source(path, self.root)
+        key = (file, violation.function, violation.mnemonic.upper(), instruction)
+        occurrence = self._seen.get(key, 0)
+        self._seen[key] = occurrence + 1
+        return _hash(*key, occurrence)
+
+
+def fingerprints(violations: Iterable[Violation], default_file: str = "") -> list[int]:
+    """Fingerprints of violations in report order."""
+    fingerprinter = Fingerprinter(default_file)
+    return [fingerprinter(v) for v in violations]
+
+
+class Baseline:
+    """A sorted set of violation fingerprints."""
+
+    def __init__(self, values: Iterable[int] = ()):
+        self._values = array("Q", sorted(set(values)))
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, value: int) -> bool:
+        values = self._values
+        index = bisect_left(values, value)
+        return index < len(values) and values[index] == value
+
+    @classmethod
+    def from_violations(cls, violations: Iterable[Violation], default_file: str = "") -> "Baseline":
+        """A baseline of violations; default_file is the file of those without one."""
+        return cls(fingerprints(violations, default_file))
+
+    @classmethod
+    def load(cls, path: str) -> "Baseline":
+        """
+        Read a baseline file.
+
+        Raises:
+            ValueError: The file is not a baseline
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if data.startswith(_OLD_MAGIC):
+            raise ValueError(
+                f"Baseline {path} predates per-file fingerprints; record it again "
+                "with --update-baseline"
+            )
+        if not data.startswith(BASELINE_MAGIC) or (len(data) - len(BASELINE_MAGIC)) % 8:
+            raise ValueError(f"Not a ct-analyzer baseline file: {path}")
+        baseline = cls()
+        baseline._values.frombytes(data[len(BASELINE_MAGIC) :])
+        if sys.byteorder == "big":
+            baseline._values.byteswap()
+        return baseline
+
+    def save(self, path: str) -> None:
+        values = self._values
+        if sys.byteorder == "big":
+            values = array("Q", values)
+            values.byteswap()
+        with open(path, "wb") as f:
+            f.write(BASELINE_MAGIC)
+            f.write(values.tobytes())
+
+    def new_violations(
+        self, violations: Iterable[Violation], default_file: str = ""
+    ) -> list[Violation]:
+        """The violations whose fingerprints are not in the baseline, in order."""
+        is_new = self.filter(default_file)
+        return [v for v in violations if is_new(v)]
+
+    def filter(self, default_file: str = "") -> Callable[[Violation], bool]:
+        """Streaming predicate: True for each violation not in the baseline."""
+        fingerprinter = Fingerprinter(default_file)
+        return lambda violation: fingerprinter(violation) not in self
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory benchmarks for AssemblyParser.parse.
+
+Parses synthetic corpora (see corpus.py) for every architecture and style
+and records lines per second, peak traced memory and the number of memory
+blocks the parse leaves allocated. Results are written as JSON and can be
+compared against a stored baseline:
+
+    python ct_analyzer/benchmarks/bench_parser.py --sizes 10k,1m -o results.json
+    python ct_analyzer/benchmarks/bench_parser.py --baseline ct_analyzer/benchmarks/baseline.json
+
+Throughput depends on the machine; regenerate the baseline with
+--save-baseline on the machine that runs the comparison.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analyzer import DANGEROUS_INSTRUCTIONS, AssemblyParser, Severity
+from benchmarks.corpus import generate, styles_for
+from benchmarks.harness import (
+    DEFAULT_TOLERANCE,
+    best_time,
+    compare,
+    environment,
+    summary_line,
+    traced_memory,
+)
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+DEFAULT_SIZES = "10k,1m"
+
+
+def result_key(result: dict) -> str:
+    return f"{result['arch']}/{result['style']}/{result['size']}"
+
+
+def measure(arch: str, style: str, size: str, repeat: int = 3, memory: bool = True) -> dict:
+    """
+    Benchmark parsing one corpus.
+
+    Throughput is the best of repeat untraced runs. Memory is measured in a
+    separate run under tracemalloc, which slows parsing down.
+
+    Raises:
+        AssertionError: The parser did not find the violations the corpus holds
+    """
+    corpus = generate(arch, style, SIZES[size])
+    parser = AssemblyParser(arch, "go" if style == "go" else "gcc")
+
+    def run():
+        return parser.parse(corpus.text, include_warnings=True)
+
+    best, (_functions, violations) = best_time(run, repeat)
+
+    errors = sum(1 for v in violations if v.severity == Severity.ERROR)
+    if (errors, len(violations) - errors) != (corpus.errors, corpus.warnings):
+        raise AssertionError(
+            f"{arch}/{style}/{size}: found {errors} errors and {len(violations) - errors} "
+            f"warnings, expected {corpus.errors} and {corpus.warnings}"
+        )
+    del violations
+
+    result = {
+        "arch": arch,
+        "style": style,
+        "size": size,
+        "lines": corpus.lines,
+        "violations": corpus.errors + corpus.warnings,
+        "seconds": round(best, 6),
+        "lines_per_sec": round(corpus.lines / best),
+    }
+    if memory:
+        result.update(traced_memory(run))
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AssemblyParser.parse")
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma-separated corpus sizes from {', '.join(SIZES)} (default: {DEFAULT_SIZES})",
+    )
+    parser.add_argument("--arch", action="append", help="Only this architecture (repeatable)")
+    parser.add_argument("--style", action="append", help="Only this style (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per corpus (best kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--output", "-o", help="Write the JSON results to a file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Also write results to FILE")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed regression as a fraction (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = args.sizes.split(",")
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size: {', '.join(unknown)}")
+    archs = args.arch or list(DANGEROUS_INSTRUCTIONS)
+    for arch in archs:
+        if arch not in DANGEROUS_INSTRUCTIONS:
+            parser.error(f"unknown architecture: {arch}")
+
+    results = []
+    for size in sizes:
+        for arch in archs:
+            for style in styles_for(arch):
+                if args.style and style not in args.style:
+                    continue
+                result = measure(arch, style, size, args.repeat, not args.no_memory)
+                results.append(result)
+                print(summary_line(result_key(result), result), file=sys.stderr)
+
+    document = {"environment": environment(), "results": results}
+    text = json.dumps(document, indent=2)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+    if not args.output:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), result_key, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
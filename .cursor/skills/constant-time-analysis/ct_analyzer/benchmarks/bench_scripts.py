@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory benchmarks for the script analyzers' text parsers.
+
+Each bytecode parser (_parse_vld_output, _parse_v8_bytecode, ...) is fed a
+recorded tool-output fixture from fixtures/, repeated up to a realistic
+size, and each source scanner (_detect_dangerous_function_calls) reads a
+test sample repeated to the size of a large source file. No PHP, Node.js,
+Ruby, JVM or .NET toolchain is needed.
+
+    cd ct_analyzer/benchmarks
+    python bench_scripts.py -o results.json
+    python bench_scripts.py --baseline scripts_baseline.json
+
+--scale shrinks every workload (e.g. 0.01 for a quick run); baselines are
+only comparable at the same scale.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.harness import (
+    DEFAULT_TOLERANCE,
+    best_time,
+    compare,
+    environment,
+    summary_line,
+    traced_memory,
+)
+from script_analyzers import (
+    CSharpAnalyzer,
+    JavaAnalyzer,
+    JavaScriptAnalyzer,
+    KotlinAnalyzer,
+    PHPAnalyzer,
+    PythonAnalyzer,
+    RubyAnalyzer,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SAMPLES = Path(__file__).parent.parent / "tests" / "test_samples"
+
+# Size of a large single source file or bundle
+SOURCE_BYTES = 2_000_000
+
+
+@dataclass
+class Workload:
+    """One parser or scanner benchmark."""
+
+    name: str
+    analyzer: type
+    method: str
+    # Parsers: recorded tool output. Scanners: source sample.
+    input: Path
+    copies: int
+    source_file: str | None = None
+
+
+def _copies_for(sample: str) -> int:
+    """Copies of a sample (or of its recorded output) that add up to SOURCE_BYTES of source."""
+    return max(1, SOURCE_BYTES // os.path.getsize(SAMPLES / sample))
+
+
+WORKLOADS = [
+    # VLD dump of the functions of vulnerable.php
+    Workload(
+        "vld", PHPAnalyzer, "_parse_vld_output", FIXTURES / "vld.txt",
+        _copies_for("vulnerable.php"),
+    ),
+    # node --no-lazy --print-bytecode of bn_excerpt.js, scaled to a 2 MB bundle
+    Workload(
+        "v8", JavaScriptAnalyzer, "_parse_v8_bytecode", FIXTURES / "v8.txt",
+        _copies_for("bn_excerpt.js"), "bundle.js",
+    ),
+    # python -m dis vulnerable.py
+    Workload(
+        "dis", PythonAnalyzer, "_parse_dis_output", FIXTURES / "dis.txt",
+        _copies_for("vulnerable.py"), "vulnerable.py",
+    ),
+    # ruby --dump=insns vulnerable.rb
+    Workload(
+        "yarv", RubyAnalyzer, "_parse_yarv_output", FIXTURES / "yarv.txt",
+        _copies_for("vulnerable.rb"), "vulnerable.rb",
+    ),
+    # javap -c -p -v of one class, scaled to a 5,000-class JAR
+    Workload(
+        "javap", JavaAnalyzer, "_parse_javap_output", FIXTURES / "javap.txt", 5000,
+        "CryptoUtils.java",
+    ),
+    Workload(
+        "javap-kotlin", KotlinAnalyzer, "_parse_javap_output", FIXTURES / "javap.txt", 5000,
+        "CryptoUtils.kt",
+    ),
+    # ilspycmd -il of one type, scaled to a 5,000-type assembly
+    Workload(
+        "il", CSharpAnalyzer, "_parse_il_output", FIXTURES / "il.txt", 5000, "Vulnerable.cs",
+    ),
+] + [
+    Workload(
+        f"scan-{language}", analyzer, "_detect_dangerous_function_calls", SAMPLES / sample,
+        _copies_for(sample),
+    )
+    for language, analyzer, sample in (
+        ("javascript", JavaScriptAnalyzer, "bn_excerpt.js"),
+        ("python", PythonAnalyzer, "vulnerable.py"),
+        ("ruby", RubyAnalyzer, "vulnerable.rb"),
+        ("java", JavaAnalyzer, "vulnerable.java"),
+        ("kotlin", KotlinAnalyzer, "vulnerable.kt"),
+        ("csharp", CSharpAnalyzer, "vulnerable.cs"),
+    )
+]
+
+
+def result_key(result: dict) -> str:
+    return result["name"]
+
+
+def measure(workload: Workload, scale: float = 1.0, repeat: int = 3, memory: bool = True) -> dict:
+    """
+    Benchmark one workload.
+
+    Throughput is the best of repeat untraced runs; memory is measured in a
+    separate run under tracemalloc.
+    """
+    text = workload.input.read_text() * max(1, round(workload.copies * scale))
+    method = getattr(workload.analyzer(), workload.method)
+    scratch = None
+
+    if workload.method == "_detect_dangerous_function_calls":
+        # Scanners read the source from disk
+        scratch = tempfile.mkdtemp(prefix="ct-bench-")
+        path = os.path.join(scratch, workload.input.name)
+        with open(path, "w") as f:
+            f.write(text)
+
+        def run():
+            return method(path, include_warnings=True)
+
+    else:
+        args = (text,) if workload.source_file is None else (text, workload.source_file)
+
+        def run():
+            return method(*args, include_warnings=True)
+
+    try:
+        best, outcome = best_time(run, repeat)
+        violations = outcome if isinstance(outcome, list) else outcome[1]
+        lines = text.count("\n")
+        result = {
+            "name": workload.name,
+            "lines": lines,
+            "bytes": len(text),
+            "violations": len(violations),
+            "seconds": round(best, 6),
+            "lines_per_sec": round(lines / best),
+        }
+        del outcome, violations
+        if memory:
+            result.update(traced_memory(run))
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the script analyzers' parsers")
+    parser.add_argument(
+        "--only", action="append", metavar="NAME", help="Only this workload (repeatable)"
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply every workload size (default: 1)"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per workload (best kept)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc run")
+    parser.add_argument("--list", action="store_true", help="List the workloads and exit")
+    parser.add_argument("--output", "-o", help="Write the JSON results to a file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Also write results to FILE")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed regression as a fraction (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for workload in WORKLOADS:
+            print(f"{workload.name:<18} {workload.analyzer.__name__}.{workload.method}")
+        return 0
+    names = {workload.name for workload in WORKLOADS}
+    unknown = sorted(set(args.only or ()) - names)
+    if unknown:
+        parser.error(f"unknown workload: {', '.join(unknown)}")
+
+    results = []
+    for workload in WORKLOADS:
+        if args.only and workload.name not in args.only:
+            continue
+        result = measure(workload, args.scale, args.repeat, not args.no_memory)
+        results.append(result)
+        print(summary_line(workload.name, result), file=sys.stderr)
+
+    document = {"environment": environment(), "scale": args.scale, "results": results}
+    text = json.dumps(document, indent=2)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+    if not args.output:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("scale", 1.0) != args.scale:
+            parser.error(f"baseline was recorded at --scale {baseline.get('scale', 1.0)}")
+        regressions = compare(results, baseline, result_key, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
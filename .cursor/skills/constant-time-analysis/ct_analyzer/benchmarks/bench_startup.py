@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the ct-analyzer command line.
+
+Build scripts run ct-analyzer once per file, so the cost of starting the
+interpreter and importing the analyzer is paid on every call. Each
+scenario is run in a fresh interpreter, timed from process start to exit,
+and run once more under `-X importtime` to list the modules it imports:
+
+    cd ct_analyzer/benchmarks
+    python bench_startup.py
+    python bench_startup.py --baseline startup_baseline.json
+
+A scenario regresses when its median time grows by more than --tolerance,
+or when it imports a module the baseline run did not. The module check is
+machine-independent, so it also runs in the test suite.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.harness import DEFAULT_TOLERANCE, environment
+
+ANALYZER_DIRECTORY = str(Path(__file__).parent.parent)
+# What the ct-analyzer console script runs. (Running analyzer.py as a script
+# would also compile it on every call: __main__ is never bytecode-cached.)
+ENTRY_POINT = "import sys, analyzer; sys.exit(analyzer.main())"
+
+SMALL_ASSEMBLY = """\
+mod_reduce:
+    movl %edi, %eax
+    cltd
+    idivl %esi
+    movl %edx, %eax
+    ret
+"""
+
+# Name -> arguments after the interpreter; "{assembly}" is a small .s file
+SCENARIOS = {
+    "import": ["-c", "import analyzer"],
+    "assembly": ["-c", ENTRY_POINT, "--assembly", "--arch", "x86_64", "{assembly}"],
+    "assembly-json": ["-c", ENTRY_POINT, "--assembly", "--arch", "x86_64", "--json", "{assembly}"],
+}
+
+
+def _environment() -> dict:
+    env = dict(os.environ)
+    # Use (and write) cached bytecode, as an installed tool would
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    paths = [ANALYZER_DIRECTORY, env.get("PYTHONPATH")]
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, paths))
+    return env
+
+
+def _command(scenario: str, assembly: str, options: tuple[str, ...] = ()) -> list[str]:
+    return [sys.executable, *options, *(a.format(assembly=assembly) for a in SCENARIOS[scenario])]
+
+
+def imported_modules(scenario: str, assembly: str) -> dict[str, int]:
+    """Modules a scenario imports, with their cumulative import time in microseconds."""
+    result = subprocess.run(
+        _command(scenario, assembly, ("-X", "importtime")),
+        capture_output=True,
+        text=True,
+        env=_environment(),
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure(scenario: str, assembly: str, repeat: int) -> dict:
+    """Median and fastest wall time of repeat fresh runs, and the imported modules."""
+    command = _command(scenario, assembly)
+    env = _environment()
+    # Warm the page cache and the bytecode cache
+    subprocess.run(command, capture_output=True, env=env)
+    times = []
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        subprocess.run(command, capture_output=True, env=env)
+        times.append(time.perf_counter() - started)
+    modules = imported_modules(scenario, assembly)
+    slowest = sorted(modules.items(), key=lambda item: -item[1])
+    return {
+        "name": scenario,
+        "median_ms": round(statistics.median(times) * 1000, 2),
+        "best_ms": round(min(times) * 1000, 2),
+        "module_count": len(modules),
+        "slowest_imports": [f"{name} {us / 1000:.1f}ms" for name, us in slowest[:8]],
+        "modules": sorted(modules),
+    }
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Regressions of results against a baseline document."""
+    expected = {r["name"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        base = expected.get(result["name"])
+        if base is None:
+            continue
+        if result["median_ms"] > base["median_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{result['name']}: {result['median_ms']} ms, baseline {base['median_ms']} ms"
+            )
+        added = sorted(set(result["modules"]) - set(base["modules"]))
+        if added:
+            regressions.append(f"{result['name']}: new imports {', '.join(added)}")
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ct-analyzer startup time")
+    parser.add_argument(
+        "--only", action="append", metavar="NAME", help="Only this scenario (repeatable)"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per scenario")
+    parser.add_argument("--output", "-o", help="Write the JSON results to a file")
+    parser.add_argument("--baseline", help="Compare against this results file")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Also write results to FILE")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed slowdown as a fraction (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.only or ()) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        assembly = os.path.join(scratch, "small.s")
+        with open(assembly, "w") as f:
+            f.write(SMALL_ASSEMBLY)
+        for scenario in SCENARIOS:
+            if args.only and scenario not in args.only:
+                continue
+            result = measure(scenario, assembly, args.repeat)
+            results.append(result)
+            print(
+                f"{scenario:<22} {result['median_ms']:>8.1f} ms median "
+                f"{result['module_count']:>5} modules",
+                file=sys.stderr,
+            )
+
+    document = {"environment": environment(), "results": results}
+    text = json.dumps(document, indent=2)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+    if not args.output:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic assembly corpora for benchmarking the parser.
+
+A corpus is generated from a seed, so every run (and every machine) parses
+exactly the same text. Instructions are drawn from DANGEROUS_INSTRUCTIONS
+for the target architecture plus a set of safe instructions, and the
+generator counts the errors and warnings it emits so benchmarks can check
+the parser found all of them.
+
+Styles:
+    gas: GCC/Clang `-S` output (AT&T syntax on x86), with `# file:line` comments
+    arm: Clang `-S` output in ARM syntax (arm and arm64 only), with `.loc` directives
+    go:  `go tool objdump` listings with file:line, address and encoding columns
+"""
+
+import random
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analyzer import DANGEROUS_INSTRUCTIONS
+
+STYLES = ("gas", "arm", "go")
+
+ARM_ARCHITECTURES = ("arm", "arm64")
+
+# Instructions that never produce a violation, per architecture
+SAFE_MNEMONICS = {
+    "x86_64": ["movq", "addq", "subq", "leaq", "xorl", "andq", "cmpq", "testq", "pushq", "popq",
+               "shlq", "imulq", "movl", "movzbl", "call", "ret"],
+    "i386": ["movl", "addl", "subl", "leal", "xorl", "andl", "cmpl", "testl", "pushl", "popl",
+             "shll", "imull", "movzbl", "call", "ret"],
+    "arm64": ["mov", "add", "sub", "ldr", "str", "stp", "ldp", "eor", "and", "orr", "lsl",
+              "mul", "cmp", "csel", "adrp", "ret"],
+    "arm": ["mov", "add", "sub", "ldr", "str", "push", "pop", "eor", "and", "orr", "lsl",
+            "mul", "cmp", "bx"],
+    "riscv64": ["addi", "add", "sub", "ld", "sd", "mv", "li", "xor", "and", "or", "slli",
+                "mul", "auipc", "ret"],
+    "ppc64le": ["addi", "add", "subf", "ld", "std", "mr", "li", "xor", "and", "or", "sldi",
+                "mulld", "mflr", "blr"],
+    "s390x": ["lgr", "agr", "sgr", "lg", "stg", "lghi", "xgr", "ngr", "ogr", "sllg", "msgr",
+              "larl", "br"],
+}
+
+# Operand text per architecture, indexed by a small random number
+OPERANDS = {
+    "x86_64": ["%rdi, %rax", "$8, %rsp", "16(%rsp), %rcx", "%ecx", "%xmm1, %xmm0", "-24(%rbp)"],
+    "i386": ["%edi, %eax", "$8, %esp", "16(%esp), %ecx", "%ecx", "-12(%ebp)"],
+    "arm64": ["x0, x1, x2", "w8, w9", "x29, x30, [sp, #-16]!", "x0, [x1, #8]", "d0, d1, d2"],
+    "arm": ["r0, r1, r2", "r3, #4", "r0, [r1, #8]", "{r4, lr}", "s0, s1, s2"],
+    "riscv64": ["a0, a0, a1", "sp, sp, -32", "ra, 24(sp)", "a5, a4", "fa0, fa0, fa1"],
+    "ppc64le": ["3, 3, 4", "1, 1, -32", "0, 16(1)", "9, 10", "1, 2, 3"],
+    "s390x": ["%r2, %r3", "%r15, -160", "%r1, 8(%r15)", "%r2, %r14", "%f0, %f2"],
+}
+
+# Go assembler operands use register names without prefixes
+GO_OPERANDS = ["AX, CX", "$8, SP", "0x10(SP), DX", "R1, R2", "F0, F1", "$1, R3"]
+
+# Tokens the listing parser skips as encoding bytes (e.g. "bcc", "ddb")
+_HEX_TOKEN = re.compile(r"^[0-9a-fA-F]{2,}$")
+
+# Share of instructions that are errors and warnings
+ERROR_RATE = 0.02
+WARNING_RATE = 0.05
+
+# Instructions per function, and per source-location annotation
+FUNCTION_SIZE = 48
+LOCATION_EVERY = 6
+
+
+@dataclass
+class Corpus:
+    """A generated assembly listing and what parsing it should find."""
+
+    arch: str
+    style: str
+    text: str
+    lines: int
+    functions: int
+    errors: int
+    warnings: int
+
+
+def styles_for(arch: str) -> list[str]:
+    """The corpus styles that exist for an architecture."""
+    return [s for s in STYLES if s != "arm" or arch in ARM_ARCHITECTURES]
+
+
+def _vocabulary(arch: str, style: str) -> tuple[list[str], list[str], list[str]]:
+    instructions = DANGEROUS_INSTRUCTIONS[arch]
+    errors = list(instructions.get("errors", {}))
+    warnings = [m for m in instructions.get("warnings", {}) if m not in errors]
+    safe = [m for m in SAFE_MNEMONICS[arch] if m not in errors and m not in warnings]
+    vocabulary = [
+        [m for m in group if not _HEX_TOKEN.match(m)] for group in (errors, warnings, safe)
+    ]
+    if style == "go":
+        vocabulary = [[m.upper() for m in group] for group in vocabulary]
+    return tuple(vocabulary)
+
+
+def _instruction_lines(arch: str, style: str, rng: random.Random):
+    """Endless (line, kind) pairs for one style; kind is "error", "warning" or None."""
+    errors, warnings, safe = _vocabulary(arch, style)
+    operands = GO_OPERANDS if style == "go" else OPERANDS[arch]
+    comment = {"arm": "@" if arch == "arm" else "//"}.get(style, "#")
+    address = 0x401000
+    while True:
+        roll = rng.random()
+        if roll < ERROR_RATE:
+            kind, mnemonic = "error", rng.choice(errors)
+        elif roll < ERROR_RATE + WARNING_RATE:
+            kind, mnemonic = "warning", rng.choice(warnings)
+        else:
+            kind, mnemonic = None, rng.choice(safe)
+        operand = operands[rng.randrange(len(operands))]
+        if style == "go":
+            size = rng.choice((2, 3, 4, 5))
+            encoding = "".join(f"{rng.randrange(256):02x}" for _ in range(size))
+            yield f"\t0x{address:x}\t{encoding}\t\t{mnemonic} {operand}", kind
+            address += size
+        elif style == "arm" and rng.random() < 0.1:
+            yield f"\t{mnemonic}\t{operand}\t{comment} spill", kind
+        else:
+            yield f"\t{mnemonic}\t{operand}", kind
+
+
+def generate(arch: str, style: str, lines: int, seed: int = 0) -> Corpus:
+    """
+    Generate a corpus of (about) the given number of lines.
+
+    Args:
+        arch: Architecture key of DANGEROUS_INSTRUCTIONS
+        style: One of styles_for(arch)
+        lines: Target line count; the last function is completed, so the
+            result may be a few lines longer
+        seed: Random seed; equal arguments give identical corpora
+
+    Raises:
+        ValueError: Unknown architecture or style
+    """
+    if arch not in DANGEROUS_INSTRUCTIONS:
+        raise ValueError(f"Unknown architecture: {arch}")
+    if style not in styles_for(arch):
+        raise ValueError(f"Style {style} is not available for {arch}")
+
+    rng = random.Random(f"{seed}:{arch}:{style}")
+    instructions = _instruction_lines(arch, style, rng)
+    counts = {"error": 0, "warning": 0, None: 0}
+    out: list[str] = []
+    functions = 0
+    source_line = 1
+
+    while len(out) < lines:
+        name = f"ct_bench_{functions}"
+        functions += 1
+        if style == "go":
+            out.append(f"TEXT main.{name}(SB) /src/bench/bench.go")
+        else:
+            out += [f"\t.globl\t{name}", f"\t.type\t{name}, @function", f"{name}:"]
+            out.append("\t.cfi_startproc" if style == "gas" else "\t.fnstart")
+        for index in range(FUNCTION_SIZE):
+            if index % LOCATION_EVERY == 0:
+                source_line += rng.randrange(1, 4)
+            line, kind = next(instructions)
+            counts[kind] += 1
+            if style == "go":
+                line = f"  bench.go:{source_line}{line}"
+            elif index % LOCATION_EVERY == 0:
+                if style == "gas":
+                    out.append(f"# bench.c:{source_line}")
+                else:
+                    out.append(f"\t.loc\t1 {source_line} 7")
+            if index and index % 16 == 0 and style != "go":
+                out.append(f".LBB{functions}_{index // 16}:")
+            out.append(line)
+        if style != "go":
+            out.append("\t.cfi_endproc" if style == "gas" else "\t.fnend")
+            out.append(f"\t.size\t{name}, .-{name}")
+
+    return Corpus(
+        arch=arch,
+        style=style,
+        text="\n".join(out) + "\n",
+        lines=len(out),
+        functions=functions,
+        errors=counts["error"],
+        warnings=counts["warning"],
+    )
@@ -0,0 +1,92 @@
+"""Timing, memory and baseline helpers shared by the benchmark scripts."""
+
+import platform
+import time
+import tracemalloc
+from collections.abc import Callable
+
+# Allowed slowdown / memory growth relative to the baseline
+DEFAULT_TOLERANCE = 0.25
+
+
+def best_time(run: Callable[[], object], repeat: int) -> tuple[float, object]:
+    """Fastest of repeat calls of run, and the result of the last call."""
+    best = result = None
+    for _ in range(max(repeat, 1)):
+        started = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def traced_memory(run: Callable[[], object]) -> dict:
+    """
+    Peak traced memory of one call of run, and the blocks it leaves allocated.
+
+    Only allocations made during the call are counted, so inputs prepared
+    beforehand are excluded.
+    """
+    tracemalloc.start()
+    try:
+        result = run()
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return {"peak_bytes": peak, "allocated_blocks": blocks}
+
+
+def compare(
+    results: list[dict],
+    baseline: dict,
+    key: Callable[[dict], str],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """
+    Regressions of results against a baseline document.
+
+    A result regresses when its throughput drops, or its peak memory grows,
+    by more than tolerance (a fraction), or when it finds a different number
+    of violations. Results missing from the baseline are not compared.
+    """
+    expected = {key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        name = key(result)
+        base = expected.get(name)
+        if base is None:
+            continue
+        if result["violations"] != base["violations"]:
+            regressions.append(
+                f"{name}: {result['violations']} violations, baseline {base['violations']}"
+            )
+        if result["lines_per_sec"] < base["lines_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['lines_per_sec']:,} lines/s, baseline {base['lines_per_sec']:,}"
+            )
+        if "peak_bytes" in result and "peak_bytes" in base:
+            if result["peak_bytes"] > base["peak_bytes"] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: peak {result['peak_bytes']:,} bytes, baseline {base['peak_bytes']:,}"
+                )
+    return regressions
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def summary_line(name: str, result: dict) -> str:
+    """One human-readable progress line for a result."""
+    line = f"{name:<22} {result['lines_per_sec']:>12,} lines/s"
+    if "peak_bytes" in result:
+        line += f" {result['peak_bytes'] / 1e6:>10.1f} MB peak"
+    return line
@@ -0,0 +1,814 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Prebuilt binary analysis for constant-time analysis.
+
+This module analyzes already-compiled ELF objects (.o), static archives (.a)
+and shared libraries (.so) without needing the original source or a compiler.
+The ELF symbol table is read in pure Python to find function ranges, only the
+requested symbols are disassembled, and violations are mapped back to source
+lines with a single batched addr2line call when DWARF line info is present.
+"""
+
+import mmap
+import os
+import re
+import struct
+import tempfile
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import (
+        STAGE_DISASSEMBLE,
+        STAGE_SYMBOLIZE,
+        AnalysisReport,
+        AssemblyParser,
+        ToolLimitExceeded,
+        ToolLimits,
+        ToolRun,
+        Violation,
+        instruction_rules,
+        normalize_arch,
+        run_tool,
+    )
+    from .native_decoder import has_native_decoder, scan_elf
+except ImportError:
+    from analyzer import (
+        STAGE_DISASSEMBLE,
+        STAGE_SYMBOLIZE,
+        AnalysisReport,
+        AssemblyParser,
+        ToolLimitExceeded,
+        ToolLimits,
+        ToolRun,
+        Violation,
+        instruction_rules,
+        normalize_arch,
+        run_tool,
+    )
+    from native_decoder import has_native_decoder, scan_elf
+
+
+# =============================================================================
+# ELF Constants
+# =============================================================================
+
+ELF_MAGIC = b"\x7fELF"
+AR_MAGIC = b"!<arch>\n"
+
+ELFCLASS64 = 2
+ELFDATA2LSB = 1
+
+ET_REL = 1
+
+SHT_SYMTAB = 2
+SHT_NOBITS = 8
+SHT_DYNSYM = 11
+
+SHN_UNDEF = 0
+SHN_LORESERVE = 0xFF00
+SHN_XINDEX = 0xFFFF
+
+STT_NOTYPE = 0
+STT_FUNC = 2
+STT_GNU_IFUNC = 10
+
+EM_386 = 3
+EM_PPC64 = 21
+EM_S390 = 22
+EM_ARM = 40
+EM_X86_64 = 62
+EM_AARCH64 = 183
+EM_RISCV = 243
+
+# ELF e_machine -> canonical architecture name used by DANGEROUS_INSTRUCTIONS
+ELF_MACHINE_ARCH = {
+    EM_386: "i386",
+    EM_PPC64: "ppc64le",
+    EM_S390: "s390x",
+    EM_ARM: "arm",
+    EM_X86_64: "x86_64",
+    EM_AARCH64: "arm64",
+    EM_RISCV: "riscv64",
+}
+
+# x86 prefixes that objdump prints as a separate token before the mnemonic
+X86_PREFIXES = frozenset(
+    {
+        "rep",
+        "repe",
+        "repz",
+        "repne",
+        "repnz",
+        "lock",
+        "bnd",
+        "notrack",
+        "data16",
+        "addr32",
+        "cs",
+        "ds",
+        "es",
+        "fs",
+        "gs",
+        "ss",
+    }
+)
+
+SUPPORTED_DECODERS = ("objdump", "native")
+
+
+# =============================================================================
+# ELF Reader
+# =============================================================================
+
+
+@dataclass
+class ElfSection:
+    """A section header from an ELF file."""
+
+    index: int
+    name: str
+    type: int
+    flags: int
+    address: int
+    offset: int
+    size: int
+    link: int
+    entsize: int
+
+
+@dataclass
+class ElfSymbol:
+    """A function symbol with its address range."""
+
+    name: str
+    address: int
+    size: int
+    section: int
+
+    @property
+    def end(self) -> int:
+        return self.address + self.size
+
+
+class ElfFile:
+    """
+    Minimal pure-Python ELF reader.
+
+    Only the pieces needed for analysis are decoded: the file header, the
+    section headers and the (static or dynamic) symbol table. Works on any
+    buffer supporting the buffer protocol, so both memory-mapped files and
+    archive members can be parsed without copying.
+
+    Files opened with from_path own their mapping; use the reader as a
+    context manager (or call close) to release it.
+    """
+
+    def __init__(self, data, name: str = ""):
+        self.data = memoryview(data)
+        self.name = name
+        self._mapping = None
+
+        if bytes(self.data[:4]) != ELF_MAGIC:
+            raise ValueError(f"Not an ELF file: {name or '<buffer>'}")
+
+        self.is_64 = self.data[4] == ELFCLASS64
+        self.little_endian = self.data[5] == ELFDATA2LSB
+        self._endian = "<" if self.little_endian else ">"
+
+        if self.is_64:
+            header = struct.unpack_from(self._endian + "HHIQQQIHHHHHH", self.data, 16)
+        else:
+            header = struct.unpack_from(self._endian + "HHIIIIIHHHHHH", self.data, 16)
+
+        (
+            self.elf_type,
+            self.machine,
+            _version,
+            self.entry,
+            _phoff,
+            self._shoff,
+            self.flags,
+            _ehsize,
+            _phentsize,
+            _phnum,
+            self._shentsize,
+            self._shnum,
+            self._shstrndx,
+        ) = header
+
+        self.sections = self._read_sections()
+
+    @classmethod
+    def from_path(cls, path: str) -> "ElfFile":
+        """Memory-map an ELF file from disk."""
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            elf = cls(data, name=str(path))
+        except BaseException:
+            data.close()
+            raise
+        elf._mapping = data
+        return elf
+
+    def close(self) -> None:
+        """Release the buffer and close the mapping opened by from_path."""
+        self.data.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self) -> "ElfFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def arch(self) -> str | None:
+        """Canonical architecture name, or None if the machine type is unknown."""
+        return ELF_MACHINE_ARCH.get(self.machine)
+
+    @property
+    def is_relocatable(self) -> bool:
+        return self.elf_type == ET_REL
+
+    def _read_sections(self) -> list[ElfSection]:
+        if not self._shoff:
+            return []
+
+        fmt = self._endian + ("IIQQQQIIQQ" if self.is_64 else "IIIIIIIIII")
+
+        def read_header(index: int) -> tuple:
+            return struct.unpack_from(fmt, self.data, self._shoff + index * self._shentsize)
+
+        # Extended section numbering stores the real counts in section 0
+        shnum = self._shnum
+        shstrndx = self._shstrndx
+        first = read_header(0)
+        if shnum == 0:
+            shnum = first[5]
+        if shstrndx == SHN_XINDEX:
+            shstrndx = first[6]
+
+        raw = [read_header(i) for i in range(shnum)]
+        sections = [
+            ElfSection(
+                index=i,
+                name="",
+                type=h[1],
+                flags=h[2],
+                address=h[3],
+                offset=h[4],
+                size=h[5],
+                link=h[6],
+                entsize=h[9],
+            )
+            for i, h in enumerate(raw)
+        ]
+
+        if 0 < shstrndx < len(sections):
+            strtab = sections[shstrndx]
+            for section, header in zip(sections, raw):
+                section.name = self._read_string(strtab.offset, header[0])
+
+        return sections
+
+    def _read_string(self, table_offset: int, index: int) -> str:
+        start = table_offset + index
+        end = start
+        data = self.data
+        while end < len(data) and data[end] != 0:
+            end += 1
+        return bytes(data[start:end]).decode("utf-8", errors="replace")
+
+    def section(self, name: str) -> ElfSection | None:
+        """Get a section by name."""
+        for section in self.sections:
+            if section.name == name:
+                return section
+        return None
+
+    def section_data(self, section: ElfSection) -> memoryview:
+        """Get the raw contents of a section (empty for SHT_NOBITS)."""
+        if section.type == SHT_NOBITS:
+            return self.data[0:0]
+        return self.data[section.offset : section.offset + section.size]
+
+    def has_debug_line(self) -> bool:
+        """Check whether DWARF line information is present."""
+        return any(s.name in (".debug_line", ".zdebug_line") for s in self.sections)
+
+    def _iter_symbols(self):
+        """Yield (name_offset, info, shndx, value, size, strtab) for each symbol."""
+        symtab = next((s for s in self.sections if s.type == SHT_SYMTAB), None)
+        if symtab is None:
+            symtab = next((s for s in self.sections if s.type == SHT_DYNSYM), None)
+        if symtab is None or symtab.entsize == 0:
+            return
+
+        strtab = self.sections[symtab.link]
+        fmt = self._endian + ("IBBHQQ" if self.is_64 else "IIIBBH")
+        for i in range(1, symtab.size // symtab.entsize):
+            entry = struct.unpack_from(fmt, self.data, symtab.offset + i * symtab.entsize)
+            if self.is_64:
+                st_name, st_info, _other, st_shndx, st_value, st_size = entry
+            else:
+                st_name, st_value, st_size, st_info, _other, st_shndx = entry
+            yield st_name, st_info, st_shndx, st_value, st_size, strtab
+
+    def function_symbols(self) -> list[ElfSymbol]:
+        """
+        Get defined function symbols, sorted by address.
+
+        Uses .symtab when present and falls back to .dynsym for stripped
+        shared libraries. Aliases (several names for one address) are
+        collapsed to the first name.
+        """
+        symbols = []
+        seen = set()
+
+        for st_name, st_info, st_shndx, st_value, st_size, strtab in self._iter_symbols():
+            if st_info & 0xF not in (STT_FUNC, STT_GNU_IFUNC):
+                continue
+            if st_shndx == SHN_UNDEF or st_shndx >= SHN_LORESERVE or st_size == 0:
+                continue
+
+            # Thumb functions have the low bit set in their address
+            if self.machine == EM_ARM:
+                st_value &= ~1
+
+            key = (st_shndx, st_value)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            name = self._read_string(strtab.offset, st_name)
+            symbols.append(ElfSymbol(name=name, address=st_value, size=st_size, section=st_shndx))
+
+        symbols.sort(key=lambda s: (s.section, s.address))
+        return symbols
+
+    def mapping_symbols(self) -> dict[int, list[tuple[int, str]]]:
+        """
+        Get ARM/AArch64/RISC-V mapping symbols per section.
+
+        Mapping symbols ($x, $a, $t for code, $d for data) mark literal pools
+        and other data embedded in executable sections. Returns
+        {section_index: [(address, kind), ...]} sorted by address, where kind
+        is "d" for data and "x" for code.
+        """
+        mapping: dict[int, list[tuple[int, str]]] = {}
+        for st_name, st_info, st_shndx, st_value, _size, strtab in self._iter_symbols():
+            if st_info & 0xF != STT_NOTYPE or st_shndx == SHN_UNDEF or st_shndx >= SHN_LORESERVE:
+                continue
+            name = self._read_string(strtab.offset, st_name)
+            if len(name) < 2 or name[0] != "$" or name[1] not in "adtx":
+                continue
+            if len(name) > 2 and name[2] != ".":
+                continue
+            kind = "d" if name[1] == "d" else "x"
+            mapping.setdefault(st_shndx, []).append((st_value, kind))
+
+        for entries in mapping.values():
+            entries.sort()
+        return mapping
+
+
+def iter_archive_members(data):
+    """
+    Iterate over the members of a System V / GNU ar archive.
+
+    Yields (member_name, member_data) tuples, skipping the symbol index and
+    the GNU long-name table. The member data are views into data; release
+    them (and close the generator) before closing the underlying mapping.
+    """
+    data = memoryview(data)
+    if bytes(data[:8]) != AR_MAGIC:
+        raise ValueError("Not an ar archive")
+
+    try:
+        offset = 8
+        long_names = b""
+        while offset + 60 <= len(data):
+            header = bytes(data[offset : offset + 60])
+            name = header[:16].decode("ascii", errors="replace").rstrip()
+            size = int(header[48:58].decode("ascii").strip() or 0)
+            body = data[offset + 60 : offset + 60 + size]
+            offset += 60 + size + (size & 1)
+
+            if name in ("/", "/SYM64/"):
+                continue
+            if name == "//":
+                long_names = bytes(body)
+                continue
+
+            if name.startswith("/") and name[1:].isdigit():
+                start = int(name[1:])
+                end = long_names.find(b"\n", start)
+                name = long_names[start : end if end != -1 else None].decode("utf-8", "replace")
+            elif name.startswith("#1/"):
+                # BSD long names are stored at the start of the member data
+                name_len = int(name[3:])
+                name = bytes(body[:name_len]).rstrip(b"\0").decode("utf-8", "replace")
+                body = body[name_len:]
+            name = name.rstrip("/")
+
+            yield name, body
+    finally:
+        data.release()
+
+
+def is_binary_file(path: str) -> bool:
+    """Check whether a file is an ELF object or ar archive."""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(8)
+    except OSError:
+        return False
+    return magic.startswith(ELF_MAGIC) or magic == AR_MAGIC
+
+
+# =============================================================================
+# objdump / addr2line Drivers
+# =============================================================================
+
+
+def _parse_objdump_output(output: str) -> dict[str, list[tuple[int, str, str]]]:
+    """
+    Parse objdump -d output into per-symbol instruction lists.
+
+    Returns {symbol: [(address, mnemonic, instruction_text), ...]}.
+
+    objdump output format example:
+    0000000000001139 <decompose>:
+        1139:	idiv   %esi
+        113b:	ret
+    """
+    result: dict[str, list[tuple[int, str, str]]] = {}
+    current = None
+
+    for line in output.split("\n"):
+        header = re.match(r"^[0-9a-fA-F]+\s+<(.+)>:$", line)
+        if header:
+            # Drop symbol versions from .dynsym labels: "memcpy@@GLIBC_2.14"
+            label = header.group(1)
+            if not label.startswith("*"):
+                label = label.split("@")[0]
+            current = result.setdefault(label, [])
+            continue
+
+        if current is None:
+            continue
+
+        insn = re.match(r"^\s*([0-9a-fA-F]+):\s+(.*)$", line)
+        if not insn:
+            continue
+
+        text = insn.group(2).split("#")[0].split("//")[0].strip()
+        parts = text.split()
+        while parts and parts[0].lower() in X86_PREFIXES and len(parts) > 1:
+            parts = parts[1:]
+        if not parts or parts[0] == "(bad)" or parts[0] == "...":
+            continue
+
+        current.append((int(insn.group(1), 16), parts[0].lower(), text))
+
+    return result
+
+
+def _disassemble_symbols(
+    path: str,
+    symbols: list[ElfSymbol],
+    all_symbols: bool,
+    objdump: str,
+    jobs: int | None,
+    limits: ToolLimits | None = None,
+) -> dict[str, list[tuple[int, str, str]]]:
+    """
+    Disassemble the given symbols with objdump.
+
+    When every function is requested a single full disassembly is cheaper
+    than one process per symbol; otherwise each symbol is disassembled with
+    --disassemble=<sym>, in parallel.
+    """
+    base_cmd = [objdump, "-d", "--no-show-raw-insn"]
+
+    def run(extra: list[str]) -> str:
+        try:
+            result = run_tool(ToolRun([*base_cmd, *extra, path], stage=STAGE_DISASSEMBLE), limits)
+        except FileNotFoundError:
+            raise RuntimeError(f"objdump not found: {objdump}") from None
+        if result.returncode != 0:
+            raise RuntimeError(f"objdump failed: {result.stderr.strip()}")
+        return result.stdout
+
+    if all_symbols:
+        return _parse_objdump_output(run([]))
+
+    disassembly: dict[str, list[tuple[int, str, str]]] = {}
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1) as pool:
+        outputs = pool.map(lambda s: run([f"--disassemble={s.name}"]), symbols)
+        for output in outputs:
+            disassembly.update(_parse_objdump_output(output))
+    return disassembly
+
+
+def _addr2line(
+    path: str,
+    addresses: list[tuple[str | None, int]],
+    addr2line: str,
+    limits: ToolLimits | None = None,
+) -> dict[tuple[str | None, int], tuple[str, int]]:
+    """
+    Map addresses to source locations with one addr2line call per section.
+
+    Relocatable objects need the section name (-j) since their addresses are
+    section-relative; linked files pass None as the section.
+    """
+    locations = {}
+    by_section: dict[str | None, list[int]] = {}
+    for section, address in addresses:
+        by_section.setdefault(section, []).append(address)
+
+    for section, addrs in by_section.items():
+        unique = sorted(set(addrs))
+        cmd = [addr2line, "-e", path, "-a"]
+        if section:
+            cmd.extend(["-j", section])
+        cmd.extend(hex(a) for a in unique)
+
+        try:
+            result = run_tool(ToolRun(cmd, stage=STAGE_SYMBOLIZE), limits)
+        except FileNotFoundError:
+            return locations
+        if result.returncode != 0:
+            continue
+
+        # Output is pairs of lines: "0x<addr>" then "file:line"
+        lines = result.stdout.strip().split("\n")
+        for addr_line, loc_line in zip(lines[0::2], lines[1::2]):
+            try:
+                address = int(addr_line, 16)
+            except ValueError:
+                continue
+            loc = loc_line.split(" (discriminator")[0]
+            file_name, _, line_no = loc.rpartition(":")
+            if not file_name or file_name == "??" or not line_no.isdigit() or line_no == "0":
+                continue
+            locations[(section, address)] = (file_name, int(line_no))
+
+    return locations
+
+
+# =============================================================================
+# Binary Analysis
+# =============================================================================
+
+
+@dataclass
+class _ObjectResult:
+    """Analysis results for a single ELF object."""
+
+    arch: str
+    functions: list[dict] = field(default_factory=list)
+    violations: list[Violation] = field(default_factory=list)
+
+
+def _analyze_elf(
+    path: str,
+    label: str,
+    arch: str | None,
+    include_warnings: bool,
+    function_filter: str | None,
+    decoder: str,
+    jobs: int | None,
+    objdump: str,
+    addr2line: str,
+    limits: ToolLimits | None,
+) -> _ObjectResult:
+    """Analyze one ELF object on disk."""
+    with ElfFile.from_path(path) as elf:
+        return _analyze_elf_file(
+            elf,
+            path,
+            label,
+            arch,
+            include_warnings,
+            function_filter,
+            decoder,
+            jobs,
+            objdump,
+            addr2line,
+            limits,
+        )
+
+
+def _analyze_elf_file(
+    elf: ElfFile,
+    path: str,
+    label: str,
+    arch: str | None,
+    include_warnings: bool,
+    function_filter: str | None,
+    decoder: str,
+    jobs: int | None,
+    objdump: str,
+    addr2line: str,
+    limits: ToolLimits | None,
+) -> _ObjectResult:
+    """Analyze an open ELF object; path is handed to objdump and addr2line."""
+    elf_arch = normalize_arch(arch) if arch else elf.arch
+    if elf_arch is None:
+        raise RuntimeError(
+            f"Unsupported ELF machine type {elf.machine} in {label}; pass --arch explicitly"
+        )
+
+    result = _ObjectResult(arch=elf_arch)
+    symbols = elf.function_symbols()
+    all_symbols = True
+    if function_filter:
+        pattern = re.compile(function_filter)
+        selected = [s for s in symbols if pattern.search(s.name)]
+        all_symbols = len(selected) == len(symbols)
+        symbols = selected
+    if not symbols:
+        return result
+
+    # Both decoders report the table spelling (objdump's idiv, the native idivl)
+    rules = instruction_rules(elf_arch)
+    # (symbol, address, instruction_text, mnemonic, severity, reason)
+    hits = []
+    if decoder == "native":
+        if not has_native_decoder(elf_arch):
+            raise RuntimeError(
+                f"Native decoder does not support {elf_arch}; use the objdump decoder"
+            )
+        result.functions, located = scan_elf(elf, elf_arch, include_warnings, symbols)
+        for symbol, hit in located:
+            text = f"{hit.mnemonic} <{hit.encoding}>"
+            mnemonic = rules.canonical(hit.mnemonic)
+            hits.append((symbol, hit.address, text, mnemonic, hit.severity, hit.reason))
+    else:
+        disassembly = _disassemble_symbols(path, symbols, all_symbols, objdump, jobs, limits)
+        # objdump may label an address with a different alias than the symbol
+        # table walk picked; linked files can fall back to the start address
+        by_start = {}
+        if not elf.is_relocatable:
+            by_start = {insns[0][0]: insns for insns in disassembly.values() if insns}
+        parser = AssemblyParser(elf_arch, decoder)
+        for symbol in symbols:
+            instructions = disassembly.get(symbol.name) or by_start.get(symbol.address, [])
+            result.functions.append({"name": symbol.name, "instructions": len(instructions)})
+            for address, mnemonic, text in instructions:
+                match = parser.classify(mnemonic, include_warnings)
+                if match is not None:
+                    hits.append((symbol, address, text, rules.canonical(mnemonic), *match))
+
+    pending = []
+    for symbol, address, text, mnemonic, severity, reason in hits:
+        violation = Violation(
+            function=symbol.name,
+            file=label,
+            line=None,
+            address=hex(address),
+            instruction=text,
+            mnemonic=mnemonic.upper(),
+            reason=reason,
+            severity=severity,
+        )
+        result.violations.append(violation)
+        pending.append((symbol, address, violation))
+
+    if pending and elf.has_debug_line():
+
+        def addr_key(symbol: ElfSymbol, address: int) -> tuple[str | None, int]:
+            if elf.is_relocatable:
+                return elf.sections[symbol.section].name, address
+            return None, address
+
+        keys = [addr_key(s, a) for s, a, _ in pending]
+        locations = _addr2line(path, keys, addr2line, limits)
+        for symbol, address, violation in pending:
+            location = locations.get(addr_key(symbol, address))
+            if location:
+                violation.file, violation.line = location
+
+    return result
+
+
+def _analyze_members(
+    binary_file: str, binary_path: Path, magic: bytes, options: dict
+) -> list[_ObjectResult]:
+    """Analyze an ELF file, or each ELF member of an ar archive."""
+    results = []
+    if magic == AR_MAGIC:
+        with open(binary_path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            members = []
+            with data, closing(iter_archive_members(data)) as archive:
+                for index, (name, body) in enumerate(archive):
+                    with body:
+                        if bytes(body[:4]) != ELF_MAGIC:
+                            continue
+                        member_path = os.path.join(tmpdir, f"{index}_{Path(name).name}")
+                        with open(member_path, "wb") as out:
+                            out.write(body)
+                    members.append((member_path, f"{binary_file}({name})"))
+            for member_path, label in members:
+                results.append(_analyze_elf(member_path, label, **options))
+    elif magic.startswith(ELF_MAGIC):
+        results.append(_analyze_elf(str(binary_path), str(binary_file), **options))
+    else:
+        raise RuntimeError(f"Not an ELF object or ar archive: {binary_file}")
+    return results
+
+
+def analyze_binary(
+    binary_file: str,
+    arch: str = None,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    decoder: str = "objdump",
+    jobs: int = None,
+    objdump: str = None,
+    addr2line: str = None,
+    limits: ToolLimits | None = None,
+) -> AnalysisReport:
+    """
+    Analyze a prebuilt ELF object, static archive or shared library.
+
+    Args:
+        binary_file: Path to the .o, .a or .so file
+        arch: Target architecture (default: read from the ELF header)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to select function symbols
+        decoder: Disassembly backend: "objdump", or "native" to scan machine
+            code directly (arm64, riscv64)
+        jobs: Maximum number of parallel disassembly processes
+        objdump: Path to objdump (default: $OBJDUMP or "objdump")
+        addr2line: Path to addr2line (default: $ADDR2LINE or "addr2line")
+        limits: Timeouts and resource limits for objdump and addr2line
+
+    Returns:
+        AnalysisReport with results; if a limit stopped objdump or addr2line,
+        an empty failing report with limit_exceeded set
+    """
+    binary_path = Path(binary_file)
+    if not binary_path.exists():
+        raise FileNotFoundError(f"Binary file not found: {binary_file}")
+    if decoder not in SUPPORTED_DECODERS:
+        raise ValueError(
+            f"Unknown decoder '{decoder}'. Supported decoders: {', '.join(SUPPORTED_DECODERS)}"
+        )
+
+    objdump = objdump or os.environ.get("OBJDUMP", "objdump")
+    addr2line = addr2line or os.environ.get("ADDR2LINE", "addr2line")
+    options = dict(
+        arch=arch,
+        include_warnings=include_warnings,
+        function_filter=function_filter,
+        decoder=decoder,
+        jobs=jobs,
+        objdump=objdump,
+        addr2line=addr2line,
+        limits=limits,
+    )
+
+    with open(binary_path, "rb") as f:
+        magic = f.read(8)
+
+    try:
+        results = _analyze_members(binary_file, binary_path, magic, options)
+    except ToolLimitExceeded as e:
+        return AnalysisReport(
+            architecture=normalize_arch(arch) if arch else "unknown",
+            compiler=decoder,
+            optimization="unknown",
+            source_file=str(binary_file),
+            total_functions=0,
+            total_instructions=0,
+            limit_exceeded=e.event,
+        )
+
+    functions = [f for r in results for f in r.functions]
+    violations = [v for r in results for v in r.violations]
+    report_arch = normalize_arch(arch) if arch else (results[0].arch if results else "unknown")
+
+    return AnalysisReport(
+        architecture=report_arch,
+        compiler=decoder,
+        optimization="unknown",
+        source_file=str(binary_file),
+        total_functions=len(functions),
+        total_instructions=sum(f["instructions"] for f in functions),
+        violations=violations,
+    )
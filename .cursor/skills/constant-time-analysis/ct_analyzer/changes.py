@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Target selection for batch constant-time analysis.
+
+`--changed-since <rev>` analyzes only the source files that changed since
+a revision, and within them only the functions overlapping the changed
+lines, so pull-request checks scale with the diff rather than the
+repository:
+
+    ct-analyzer --changed-since origin/main
+    ct-analyzer --changed-since HEAD~1 src/crypto/
+
+One `git diff --unified=0` call yields both the changed paths and the hunk
+ranges on the new side. Given a directory instead, every source file below
+it is analyzed. Either way files are routed by detect_language(); headers
+are skipped since they are not translation units on their own.
+"""
+
+import os
+import re
+import subprocess
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import detect_language
+except ImportError:
+    from analyzer import detect_language
+
+
+# New-side range of a unified diff hunk: "@@ -a,b +c,d @@"
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+HEADER_SUFFIXES = (".h", ".hpp", ".hxx")
+
+
+def _git(args: list[str], cwd: str | None) -> str:
+    try:
+        result = subprocess.run(["git", *args], capture_output=True, text=True, cwd=cwd)
+    except FileNotFoundError:
+        raise RuntimeError("git not found") from None
+    if result.returncode != 0:
+        raise RuntimeError(f"git failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def _unquote(name: str) -> str:
+    """A path git quoted for containing control characters, quotes or backslashes."""
+    escaped = name[1:-1].encode("utf-8").decode("unicode_escape")
+    # Octal escapes are UTF-8 bytes, now one character each
+    return escaped.encode("latin-1").decode("utf-8", errors="surrogateescape")
+
+
+def parse_diff(diff: str, root: str) -> dict[str, list[tuple[int, int]]]:
+    """
+    Changed line ranges per file from `git diff --unified=0` output.
+
+    Ranges are inclusive (first, last) lines of the new version. A pure
+    deletion is recorded as the two lines around it.
+
+    Args:
+        diff: Diff text, with the default "b/" destination prefix
+        root: Directory the diff paths are relative to
+
+    Returns:
+        Absolute path -> ranges, for files that exist on the new side
+
+    Raises:
+        ValueError: A new-side path lacks the "b/" prefix
+    """
+    changes: dict[str, list[tuple[int, int]]] = {}
+    ranges = None
+    # File headers only come between "diff --git" and the first hunk; after
+    # that, "+++ " is an added line that starts with "++ "
+    header = True
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            header, ranges = True, None
+        elif header and line.startswith("+++ "):
+            # Names with spaces end in a tab
+            target = line[4:].rstrip("\t")
+            if target.startswith('"'):
+                target = _unquote(target)
+            if target == "/dev/null":
+                ranges = None
+                continue
+            if not target.startswith("b/"):
+                raise ValueError(f"Unexpected path in diff: {target}")
+            path = os.path.normpath(os.path.join(root, target[2:]))
+            ranges = changes.setdefault(path, [])
+        elif line.startswith("@@"):
+            header = False
+            if ranges is None:
+                continue
+            match = _HUNK.match(line)
+            if match:
+                start = int(match.group(1))
+                count = 1 if match.group(2) is None else int(match.group(2))
+                ranges.append((start, start + count - 1) if count else (start, start + 1))
+    return changes
+
+
+def changed_lines_since(
+    revision: str, paths: list[str] | None = None, cwd: str | None = None
+) -> dict[str, list[tuple[int, int]]]:
+    """
+    Changed line ranges per file between a revision and the working tree.
+
+    Args:
+        revision: Any revision git accepts (branch, tag, commit, HEAD~1)
+        paths: Restrict the diff to these files or directories
+        cwd: Directory inside the repository (default: current directory)
+
+    Returns:
+        Absolute path -> inclusive (first, last) new-side line ranges
+
+    Raises:
+        RuntimeError: git is missing, the revision is unknown, or the diff
+            names a file that does not exist
+    """
+    root = _git(["rev-parse", "--show-toplevel"], cwd).strip()
+    diff = _git(
+        [
+            "-c",
+            "core.quotePath=false",
+            "diff",
+            "--unified=0",
+            "--no-color",
+            "--no-ext-diff",
+            "--diff-filter=d",
+            # Override diff.noprefix and diff.mnemonicPrefix
+            "--src-prefix=a/",
+            "--dst-prefix=b/",
+            revision,
+            "--",
+            *(paths or []),
+        ],
+        cwd,
+    )
+    changes = parse_diff(diff, root)
+    # Deletions are filtered out, so every path should exist; one that does
+    # not was misread and would otherwise drop out of the analysis silently
+    missing = sorted(path for path in changes if not os.path.lexists(path))
+    if missing:
+        raise RuntimeError(f"git diff names files that do not exist: {', '.join(missing)}")
+    return changes
+
+
+def select_sources(changes: dict[str, list[tuple[int, int]] | None]) -> dict:
+    """The files (keys of changes) that can be analyzed as source files, in path order."""
+    return {
+        path: ranges
+        for path, ranges in sorted(changes.items())
+        if detect_language(path) != "unknown"
+        and not path.lower().endswith(HEADER_SUFFIXES)
+        and os.path.isfile(path)
+    }
+
+
+def scan_sources(directory: str) -> dict[str, None]:
+    """
+    Every analyzable source file under a directory, for whole-tree batches.
+
+    Hidden directories (.git, .venv, ...) are skipped. Values are None: the
+    files are analyzed in full.
+    """
+    found = {}
+    for root, directories, files in os.walk(directory):
+        directories[:] = [d for d in directories if not d.startswith(".")]
+        for name in files:
+            found[os.path.abspath(os.path.join(root, name))] = None
+    return select_sources(found)
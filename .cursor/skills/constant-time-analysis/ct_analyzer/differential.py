@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Differential analysis of one source file under several compiler configurations.
+
+Constant-time regressions often appear under only one compiler or
+optimization level: one emits a division or a branch where another uses a
+multiply or a conditional move. `--compilers` and `--opt-levels` analyze
+the file under every listed configuration at once and align the reports
+per function:
+
+    ct-analyzer --compilers gcc,clang crypto.c
+    ct-analyzer --compilers gcc,clang --opt-levels O2,O3 crypto.c
+
+Each configuration is a step generator run on one event loop, so the
+compilers run concurrently and each output is parsed as soon as its
+compiler finishes. The jobs go through the same tool store as any other
+run (--tool-cache), so a stored compile is replayed rather than rerun.
+
+Configurations often produce the same code for most functions (O2 and O3,
+Os and Oz). The assembly is split at its function labels, and each
+distinct function body is parsed once; its violations are copied to every
+configuration that produced it. Bodies are compared on what the
+parser reads, with local labels (.L5, .LBB0_3, ...) renamed in order of
+first use, since the compiler numbers those per file.
+
+A violation is unique to a configuration when no other configuration
+reports the same instruction in the same function.
+"""
+
+import dataclasses
+import os
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import (
+        AnalysisReport,
+        AssemblyParser,
+        OutputFormat,
+        ToolLimitExceeded,
+        ToolSteps,
+        Violation,
+        ViolationTable,
+        _assembly_text_steps,
+        _file_table,
+        _limited_report,
+        _match_function_start,
+        _toolchain_steps,
+        compile_function_filter,
+        detect_language,
+        get_native_arch,
+        is_bytecode_language,
+        normalize_arch,
+        run_steps_async,
+        violation_to_dict,
+    )
+except ImportError:
+    from analyzer import (
+        AnalysisReport,
+        AssemblyParser,
+        OutputFormat,
+        ToolLimitExceeded,
+        ToolSteps,
+        Violation,
+        ViolationTable,
+        _assembly_text_steps,
+        _file_table,
+        _limited_report,
+        _match_function_start,
+        _toolchain_steps,
+        compile_function_filter,
+        detect_language,
+        get_native_arch,
+        is_bytecode_language,
+        normalize_arch,
+        run_steps_async,
+        violation_to_dict,
+    )
+
+# (compiler name or None for the language default, optimization level)
+Configuration = tuple[str | None, str]
+
+
+def parse_names(spec: str) -> list[str]:
+    """Parse a comma-separated --compilers or --opt-levels list, dropping repeats."""
+    return list(dict.fromkeys(name.strip() for name in spec.split(",") if name.strip()))
+
+
+def configuration_labels(configurations: Sequence[Configuration]) -> list[str]:
+    """
+    Short names for configurations: the part that varies between them.
+
+    ("gcc", "O2"), ("clang", "O2") -> gcc, clang; ("gcc", "O2"), ("gcc", "O3")
+    -> O2, O3; a full matrix -> gcc -O2, gcc -O3, ...
+    """
+    if len({optimization for _, optimization in configurations}) == 1:
+        return [compiler or "default" for compiler, _ in configurations]
+    if len({compiler for compiler, _ in configurations}) == 1:
+        return [optimization for _, optimization in configurations]
+    return [f"{compiler or 'default'} -{optimization}" for compiler, optimization in configurations]
+
+
+@dataclass
+class CompilerComparison:
+    """Reports of one source file under several configurations, aligned per function."""
+
+    source_file: str
+    # Configuration label -> report, in the order the configurations were given
+    reports: dict[str, AnalysisReport]
+    # Function -> groups of configurations that produced an identical body
+    identical: dict[str, list[list[str]]] = field(default_factory=dict)
+    # Function bodies in all configurations, and the distinct ones parsed
+    bodies: int = 0
+    parsed_bodies: int = 0
+
+    @property
+    def passed(self) -> bool:
+        return all(report.passed for report in self.reports.values())
+
+    def functions(self) -> list[str]:
+        """Functions with violations under any configuration, in order of first appearance."""
+        names = {}
+        for report in self.reports.values():
+            for v in report.violations:
+                names.setdefault(v.function, None)
+        return list(names)
+
+    def violations(self, function: str) -> dict[str, list[Violation]]:
+        """Each configuration's violations in one function."""
+        return {name: report.by_function(function) for name, report in self.reports.items()}
+
+    def unique(self, *labels: str) -> list[Violation]:
+        """
+        Violations of labels[0] whose instruction no configuration outside
+        labels reports in the same function.
+        """
+        others = {
+            (v.function, v.mnemonic)
+            for name, report in self.reports.items()
+            if name not in labels
+            for v in report.violations
+        }
+        return [
+            v for v in self.reports[labels[0]].violations if (v.function, v.mnemonic) not in others
+        ]
+
+    def groups(self, function: str) -> list[list[str]]:
+        """Configurations partitioned by identical body of function, in report order."""
+        grouped = {name: group for group in self.identical.get(function, ()) for name in group}
+        groups = []
+        for name in self.reports:
+            group = grouped.get(name, [name])
+            if group[0] == name:
+                groups.append(group)
+        return groups
+
+
+# =============================================================================
+# Function Bodies
+# =============================================================================
+
+# Compiler-numbered local labels and their references
+_LOCAL_LABEL = re.compile(r"\.L\w+")
+# Stripped lines the parser skips: blank lines, comments without a file:line
+# location, and directives other than .loc, .file and .type
+_UNPARSED_LINE = re.compile(
+    r"^(?:\.(?!loc|file|type)[^\n]*[^:\s]|(?=[#;]|//)(?![^\n]*#\s*[^:\n]+:\d)[^\n]*|)(?:\n|\Z)",
+    re.MULTILINE,
+)
+# Candidate function-start lines. A .type directive also starts a function
+# for the parser, but is left at the end of the preceding body: splitting at
+# any subset of the starts parses the same, and its label follows anyway.
+_BOUNDARY_CANDIDATE = re.compile(r"^(?:[A-Za-z_][A-Za-z0-9_]*:$|TEXT[ \t].*$)", re.MULTILINE)
+
+
+def _parsed_text(text: str) -> str:
+    """
+    The lines of assembly the parser reads, stripped: instructions, labels,
+    location comments, .loc, .file and .type.
+
+    Other directives (.cfi_*, alignment, data and debug sections after the
+    code) do not change the parse, and differ between configurations that
+    emit the same code.
+    """
+    return _UNPARSED_LINE.sub("", "\n".join(line.strip() for line in text.split("\n")))
+
+
+def _function_bodies(text: str) -> list[tuple[str | None, str]]:
+    """
+    Split parsed text (see _parsed_text) into (function, body) at function
+    labels. The lines before the first label form a body of no function.
+    """
+    bodies = []
+    name = None
+    start = 0
+    for candidate in _BOUNDARY_CANDIDATE.finditer(text):
+        match = _match_function_start(candidate.group(0))
+        if match:
+            if candidate.start() > start:
+                bodies.append((name, text[start : candidate.start()]))
+            name = match.group(1)
+            start = candidate.start()
+    if len(text) > start:
+        bodies.append((name, text[start:]))
+    return bodies
+
+
+def _body_key(body: str) -> str:
+    """A body with local labels renamed by first use, for comparison."""
+    if ".L" not in body:
+        return body
+    labels: dict[str, str] = {}
+
+    def rename(match: re.Match) -> str:
+        return labels.setdefault(match.group(0), f".L{len(labels)}")
+
+    return _LOCAL_LABEL.sub(rename, body)
+
+
+@dataclass
+class _Body:
+    """Parse result of one distinct function body."""
+
+    # The parsed text it was parsed from
+    text: str
+    functions: list[dict]
+    violations: ViolationTable
+    # Line of text holding each violation's instruction, once needed
+    rows: list[int] | None
+    # As returned by AssemblyParser._parse_text
+    unlocated: int
+    location: tuple[str, int] | None
+
+
+class FunctionBodies:
+    """
+    Parses the function bodies of several configurations' assembly, each
+    distinct body once.
+
+    Configurations share the architecture, warning level and function
+    filter; only their assembly differs.
+    """
+
+    def __init__(
+        self, arch: str, include_warnings: bool = False, function_filter: str | None = None
+    ):
+        self.parser = AssemblyParser(arch, "unknown")
+        self.include_warnings = include_warnings
+        self.function_filter = compile_function_filter(function_filter)
+        self._bodies: dict[tuple, _Body] = {}
+        # Keys of the bodies seen since the last forget_unused()
+        self._used: set[tuple] = set()
+        self.total = 0
+
+    @property
+    def parsed(self) -> int:
+        """Distinct bodies parsed so far."""
+        return len(self._bodies)
+
+    def forget_unused(self) -> None:
+        """Drop the bodies not seen since the last call, bounding a long-lived cache."""
+        self._bodies = {key: self._bodies[key] for key in self._used}
+        self._used = set()
+
+    def _parse(self, text: str, files: dict[int, str]) -> _Body:
+        functions, violations, unlocated, location = self.parser._parse_text(
+            text,
+            self.include_warnings,
+            function_filter=self.function_filter,
+            source_files=files,
+        )
+        return _Body(text, functions, violations, None, unlocated, location)
+
+    @staticmethod
+    def _rows(body: _Body) -> list[int]:
+        if body.rows is None:
+            lines = body.text.split("\n")
+            body.rows = []
+            row = 0
+            for v in body.violations:
+                while lines[row] != v.instruction:
+                    row += 1
+                body.rows.append(row)
+                row += 1
+        return body.rows
+
+    def analyze(self, text: str) -> tuple[list[dict], ViolationTable, dict[str, tuple]]:
+        """
+        Parse one configuration's assembly.
+
+        Returns:
+            (functions, violations) as AssemblyParser.parse would return
+            them, and each function's body signature: configurations with
+            equal signatures produced identical code for that function
+        """
+        files = _file_table(text.encode("utf-8", errors="replace")) if ".file" in text else {}
+        files_key = tuple(sorted(files.items()))
+        functions = []
+        violations = ViolationTable()
+        signatures: dict[str, list[str]] = {}
+        location = None
+        for name, body_text in _function_bodies(_parsed_text(text)):
+            self.total += 1
+            key = (files_key, _body_key(body_text))
+            self._used.add(key)
+            body = self._bodies.get(key)
+            if body is None:
+                body = self._bodies[key] = self._parse(body_text, files)
+            if body.violations:
+                offset = len(violations)
+                violations.extend(body.violations)
+                # Label names differ between identical bodies; keep this one's text
+                if body_text != body.text:
+                    lines = body_text.split("\n")
+                    for index, (v, row) in enumerate(zip(body.violations, self._rows(body))):
+                        if lines[row] != v.instruction:
+                            violations[offset + index] = dataclasses.replace(
+                                v, instruction=lines[row]
+                            )
+                # Leading violations carry the location where the previous body ended
+                if location is not None:
+                    for index in range(offset, offset + body.unlocated):
+                        violations.set_location(index, location[0], location[1])
+            location = body.location or location
+            functions.extend(body.functions)
+            signatures.setdefault(name or "<unknown>", []).append(key[1])
+        return functions, violations, {name: tuple(keys) for name, keys in signatures.items()}
+
+
+# =============================================================================
+# Comparison
+# =============================================================================
+
+
+def _configuration_steps(
+    bodies: FunctionBodies,
+    source_file: str,
+    arch: str,
+    compiler: str | None,
+    optimization: str,
+    extra_flags: list[str] | None,
+    debug_info: bool,
+) -> ToolSteps[tuple[AnalysisReport, dict[str, tuple]]]:
+    """Compile and parse one configuration; the report and its body signatures."""
+    language = detect_language(source_file)
+    try:
+        compiler_obj, available = yield from _toolchain_steps("compiler", compiler, language)
+    except ToolLimitExceeded as e:
+        return _limited_report(source_file, arch, compiler or "unknown", optimization, e.event), {}
+    if not available:
+        raise RuntimeError(f"Compiler not available: {compiler_obj.name}")
+    try:
+        text = yield from _assembly_text_steps(
+            compiler_obj, source_file, arch, optimization, extra_flags, debug_info
+        )
+    except ToolLimitExceeded as e:
+        return _limited_report(source_file, arch, compiler_obj.name, optimization, e.event), {}
+
+    functions, violations, signatures = bodies.analyze(text)
+    report = AnalysisReport(
+        architecture=arch,
+        compiler=compiler_obj.name,
+        optimization=optimization,
+        source_file=str(source_file),
+        total_functions=len(functions),
+        total_instructions=sum(f["instructions"] for f in functions),
+        violations=violations,
+    )
+    return report, signatures
+
+
+async def compare_configurations_async(
+    source_file: str,
+    configurations: Sequence[Configuration],
+    arch: str | None = None,
+    include_warnings: bool = False,
+    function_filter: str | None = None,
+    extra_flags: list[str] | None = None,
+    limits=None,
+    debug_info: bool = False,
+    timeout: float | None = None,
+) -> CompilerComparison:
+    """
+    Analyze a source file under several compiler configurations concurrently.
+
+    Args:
+        source_file: Path to a C, C++, Go, Rust or Swift source file
+        configurations: (compiler, optimization) pairs, e.g.
+            [("gcc", "O2"), ("gcc", "O3")]; compiler None picks the
+            language default
+        arch, include_warnings, function_filter, extra_flags, limits,
+        debug_info: As for analyze_source()
+        timeout: Per-configuration toolchain timeout in seconds
+
+    Returns:
+        CompilerComparison with one report per configuration, labelled by
+        configuration_labels()
+
+    Raises:
+        FileNotFoundError: The source file does not exist
+        ValueError: The source is analyzed as bytecode, not compiled
+        RuntimeError: A compiler is unavailable or compilation failed
+        TimeoutError: A compiler ran longer than timeout
+    """
+    import asyncio
+
+    if not os.path.exists(source_file):
+        raise FileNotFoundError(f"Source file not found: {source_file}")
+    language = detect_language(source_file)
+    if is_bytecode_language(language):
+        raise ValueError(f"Compiler comparison needs a compiled language, not {language}")
+
+    configurations = list(dict.fromkeys(configurations))
+    labels = configuration_labels(configurations)
+    arch = normalize_arch(arch or get_native_arch())
+    bodies = FunctionBodies(arch, include_warnings, function_filter)
+    jobs = [
+        run_steps_async(
+            _configuration_steps(
+                bodies, source_file, arch, compiler, optimization, extra_flags, debug_info
+            ),
+            timeout=timeout,
+            limits=limits,
+        )
+        for compiler, optimization in configurations
+    ]
+    results = await asyncio.gather(*jobs)
+
+    reports = {label: report for label, (report, _) in zip(labels, results)}
+    identical = {}
+    functions = dict.fromkeys(name for _, signatures in results for name in signatures)
+    for function in functions:
+        by_body: dict[tuple, list[str]] = {}
+        for label, (_, signatures) in zip(labels, results):
+            if function in signatures:
+                by_body.setdefault(signatures[function], []).append(label)
+        groups = [group for group in by_body.values() if len(group) > 1]
+        if groups:
+            identical[function] = groups
+    return CompilerComparison(source_file, reports, identical, bodies.total, bodies.parsed)
+
+
+async def compare_compilers_async(
+    source_file: str, compilers: Sequence[str], optimization: str = "O2", **options
+) -> CompilerComparison:
+    """compare_configurations_async() over compilers at one optimization level."""
+    configurations = [(compiler, optimization) for compiler in compilers]
+    return await compare_configurations_async(source_file, configurations, **options)
+
+
+def compare_configurations(
+    source_file: str, configurations: Sequence[Configuration], **options
+) -> CompilerComparison:
+    """Blocking compare_configurations_async(); see there for the arguments."""
+    import asyncio
+
+    return asyncio.run(compare_configurations_async(source_file, configurations, **options))
+
+
+def compare_compilers(source_file: str, compilers: Sequence[str], **options) -> CompilerComparison:
+    """Blocking compare_compilers_async(); see there for the arguments."""
+    import asyncio
+
+    return asyncio.run(compare_compilers_async(source_file, compilers, **options))
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+
+def _summary(report: AnalysisReport) -> dict:
+    return {
+        "compiler": report.compiler,
+        "optimization": report.optimization,
+        "passed": report.passed,
+        "error_count": report.error_count,
+        "warning_count": report.warning_count,
+        "total_functions": report.total_functions,
+        "total_instructions": report.total_instructions,
+        "limit_exceeded": report.limit_exceeded and report.limit_exceeded.to_dict(),
+    }
+
+
+def format_comparison(comparison: CompilerComparison, format_type: OutputFormat) -> str:
+    """
+    Format a comparison as text or JSON.
+
+    Configurations with an identical body of a function are listed together
+    ("O2/O3"), with that function's violations shown once.
+
+    Raises:
+        ValueError: format_type is neither TEXT nor JSON
+    """
+    first = next(iter(comparison.reports.values()))
+    # Function -> group label -> (violations, (function, mnemonic) pairs unique to the group)
+    aligned = {}
+    for function in comparison.functions():
+        by_group = {}
+        for group in comparison.groups(function):
+            unique = {(v.function, v.mnemonic) for v in comparison.unique(*group)}
+            violations = comparison.reports[group[0]].by_function(function)
+            by_group["/".join(group)] = (violations, unique)
+        aligned[function] = by_group
+
+    if format_type == OutputFormat.JSON:
+        import json
+
+        functions = [
+            {
+                "name": function,
+                "identical": comparison.identical.get(function, []),
+                "violations": {
+                    label: [violation_to_dict(v) for v in violations]
+                    for label, (violations, _) in by_group.items()
+                },
+                "unique": {
+                    label: sorted({mnemonic for f, mnemonic in unique if f == function})
+                    for label, (_, unique) in by_group.items()
+                },
+            }
+            for function, by_group in aligned.items()
+        ]
+        document = {
+            "source_file": comparison.source_file,
+            "architecture": first.architecture,
+            "configurations": {name: _summary(r) for name, r in comparison.reports.items()},
+            "passed": comparison.passed,
+            "function_bodies": comparison.bodies,
+            "parsed_bodies": comparison.parsed_bodies,
+            "functions": functions,
+        }
+        return json.dumps(document, indent=2)
+
+    if format_type != OutputFormat.TEXT:
+        raise ValueError("Compiler comparisons are formatted as text or JSON")
+
+    width = max(
+        [len(name) for name in comparison.reports]
+        + [len(label) for by_group in aligned.values() for label in by_group]
+    )
+    lines = []
+    lines.append("=" * 60)
+    lines.append("Constant-Time Compiler Comparison")
+    lines.append("=" * 60)
+    lines.append(f"Source: {comparison.source_file}")
+    lines.append(f"Architecture: {first.architecture}")
+    for name, report in comparison.reports.items():
+        status = "PASSED" if report.passed else "FAILED"
+        lines.append(
+            f"  {name:<{width}}  {status}  Errors: {report.error_count}, "
+            f"Warnings: {report.warning_count}, Functions: {report.total_functions}"
+        )
+        if report.limit_exceeded:
+            lines.append(f"  {'':<{width}}  Stopped: {report.limit_exceeded.describe()}")
+    lines.append(
+        f"Function bodies: {comparison.bodies}, distinct and parsed: {comparison.parsed_bodies}"
+    )
+    lines.append("")
+
+    if aligned:
+        lines.append("VIOLATIONS BY FUNCTION:")
+        lines.append("-" * 40)
+        for function, by_group in aligned.items():
+            same = [label for label in by_group if "/" in label]
+            lines.append(f"{function}:" + (f" (identical in {', '.join(same)})" if same else ""))
+            for label, (violations, unique) in by_group.items():
+                if not violations:
+                    lines.append(f"  {label:<{width}}  -")
+                    continue
+                for v in violations:
+                    location = f" line {v.line}" if v.line else ""
+                    only = f"  [only {label}]" if (function, v.mnemonic) in unique else ""
+                    severity = v.severity.value.upper()
+                    lines.append(f"  {label:<{width}}  [{severity}] {v.mnemonic}{location}{only}")
+            lines.append("")
+    else:
+        lines.append("No violations found.")
+
+    lines.append("-" * 40)
+    for name in comparison.reports:
+        lines.append(f"Only under {name}: {len(comparison.unique(name))}")
+    lines.append(f"Result: {'PASSED' if comparison.passed else 'FAILED'}")
+    return "\n".join(lines)
@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Native machine-code scanners for constant-time analysis.
+
+This module finds dangerous instructions directly in the executable sections
+of an ELF file, without running objdump or parsing disassembly text. On
+fixed-width ISAs (AArch64, RISC-V) every instruction is a 32-bit word, so
+detection is a mask-and-compare over .text. NumPy is used to vectorize the
+scan when installed; a pure-Python fallback produces identical results.
+
+x86 instructions are variable length, so each function is walked with a
+table-driven length decoder that only names the opcodes of interest.
+"""
+
+import bisect
+import struct
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised when numpy is missing
+    np = None
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import AssemblyParser, Severity
+except ImportError:
+    from analyzer import AssemblyParser, Severity
+
+
+SHF_EXECINSTR = 0x4
+EF_RISCV_RVC = 0x1
+
+# =============================================================================
+# Instruction Encodings
+# =============================================================================
+
+# AArch64 condition codes, indexed by the 4-bit cond field of B.cond
+ARM64_CONDITIONS = (
+    "eq",
+    "ne",
+    "cs",
+    "cc",
+    "mi",
+    "pl",
+    "vs",
+    "vc",
+    "hi",
+    "ls",
+    "ge",
+    "lt",
+    "gt",
+    "le",
+    "al",
+    "nv",
+)
+
+# (mask, value) pairs per DANGEROUS_INSTRUCTIONS key: word & mask == value
+# Encodings from the Arm A64 and RISC-V unprivileged ISA manuals.
+FIXED_WIDTH_ENCODINGS = {
+    "arm64": {
+        # Data-processing (2 source): sf 0 0 11010110 Rm 00001o Rn Rd
+        "udiv": [(0x7FE0FC00, 0x1AC00800)],
+        "sdiv": [(0x7FE0FC00, 0x1AC00C00)],
+        # Scalar (any ftype), vector single/double and vector half precision
+        "fdiv": [
+            (0xFF20FC00, 0x1E201800),
+            (0xBFA0FC00, 0x2E20FC00),
+            (0xBFE0FC00, 0x2E403C00),
+        ],
+        "fsqrt": [
+            (0xFF3FFC00, 0x1E21C000),
+            (0xBFBFFC00, 0x2EA1F800),
+            (0xBFFFFC00, 0x2EF9F800),
+        ],
+        **{f"b.{cond}": [(0xFF00001F, 0x54000000 | i)] for i, cond in enumerate(ARM64_CONDITIONS)},
+        "cbz": [(0x7F000000, 0x34000000)],
+        "cbnz": [(0x7F000000, 0x35000000)],
+        "tbz": [(0x7F000000, 0x36000000)],
+        "tbnz": [(0x7F000000, 0x37000000)],
+    },
+    "riscv64": {
+        # RV32M/RV64M: funct7=0000001, OP (0110011) and OP-32 (0111011)
+        "div": [(0xFE00707F, 0x02004033)],
+        "divu": [(0xFE00707F, 0x02005033)],
+        "rem": [(0xFE00707F, 0x02006033)],
+        "remu": [(0xFE00707F, 0x02007033)],
+        "divw": [(0xFE00707F, 0x0200403B)],
+        "divuw": [(0xFE00707F, 0x0200503B)],
+        "remw": [(0xFE00707F, 0x0200603B)],
+        "remuw": [(0xFE00707F, 0x0200703B)],
+        # OP-FP (1010011) with any rounding mode
+        "fdiv.s": [(0xFE00007F, 0x18000053)],
+        "fdiv.d": [(0xFE00007F, 0x1A000053)],
+        "fsqrt.s": [(0xFFF0007F, 0x58000053)],
+        "fsqrt.d": [(0xFFF0007F, 0x5A000053)],
+        # BRANCH (1100011) by funct3
+        "beq": [(0x0000707F, 0x00000063)],
+        "bne": [(0x0000707F, 0x00001063)],
+        "blt": [(0x0000707F, 0x00004063)],
+        "bge": [(0x0000707F, 0x00005063)],
+        "bltu": [(0x0000707F, 0x00006063)],
+        "bgeu": [(0x0000707F, 0x00007063)],
+    },
+}
+
+
+X86_ARCHS = ("x86_64", "i386")
+
+
+def has_native_decoder(arch: str) -> bool:
+    """Check whether machine code for an architecture can be scanned natively."""
+    return arch in FIXED_WIDTH_ENCODINGS or arch in X86_ARCHS
+
+
+@dataclass
+class NativeHit:
+    """A dangerous instruction found in machine code."""
+
+    address: int
+    encoding: str  # Hex as objdump shows it: "1ac20820" or "48 f7 f1"
+    mnemonic: str
+    severity: Severity
+    reason: str
+
+
+def _build_rules(arch: str, include_warnings: bool) -> dict[int, dict[int, str]]:
+    """Group the encodings for every flagged table entry by mask: {mask: {value: key}}."""
+    parser = AssemblyParser(arch, "native")
+    rules: dict[int, dict[int, str]] = {}
+    for key, encodings in FIXED_WIDTH_ENCODINGS[arch].items():
+        if parser.classify(key, include_warnings) is None:
+            continue
+        for mask, value in encodings:
+            rules.setdefault(mask, {})[value] = key
+    return rules
+
+
+# =============================================================================
+# Instruction Boundaries
+# =============================================================================
+
+
+def _rvc_boundaries(halfwords, forced: list[int]):
+    """
+    Find instruction start positions in a RISC-V stream with compressed code.
+
+    A halfword whose low two bits are 0b11 starts a 32-bit instruction. Within
+    a run of such halfwords, boundaries alternate; everywhere else each
+    halfword is a boundary. Known boundaries (function starts) restart runs.
+    Returns a boolean array indexed by halfword.
+    """
+    n = len(halfwords)
+    is_long = (halfwords & 3) == 3
+    index = np.arange(n)
+
+    restart = np.zeros(n, dtype=bool)
+    restart[0] = True
+    restart[[p for p in forced if 0 <= p < n]] = True
+
+    prev_long = np.concatenate(([False], is_long[:-1]))
+    run_start = is_long & (~prev_long | restart)
+    run_origin = np.maximum.accumulate(np.where(run_start, index, 0))
+
+    boundary = np.ones(n, dtype=bool)
+    inside = prev_long & ~restart
+    origin_of_prev = np.concatenate(([0], run_origin[:-1]))
+    boundary[inside] = (index[inside] - origin_of_prev[inside]) % 2 == 0
+    return boundary
+
+
+def _rvc_boundaries_py(halfwords, forced: list[int]) -> list[bool]:
+    """Pure-Python equivalent of _rvc_boundaries: a sequential length decode."""
+    n = len(halfwords)
+    forced_set = set(forced)
+    boundary = [False] * n
+    i = 0
+    while i < n:
+        boundary[i] = True
+        step = 2 if halfwords[i] & 3 == 3 else 1
+        # Resynchronize at known boundaries that a long instruction would skip
+        if step == 2 and i + 1 in forced_set:
+            step = 1
+        i += step
+    return boundary
+
+
+# =============================================================================
+# Section Scanning
+# =============================================================================
+
+
+def _data_ranges(mapping: list[tuple[int, str]], end: int) -> list[tuple[int, int]]:
+    """Turn ARM/RISC-V mapping symbols ($x code, $d data) into data address ranges."""
+    ranges = []
+    for i, (address, kind) in enumerate(mapping):
+        if kind == "d":
+            stop = mapping[i + 1][0] if i + 1 < len(mapping) else end
+            ranges.append((address, stop))
+    return ranges
+
+
+def _scan_words(words, rules) -> list[tuple[int, int, str]]:
+    """Match 32-bit words against the rules. Returns [(index, word, key)]."""
+    hits = []
+    if np is not None and not isinstance(words, list):
+        for mask, table in rules.items():
+            masked = words & np.uint32(mask)
+            found = np.nonzero(np.isin(masked, np.fromiter(table, dtype=np.uint32)))[0]
+            for index in found.tolist():
+                hits.append((index, int(words[index]), table[int(masked[index])]))
+    else:
+        for mask, table in rules.items():
+            for index, word in enumerate(words):
+                key = table.get(word & mask)
+                if key is not None:
+                    hits.append((index, word, key))
+    hits.sort()
+    return hits
+
+
+def scan_section(elf, section, arch: str, include_warnings: bool, function_starts: list[int]):
+    """
+    Scan one executable section of an ELF file.
+
+    Returns (hits, instruction_starts) where instruction_starts is a sorted
+    list of instruction addresses used for per-function counts, or None when
+    every 4-byte slot is an instruction.
+    """
+    rules = _build_rules(arch, include_warnings)
+    data = elf.section_data(section)
+    usable = len(data) & ~3 if arch == "arm64" else len(data) & ~1
+    data = data[:usable]
+    endian = "<" if elf.little_endian else ">"
+    base = section.address
+
+    compressed = arch == "riscv64" and bool(elf.flags & EF_RISCV_RVC)
+    starts = None
+
+    if not compressed:
+        if np is not None:
+            words = np.frombuffer(data, dtype=np.dtype(endian + "u4"))
+        else:
+            words = list(struct.unpack(f"{endian}{len(data) // 4}I", data))
+        raw = _scan_words(words, rules)
+        hits = [(base + index * 4, word, key) for index, word, key in raw]
+    else:
+        forced = [(start - base) // 2 for start in function_starts]
+        if np is not None:
+            halfwords = np.frombuffer(data, dtype=np.dtype(endian + "u2"))
+            boundary = _rvc_boundaries(halfwords, forced)
+            positions = np.nonzero(boundary)[0]
+            starts = (positions * 2 + base).tolist()
+            is_long = ((halfwords[positions] & 3) == 3) & (positions + 1 < len(halfwords))
+            long_positions = positions[is_long]
+            words = halfwords[long_positions].astype(np.uint32) | (
+                halfwords[long_positions + 1].astype(np.uint32) << np.uint32(16)
+            )
+            raw = _scan_words(words, rules)
+            hits = [(base + int(long_positions[i]) * 2, word, key) for i, word, key in raw]
+        else:
+            halfwords = list(struct.unpack(f"{endian}{len(data) // 2}H", data))
+            boundary = _rvc_boundaries_py(halfwords, forced)
+            positions = [i for i, is_start in enumerate(boundary) if is_start]
+            starts = [base + p * 2 for p in positions]
+            long_positions = [
+                p for p in positions if halfwords[p] & 3 == 3 and p + 1 < len(halfwords)
+            ]
+            words = [halfwords[p] | (halfwords[p + 1] << 16) for p in long_positions]
+            raw = _scan_words(words, rules)
+            hits = [(base + long_positions[i] * 2, word, key) for i, word, key in raw]
+
+    parser = AssemblyParser(arch, "native")
+    results = []
+    for address, word, key in hits:
+        severity, reason = parser.classify(key, include_warnings)
+        results.append(NativeHit(address, f"{word:08x}", key, severity, reason))
+    return results, starts
+
+
+# =============================================================================
+# x86 Length Decoder
+# =============================================================================
+
+X86_CONDITIONS = (
+    "o", "no", "b", "ae", "e", "ne", "be", "a", "s", "ns", "p", "np", "l", "ge", "le", "g",
+)  # fmt: skip
+
+# Mandatory-prefix suffixes for SSE/AVX arithmetic, indexed by VEX/EVEX pp
+X86_SSE_SUFFIXES = ("ps", "pd", "ss", "sd")
+X86_FP16_SUFFIXES = ("ph", None, "sh", None)
+
+# Immediate operand kinds
+_IMM_NONE, _IMM_B, _IMM_W, _IMM_Z, _IMM_V, _IMM_MOFFS, _IMM_ENTER, _IMM_PTR = range(8)
+
+_X86_PREFIXES = frozenset((0x26, 0x2E, 0x36, 0x3E, 0x64, 0x65, 0x66, 0x67, 0xF0, 0xF2, 0xF3))
+# Two-byte opcodes with an 8-bit immediate after ModRM (also valid in VEX/EVEX map 1)
+_X86_0F_IMM8 = frozenset((0x0F, 0x70, 0x71, 0x72, 0x73, 0xA4, 0xAC, 0xBA, 0xC2, 0xC4, 0xC5, 0xC6))
+# Relative branches whose displacement is 32 bits in 64-bit mode regardless of 0x66
+_X86_REL32 = frozenset((0xE8, 0xE9))
+
+
+def _build_x86_tables() -> tuple[bytes, bytes, bytes]:
+    """Build the one-byte ModRM/immediate tables and the two-byte ModRM table."""
+    modrm = bytearray(256)
+    imm = bytearray(256)
+    for row in range(0, 0x40, 8):
+        # ALU block: op r/m,r / op r,r/m / op AL,ib / op eAX,iz
+        modrm[row : row + 4] = b"\x01" * 4
+        imm[row + 4] = _IMM_B
+        imm[row + 5] = _IMM_Z
+    for op in (0x62, 0x63, 0x69, 0x6B, 0xC0, 0xC1, 0xC4, 0xC5, 0xC6, 0xC7, 0xF6, 0xF7, 0xFE, 0xFF):
+        modrm[op] = 1
+    for op in (*range(0x80, 0x90), *range(0xD0, 0xD4), *range(0xD8, 0xE0)):
+        modrm[op] = 1
+    for op in (0x6A, 0x6B, 0x80, 0x82, 0x83, 0xA8, 0xC0, 0xC1, 0xC6, 0xCD, 0xD4, 0xD5, 0xEB):
+        imm[op] = _IMM_B
+    for op in (*range(0x70, 0x80), *range(0xB0, 0xB8), *range(0xE0, 0xE8)):
+        imm[op] = _IMM_B
+    for op in (0x68, 0x69, 0x81, 0xA9, 0xC7, 0xE8, 0xE9):
+        imm[op] = _IMM_Z
+    for op in range(0xB8, 0xC0):
+        imm[op] = _IMM_V
+    for op in range(0xA0, 0xA4):
+        imm[op] = _IMM_MOFFS
+    imm[0xC2] = imm[0xCA] = _IMM_W
+    imm[0xC8] = _IMM_ENTER
+    imm[0x9A] = imm[0xEA] = _IMM_PTR
+
+    modrm_0f = bytearray(b"\x01" * 256)
+    no_modrm = (
+        *range(0x04, 0x0D), 0x0E, *range(0x30, 0x38), 0x39, *range(0x3B, 0x40),
+        0x77, *range(0x80, 0x90), 0xA0, 0xA1, 0xA2, 0xA8, 0xA9, 0xAA, *range(0xC8, 0xD0),
+    )  # fmt: skip
+    for op in no_modrm:
+        modrm_0f[op] = 0
+    return bytes(modrm), bytes(imm), bytes(modrm_0f)
+
+
+_X86_MODRM, _X86_IMM, _X86_MODRM_0F = _build_x86_tables()
+
+
+def _x86_modrm_length(code: bytes, pos: int, addr16: bool) -> int:
+    """Length of a ModRM byte plus any SIB byte and displacement."""
+    m = code[pos]
+    mod = m >> 6
+    rm = m & 7
+    if mod == 3:
+        return 1
+    if addr16:
+        if mod == 0:
+            return 3 if rm == 6 else 1
+        return 2 if mod == 1 else 3
+    length = 1
+    if rm == 4:
+        length = 2
+        if mod == 0 and code[pos + 1] & 7 == 5:
+            return 6
+    elif mod == 0 and rm == 5:
+        return 5
+    if mod == 1:
+        length += 1
+    elif mod == 2:
+        length += 4
+    return length
+
+
+def _x87_key(op: int, m: int) -> str | None:
+    """Name the x87 division and square-root forms of a D8-DF escape."""
+    reg = (m >> 3) & 7
+    if m == 0xFA and op == 0xD9:
+        return "fsqrt"
+    if reg < 6:
+        return None
+    if m < 0xC0:
+        if op in (0xD8, 0xDC):
+            return "fdiv" if reg == 6 else "fdivr"
+        if op in (0xDA, 0xDE):
+            return "fidiv" if reg == 6 else "fidivr"
+        return None
+    if op == 0xD8:
+        return "fdiv" if reg == 6 else "fdivr"
+    # DC/DE register forms encode the reversed operation in reg 6
+    if op == 0xDC:
+        return "fdivr" if reg == 6 else "fdiv"
+    if op == 0xDE:
+        return "fdivrp" if reg == 6 else "fdivp"
+    return None
+
+
+def scan_x86(code: bytes, start: int, end: int, is_64: bool):
+    """
+    Walk x86 machine code from start to end, naming dangerous instructions.
+
+    The decoder computes the length of every instruction (legacy and REX
+    prefixes, one/two/three-byte maps, VEX, EVEX and XOP) but only resolves
+    mnemonics for integer division, SSE/AVX/x87 division and square root,
+    and conditional branches. `code` must extend at least 16 bytes past
+    `end` so that truncated instructions never index out of range.
+
+    Returns:
+        (instruction_count, [(offset, length, mnemonic), ...])
+    """
+    count = 0
+    hits = []
+    pos = start
+    modrm_table = _X86_MODRM
+    imm_table = _X86_IMM
+    prefixes = _X86_PREFIXES
+
+    while pos < end:
+        insn = pos
+        opsize16 = addr_override = rex_w = False
+        rep = 0
+        while True:
+            b = code[pos]
+            if b in prefixes:
+                if b == 0x66:
+                    opsize16 = True
+                elif b == 0x67:
+                    addr_override = True
+                elif b >= 0xF2:
+                    rep = b
+                rex_w = False  # REX only counts directly before the opcode
+                pos += 1
+            elif is_64 and 0x40 <= b <= 0x4F:
+                rex_w = bool(b & 8)
+                pos += 1
+            else:
+                break
+            if pos - insn >= 14:
+                break
+        addr16 = addr_override and not is_64
+        z = 2 if opsize16 and not rex_w else 4
+
+        op = code[pos]
+        pos += 1
+        key = None
+
+        if op == 0x0F:
+            op2 = code[pos]
+            pos += 1
+            if op2 == 0x38 or op2 == 0x3A:
+                pos += 1
+                pos += _x86_modrm_length(code, pos, addr16)
+                if op2 == 0x3A:
+                    pos += 1
+            else:
+                if _X86_MODRM_0F[op2]:
+                    pos += _x86_modrm_length(code, pos, addr16)
+                if 0x80 <= op2 <= 0x8F:
+                    pos += 4 if is_64 else z
+                    key = "j" + X86_CONDITIONS[op2 & 15]
+                elif op2 in _X86_0F_IMM8:
+                    pos += 1
+                elif op2 == 0x78 and (opsize16 or rep == 0xF2):
+                    pos += 2  # SSE4a EXTRQ/INSERTQ ib, ib
+                elif op2 == 0x51 or op2 == 0x5E:
+                    prefix = 2 if rep == 0xF3 else 3 if rep == 0xF2 else 1 if opsize16 else 0
+                    key = ("sqrt" if op2 == 0x51 else "div") + X86_SSE_SUFFIXES[prefix]
+
+        elif (op == 0xC4 or op == 0xC5) and (is_64 or code[pos] >= 0xC0):
+            if op == 0xC5:
+                vmap = 1
+                pp = code[pos] & 3
+                pos += 1
+            else:
+                vmap = code[pos] & 0x1F
+                pp = code[pos + 1] & 3
+                pos += 2
+            vop = code[pos]
+            pos += 1
+            if not (vmap == 1 and vop == 0x77):  # VZEROUPPER/VZEROALL
+                pos += _x86_modrm_length(code, pos, addr16)
+            if vmap == 3 or (vmap == 1 and vop in _X86_0F_IMM8):
+                pos += 1
+            if vmap == 1 and (vop == 0x51 or vop == 0x5E):
+                key = ("vsqrt" if vop == 0x51 else "vdiv") + X86_SSE_SUFFIXES[pp]
+
+        elif op == 0x62 and (is_64 or code[pos] >= 0xC0):
+            vmap = code[pos] & 7
+            pp = code[pos + 1] & 3
+            pos += 3
+            vop = code[pos]
+            pos += 1
+            pos += _x86_modrm_length(code, pos, addr16)
+            if vmap == 3 or (vmap == 1 and vop in _X86_0F_IMM8):
+                pos += 1
+            if vop == 0x51 or vop == 0x5E:
+                name = "vsqrt" if vop == 0x51 else "vdiv"
+                if vmap == 1:
+                    key = name + X86_SSE_SUFFIXES[pp]
+                elif vmap == 5 and X86_FP16_SUFFIXES[pp]:
+                    key = name + X86_FP16_SUFFIXES[pp]
+
+        elif op == 0x8F and code[pos] & 0x1F >= 8:
+            # AMD XOP: like a three-byte VEX with maps 8-10
+            vmap = code[pos] & 0x1F
+            pos += 3
+            pos += _x86_modrm_length(code, pos, addr16)
+            pos += 1 if vmap == 8 else 4 if vmap == 10 else 0
+
+        else:
+            if modrm_table[op]:
+                m = code[pos]
+                pos += _x86_modrm_length(code, pos, addr16)
+                if op == 0xF6 or op == 0xF7:
+                    reg = (m >> 3) & 7
+                    if reg < 2:
+                        pos += 1 if op == 0xF6 else z
+                    elif reg >= 6:
+                        size = "b" if op == 0xF6 else "q" if rex_w else "w" if opsize16 else "l"
+                        key = ("div" if reg == 6 else "idiv") + size
+                elif 0xD8 <= op <= 0xDF:
+                    key = _x87_key(op, m)
+            kind = imm_table[op]
+            if kind:
+                if kind == _IMM_B:
+                    pos += 1
+                    if 0x70 <= op <= 0x7F:
+                        key = "j" + X86_CONDITIONS[op & 15]
+                elif kind == _IMM_Z:
+                    pos += 4 if is_64 and op in _X86_REL32 else z
+                elif kind == _IMM_V:
+                    pos += 8 if rex_w else z
+                elif kind == _IMM_W:
+                    pos += 2
+                elif kind == _IMM_MOFFS:
+                    pos += (4 if addr_override else 8) if is_64 else (2 if addr_override else 4)
+                elif kind == _IMM_ENTER:
+                    pos += 3
+                else:
+                    pos += z + 2
+
+        count += 1
+        if key is not None:
+            hits.append((insn - start, pos - insn, key))
+
+    return count, hits
+
+
+def _scan_x86_section(elf, section, arch: str, include_warnings: bool, section_symbols: list):
+    """Decode each function symbol in an x86 section. Returns (counts, located)."""
+    parser = AssemblyParser(arch, "native")
+    data = elf.section_data(section)
+    is_64 = arch == "x86_64"
+    counts = []
+    located = []
+    for symbol in section_symbols:
+        offset = symbol.address - section.address
+        size = max(0, min(symbol.size, len(data) - offset))
+        code = bytes(data[offset : offset + size]) + bytes(16)
+        count, hits = scan_x86(code, 0, size, is_64)
+        counts.append(count)
+        for hit_offset, length, key in hits:
+            match = parser.classify(key, include_warnings)
+            if match is None:
+                continue
+            encoding = code[hit_offset : hit_offset + length].hex(" ")
+            address = symbol.address + hit_offset
+            located.append((symbol, NativeHit(address, encoding, key, *match)))
+    return counts, located
+
+
+def scan_elf(elf, arch: str, include_warnings: bool, symbols: list) -> tuple[list[dict], list]:
+    """
+    Scan all executable sections of an ELF file.
+
+    Args:
+        elf: Parsed ElfFile
+        arch: Canonical architecture name
+        include_warnings: Include warning-level instructions
+        symbols: Function symbols to report on (from ElfFile.function_symbols)
+
+    Returns:
+        (functions, [(symbol_or_None, NativeHit), ...])
+    """
+    by_section: dict[int, list] = {}
+    for symbol in symbols:
+        by_section.setdefault(symbol.section, []).append(symbol)
+    mapping = elf.mapping_symbols()
+
+    functions = []
+    located = []
+    for section in elf.sections:
+        if not section.flags & SHF_EXECINSTR or section.index not in by_section:
+            continue
+
+        section_symbols = by_section[section.index]
+        if arch in X86_ARCHS:
+            counts, hits = _scan_x86_section(elf, section, arch, include_warnings, section_symbols)
+            for symbol, count in zip(section_symbols, counts):
+                functions.append({"name": symbol.name, "instructions": count})
+            located.extend(hits)
+            continue
+
+        starts_by_addr = [s.address for s in section_symbols]
+        hits, starts = scan_section(elf, section, arch, include_warnings, starts_by_addr)
+        data_ranges = _data_ranges(mapping.get(section.index, []), section.address + section.size)
+
+        for symbol in section_symbols:
+            if starts is None:
+                count = symbol.size // 4
+            else:
+                count = bisect.bisect_left(starts, symbol.end) - bisect.bisect_left(
+                    starts, symbol.address
+                )
+            functions.append({"name": symbol.name, "instructions": count})
+
+        for hit in hits:
+            if any(lo <= hit.address < hi for lo, hi in data_ranges):
+                continue
+            i = bisect.bisect_right(starts_by_addr, hit.address) - 1
+            if i < 0 or hit.address >= section_symbols[i].end:
+                continue
+            located.append((section_symbols[i], hit))
+
+    return functions, located
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Record and replay of toolchain subprocesses.
+
+Every compiler, disassembler and script-runtime invocation goes through
+run_tool() (or its asyncio counterpart). With a ToolStore installed
+(set_tool_store()), each run is keyed by its command, environment changes
+and the content of the files it is given, and its exit code, stdout,
+stderr and output files are kept in a content-addressed store:
+
+    ct-analyzer --record .ct-tools crypto.c      # run the tools, store every run
+    ct-analyzer --replay .ct-tools crypto.c      # serve stored runs, spawn nothing
+    ct-analyzer --tool-cache .ct-tools crypto.c  # replay if stored, else run and store
+
+Paths are stored as placeholders, so a run recorded in one temporary
+directory replays in another. Arguments that name existing non-empty
+files are inputs and are hashed; empty or missing files are outputs;
+directories (and the working directory) are scanned for files the tool
+creates. Files a tool reads without naming them on its command line (e.g.
+a C# source referenced from a generated project) are declared through
+ToolRun.inputs. Headers included by C and C++ sources are not tracked, so
+a stored compile is only reused while the source file itself is unchanged
+and its headers are not edited.
+
+Runs are stored under two keys. The portable key names the tool by its
+basename only, so a store recorded on one machine replays on another where
+the tool lives elsewhere; --replay looks runs up by it. The cache key also
+includes the resolved tool binary's path, size and modification time, so
+--tool-cache runs a compiler again after it is upgraded instead of serving
+the old compiler's output.
+
+Layout:
+    objects/ab/cdef...   blob contents, named by SHA-256
+    runs/ab/abcd....json recorded run: exit code, blob names of stdout,
+                         stderr and output files
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass, field
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import ToolRun
+except ImportError:
+    from analyzer import ToolRun
+
+
+STORE_VERSION = 1
+
+MODE_RECORD = "record"  # always run, store every run
+MODE_REPLAY = "replay"  # never run; a missing run is an error
+MODE_CACHE = "cache"  # replay stored runs, run and store the others
+MODES = (MODE_RECORD, MODE_REPLAY, MODE_CACHE)
+
+
+class ToolNotRecorded(RuntimeError):
+    """Replay mode found no stored run for a tool invocation."""
+
+
+def _token(name: str) -> str:
+    return f"<<ct:{name}>>"
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _as_text(data: bytes) -> str | None:
+    """data decoded as UTF-8 text, or None for binary content."""
+    if b"\0" in data:
+        return None
+    try:
+        return data.decode()
+    except UnicodeDecodeError:
+        return None
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _walk(directory: str) -> dict[str, tuple[int, int]]:
+    """relative path -> (size, mtime) of every file under directory."""
+    files = {}
+    for root, _directories, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            stat = _stat(path)
+            if stat is not None:
+                files[os.path.relpath(path, directory)] = stat
+    return files
+
+
+@dataclass
+class Recording:
+    """A tool run being looked up or recorded, with its paths mapped to placeholders."""
+
+    key: str
+    # (path, placeholder), longest path first
+    names: list[tuple[str, str]]
+    outputs: dict[str, str] = field(default_factory=dict)
+    directories: dict[str, str] = field(default_factory=dict)
+    before: dict[str, object] = field(default_factory=dict)
+    # Further keys the run is stored under (see the module docstring)
+    aliases: list[str] = field(default_factory=list)
+
+    def encode(self, text: str) -> str:
+        """Replace the run's paths with placeholders."""
+        for path, token in self.names:
+            text = text.replace(path, token)
+        return text
+
+    def decode(self, text: str) -> str:
+        """Replace placeholders with the run's paths."""
+        for path, token in self.names:
+            text = text.replace(token, path)
+        return text
+
+
+class ToolStore:
+    """A content-addressed store of tool runs."""
+
+    def __init__(self, path: str, mode: str = MODE_CACHE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown tool store mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        # Tool name -> resolved path
+        self._tools: dict[str, str | None] = {}
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+
+    def _tool_identity(self, name: str) -> list | None:
+        """[path, size, mtime] of the binary a tool name resolves to, or None."""
+        if name not in self._tools:
+            self._tools[name] = shutil.which(name)
+        path = self._tools[name]
+        stat = _stat(path) if path else None
+        return None if stat is None else [os.path.realpath(path), *stat]
+
+    def prepare(self, request: ToolRun) -> Recording:
+        """
+        Map the request's paths to placeholders and compute its keys.
+
+        The recording's key is the one this mode looks up: the cache key in
+        cache mode, the portable key otherwise. The run is stored under both.
+        """
+        inputs: dict[str, str] = {}
+        outputs: dict[str, str] = {}
+        directories: dict[str, str] = {}
+        if request.cwd:
+            directories[_token("cwd")] = request.cwd
+        for arg in [*request.cmd[1:], *request.inputs]:
+            if any(arg in group.values() for group in (inputs, outputs, directories)):
+                continue
+            if os.path.isdir(arg):
+                directories[_token(f"dir{len(directories)}")] = arg
+            elif os.path.isfile(arg) and os.path.getsize(arg):
+                inputs[_token(f"in{len(inputs)}")] = arg
+            elif os.path.isfile(arg) or (
+                os.sep in arg and os.path.isdir(os.path.dirname(arg) or os.curdir)
+            ):
+                outputs[_token(f"out{len(outputs)}")] = arg
+
+        names = [
+            (path, token)
+            for group in (inputs, outputs, directories)
+            for token, path in group.items()
+        ]
+        names.sort(key=lambda item: len(item[0]), reverse=True)
+        recording = Recording("", names, outputs, directories)
+
+        hashes = {}
+        for token, path in inputs.items():
+            with open(path, "rb") as f:
+                data = f.read()
+            text = _as_text(data)
+            hashes[token] = _digest(data if text is None else recording.encode(text).encode())
+        env = {
+            name: value
+            for name, value in (request.env or {}).items()
+            if os.environ.get(name) != value
+        }
+        described = {
+            "version": STORE_VERSION,
+            # The tool by name, so stores replay on machines where it lives elsewhere
+            "cmd": [os.path.basename(request.cmd[0])]
+            + [recording.encode(arg) for arg in request.cmd[1:]],
+            "env": {name: recording.encode(value) for name, value in env.items()},
+            "cwd": bool(request.cwd),
+            "inputs": hashes,
+        }
+        portable = _digest(json.dumps(described, sort_keys=True).encode())
+        described["tool"] = self._tool_identity(request.cmd[0])
+        cache = _digest(json.dumps(described, sort_keys=True).encode())
+        if self.mode == MODE_CACHE:
+            recording.key, recording.aliases = cache, [portable]
+        else:
+            recording.key, recording.aliases = portable, [cache]
+        return recording
+
+    # -------------------------------------------------------------------------
+    # Blobs and runs
+    # -------------------------------------------------------------------------
+
+    def _object(self, digest: str) -> str:
+        return os.path.join(self.path, "objects", digest[:2], digest[2:])
+
+    def _run(self, key: str) -> str:
+        return os.path.join(self.path, "runs", key[:2], f"{key}.json")
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def _put(self, data: bytes) -> str:
+        digest = _digest(data)
+        path = self._object(digest)
+        if not os.path.exists(path):
+            self._write(path, data)
+        return digest
+
+    def _get(self, digest: str) -> bytes:
+        with open(self._object(digest), "rb") as f:
+            return f.read()
+
+    # -------------------------------------------------------------------------
+    # Replay and record
+    # -------------------------------------------------------------------------
+
+    def replay(self, request: ToolRun) -> tuple[Recording, subprocess.CompletedProcess | None]:
+        """
+        Look up a stored run.
+
+        Returns:
+            The request's recording, and the replayed process if the run is
+            stored (and the store replays). Stored output files are written
+            back to the request's paths.
+
+        Raises:
+            ToolNotRecorded: Replay mode and the run is not stored
+        """
+        recording = self.prepare(request)
+        if self.mode != MODE_RECORD:
+            try:
+                with open(self._run(recording.key)) as f:
+                    run = json.load(f)
+            except FileNotFoundError:
+                run = None
+            if run is not None:
+                self.hits += 1
+                return recording, self._restore(request, recording, run)
+            if self.mode == MODE_REPLAY:
+                raise ToolNotRecorded(f"No recorded run for: {' '.join(request.cmd)}")
+        self.misses += 1
+        # Snapshot what the tool may write, to find its outputs afterwards
+        for path in recording.outputs.values():
+            recording.before[path] = _stat(path)
+        for directory in recording.directories.values():
+            recording.before[directory] = _walk(directory)
+        return recording, None
+
+    def _restore(
+        self, request: ToolRun, recording: Recording, run: dict
+    ) -> subprocess.CompletedProcess:
+        for output in run["files"]:
+            path = recording.decode(output["path"])
+            data = self._get(output["blob"])
+            if output["text"]:
+                data = recording.decode(data.decode()).encode()
+            os.makedirs(os.path.dirname(path) or os.curdir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(data)
+        stdout = recording.decode(self._get(run["stdout"]).decode())
+        stderr = recording.decode(self._get(run["stderr"]).decode())
+        return subprocess.CompletedProcess(request.cmd, run["returncode"], stdout, stderr)
+
+    def record(self, recording: Recording, completed: subprocess.CompletedProcess) -> None:
+        """Store a finished run and the files it wrote."""
+        changed = [
+            (path, token)
+            for token, path in recording.outputs.items()
+            if _stat(path) is not None and _stat(path) != recording.before.get(path)
+        ]
+        for directory in recording.directories.values():
+            before = recording.before.get(directory, {})
+            for relative, stat in sorted(_walk(directory).items()):
+                if before.get(relative) != stat:
+                    changed.append((os.path.join(directory, relative), None))
+
+        files = []
+        for path, token in changed:
+            with open(path, "rb") as f:
+                data = f.read()
+            text = _as_text(data)
+            if text is not None:
+                data = recording.encode(text).encode()
+            stored_path = token or recording.encode(path)
+            files.append({"path": stored_path, "blob": self._put(data), "text": text is not None})
+
+        run = {
+            "version": STORE_VERSION,
+            "cmd": [recording.encode(arg) for arg in completed.args],
+            "returncode": completed.returncode,
+            "stdout": self._put(recording.encode(completed.stdout or "").encode()),
+            "stderr": self._put(recording.encode(completed.stderr or "").encode()),
+            "files": files,
+        }
+        data = json.dumps(run, indent=1).encode()
+        for key in (recording.key, *recording.aliases):
+            self._write(self._run(key), data)
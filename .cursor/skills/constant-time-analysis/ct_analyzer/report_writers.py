@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Streaming report writers for constant-time analysis.
+
+format_report() renders a finished report into one string. The writers in
+this module instead emit each violation as soon as the parser finds it and
+close the document with a trailer of counts once analysis ends, so peak
+memory does not grow with the report and consumers can start reading
+immediately.
+
+Every writer has the same three-step interface:
+
+    writer = get_report_writer(OutputFormat.NDJSON, sys.stdout, "crypto.c")
+    writer.start()
+    report = analyze_source("crypto.c", on_violation=writer.write)
+    writer.finish(report)
+
+If analysis fails after start(), writer.abort(message) closes the document
+with the error instead of a trailer, so the output stays well-formed.
+
+The trailer counts the violations the writer was given, so callers need not
+keep them: the command line drops each batch file's violations once they
+are written.
+"""
+
+import json
+from typing import TextIO
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import (
+        AnalysisReport,
+        OutputFormat,
+        Severity,
+        Violation,
+        format_failures_github,
+        format_failures_text,
+        format_limit_github,
+        format_limit_text,
+        format_violation_github,
+        format_violation_text,
+        violation_to_dict,
+    )
+except ImportError:
+    from analyzer import (
+        AnalysisReport,
+        OutputFormat,
+        Severity,
+        Violation,
+        format_failures_github,
+        format_failures_text,
+        format_limit_github,
+        format_limit_text,
+        format_violation_github,
+        format_violation_text,
+        violation_to_dict,
+    )
+
+
+TOOL_NAME = "ct-analyzer"
+TOOL_URI = "https://github.com/trailofbits/skills/tree/main/plugins/constant-time-analysis"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_VERSION = "2.1.0"
+
+
+class ReportWriter:
+    """Base class for writers that stream violations to a text stream."""
+
+    def __init__(self, stream: TextIO, source_file: str):
+        self.stream = stream
+        self.source_file = source_file
+        self.count = 0
+        self.error_count = 0
+        self.warning_count = 0
+        self.closed = False
+
+    def start(self) -> None:
+        """Write anything that precedes the first violation."""
+
+    def write(self, violation: Violation) -> None:
+        """Write one violation."""
+        raise NotImplementedError
+
+    def passed(self, report: AnalysisReport) -> bool:
+        """Whether the written violations, the report's limits and its files pass."""
+        return (
+            self.error_count == 0 and report.limit_exceeded is None and not report.failed_files
+        )
+
+    def _counted(self, violation: Violation) -> None:
+        self.count += 1
+        if violation.severity == Severity.ERROR:
+            self.error_count += 1
+        else:
+            self.warning_count += 1
+
+    def finish(self, report: AnalysisReport) -> None:
+        """Write the trailer once analysis is complete."""
+        self.closed = True
+        self.stream.flush()
+
+    def abort(self, message: str) -> None:
+        """
+        Close the document after a failure, in place of finish().
+
+        Does nothing once the writer is closed.
+        """
+        if self.closed:
+            return
+        self._abort(message)
+        self.closed = True
+        self.stream.flush()
+
+    def _abort(self, message: str) -> None:
+        self.stream.write(f"Error: {message}\n")
+
+
+class NDJSONWriter(ReportWriter):
+    """
+    Newline-delimited JSON: one object per line.
+
+    A "header" record is followed by one "violation" record per finding and
+    a closing "summary" record with the counts and overall result.
+    """
+
+    def start(self) -> None:
+        self._emit({"type": "header", "tool": TOOL_NAME, "source_file": self.source_file})
+
+    def write(self, violation: Violation) -> None:
+        self._counted(violation)
+        self._emit({"type": "violation", **violation_to_dict(violation)})
+
+    def finish(self, report: AnalysisReport) -> None:
+        self._emit(
+            {
+                "type": "summary",
+                "architecture": report.architecture,
+                "compiler": report.compiler,
+                "optimization": report.optimization,
+                "source_file": report.source_file,
+                "total_functions": report.total_functions,
+                "total_instructions": report.total_instructions,
+                "error_count": self.error_count,
+                "warning_count": self.warning_count,
+                "passed": self.passed(report),
+                "suppressed": report.suppressed,
+                "limit_exceeded": report.limit_exceeded and report.limit_exceeded.to_dict(),
+                "failed_files": report.failed_files,
+            }
+        )
+        super().finish(report)
+
+    def _abort(self, message: str) -> None:
+        self._emit({"type": "error", "error": message})
+
+    def _emit(self, record: dict) -> None:
+        self.stream.write(json.dumps(record, separators=(",", ":")))
+        self.stream.write("\n")
+
+
+class SarifWriter(ReportWriter):
+    """
+    SARIF 2.1.0 log with a single run.
+
+    The results array is written incrementally; the run's invocation and
+    summary properties follow it, since JSON object members may appear in
+    any order.
+    """
+
+    def start(self) -> None:
+        driver = {"name": TOOL_NAME, "informationUri": TOOL_URI}
+        self.stream.write(
+            f'{{"$schema":"{SARIF_SCHEMA}","version":"{SARIF_VERSION}",'
+            f'"runs":[{{"tool":{{"driver":{json.dumps(driver)}}},"results":['
+        )
+
+    def write(self, violation: Violation) -> None:
+        result = {
+            "ruleId": violation.mnemonic,
+            "level": "error" if violation.severity == Severity.ERROR else "warning",
+            "message": {
+                "text": f"{violation.mnemonic} in {violation.function}: {violation.reason}"
+            },
+            "locations": [self._location(violation)],
+            "properties": {
+                "instruction": violation.instruction,
+                "address": violation.address,
+            },
+        }
+        if self.count:
+            self.stream.write(",")
+        self.stream.write("\n")
+        self.stream.write(json.dumps(result, separators=(",", ":")))
+        self._counted(violation)
+
+    def finish(self, report: AnalysisReport) -> None:
+        properties = {
+            "architecture": report.architecture,
+            "compiler": report.compiler,
+            "optimization": report.optimization,
+            "totalFunctions": report.total_functions,
+            "totalInstructions": report.total_instructions,
+            "errorCount": self.error_count,
+            "warningCount": self.warning_count,
+            "suppressedCount": report.suppressed,
+            "passed": self.passed(report),
+        }
+        notifications = []
+        if report.limit_exceeded:
+            event = report.limit_exceeded
+            notifications.append(
+                {
+                    "level": "error",
+                    "message": {"text": f"{event.describe()}: {event.command}"},
+                    "properties": event.to_dict(),
+                }
+            )
+        for path, reason in (report.failed_files or {}).items():
+            notifications.append(
+                {
+                    "level": "error",
+                    "message": {"text": f"Analysis failed: {reason}"},
+                    "locations": [{"physicalLocation": {"artifactLocation": {"uri": path}}}],
+                }
+            )
+        invocation = {"executionSuccessful": not notifications}
+        if notifications:
+            invocation["toolExecutionNotifications"] = notifications
+        self._close(invocation, properties)
+        super().finish(report)
+
+    def _abort(self, message: str) -> None:
+        invocation = {
+            "executionSuccessful": False,
+            "toolExecutionNotifications": [{"level": "error", "message": {"text": message}}],
+        }
+        self._close(invocation, {"passed": False})
+
+    def _close(self, invocation: dict, properties: dict) -> None:
+        self.stream.write(
+            f'\n],"invocations":[{json.dumps(invocation)}],'
+            f'"properties":{json.dumps(properties)}}}]}}\n'
+        )
+
+    @staticmethod
+    def _location(violation: Violation) -> dict:
+        location = {"logicalLocations": [{"name": violation.function, "kind": "function"}]}
+        if violation.file:
+            physical = {"artifactLocation": {"uri": violation.file}}
+            if violation.line and violation.line > 0:
+                physical["region"] = {"startLine": violation.line}
+            location["physicalLocation"] = physical
+        return location
+
+
+class TextWriter(ReportWriter):
+    """
+    The human-readable text report, streamed.
+
+    Architecture, compiler and function counts are only known once analysis
+    ends, so they move from the header into the trailer.
+    """
+
+    def start(self) -> None:
+        self.stream.write("=" * 60 + "\n")
+        self.stream.write("Constant-Time Analysis Report\n")
+        self.stream.write("=" * 60 + "\n")
+        self.stream.write(f"Source: {self.source_file}\n\n")
+
+    def write(self, violation: Violation) -> None:
+        if not self.count:
+            self.stream.write("VIOLATIONS FOUND:\n")
+            self.stream.write("-" * 40 + "\n")
+        self._counted(violation)
+        self.stream.write("\n".join(format_violation_text(violation)) + "\n")
+
+    def finish(self, report: AnalysisReport) -> None:
+        if report.limit_exceeded:
+            self.stream.write(format_limit_text(report.limit_exceeded) + "\n")
+        if report.failed_files:
+            self.stream.write("\n".join(format_failures_text(report.failed_files)) + "\n")
+        if not self.count:
+            self.stream.write("No violations found.\n")
+        self.stream.write("-" * 40 + "\n")
+        self.stream.write(f"Architecture: {report.architecture}\n")
+        self.stream.write(f"Compiler: {report.compiler}\n")
+        self.stream.write(f"Optimization: {report.optimization}\n")
+        self.stream.write(f"Functions analyzed: {report.total_functions}\n")
+        self.stream.write(f"Instructions analyzed: {report.total_instructions}\n")
+        status = "PASSED" if self.passed(report) else "FAILED"
+        self.stream.write(f"Result: {status}\n")
+        self.stream.write(f"Errors: {self.error_count}, Warnings: {self.warning_count}\n")
+        if report.suppressed:
+            self.stream.write(f"Suppressed by baseline: {report.suppressed}\n")
+        super().finish(report)
+
+    def _abort(self, message: str) -> None:
+        self.stream.write("-" * 40 + "\n")
+        self.stream.write(f"Error: {message}\n")
+        self.stream.write("Result: FAILED\n")
+
+
+class GitHubWriter(ReportWriter):
+    """GitHub Actions annotations, closed by a ::notice:: summary line."""
+
+    def write(self, violation: Violation) -> None:
+        self._counted(violation)
+        self.stream.write(format_violation_github(violation) + "\n")
+
+    def finish(self, report: AnalysisReport) -> None:
+        if report.limit_exceeded:
+            self.stream.write(format_limit_github(report) + "\n")
+        for line in format_failures_github(report.failed_files or {}):
+            self.stream.write(line + "\n")
+        status = "passed" if self.passed(report) else "failed"
+        self.stream.write(
+            f"::notice::{TOOL_NAME} {status}: {self.error_count} errors, "
+            f"{self.warning_count} warnings in {report.total_functions} functions\n"
+        )
+        super().finish(report)
+
+    def _abort(self, message: str) -> None:
+        # Compiler diagnostics span lines; workflow commands must not
+        message = message.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+        self.stream.write(f"::error file={self.source_file}::{TOOL_NAME} failed: {message}\n")
+
+
+REPORT_WRITERS = {
+    OutputFormat.TEXT: TextWriter,
+    OutputFormat.GITHUB: GitHubWriter,
+    OutputFormat.NDJSON: NDJSONWriter,
+    OutputFormat.SARIF: SarifWriter,
+}
+
+
+def get_report_writer(format_type: OutputFormat, stream: TextIO, source_file: str) -> ReportWriter:
+    """
+    Get a streaming writer for an output format.
+
+    Args:
+        format_type: Output format (JSON is not streamable; use NDJSON)
+        stream: Text stream to write to
+        source_file: Analyzed file, shown before any violation
+
+    Returns:
+        ReportWriter instance
+    """
+    writer_class = REPORT_WRITERS.get(format_type)
+    if writer_class is None:
+        raise ValueError(f"No streaming writer for format: {format_type.value}")
+    return writer_class(stream, source_file)
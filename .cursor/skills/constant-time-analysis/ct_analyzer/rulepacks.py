@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Rule packs: the dangerous-instruction tables as versioned data files.
+
+Each pack is a JSON file for one target, an architecture or a language:
+
+    {
+      "format": "ct-analyzer-rules",
+      "version": 1,
+      "target": "x86_64",
+      "description": "x86_64 / amd64",
+      "tables": {
+        "instructions": {
+          "errors": [
+            {"category": "Integer division", "entries": {"div": "DIV has ..."}}
+          ],
+          "warnings": []
+        }
+      }
+    }
+
+The built-in packs live in rules/native/ (table "instructions", one pack
+per architecture) and rules/scripts/ (tables "opcodes" or "bytecodes" and
+"functions", one pack per language). A pack is read the first time one of
+its tables is used, so analyzing an x86_64 file never reads the others.
+
+Additional packs are merged over the built-in ones, entry by entry:
+
+    ct-analyzer --rules team-rules.json crypto.c
+    CT_ANALYZER_RULES=/etc/ct-rules ct-analyzer crypto.c
+
+A custom pack may extend a built-in target or add a new one (a new
+architecture can then be used with --assembly --arch). Structures compiled
+from the tables, such as the parser's instruction lookup, are cached
+here and rebuilt when packs are added.
+"""
+
+import os
+from collections.abc import Callable, Iterator, Mapping
+from typing import TypeVar
+
+RULES_FORMAT = "ct-analyzer-rules"
+RULES_VERSION = 1
+RULES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules")
+# Packs or directories of packs to load on top of the built-in ones
+RULES_PATH_VARIABLE = "CT_ANALYZER_RULES"
+
+SEVERITIES = ("errors", "warnings")
+# Built-in pack directory of each table
+_TABLE_DIRECTORIES = {
+    "instructions": "native",
+    "opcodes": "scripts",
+    "bytecodes": "scripts",
+    "functions": "scripts",
+}
+
+T = TypeVar("T")
+
+# Severity -> entry -> reason
+Table = dict[str, dict[str, str]]
+
+
+class RulePackError(ValueError):
+    """A rule pack is malformed or has an unsupported format version."""
+
+
+def read_pack(path: str) -> dict:
+    """
+    Read and validate a rule pack.
+
+    Args:
+        path: Pack file
+
+    Returns:
+        {"target": name, "tables": {table: {"errors": {...}, "warnings": {...}}}}
+        with each severity flattened to an entry -> reason mapping. Equal
+        reasons share one string.
+
+    Raises:
+        RulePackError: The file is not a supported rule pack
+        OSError: The file cannot be read
+    """
+    import json
+
+    try:
+        with open(path) as f:
+            document = json.load(f)
+    except ValueError as e:
+        raise RulePackError(f"{path}: not valid JSON: {e}") from None
+    if not isinstance(document, dict) or document.get("format") != RULES_FORMAT:
+        raise RulePackError(f"{path}: not a {RULES_FORMAT} file")
+    if document.get("version") != RULES_VERSION:
+        raise RulePackError(
+            f"{path}: unsupported rule pack version {document.get('version')!r} "
+            f"(supported: {RULES_VERSION})"
+        )
+    target = document.get("target")
+    if not isinstance(target, str) or not target:
+        raise RulePackError(f"{path}: missing target")
+
+    reasons: dict[str, str] = {}
+    tables = {}
+    for name, groups_by_severity in (document.get("tables") or {}).items():
+        table: Table = {severity: {} for severity in SEVERITIES}
+        for severity, groups in groups_by_severity.items():
+            if severity not in SEVERITIES:
+                raise RulePackError(f"{path}: unknown severity {severity!r} in table {name}")
+            for group in groups:
+                for entry, reason in group.get("entries", {}).items():
+                    table[severity][entry] = reasons.setdefault(reason, reason)
+        tables[name] = table
+    return {"target": target, "tables": tables}
+
+
+def _json_files(directory: str) -> list[str]:
+    """Names of the *.json files in a directory, sorted; none if it does not exist."""
+    try:
+        return sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    except FileNotFoundError:
+        return []
+
+
+def _pack_files(path: str) -> list[str]:
+    """The pack files at path: the file itself, or the *.json files of a directory."""
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in _json_files(path)]
+    return [path]
+
+
+class RulePacks:
+    """The built-in rule packs plus any added ones, loaded per target on first use."""
+
+    def __init__(self, directory: str = RULES_DIRECTORY):
+        self.directory = directory
+        # Built-in pack directory -> pack file names without .json
+        self._names: dict[str, list[str]] = {}
+        # Parsed built-in packs by file
+        self._builtin: dict[str, dict] = {}
+        # (table, target) -> merged table
+        self._tables: dict[tuple[str, str], Table | None] = {}
+        # Added packs, in the order they were added
+        self._extra: list[dict] = []
+        self._compiled: dict[object, object] = {}
+        self._environment_loaded = False
+
+    def load_environment(self) -> None:
+        """
+        Add the packs named by CT_ANALYZER_RULES, once.
+
+        Called before the first lookup; call it earlier to report a bad
+        pack before analysis starts.
+
+        Raises:
+            RulePackError: A file is not a supported rule pack
+            OSError: A file cannot be read
+        """
+        if self._environment_loaded:
+            return
+        self._environment_loaded = True
+        for path in filter(None, os.environ.get(RULES_PATH_VARIABLE, "").split(os.pathsep)):
+            self.add(path)
+
+    def add(self, path: str) -> list[str]:
+        """
+        Load custom packs and merge them over the built-in tables.
+
+        Args:
+            path: A pack file, or a directory of *.json packs
+
+        Returns:
+            The targets of the added packs
+
+        Raises:
+            RulePackError: A file is not a supported rule pack
+            OSError: A file cannot be read
+        """
+        packs = [read_pack(file) for file in _pack_files(path)]
+        self._extra.extend(packs)
+        self._tables.clear()
+        self._compiled.clear()
+        return [pack["target"] for pack in packs]
+
+    @property
+    def customized(self) -> bool:
+        """Whether packs beyond the built-in ones are loaded (--rules, CT_ANALYZER_RULES)."""
+        self.load_environment()
+        return bool(self._extra)
+
+    def _builtin_names(self, table: str) -> list[str]:
+        subdirectory = _TABLE_DIRECTORIES.get(table, "scripts")
+        names = self._names.get(subdirectory)
+        if names is None:
+            files = _json_files(os.path.join(self.directory, subdirectory))
+            names = self._names[subdirectory] = [name[: -len(".json")] for name in files]
+        return names
+
+    def _read_builtin(self, table: str, target: str) -> Table | None:
+        if target not in self._builtin_names(table):
+            return None
+        subdirectory = _TABLE_DIRECTORIES.get(table, "scripts")
+        path = os.path.join(self.directory, subdirectory, f"{target}.json")
+        pack = self._builtin.get(path)
+        if pack is None:
+            pack = self._builtin[path] = read_pack(path)
+        return pack["tables"].get(table)
+
+    def table(self, table: str, target: str) -> Table | None:
+        """
+        A target's table, merged from its built-in pack and added packs.
+
+        Returns:
+            {"errors": {entry: reason}, "warnings": {...}}, or None if no
+            pack defines the table for target
+        """
+        key = (table, target)
+        if key in self._tables:
+            return self._tables[key]
+        self.load_environment()
+        merged = self._read_builtin(table, target)
+        extras = [
+            pack["tables"][table]
+            for pack in self._extra
+            if pack["target"] == target and table in pack["tables"]
+        ]
+        if extras:
+            # Merge into a copy, so the parsed built-in pack stays as shipped
+            base = merged or {}
+            merged = {severity: dict(base.get(severity, {})) for severity in SEVERITIES}
+            for extra in extras:
+                for severity in SEVERITIES:
+                    merged[severity].update(extra[severity])
+        self._tables[key] = merged
+        return merged
+
+    def targets(self, table: str) -> list[str]:
+        """Targets that have the table, built-in ones first, without reading built-in packs."""
+        self.load_environment()
+        names = list(self._builtin_names(table))
+        for pack in self._extra:
+            if table in pack["tables"] and pack["target"] not in names:
+                names.append(pack["target"])
+        return names
+
+    def has(self, table: str, target: str) -> bool:
+        """Whether target has the table, without reading built-in packs."""
+        return target in self.targets(table)
+
+    def compiled(self, key: object, build: Callable[[], T]) -> T:
+        """
+        A structure compiled from the tables, built once per key.
+
+        The cache is cleared when packs are added, so build() sees the
+        merged tables.
+        """
+        if key not in self._compiled:
+            self._compiled[key] = build()
+        return self._compiled[key]
+
+
+RULE_PACKS = RulePacks()
+
+
+def add_rule_pack(path: str) -> list[str]:
+    """Load custom packs into the default registry (see RulePacks.add)."""
+    return RULE_PACKS.add(path)
+
+
+# =============================================================================
+# Table Views
+# =============================================================================
+
+
+class TargetTables(Mapping):
+    """
+    target -> {"errors": ..., "warnings": ...} for one table, e.g.
+    DANGEROUS_INSTRUCTIONS. Iterating and membership tests read no packs;
+    a target's pack is read when its entry is first looked up.
+    """
+
+    def __init__(self, table: str, packs: RulePacks = RULE_PACKS):
+        self._table = table
+        self._packs = packs
+
+    def __getitem__(self, target: str) -> Table:
+        tables = self._packs.table(self._table, target)
+        if tables is None:
+            raise KeyError(target)
+        return tables
+
+    def __contains__(self, target: object) -> bool:
+        return isinstance(target, str) and self._packs.has(self._table, target)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._packs.targets(self._table))
+
+    def __len__(self) -> int:
+        return len(self._packs.targets(self._table))
+
+    def __repr__(self) -> str:
+        return f"TargetTables({self._table!r}, targets={list(self)})"
+
+
+class PackTable(Mapping):
+    """
+    {"errors": ..., "warnings": ...} of one target's table, e.g.
+    DANGEROUS_PHP_OPCODES, read when first looked up.
+    """
+
+    def __init__(self, target: str, table: str, packs: RulePacks = RULE_PACKS):
+        self._target = target
+        self._table = table
+        self._packs = packs
+
+    def __getitem__(self, severity: str) -> dict[str, str]:
+        tables = self._packs.table(self._table, self._target)
+        if tables is None:
+            if severity in SEVERITIES:
+                return {}
+            raise KeyError(severity)
+        return tables[severity]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SEVERITIES)
+
+    def __len__(self) -> int:
+        return len(SEVERITIES)
+
+    def __repr__(self) -> str:
+        return f"PackTable({self._target!r}, {self._table!r})"
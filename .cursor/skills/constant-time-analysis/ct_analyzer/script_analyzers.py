@@ -11,7 +11,6 @@ that work at the bytecode/opcode level rather than native assembly.
 
 import os
 import re
-import subprocess
 import sys
 import tempfile
 from abc import ABC, abstractmethod
@@ -19,495 +18,71 @@ from pathlib import Path
 
 # Import shared types from main analyzer
 try:
-    from .analyzer import AnalysisReport, Severity, Violation
+    from .analyzer import (
+        STAGE_DISASSEMBLE,
+        STAGE_PROBE,
+        AnalysisReport,
+        Severity,
+        ToolRun,
+        ToolSteps,
+        Violation,
+        compile_function_filter,
+        run_steps,
+    )
 except ImportError:
-    from analyzer import AnalysisReport, Severity, Violation
-
-
-# =============================================================================
-# PHP Dangerous Operations
-# =============================================================================
-
-DANGEROUS_PHP_OPCODES = {
-    "errors": {
-        # Variable-time arithmetic
-        "zend_div": "DIV opcode has variable-time execution based on operand values",
-        "div": "DIV opcode has variable-time execution based on operand values",
-        "zend_mod": "MOD opcode has variable-time execution based on operand values",
-        "mod": "MOD opcode has variable-time execution based on operand values",
-        "zend_pow": "POW opcode has variable-time execution",
-        "pow": "POW opcode has variable-time execution",
-    },
-    "warnings": {
-        # Comparisons that may early-terminate
-        "zend_is_equal": "Equality comparison may early-terminate on secret data",
-        "is_equal": "Equality comparison may early-terminate on secret data",
-        "zend_is_identical": "Identity comparison may early-terminate on secret data",
-        "is_identical": "Identity comparison may early-terminate on secret data",
-        "zend_is_not_equal": "Inequality comparison may early-terminate on secret data",
-        "is_not_equal": "Inequality comparison may early-terminate on secret data",
-        "zend_is_not_identical": "Non-identity comparison may early-terminate on secret data",
-        "is_not_identical": "Non-identity comparison may early-terminate on secret data",
-        # Table lookups (cache timing via secret-indexed array access)
-        "fetch_dim_r": "Array access may leak timing via cache if index depends on secrets",
-        "zend_fetch_dim_r": "Array access may leak timing via cache if index depends on secrets",
-        "fetch_dim_w": "Array access may leak timing via cache if index depends on secrets",
-        "zend_fetch_dim_w": "Array access may leak timing via cache if index depends on secrets",
-        # Bit shift operations (may leak via timing if shift amount is secret)
-        "zend_sl": "Left shift may leak timing if shift amount depends on secrets",
-        "sl": "Left shift may leak timing if shift amount depends on secrets",
-        "zend_sr": "Right shift may leak timing if shift amount depends on secrets",
-        "sr": "Right shift may leak timing if shift amount depends on secrets",
-    },
-}
-
-# Functions with timing side-channels (based on Paragonie research)
-DANGEROUS_PHP_FUNCTIONS = {
-    "errors": {
-        # Cache-timing side-channels via table lookups
-        "chr": "chr() uses table lookup indexed by secret data; use pack('C', $int) instead",
-        "ord": "ord() uses table lookup indexed by secret data; use unpack('C', $char)[1] instead",
-        "bin2hex": "bin2hex() uses table lookups indexed on secret data",
-        "hex2bin": "hex2bin() uses table lookups indexed on secret data",
-        "base64_encode": "base64_encode() uses table lookups indexed on secret data",
-        "base64_decode": "base64_decode() uses table lookups indexed on secret data",
-        # Predictable randomness (not cryptographically secure)
-        "rand": "rand() is predictable; use random_int() for cryptographic purposes",
-        "mt_rand": "mt_rand() is predictable; use random_int() for cryptographic purposes",
-        "array_rand": "array_rand() uses mt_rand internally; use random_int() instead",
-        "uniqid": "uniqid() is predictable; use random_bytes() for cryptographic purposes",
-        "lcg_value": "lcg_value() is predictable; use random_int() for cryptographic purposes",
-        "str_shuffle": "str_shuffle() uses mt_rand internally",
-        "shuffle": "shuffle() uses mt_rand internally; use a Fisher-Yates with random_int()",
-    },
-    "warnings": {
-        # Variable-time string comparisons
-        "strcmp": "strcmp() has variable-time execution; use hash_equals() for secrets",
-        "strcasecmp": "strcasecmp() has variable-time execution; use hash_equals() for secrets",
-        "strncmp": "strncmp() has variable-time execution; use hash_equals() for secrets",
-        "strncasecmp": "strncasecmp() has variable-time execution; use hash_equals() for secrets",
-        "substr_compare": "substr_compare() has variable-time execution; use hash_equals()",
-        # String operations that may indicate unsafe comparison patterns
-        "substr": "substr() in comparisons may indicate timing-unsafe pattern",
-        # Variable-length encoding (may leak data length via timing)
-        "pack": "pack() may leak data length via timing; ensure fixed-length output",
-        "unpack": "unpack() may leak data length via timing; ensure fixed-length input",
-        "serialize": "serialize() produces variable-length output that may leak information",
-        "json_encode": "json_encode() produces variable-length output that may leak information",
-    },
-}
-
-
-# =============================================================================
-# JavaScript/TypeScript Dangerous Operations
-# =============================================================================
-
-DANGEROUS_JS_BYTECODES = {
-    "errors": {
-        # Variable-time arithmetic
-        "div": "Div bytecode has variable-time execution based on operand values",
-        "mod": "Mod bytecode has variable-time execution based on operand values",
-        "divsmi": "DivSmi (division by small integer) has variable-time execution",
-        "modsmi": "ModSmi (modulo by small integer) has variable-time execution",
-    },
-    "warnings": {
-        # Conditional jumps (may leak timing if condition depends on secrets)
-        "jumpiftrue": "Conditional jump may leak timing if condition depends on secret data",
-        "jumpiffalse": "Conditional jump may leak timing if condition depends on secret data",
-        "jumpiftobooleanfalse": "Conditional jump may leak timing if condition depends on secret data",
-        "jumpiftobooleantrue": "Conditional jump may leak timing if condition depends on secret data",
-        "jumpifundefined": "Conditional jump may leak timing if condition depends on secret data",
-        "jumpifnull": "Conditional jump may leak timing if condition depends on secret data",
-        # Comparison operations
-        "testequal": "Equality test may early-terminate on secret data",
-        "testequalstrict": "Strict equality test may early-terminate on secret data",
-        # Table lookups (cache timing via secret-indexed array access)
-        "ldakeyedproperty": "Array/property access may leak timing via cache if index depends on secrets",
-        "stakeyedproperty": "Array/property access may leak timing via cache if index depends on secrets",
-        "ldanamedproperty": "Property access may leak timing via cache if key depends on secrets",
-        "getkeyed": "Array access may leak timing via cache if index depends on secrets",
-        "setkeyed": "Array access may leak timing via cache if index depends on secrets",
-        # Bit shift operations (may leak via timing if shift amount is secret)
-        "shiftleft": "Left shift may leak timing if shift amount depends on secrets",
-        "shiftright": "Right shift may leak timing if shift amount depends on secrets",
-        "shiftrightsmi": "Right shift by constant may still leak timing in some contexts",
-        "shiftleftsmi": "Left shift by constant may still leak timing in some contexts",
-        "bitwiseand": "Bitwise AND timing may vary based on operands",
-        "bitwiseor": "Bitwise OR timing may vary based on operands",
-        "bitwisexor": "Bitwise XOR timing may vary based on operands",
-    },
-}
-
-DANGEROUS_JS_FUNCTIONS = {
-    "errors": {
-        # Variable latency math operations
-        "math.sqrt": "Math.sqrt() has variable latency based on operand values",
-        "math.pow": "Math.pow() has variable latency based on operand values",
-        # Unpredictable timing
-        "eval": "eval() has unpredictable timing characteristics",
-        # Predictable randomness
-        "math.random": "Math.random() is predictable; use crypto.getRandomValues() instead",
-    },
-    "warnings": {
-        # Variable-time string operations
-        "localecompare": "localeCompare() has variable-time execution",
-        "indexof": "indexOf() has early-terminating behavior",
-        "includes": "includes() has early-terminating behavior",
-        "startswith": "startsWith() has early-terminating behavior",
-        "endswith": "endsWith() has early-terminating behavior",
-        "search": "search() has variable-time execution",
-        "match": "match() has variable-time execution",
-        # Variable-length encoding (may leak data length via timing)
-        "textencoder": "TextEncoder may leak data length via timing; ensure fixed-length output",
-        "textdecoder": "TextDecoder may leak data length via timing; ensure fixed-length input",
-        "json.stringify": "JSON.stringify() produces variable-length output that may leak information",
-        "json.parse": "JSON.parse() timing may vary based on input length/structure",
-        "btoa": "btoa() produces variable-length output based on input",
-        "atob": "atob() timing may vary based on input length",
-        "encodeuricomponent": "encodeURIComponent() produces variable-length output",
-        "decodeuricomponent": "decodeURIComponent() timing may vary based on input",
-    },
-}
+    from analyzer import (
+        STAGE_DISASSEMBLE,
+        STAGE_PROBE,
+        AnalysisReport,
+        Severity,
+        ToolRun,
+        ToolSteps,
+        Violation,
+        compile_function_filter,
+        run_steps,
+    )
 
 
-# =============================================================================
-# Python Dangerous Operations
-# =============================================================================
-
-DANGEROUS_PYTHON_BYTECODES = {
-    "errors": {
-        # Python < 3.11 division/modulo operations
-        "binary_true_divide": "BINARY_TRUE_DIVIDE has variable-time execution",
-        "binary_floor_divide": "BINARY_FLOOR_DIVIDE has variable-time execution",
-        "binary_modulo": "BINARY_MODULO has variable-time execution",
-        "inplace_true_divide": "INPLACE_TRUE_DIVIDE has variable-time execution",
-        "inplace_floor_divide": "INPLACE_FLOOR_DIVIDE has variable-time execution",
-        "inplace_modulo": "INPLACE_MODULO has variable-time execution",
-        # Python 3.11+ uses BINARY_OP with oparg for these
-        # We detect these specially in the parser
-    },
-    "warnings": {
-        # Comparison operations
-        "compare_op": "COMPARE_OP may early-terminate on secret data",
-        "contains_op": "CONTAINS_OP has early-terminating behavior",
-        # Table lookups (cache timing via secret-indexed access)
-        "binary_subscr": "Subscript access may leak timing via cache if index depends on secrets",
-        "store_subscr": "Subscript store may leak timing via cache if index depends on secrets",
-        # Bit shift operations (may leak via timing if shift amount is secret)
-        "binary_lshift": "Left shift may leak timing if shift amount depends on secrets",
-        "binary_rshift": "Right shift may leak timing if shift amount depends on secrets",
-        "inplace_lshift": "Inplace left shift may leak timing if shift amount depends on secrets",
-        "inplace_rshift": "Inplace right shift may leak timing if shift amount depends on secrets",
-    },
-}
-
-DANGEROUS_PYTHON_FUNCTIONS = {
-    "errors": {
-        # Predictable randomness (not cryptographically secure)
-        "random.random": "random.random() is predictable; use secrets.token_bytes() instead",
-        "random.randint": "random.randint() is predictable; use secrets.randbelow() instead",
-        "random.randrange": "random.randrange() is predictable; use secrets.randbelow() instead",
-        "random.choice": "random.choice() is predictable; use secrets.choice() instead",
-        "random.shuffle": "random.shuffle() is predictable; use secrets module instead",
-        "random.sample": "random.sample() is predictable; use secrets module instead",
-        # Variable latency math operations
-        "math.sqrt": "math.sqrt() has variable latency based on operand values",
-        "math.pow": "math.pow() has variable latency based on operand values",
-        # Dangerous eval
-        "eval": "eval() has unpredictable timing characteristics",
-        "exec": "exec() has unpredictable timing characteristics",
-    },
-    "warnings": {
-        # Variable-time string operations
-        "str.find": "str.find() has early-terminating behavior",
-        "str.index": "str.index() has early-terminating behavior",
-        "str.startswith": "str.startswith() has early-terminating behavior",
-        "str.endswith": "str.endswith() has early-terminating behavior",
-        # in operator on strings (detected via CONTAINS_OP)
-        # Variable-length encoding (may leak data length via timing)
-        "int.to_bytes": "int.to_bytes() output length may leak information about the integer",
-        "int.from_bytes": "int.from_bytes() timing may vary based on input length",
-        "struct.pack": "struct.pack() may leak data length via timing; ensure fixed-length output",
-        "struct.unpack": "struct.unpack() may leak data length via timing; ensure fixed-length input",
-        "json.dumps": "json.dumps() produces variable-length output that may leak information",
-        "json.loads": "json.loads() timing may vary based on input length/structure",
-        "pickle.dumps": "pickle.dumps() produces variable-length output that may leak information",
-        "pickle.loads": "pickle.loads() timing varies based on input; also a security risk",
-        "base64.b64encode": "base64.b64encode() produces variable-length output",
-        "base64.b64decode": "base64.b64decode() timing may vary based on input length",
-    },
-}
+try:
+    from .rulepacks import PackTable
+except ImportError:
+    from rulepacks import PackTable
 
 
 # =============================================================================
-# Ruby Dangerous Operations
+# Dangerous Operations
 # =============================================================================
 
-DANGEROUS_RUBY_BYTECODES = {
-    "errors": {
-        # Division and modulo operations
-        "opt_div": "opt_div has variable-time execution based on operand values",
-        "opt_mod": "opt_mod has variable-time execution based on operand values",
-    },
-    "warnings": {
-        # Comparison and equality operations
-        "opt_eq": "opt_eq may early-terminate on secret data",
-        "opt_neq": "opt_neq may early-terminate on secret data",
-        "opt_lt": "opt_lt comparison may leak timing information",
-        "opt_le": "opt_le comparison may leak timing information",
-        "opt_gt": "opt_gt comparison may leak timing information",
-        "opt_ge": "opt_ge comparison may leak timing information",
-        "branchif": "Conditional branch may leak timing if condition depends on secrets",
-        "branchunless": "Conditional branch may leak timing if condition depends on secrets",
-        # Table lookups (cache timing via secret-indexed access)
-        "opt_aref": "Array access may leak timing via cache if index depends on secrets",
-        "opt_aset": "Array store may leak timing via cache if index depends on secrets",
-        # Bit shift operations (may leak via timing if shift amount is secret)
-        "opt_lshift": "Left shift may leak timing if shift amount depends on secrets",
-        "opt_rshift": "Right shift may leak timing if shift amount depends on secrets",
-        "opt_and": "Bitwise AND timing may vary based on operands",
-        "opt_or": "Bitwise OR timing may vary based on operands",
-    },
-}
-
-DANGEROUS_RUBY_FUNCTIONS = {
-    "errors": {
-        # Predictable randomness
-        "rand": "rand() is predictable; use SecureRandom instead",
-        "random": "Random is predictable; use SecureRandom instead",
-        "srand": "srand() sets predictable seed; use SecureRandom instead",
-        # Variable latency math operations
-        "math.sqrt": "Math.sqrt() has variable latency based on operand values",
-    },
-    "warnings": {
-        # Variable-time string operations
-        "include?": "include?() has early-terminating behavior",
-        "index": "index() has early-terminating behavior",
-        "start_with?": "start_with?() has early-terminating behavior",
-        "end_with?": "end_with?() has early-terminating behavior",
-        "match": "match() has variable-time execution",
-        "=~": "=~ regex match has variable-time execution",
-        # Variable-length encoding (may leak data length via timing)
-        "pack": "Array#pack() may leak data length via timing; ensure fixed-length output",
-        "unpack": "String#unpack() may leak data length via timing; ensure fixed-length input",
-        "to_json": "to_json() produces variable-length output that may leak information",
-        "json.parse": "JSON.parse() timing may vary based on input length/structure",
-        "marshal.dump": "Marshal.dump() produces variable-length output that may leak information",
-        "marshal.load": "Marshal.load() timing varies based on input; also a security risk",
-        "base64.encode64": "Base64.encode64() produces variable-length output",
-        "base64.decode64": "Base64.decode64() timing may vary based on input length",
-    },
-}
+# {"errors": {name: reason}, "warnings": {...}} tables, read from the language's
+# rule pack (rules/scripts/<language>.json) on first lookup
 
+# PHP opcodes, and functions with timing side-channels (based on Paragonie research)
+DANGEROUS_PHP_OPCODES = PackTable("php", "opcodes")
+DANGEROUS_PHP_FUNCTIONS = PackTable("php", "functions")
 
-# =============================================================================
-# Java (JVM) Dangerous Operations
-# =============================================================================
+# JavaScript/TypeScript
+DANGEROUS_JS_BYTECODES = PackTable("javascript", "bytecodes")
+DANGEROUS_JS_FUNCTIONS = PackTable("javascript", "functions")
 
-DANGEROUS_JAVA_BYTECODES = {
-    "errors": {
-        # Integer division - variable time based on operand values
-        "idiv": "IDIV has variable-time execution based on operand values",
-        "ldiv": "LDIV has variable-time execution based on operand values",
-        "irem": "IREM has variable-time execution based on operand values",
-        "lrem": "LREM has variable-time execution based on operand values",
-        # Floating-point division - variable latency
-        "fdiv": "FDIV has variable latency based on operand values",
-        "ddiv": "DDIV has variable latency based on operand values",
-        "frem": "FREM has variable latency based on operand values",
-        "drem": "DREM has variable latency based on operand values",
-    },
-    "warnings": {
-        # Conditional branches - may leak timing if condition depends on secrets
-        "ifeq": "conditional branch may leak timing if condition depends on secret data",
-        "ifne": "conditional branch may leak timing if condition depends on secret data",
-        "iflt": "conditional branch may leak timing if condition depends on secret data",
-        "ifge": "conditional branch may leak timing if condition depends on secret data",
-        "ifgt": "conditional branch may leak timing if condition depends on secret data",
-        "ifle": "conditional branch may leak timing if condition depends on secret data",
-        "if_icmpeq": "conditional branch may leak timing if condition depends on secret data",
-        "if_icmpne": "conditional branch may leak timing if condition depends on secret data",
-        "if_icmplt": "conditional branch may leak timing if condition depends on secret data",
-        "if_icmpge": "conditional branch may leak timing if condition depends on secret data",
-        "if_icmpgt": "conditional branch may leak timing if condition depends on secret data",
-        "if_icmple": "conditional branch may leak timing if condition depends on secret data",
-        "if_acmpeq": "conditional branch may leak timing if condition depends on secret data",
-        "if_acmpne": "conditional branch may leak timing if condition depends on secret data",
-        "ifnull": "conditional branch may leak timing if condition depends on secret data",
-        "ifnonnull": "conditional branch may leak timing if condition depends on secret data",
-        # Table lookups - cache timing if index depends on secrets
-        "iaload": "array access may leak timing via cache if index depends on secrets",
-        "laload": "array access may leak timing via cache if index depends on secrets",
-        "faload": "array access may leak timing via cache if index depends on secrets",
-        "daload": "array access may leak timing via cache if index depends on secrets",
-        "aaload": "array access may leak timing via cache if index depends on secrets",
-        "baload": "array access may leak timing via cache if index depends on secrets",
-        "caload": "array access may leak timing via cache if index depends on secrets",
-        "saload": "array access may leak timing via cache if index depends on secrets",
-        "iastore": "array store may leak timing via cache if index depends on secrets",
-        "lastore": "array store may leak timing via cache if index depends on secrets",
-        "fastore": "array store may leak timing via cache if index depends on secrets",
-        "dastore": "array store may leak timing via cache if index depends on secrets",
-        "aastore": "array store may leak timing via cache if index depends on secrets",
-        "bastore": "array store may leak timing via cache if index depends on secrets",
-        "castore": "array store may leak timing via cache if index depends on secrets",
-        "sastore": "array store may leak timing via cache if index depends on secrets",
-        "tableswitch": "switch statement may leak timing based on case value",
-        "lookupswitch": "switch statement may leak timing based on case value",
-    },
-}
-
-DANGEROUS_JAVA_FUNCTIONS = {
-    "errors": {
-        # Predictable randomness
-        "java.util.random": "java.util.Random is predictable; use SecureRandom instead",
-        "math.random": "Math.random() is predictable; use SecureRandom instead",
-        # Variable latency math
-        "math.sqrt": "Math.sqrt() has variable latency based on operand values",
-        "math.pow": "Math.pow() has variable latency based on operand values",
-    },
-    "warnings": {
-        # Variable-time comparisons
-        "arrays.equals": "Arrays.equals() may early-terminate; use MessageDigest.isEqual()",
-        "string.equals": "String.equals() may early-terminate on secret data",
-        "string.compareto": "String.compareTo() has variable-time execution",
-        "string.contentequals": "String.contentEquals() may early-terminate",
-        # Variable-length encoding
-        "base64.getencoder": "Base64 encoding produces variable-length output",
-        "base64.getdecoder": "Base64 decoding timing may vary based on input",
-    },
-}
+# Python
+DANGEROUS_PYTHON_BYTECODES = PackTable("python", "bytecodes")
+DANGEROUS_PYTHON_FUNCTIONS = PackTable("python", "functions")
 
+# Ruby
+DANGEROUS_RUBY_BYTECODES = PackTable("ruby", "bytecodes")
+DANGEROUS_RUBY_FUNCTIONS = PackTable("ruby", "functions")
 
-# =============================================================================
-# Kotlin (JVM) Dangerous Operations
-# =============================================================================
+# Java (JVM)
+DANGEROUS_JAVA_BYTECODES = PackTable("java", "bytecodes")
+DANGEROUS_JAVA_FUNCTIONS = PackTable("java", "functions")
 
 # Kotlin compiles to JVM bytecode, so it uses the same dangerous bytecodes as Java
 DANGEROUS_KOTLIN_BYTECODES = DANGEROUS_JAVA_BYTECODES
+DANGEROUS_KOTLIN_FUNCTIONS = PackTable("kotlin", "functions")
 
-DANGEROUS_KOTLIN_FUNCTIONS = {
-    "errors": {
-        # Predictable randomness (Kotlin stdlib)
-        "random.nextint": "Random.nextInt() is predictable; use SecureRandom instead",
-        "random.nextlong": "Random.nextLong() is predictable; use SecureRandom instead",
-        "random.nextdouble": "Random.nextDouble() is predictable; use SecureRandom instead",
-        "random.nextfloat": "Random.nextFloat() is predictable; use SecureRandom instead",
-        "random.nextbytes": "Random.nextBytes() is predictable; use SecureRandom instead",
-        "random.default": "Random.Default is predictable; use SecureRandom instead",
-        # Java interop (same as Java)
-        "java.util.random": "java.util.Random is predictable; use SecureRandom instead",
-        "math.random": "Math.random() is predictable; use SecureRandom instead",
-        # Variable latency math
-        "kotlin.math.sqrt": "sqrt() has variable latency based on operand values",
-        "kotlin.math.pow": "pow() has variable latency based on operand values",
-        "math.sqrt": "Math.sqrt() has variable latency based on operand values",
-        "math.pow": "Math.pow() has variable latency based on operand values",
-    },
-    "warnings": {
-        # Variable-time comparisons (Kotlin-specific)
-        "contentequals": "contentEquals() may early-terminate on secret data",
-        "equals": "equals() may early-terminate on secret data",
-        "compareto": "compareTo() has variable-time execution",
-        # Arrays
-        "arrays.equals": "Arrays.equals() may early-terminate; use MessageDigest.isEqual()",
-        "arrays.contentequals": "contentEquals() may early-terminate on array comparison",
-        # String operations
-        "string.equals": "String.equals() may early-terminate on secret data",
-        "string.compareto": "String.compareTo() has variable-time execution",
-        # Variable-length encoding
-        "base64.getencoder": "Base64 encoding produces variable-length output",
-        "base64.getdecoder": "Base64 decoding timing may vary based on input",
-        "encodetobytearray": "encodeToByteArray() produces variable-length output",
-        "decodetostring": "decodeToString() timing may vary based on input",
-    },
-}
-
-
-# =============================================================================
-# C# (CIL/.NET) Dangerous Operations
-# =============================================================================
-
-DANGEROUS_CSHARP_BYTECODES = {
-    "errors": {
-        # Integer division - variable time based on operand values
-        "div": "DIV has variable-time execution based on operand values",
-        "div.un": "DIV.UN has variable-time execution based on operand values",
-        "rem": "REM has variable-time execution based on operand values",
-        "rem.un": "REM.UN has variable-time execution based on operand values",
-    },
-    "warnings": {
-        # Conditional branches - may leak timing if condition depends on secrets
-        "beq": "conditional branch may leak timing if condition depends on secret data",
-        "beq.s": "conditional branch may leak timing if condition depends on secret data",
-        "bne": "conditional branch may leak timing if condition depends on secret data",
-        "bne.un": "conditional branch may leak timing if condition depends on secret data",
-        "bne.un.s": "conditional branch may leak timing if condition depends on secret data",
-        "blt": "conditional branch may leak timing if condition depends on secret data",
-        "blt.s": "conditional branch may leak timing if condition depends on secret data",
-        "blt.un": "conditional branch may leak timing if condition depends on secret data",
-        "blt.un.s": "conditional branch may leak timing if condition depends on secret data",
-        "bgt": "conditional branch may leak timing if condition depends on secret data",
-        "bgt.s": "conditional branch may leak timing if condition depends on secret data",
-        "bgt.un": "conditional branch may leak timing if condition depends on secret data",
-        "bgt.un.s": "conditional branch may leak timing if condition depends on secret data",
-        "ble": "conditional branch may leak timing if condition depends on secret data",
-        "ble.s": "conditional branch may leak timing if condition depends on secret data",
-        "ble.un": "conditional branch may leak timing if condition depends on secret data",
-        "ble.un.s": "conditional branch may leak timing if condition depends on secret data",
-        "bge": "conditional branch may leak timing if condition depends on secret data",
-        "bge.s": "conditional branch may leak timing if condition depends on secret data",
-        "bge.un": "conditional branch may leak timing if condition depends on secret data",
-        "bge.un.s": "conditional branch may leak timing if condition depends on secret data",
-        "brfalse": "conditional branch may leak timing if condition depends on secret data",
-        "brfalse.s": "conditional branch may leak timing if condition depends on secret data",
-        "brtrue": "conditional branch may leak timing if condition depends on secret data",
-        "brtrue.s": "conditional branch may leak timing if condition depends on secret data",
-        # Table lookups - cache timing if index depends on secrets
-        "ldelem": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.i": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.i1": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.i2": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.i4": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.i8": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.u1": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.u2": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.u4": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.r4": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.r8": "array access may leak timing via cache if index depends on secrets",
-        "ldelem.ref": "array access may leak timing via cache if index depends on secrets",
-        "stelem": "array store may leak timing via cache if index depends on secrets",
-        "stelem.i": "array store may leak timing via cache if index depends on secrets",
-        "stelem.i1": "array store may leak timing via cache if index depends on secrets",
-        "stelem.i2": "array store may leak timing via cache if index depends on secrets",
-        "stelem.i4": "array store may leak timing via cache if index depends on secrets",
-        "stelem.i8": "array store may leak timing via cache if index depends on secrets",
-        "stelem.r4": "array store may leak timing via cache if index depends on secrets",
-        "stelem.r8": "array store may leak timing via cache if index depends on secrets",
-        "stelem.ref": "array store may leak timing via cache if index depends on secrets",
-        "switch": "switch statement may leak timing based on case value",
-    },
-}
-
-DANGEROUS_CSHARP_FUNCTIONS = {
-    "errors": {
-        # Predictable randomness
-        "system.random": "System.Random is predictable; use RandomNumberGenerator instead",
-        # Variable latency math
-        "math.sqrt": "Math.Sqrt() has variable latency based on operand values",
-        "math.pow": "Math.Pow() has variable latency based on operand values",
-    },
-    "warnings": {
-        # Variable-time comparisons
-        "sequenceequal": "SequenceEqual() may early-terminate; use FixedTimeEquals()",
-        "string.equals": "String.Equals() may early-terminate on secret data",
-        "string.compare": "String.Compare() has variable-time execution",
-        "array.equals": "Array comparison may early-terminate",
-        # Variable-length encoding
-        "convert.tobase64string": "Base64 encoding produces variable-length output",
-        "convert.frombase64string": "Base64 decoding timing may vary based on input",
-    },
-}
+# C# (CIL/.NET)
+DANGEROUS_CSHARP_BYTECODES = PackTable("csharp", "bytecodes")
+DANGEROUS_CSHARP_FUNCTIONS = PackTable("csharp", "functions")
 
 
 # =============================================================================
@@ -520,12 +95,15 @@ class ScriptAnalyzer(ABC):
 
     name: str = "unknown"
 
-    @abstractmethod
     def is_available(self) -> bool:
         """Check if the analyzer's runtime is available."""
-        raise NotImplementedError
+        return run_steps(self.availability_steps())
 
     @abstractmethod
+    def availability_steps(self) -> ToolSteps[bool]:
+        """Step generator behind is_available()."""
+        raise NotImplementedError
+
     def analyze(
         self,
         source_file: str,
@@ -543,6 +121,16 @@ class ScriptAnalyzer(ABC):
         Returns:
             AnalysisReport with results
         """
+        return run_steps(self.analyze_steps(source_file, include_warnings, function_filter))
+
+    @abstractmethod
+    def analyze_steps(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> ToolSteps[AnalysisReport]:
+        """Step generator behind analyze(); see analyzer.ToolSteps."""
         raise NotImplementedError
 
 
@@ -564,36 +152,28 @@ class PHPAnalyzer(ScriptAnalyzer):
         self.php_path = php_path or "php"
         self._vld_available: bool | None = None
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if PHP is available."""
         try:
-            result = subprocess.run(
-                [self.php_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.php_path, "--version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _check_vld_available(self) -> bool:
+    def _check_vld_available(self) -> ToolSteps[bool]:
         """Check if VLD extension is available."""
         if self._vld_available is not None:
             return self._vld_available
 
         try:
-            result = subprocess.run(
-                [self.php_path, "-m"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.php_path, "-m"], stage=STAGE_PROBE)
             self._vld_available = "vld" in result.stdout.lower()
         except FileNotFoundError:
             self._vld_available = False
 
         return self._vld_available
 
-    def _get_vld_output(self, source_file: str) -> tuple[bool, str]:
+    def _get_vld_output(self, source_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get VLD opcode dump for a PHP file."""
         cmd = [
             self.php_path,
@@ -607,13 +187,13 @@ class PHPAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             # VLD outputs to stderr
             return True, result.stderr
         except FileNotFoundError:
             return False, f"PHP not found: {self.php_path}"
 
-    def _get_opcache_output(self, source_file: str) -> tuple[bool, str]:
+    def _get_opcache_output(self, source_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get OPcache debug output for a PHP file (fallback)."""
         cmd = [
             self.php_path,
@@ -625,7 +205,7 @@ class PHPAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             # OPcache debug outputs to stderr
             return True, result.stderr
         except FileNotFoundError:
@@ -653,13 +233,18 @@ class PHPAnalyzer(ScriptAnalyzer):
            6     1        ASSIGN                                                   !1, 3
            7     2        DIV                                              ~4      !0, !1
         """
+        function_errors = DANGEROUS_PHP_FUNCTIONS["errors"]
+        function_warnings = DANGEROUS_PHP_FUNCTIONS["warnings"]
+        opcode_errors = DANGEROUS_PHP_OPCODES["errors"]
+        opcode_warnings = DANGEROUS_PHP_OPCODES["warnings"]
         functions = []
         violations = []
 
         current_function = None
         current_file = None
         in_opcode_section = False
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         # Track function calls for detection
         pending_fcall: str | None = None
@@ -673,7 +258,9 @@ class PHPAnalyzer(ScriptAnalyzer):
                 func_name = func_match.group(1).strip()
                 if func_name and func_name != "(null)":
                     current_function = func_name
-                    functions.append({"name": current_function, "instructions": 0})
+                    selected = selects is None or selects(current_function)
+                    if selected:
+                        functions.append({"name": current_function, "instructions": 0})
                 continue
 
             # Detect filename
@@ -695,6 +282,12 @@ class PHPAnalyzer(ScriptAnalyzer):
             if not in_opcode_section:
                 continue
 
+            # Functions excluded by the filter are not tokenized at all
+            if not selected:
+                if not line_stripped:
+                    in_opcode_section = False
+                continue
+
             # Parse opcode line
             # Format: line# index flags opcode [fetch] [ext] [return] operands
             # Line number is optional (continuation lines don't have it)
@@ -718,10 +311,6 @@ class PHPAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            # Check if we should skip this function
-            if filter_pattern and current_function:
-                if not filter_pattern.search(current_function):
-                    continue
 
             opcode_lower = opcode.lower()
 
@@ -736,7 +325,7 @@ class PHPAnalyzer(ScriptAnalyzer):
             elif opcode in ("DO_FCALL", "DO_ICALL", "DO_FCALL_BY_NAME"):
                 if pending_fcall:
                     # Check if this function is dangerous
-                    if pending_fcall in DANGEROUS_PHP_FUNCTIONS["errors"]:
+                    if pending_fcall in function_errors:
                         violations.append(
                             Violation(
                                 function=current_function or "<main>",
@@ -745,11 +334,11 @@ class PHPAnalyzer(ScriptAnalyzer):
                                 address="",
                                 instruction=f"{opcode} {pending_fcall}",
                                 mnemonic=pending_fcall.upper(),
-                                reason=DANGEROUS_PHP_FUNCTIONS["errors"][pending_fcall],
+                                reason=function_errors[pending_fcall],
                                 severity=Severity.ERROR,
                             )
                         )
-                    elif include_warnings and pending_fcall in DANGEROUS_PHP_FUNCTIONS["warnings"]:
+                    elif include_warnings and pending_fcall in function_warnings:
                         violations.append(
                             Violation(
                                 function=current_function or "<main>",
@@ -758,14 +347,14 @@ class PHPAnalyzer(ScriptAnalyzer):
                                 address="",
                                 instruction=f"{opcode} {pending_fcall}",
                                 mnemonic=pending_fcall.upper(),
-                                reason=DANGEROUS_PHP_FUNCTIONS["warnings"][pending_fcall],
+                                reason=function_warnings[pending_fcall],
                                 severity=Severity.WARNING,
                             )
                         )
                     pending_fcall = None
 
             # Check for dangerous opcodes
-            if opcode_lower in DANGEROUS_PHP_OPCODES["errors"]:
+            if opcode_lower in opcode_errors:
                 violations.append(
                     Violation(
                         function=current_function or "<main>",
@@ -774,11 +363,11 @@ class PHPAnalyzer(ScriptAnalyzer):
                         address="",
                         instruction=f"{opcode} {operands}".strip(),
                         mnemonic=opcode.upper(),
-                        reason=DANGEROUS_PHP_OPCODES["errors"][opcode_lower],
+                        reason=opcode_errors[opcode_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and opcode_lower in DANGEROUS_PHP_OPCODES["warnings"]:
+            elif include_warnings and opcode_lower in opcode_warnings:
                 violations.append(
                     Violation(
                         function=current_function or "<main>",
@@ -787,7 +376,7 @@ class PHPAnalyzer(ScriptAnalyzer):
                         address="",
                         instruction=f"{opcode} {operands}".strip(),
                         mnemonic=opcode.upper(),
-                        reason=DANGEROUS_PHP_OPCODES["warnings"][opcode_lower],
+                        reason=opcode_warnings[opcode_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -809,25 +398,25 @@ class PHPAnalyzer(ScriptAnalyzer):
         # with some adjustments
         return self._parse_vld_output(output, include_warnings, function_filter)
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a PHP file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_file}")
 
         # Try VLD first, fall back to OPcache
-        use_vld = self._check_vld_available()
+        use_vld = yield from self._check_vld_available()
 
         if use_vld:
-            success, output = self._get_vld_output(str(source_path.absolute()))
+            success, output = yield from self._get_vld_output(str(source_path.absolute()))
             backend = "vld"
         else:
-            success, output = self._get_opcache_output(str(source_path.absolute()))
+            success, output = yield from self._get_opcache_output(str(source_path.absolute()))
             backend = "opcache"
             print("Note: VLD extension not available, using OPcache debug output", file=sys.stderr)
 
@@ -855,6 +444,12 @@ class PHPAnalyzer(ScriptAnalyzer):
 # JavaScript/TypeScript Analyzer
 # =============================================================================
 
+# One --print-bytecode instruction: optional "<position> S>" and "<address> @",
+# the offset, the encoded bytes (lowercase hex), the opcode and its operands
+_V8_INSTRUCTION = re.compile(
+    r"(?:\d+ [SE]> +)?(?:0x[0-9a-f]+ @ *)?(\d+) *: *(?:[0-9a-f]{2} +)*([A-Za-z][A-Za-z0-9]*)(.*)"
+)
+
 
 class JavaScriptAnalyzer(ScriptAnalyzer):
     """
@@ -869,35 +464,23 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         self.node_path = node_path or "node"
         self.tsc_path = tsc_path or "tsc"
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if Node.js is available."""
         try:
-            result = subprocess.run(
-                [self.node_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.node_path, "--version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _is_tsc_available(self) -> bool:
+    def _is_tsc_available(self) -> ToolSteps[bool]:
         """Check if TypeScript compiler is available."""
         try:
-            result = subprocess.run(
-                [self.tsc_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.tsc_path, "--version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             # Try npx tsc
             try:
-                result = subprocess.run(
-                    ["npx", "tsc", "--version"],
-                    capture_output=True,
-                    text=True,
-                )
+                result = yield ToolRun(["npx", "tsc", "--version"], stage=STAGE_PROBE)
                 if result.returncode == 0:
                     self.tsc_path = "npx tsc"
                     return True
@@ -905,7 +488,9 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 pass
             return False
 
-    def _transpile_typescript(self, source_file: str, output_dir: str) -> tuple[bool, str]:
+    def _transpile_typescript(
+        self, source_file: str, output_dir: str
+    ) -> ToolSteps[tuple[bool, str]]:
         """Transpile TypeScript to JavaScript."""
         source_path = Path(source_file)
 
@@ -948,7 +533,7 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         cmd.append(str(source_path.absolute()))
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
             return True, str(output_file)
@@ -957,7 +542,7 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
 
     def _get_v8_bytecode(
         self, source_file: str, function_filter: str | None = None
-    ) -> tuple[bool, str]:
+    ) -> ToolSteps[tuple[bool, str]]:
         """Get V8 bytecode output for a JavaScript file."""
         cmd = [self.node_path, "--print-bytecode"]
 
@@ -967,7 +552,7 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         cmd.append(source_file)
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             # V8 bytecode goes to stdout
             return True, result.stdout
         except FileNotFoundError:
@@ -997,13 +582,16 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 8 : Div r1
                10 : Return
         """
+        bytecode_errors = DANGEROUS_JS_BYTECODES["errors"]
+        bytecode_warnings = DANGEROUS_JS_BYTECODES["warnings"]
         functions = []
         violations = []
 
         current_function = None
         current_file = source_file
         in_bytecode_section = False
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         # Track function calls
         pending_call: str | None = None
@@ -1019,7 +607,9 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 # Skip internal Node.js functions
                 if func_name and not func_name.startswith("__"):
                     current_function = func_name
-                    functions.append({"name": current_function, "instructions": 0})
+                    selected = selects is None or selects(current_function)
+                    if selected:
+                        functions.append({"name": current_function, "instructions": 0})
                     in_bytecode_section = True
                 continue
 
@@ -1028,7 +618,8 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 in_bytecode_section = False
                 continue
 
-            if not in_bytecode_section:
+            # Functions excluded by the filter are not tokenized at all
+            if not in_bytecode_section or not selected:
                 continue
 
             # Skip metadata lines
@@ -1046,10 +637,10 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 continue
 
             # Parse bytecode instruction
-            # Format: offset : Instruction [operands]
-            bytecode_match = re.match(
-                r"\s*(\d+)\s*:\s*([A-Za-z][A-Za-z0-9]*)\s*(.*)", line_stripped
-            )
+            # Format: offset : Instruction [operands]; current Node versions
+            # prefix a source position and address and insert the encoding:
+            #   37402 S> 0x34fae8a0cc56 @    0 : 17 02    LdaImmutableCurrentContextSlot [2]
+            bytecode_match = _V8_INSTRUCTION.match(line_stripped)
 
             if not bytecode_match:
                 continue
@@ -1062,11 +653,6 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            # Check if we should skip this function
-            if filter_pattern and current_function:
-                if not filter_pattern.search(current_function):
-                    continue
-
             instruction_lower = instruction.lower()
 
             # Track function calls
@@ -1084,7 +670,7 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 pending_call = operands.lower()
 
             # Check for dangerous bytecodes
-            if instruction_lower in DANGEROUS_JS_BYTECODES["errors"]:
+            if instruction_lower in bytecode_errors:
                 violations.append(
                     Violation(
                         function=current_function or "<anonymous>",
@@ -1093,11 +679,11 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_JS_BYTECODES["errors"][instruction_lower],
+                        reason=bytecode_errors[instruction_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and instruction_lower in DANGEROUS_JS_BYTECODES["warnings"]:
+            elif include_warnings and instruction_lower in bytecode_warnings:
                 violations.append(
                     Violation(
                         function=current_function or "<anonymous>",
@@ -1106,7 +692,7 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_JS_BYTECODES["warnings"][instruction_lower],
+                        reason=bytecode_warnings[instruction_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -1222,12 +808,12 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
 
         return violations
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a JavaScript or TypeScript file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
@@ -1238,31 +824,33 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
 
         # Handle TypeScript
         if is_typescript:
-            if not self._is_tsc_available():
+            if not (yield from self._is_tsc_available()):
                 raise RuntimeError(
                     "TypeScript compiler not found. Install with: npm install -g typescript"
                 )
 
             with tempfile.TemporaryDirectory() as tmpdir:
-                success, result = self._transpile_typescript(source_file, tmpdir)
+                success, result = yield from self._transpile_typescript(source_file, tmpdir)
                 if not success:
                     raise RuntimeError(f"TypeScript compilation failed: {result}")
                 js_file = result
 
                 # Analyze the transpiled JS
-                return self._analyze_js(
+                report = yield from self._analyze_js(
                     js_file,
                     source_file,  # Report against original TS file
                     include_warnings,
                     function_filter,
                 )
+                return report
         else:
-            return self._analyze_js(
+            report = yield from self._analyze_js(
                 js_file,
                 source_file,
                 include_warnings,
                 function_filter,
             )
+            return report
 
     def _analyze_js(
         self,
@@ -1270,9 +858,9 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         report_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a JavaScript file."""
-        success, output = self._get_v8_bytecode(js_file, function_filter)
+        success, output = yield from self._get_v8_bytecode(js_file, function_filter)
         if not success:
             raise RuntimeError(f"Failed to get V8 bytecode: {output}")
 
@@ -1335,19 +923,15 @@ class PythonAnalyzer(ScriptAnalyzer):
     def __init__(self, python_path: str | None = None):
         self.python_path = python_path or "python3"
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if Python is available."""
         try:
-            result = subprocess.run(
-                [self.python_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.python_path, "--version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _get_dis_output(self, source_file: str) -> tuple[bool, str]:
+    def _get_dis_output(self, source_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get Python dis module output for bytecode disassembly."""
         cmd = [
             self.python_path,
@@ -1357,7 +941,7 @@ class PythonAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             # dis outputs to stdout
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
@@ -1392,11 +976,15 @@ class PythonAnalyzer(ScriptAnalyzer):
                       6 BINARY_OP               11 (/)
                       8 STORE_FAST               2 (result)
         """
+        bytecode_errors = DANGEROUS_PYTHON_BYTECODES["errors"]
+        bytecode_warnings = DANGEROUS_PYTHON_BYTECODES["warnings"]
         functions = []
         violations = []
 
         current_function = None
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        current_line = None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         for line in output.split("\n"):
             line_stripped = line.strip()
@@ -1407,13 +995,22 @@ class PythonAnalyzer(ScriptAnalyzer):
             if func_match:
                 func_name = func_match.group(1).strip()
                 current_function = func_name
-                functions.append({"name": current_function, "instructions": 0})
+                current_line = None
+                selected = selects is None or selects(current_function)
+                if selected:
+                    functions.append({"name": current_function, "instructions": 0})
                 continue
 
             # Also detect module-level code
             if line_stripped.startswith("Disassembly of") and "<module>" in line_stripped:
                 current_function = "<module>"
-                functions.append({"name": current_function, "instructions": 0})
+                selected = selects is None or selects(current_function)
+                if selected:
+                    functions.append({"name": current_function, "instructions": 0})
+                continue
+
+            # Functions excluded by the filter are not tokenized at all
+            if not selected:
                 continue
 
             # Parse bytecode instruction
@@ -1428,7 +1025,10 @@ class PythonAnalyzer(ScriptAnalyzer):
             if not bytecode_match:
                 continue
 
-            line_num = int(bytecode_match.group(1)) if bytecode_match.group(1) else None
+            # The line number is only printed on the first instruction of each line
+            if bytecode_match.group(1):
+                current_line = int(bytecode_match.group(1))
+            line_num = current_line
             offset = bytecode_match.group(2)
             instruction = bytecode_match.group(3).strip()
             operands = bytecode_match.group(4).strip() if bytecode_match.group(4) else ""
@@ -1437,10 +1037,6 @@ class PythonAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            # Check if we should skip this function
-            if filter_pattern and current_function:
-                if not filter_pattern.search(current_function):
-                    continue
 
             instruction_lower = instruction.lower()
 
@@ -1467,7 +1063,7 @@ class PythonAnalyzer(ScriptAnalyzer):
                 continue
 
             # Check for dangerous bytecodes (Python < 3.11)
-            if instruction_lower in DANGEROUS_PYTHON_BYTECODES["errors"]:
+            if instruction_lower in bytecode_errors:
                 violations.append(
                     Violation(
                         function=current_function or "<module>",
@@ -1476,11 +1072,11 @@ class PythonAnalyzer(ScriptAnalyzer):
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_PYTHON_BYTECODES["errors"][instruction_lower],
+                        reason=bytecode_errors[instruction_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and instruction_lower in DANGEROUS_PYTHON_BYTECODES["warnings"]:
+            elif include_warnings and instruction_lower in bytecode_warnings:
                 violations.append(
                     Violation(
                         function=current_function or "<module>",
@@ -1489,7 +1085,7 @@ class PythonAnalyzer(ScriptAnalyzer):
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_PYTHON_BYTECODES["warnings"][instruction_lower],
+                        reason=bytecode_warnings[instruction_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -1553,18 +1149,18 @@ class PythonAnalyzer(ScriptAnalyzer):
 
         return violations
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a Python file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_file}")
 
-        success, output = self._get_dis_output(str(source_path.absolute()))
+        success, output = yield from self._get_dis_output(str(source_path.absolute()))
         if not success:
             raise RuntimeError(f"Failed to get Python bytecode: {output}")
 
@@ -1615,19 +1211,15 @@ class RubyAnalyzer(ScriptAnalyzer):
     def __init__(self, ruby_path: str | None = None):
         self.ruby_path = ruby_path or "ruby"
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if Ruby is available."""
         try:
-            result = subprocess.run(
-                [self.ruby_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.ruby_path, "--version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _get_yarv_output(self, source_file: str) -> tuple[bool, str]:
+    def _get_yarv_output(self, source_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get Ruby YARV instruction sequence dump."""
         # Use --dump=insns to get instruction sequence
         cmd = [
@@ -1637,7 +1229,7 @@ class RubyAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             # Ruby dumps to stdout
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
@@ -1670,12 +1262,15 @@ class RubyAnalyzer(ScriptAnalyzer):
         0004 opt_div                                <calldata!mid:/, argc:1, ARGS_SIMPLE>
         0006 leave
         """
+        bytecode_errors = DANGEROUS_RUBY_BYTECODES["errors"]
+        bytecode_warnings = DANGEROUS_RUBY_BYTECODES["warnings"]
         functions = []
         violations = []
 
         current_function = None
         current_line = None
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         for line in output.split("\n"):
             line_stripped = line.strip()
@@ -1689,7 +1284,13 @@ class RubyAnalyzer(ScriptAnalyzer):
                 start_line = int(func_match.group(3))
                 current_function = func_name
                 current_line = start_line
-                functions.append({"name": current_function, "instructions": 0})
+                selected = selects is None or selects(current_function)
+                if selected:
+                    functions.append({"name": current_function, "instructions": 0})
+                continue
+
+            # Functions excluded by the filter are not tokenized at all
+            if not selected:
                 continue
 
             # Skip local table and other metadata lines
@@ -1714,15 +1315,11 @@ class RubyAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            # Check if we should skip this function
-            if filter_pattern and current_function:
-                if not filter_pattern.search(current_function):
-                    continue
 
             instruction_lower = instruction.lower()
 
             # Check for dangerous bytecodes
-            if instruction_lower in DANGEROUS_RUBY_BYTECODES["errors"]:
+            if instruction_lower in bytecode_errors:
                 violations.append(
                     Violation(
                         function=current_function or "<main>",
@@ -1731,11 +1328,11 @@ class RubyAnalyzer(ScriptAnalyzer):
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_RUBY_BYTECODES["errors"][instruction_lower],
+                        reason=bytecode_errors[instruction_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and instruction_lower in DANGEROUS_RUBY_BYTECODES["warnings"]:
+            elif include_warnings and instruction_lower in bytecode_warnings:
                 violations.append(
                     Violation(
                         function=current_function or "<main>",
@@ -1744,7 +1341,7 @@ class RubyAnalyzer(ScriptAnalyzer):
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_RUBY_BYTECODES["warnings"][instruction_lower],
+                        reason=bytecode_warnings[instruction_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -1816,18 +1413,18 @@ class RubyAnalyzer(ScriptAnalyzer):
 
         return violations
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a Ruby file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_file}")
 
-        success, output = self._get_yarv_output(str(source_path.absolute()))
+        success, output = yield from self._get_yarv_output(str(source_path.absolute()))
         if not success:
             raise RuntimeError(f"Failed to get Ruby bytecode: {output}")
 
@@ -1879,26 +1476,18 @@ class JavaAnalyzer(ScriptAnalyzer):
         self.javac_path = javac_path or "javac"
         self.javap_path = javap_path or "javap"
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if Java compiler and disassembler are available."""
         try:
-            result = subprocess.run(
-                [self.javac_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.javac_path, "-version"], stage=STAGE_PROBE)
             if result.returncode != 0:
                 return False
-            result = subprocess.run(
-                [self.javap_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.javap_path, "-version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _compile_java(self, source_file: str, output_dir: str) -> tuple[bool, str]:
+    def _compile_java(self, source_file: str, output_dir: str) -> ToolSteps[tuple[bool, str]]:
         """Compile Java source to class files."""
         cmd = [
             self.javac_path,
@@ -1908,14 +1497,14 @@ class JavaAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
             return True, output_dir
         except FileNotFoundError:
             return False, f"Java compiler not found: {self.javac_path}"
 
-    def _get_bytecode_output(self, class_file: str) -> tuple[bool, str]:
+    def _get_bytecode_output(self, class_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get javap bytecode disassembly for a class file."""
         cmd = [
             self.javap_path,
@@ -1926,7 +1515,7 @@ class JavaAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
             return True, result.stdout
@@ -1954,6 +1543,8 @@ class JavaAnalyzer(ScriptAnalyzer):
             LineNumberTable:
               line 5: 0
         """
+        bytecode_errors = DANGEROUS_JAVA_BYTECODES["errors"]
+        bytecode_warnings = DANGEROUS_JAVA_BYTECODES["warnings"]
         functions = []
         violations = []
 
@@ -1961,7 +1552,8 @@ class JavaAnalyzer(ScriptAnalyzer):
         current_class = None
         current_line = None
         in_code_section = False
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         # Line number table mapping: bytecode offset -> source line
         line_number_table: dict[int, int] = {}
@@ -1988,12 +1580,18 @@ class JavaAnalyzer(ScriptAnalyzer):
                     current_method = f"{current_class}.{method_name}"
                 else:
                     current_method = method_name
-                functions.append({"name": current_method, "instructions": 0})
+                selected = selects is None or selects(current_method)
+                if selected:
+                    functions.append({"name": current_method, "instructions": 0})
                 in_code_section = False
                 in_line_number_table = False
                 line_number_table = {}
                 continue
 
+            # Methods excluded by the filter are not tokenized at all
+            if not selected:
+                continue
+
             # Detect Code section start
             if line_stripped == "Code:":
                 in_code_section = True
@@ -2045,15 +1643,11 @@ class JavaAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            # Check if we should skip this method
-            if filter_pattern and current_method:
-                if not filter_pattern.search(current_method):
-                    continue
 
             instruction_lower = instruction.lower()
 
             # Check for dangerous bytecodes
-            if instruction_lower in DANGEROUS_JAVA_BYTECODES["errors"]:
+            if instruction_lower in bytecode_errors:
                 violations.append(
                     Violation(
                         function=current_method or "<unknown>",
@@ -2062,11 +1656,11 @@ class JavaAnalyzer(ScriptAnalyzer):
                         address=str(offset),
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_JAVA_BYTECODES["errors"][instruction_lower],
+                        reason=bytecode_errors[instruction_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and instruction_lower in DANGEROUS_JAVA_BYTECODES["warnings"]:
+            elif include_warnings and instruction_lower in bytecode_warnings:
                 violations.append(
                     Violation(
                         function=current_method or "<unknown>",
@@ -2075,7 +1669,7 @@ class JavaAnalyzer(ScriptAnalyzer):
                         address=str(offset),
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_JAVA_BYTECODES["warnings"][instruction_lower],
+                        reason=bytecode_warnings[instruction_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -2150,12 +1744,12 @@ class JavaAnalyzer(ScriptAnalyzer):
 
         return violations
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a Java file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
@@ -2163,7 +1757,7 @@ class JavaAnalyzer(ScriptAnalyzer):
 
         with tempfile.TemporaryDirectory() as tmpdir:
             # Compile Java source
-            success, result = self._compile_java(str(source_path.absolute()), tmpdir)
+            success, result = yield from self._compile_java(str(source_path.absolute()), tmpdir)
             if not success:
                 raise RuntimeError(f"Java compilation failed: {result}")
 
@@ -2177,7 +1771,7 @@ class JavaAnalyzer(ScriptAnalyzer):
 
             # Analyze each class file
             for class_file in class_files:
-                success, output = self._get_bytecode_output(str(class_file))
+                success, output = yield from self._get_bytecode_output(str(class_file))
                 if not success:
                     continue
 
@@ -2232,26 +1826,18 @@ class KotlinAnalyzer(ScriptAnalyzer):
         self.kotlinc_path = kotlinc_path or "kotlinc"
         self.javap_path = javap_path or "javap"
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if Kotlin compiler and Java disassembler are available."""
         try:
-            result = subprocess.run(
-                [self.kotlinc_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.kotlinc_path, "-version"], stage=STAGE_PROBE)
             if result.returncode != 0:
                 return False
-            result = subprocess.run(
-                [self.javap_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.javap_path, "-version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _compile_kotlin(self, source_file: str, output_dir: str) -> tuple[bool, str]:
+    def _compile_kotlin(self, source_file: str, output_dir: str) -> ToolSteps[tuple[bool, str]]:
         """Compile Kotlin source to class files."""
         cmd = [
             self.kotlinc_path,
@@ -2261,14 +1847,14 @@ class KotlinAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd)
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
             return True, output_dir
         except FileNotFoundError:
             return False, f"Kotlin compiler not found: {self.kotlinc_path}"
 
-    def _get_bytecode_output(self, class_file: str) -> tuple[bool, str]:
+    def _get_bytecode_output(self, class_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get javap bytecode disassembly for a class file."""
         cmd = [
             self.javap_path,
@@ -2279,7 +1865,7 @@ class KotlinAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = yield ToolRun(cmd, stage=STAGE_DISASSEMBLE)
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
             return True, result.stdout
@@ -2294,6 +1880,8 @@ class KotlinAnalyzer(ScriptAnalyzer):
         function_filter: str | None = None,
     ) -> tuple[list[dict], list[Violation]]:
         """Parse javap bytecode output for dangerous operations (same as Java)."""
+        bytecode_errors = DANGEROUS_KOTLIN_BYTECODES["errors"]
+        bytecode_warnings = DANGEROUS_KOTLIN_BYTECODES["warnings"]
         functions = []
         violations = []
 
@@ -2301,7 +1889,8 @@ class KotlinAnalyzer(ScriptAnalyzer):
         current_class = None
         current_line = None
         in_code_section = False
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         line_number_table: dict[int, int] = {}
         in_line_number_table = False
@@ -2327,12 +1916,18 @@ class KotlinAnalyzer(ScriptAnalyzer):
                     current_method = f"{current_class}.{method_name}"
                 else:
                     current_method = method_name
-                functions.append({"name": current_method, "instructions": 0})
+                selected = selects is None or selects(current_method)
+                if selected:
+                    functions.append({"name": current_method, "instructions": 0})
                 in_code_section = False
                 in_line_number_table = False
                 line_number_table = {}
                 continue
 
+            # Methods excluded by the filter are not tokenized at all
+            if not selected:
+                continue
+
             # Detect Code section start
             if line_stripped == "Code:":
                 in_code_section = True
@@ -2378,14 +1973,11 @@ class KotlinAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            if filter_pattern and current_method:
-                if not filter_pattern.search(current_method):
-                    continue
 
             instruction_lower = instruction.lower()
 
             # Check for dangerous bytecodes (same as Java since Kotlin compiles to JVM)
-            if instruction_lower in DANGEROUS_KOTLIN_BYTECODES["errors"]:
+            if instruction_lower in bytecode_errors:
                 violations.append(
                     Violation(
                         function=current_method or "<unknown>",
@@ -2394,11 +1986,11 @@ class KotlinAnalyzer(ScriptAnalyzer):
                         address=str(offset),
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_KOTLIN_BYTECODES["errors"][instruction_lower],
+                        reason=bytecode_errors[instruction_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and instruction_lower in DANGEROUS_KOTLIN_BYTECODES["warnings"]:
+            elif include_warnings and instruction_lower in bytecode_warnings:
                 violations.append(
                     Violation(
                         function=current_method or "<unknown>",
@@ -2407,7 +1999,7 @@ class KotlinAnalyzer(ScriptAnalyzer):
                         address=str(offset),
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_KOTLIN_BYTECODES["warnings"][instruction_lower],
+                        reason=bytecode_warnings[instruction_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -2498,12 +2090,12 @@ class KotlinAnalyzer(ScriptAnalyzer):
 
         return violations
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a Kotlin file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
@@ -2511,7 +2103,7 @@ class KotlinAnalyzer(ScriptAnalyzer):
 
         with tempfile.TemporaryDirectory() as tmpdir:
             # Compile Kotlin source
-            success, result = self._compile_kotlin(str(source_path.absolute()), tmpdir)
+            success, result = yield from self._compile_kotlin(str(source_path.absolute()), tmpdir)
             if not success:
                 raise RuntimeError(f"Kotlin compilation failed: {result}")
 
@@ -2525,7 +2117,7 @@ class KotlinAnalyzer(ScriptAnalyzer):
 
             # Analyze each class file
             for class_file in class_files:
-                success, output = self._get_bytecode_output(str(class_file))
+                success, output = yield from self._get_bytecode_output(str(class_file))
                 if not success:
                     continue
 
@@ -2578,19 +2170,15 @@ class CSharpAnalyzer(ScriptAnalyzer):
     def __init__(self, dotnet_path: str | None = None):
         self.dotnet_path = dotnet_path or "dotnet"
 
-    def is_available(self) -> bool:
+    def availability_steps(self) -> ToolSteps[bool]:
         """Check if .NET SDK is available."""
         try:
-            result = subprocess.run(
-                [self.dotnet_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun([self.dotnet_path, "--version"], stage=STAGE_PROBE)
             return result.returncode == 0
         except FileNotFoundError:
             return False
 
-    def _compile_csharp(self, source_file: str, output_dir: str) -> tuple[bool, str]:
+    def _compile_csharp(self, source_file: str, output_dir: str) -> ToolSteps[tuple[bool, str]]:
         """Compile C# source to DLL using dotnet build."""
         source_path = Path(source_file)
         output_dll = Path(output_dir) / f"{source_path.stem}.dll"
@@ -2623,7 +2211,8 @@ class CSharpAnalyzer(ScriptAnalyzer):
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=output_dir)
+            # The project names the source; declare it so stored builds track it
+            result = yield ToolRun(cmd, cwd=output_dir, inputs=(str(source_path.absolute()),))
             if result.returncode != 0:
                 return False, result.stderr or result.stdout
 
@@ -2636,15 +2225,11 @@ class CSharpAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f".NET SDK not found: {self.dotnet_path}"
 
-    def _get_il_output(self, dll_file: str) -> tuple[bool, str]:
+    def _get_il_output(self, dll_file: str) -> ToolSteps[tuple[bool, str]]:
         """Get IL disassembly for a .NET assembly."""
         # First try ilspycmd directly (globally installed and in PATH)
         try:
-            result = subprocess.run(
-                ["ilspycmd", "-il", dll_file],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun(["ilspycmd", "-il", dll_file], stage=STAGE_DISASSEMBLE)
             if result.returncode == 0:
                 return True, result.stdout
         except FileNotFoundError:
@@ -2652,10 +2237,9 @@ class CSharpAnalyzer(ScriptAnalyzer):
 
         # Try as local tool
         try:
-            result = subprocess.run(
+            result = yield ToolRun(
                 [self.dotnet_path, "tool", "run", "ilspycmd", "-il", dll_file],
-                capture_output=True,
-                text=True,
+                stage=STAGE_DISASSEMBLE,
             )
             if result.returncode == 0:
                 return True, result.stdout
@@ -2678,11 +2262,10 @@ class CSharpAnalyzer(ScriptAnalyzer):
                         try:
                             env = os.environ.copy()
                             env["DOTNET_ROOT"] = str(Path(dotnet8).parent)
-                            result = subprocess.run(
+                            result = yield ToolRun(
                                 [dotnet8, str(dll_path), "-il", dll_file],
-                                capture_output=True,
-                                text=True,
                                 env=env,
+                                stage=STAGE_DISASSEMBLE,
                             )
                             if result.returncode == 0:
                                 return True, result.stdout
@@ -2692,11 +2275,7 @@ class CSharpAnalyzer(ScriptAnalyzer):
 
         # Try monodis (available on Linux/macOS with Mono)
         try:
-            result = subprocess.run(
-                ["monodis", "--method", dll_file],
-                capture_output=True,
-                text=True,
-            )
+            result = yield ToolRun(["monodis", "--method", dll_file], stage=STAGE_DISASSEMBLE)
             if result.returncode == 0:
                 return True, result.stdout
         except FileNotFoundError:
@@ -2732,13 +2311,16 @@ class CSharpAnalyzer(ScriptAnalyzer):
           IL_0003: ret
         }
         """
+        bytecode_errors = DANGEROUS_CSHARP_BYTECODES["errors"]
+        bytecode_warnings = DANGEROUS_CSHARP_BYTECODES["warnings"]
         functions = []
         violations = []
 
         current_method = None
         in_method = False
         in_method_decl = False  # Between .method and {
-        filter_pattern = re.compile(function_filter) if function_filter else None
+        selects = compile_function_filter(function_filter)
+        selected = True
 
         for line in output.split("\n"):
             line_stripped = line.strip()
@@ -2755,7 +2337,8 @@ class CSharpAnalyzer(ScriptAnalyzer):
                 if "{" in line_stripped:
                     in_method_decl = False
                     in_method = True
-                    if current_method:
+                    selected = selects is None or not current_method or selects(current_method)
+                    if current_method and selected:
                         functions.append({"name": current_method, "instructions": 0})
                 continue
 
@@ -2770,7 +2353,8 @@ class CSharpAnalyzer(ScriptAnalyzer):
                 if "{" in line_stripped:
                     in_method_decl = False
                     in_method = True
-                    if current_method:
+                    selected = selects is None or not current_method or selects(current_method)
+                    if current_method and selected:
                         functions.append({"name": current_method, "instructions": 0})
                 continue
 
@@ -2779,7 +2363,8 @@ class CSharpAnalyzer(ScriptAnalyzer):
                 in_method = False
                 continue
 
-            if not in_method:
+            # Methods excluded by the filter are not tokenized at all
+            if not in_method or not selected:
                 continue
 
             # Parse IL instruction
@@ -2797,15 +2382,11 @@ class CSharpAnalyzer(ScriptAnalyzer):
             if functions:
                 functions[-1]["instructions"] += 1
 
-            # Check if we should skip this method
-            if filter_pattern and current_method:
-                if not filter_pattern.search(current_method):
-                    continue
 
             instruction_lower = instruction.lower()
 
             # Check for dangerous bytecodes
-            if instruction_lower in DANGEROUS_CSHARP_BYTECODES["errors"]:
+            if instruction_lower in bytecode_errors:
                 violations.append(
                     Violation(
                         function=current_method or "<unknown>",
@@ -2814,11 +2395,11 @@ class CSharpAnalyzer(ScriptAnalyzer):
                         address=f"IL_{offset}",
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_CSHARP_BYTECODES["errors"][instruction_lower],
+                        reason=bytecode_errors[instruction_lower],
                         severity=Severity.ERROR,
                     )
                 )
-            elif include_warnings and instruction_lower in DANGEROUS_CSHARP_BYTECODES["warnings"]:
+            elif include_warnings and instruction_lower in bytecode_warnings:
                 violations.append(
                     Violation(
                         function=current_method or "<unknown>",
@@ -2827,7 +2408,7 @@ class CSharpAnalyzer(ScriptAnalyzer):
                         address=f"IL_{offset}",
                         instruction=f"{instruction} {operands}".strip(),
                         mnemonic=instruction.upper(),
-                        reason=DANGEROUS_CSHARP_BYTECODES["warnings"][instruction_lower],
+                        reason=bytecode_warnings[instruction_lower],
                         severity=Severity.WARNING,
                     )
                 )
@@ -2973,12 +2554,12 @@ class CSharpAnalyzer(ScriptAnalyzer):
             violations=violations,
         )
 
-    def analyze(
+    def analyze_steps(
         self,
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
-    ) -> AnalysisReport:
+    ) -> ToolSteps[AnalysisReport]:
         """Analyze a C# file for constant-time violations."""
         source_path = Path(source_file)
         if not source_path.exists():
@@ -2986,7 +2567,7 @@ class CSharpAnalyzer(ScriptAnalyzer):
 
         with tempfile.TemporaryDirectory() as tmpdir:
             # Try to compile C# source
-            success, result = self._compile_csharp(str(source_path.absolute()), tmpdir)
+            success, result = yield from self._compile_csharp(str(source_path.absolute()), tmpdir)
             if not success:
                 # Fall back to source-only analysis
                 print(
@@ -2996,7 +2577,7 @@ class CSharpAnalyzer(ScriptAnalyzer):
                 return self._analyze_source_only(source_file, include_warnings)
 
             # Get IL disassembly
-            success, output = self._get_il_output(result)
+            success, output = yield from self._get_il_output(result)
             if not success:
                 # Fall back to source-only analysis
                 print(
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Long-running analysis server for constant-time analysis.
+
+`ct-analyzer serve` keeps one process resident with its modules imported,
+toolchains probed and recent results cached, and answers requests on a
+local Unix socket. Editor integrations and high-frequency CI jobs then skip
+interpreter startup and toolchain discovery on every file.
+
+The protocol is newline-delimited JSON. A client sends one request line:
+
+    {"method": "analyze_source", "params": {"source_file": "/abs/crypto.c"}}
+
+and the server answers with the same record stream as `--ndjson` (a header,
+one record per violation as soon as it is found, and a summary), or with a
+single {"type": "error"} record. Other methods ("ping", "stats",
+"clear_cache", "shutdown") answer with one {"type": "result"} record.
+
+Analyses run one at a time in the client's working directory, so relative
+paths in compiler flags resolve as they would for a local run. The server's
+own environment (PATH, toolchain versions) is used, not the client's.
+"""
+
+import argparse
+import dataclasses
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import (
+        AnalysisReport,
+        LimitEvent,
+        ToolLimits,
+        Violation,
+        analyze_assembly,
+        analyze_source,
+        clear_toolchain_cache,
+        detect_language,
+        is_bytecode_language,
+        violation_from_dict,
+    )
+    from .report_writers import NDJSONWriter
+except ImportError:
+    from analyzer import (
+        AnalysisReport,
+        LimitEvent,
+        ToolLimits,
+        Violation,
+        analyze_assembly,
+        analyze_source,
+        clear_toolchain_cache,
+        detect_language,
+        is_bytecode_language,
+        violation_from_dict,
+    )
+    from report_writers import NDJSONWriter
+
+
+# =============================================================================
+# Protocol
+# =============================================================================
+
+# Keyword arguments accepted for each analysis method; the first is the input path
+ANALYSIS_PARAMS = {
+    "analyze_source": (
+        "source_file",
+        "arch",
+        "compiler",
+        "optimization",
+        "include_warnings",
+        "function_filter",
+        "extra_flags",
+        "limits",
+        "changed_lines",
+        "debug_info",
+    ),
+    "analyze_assembly": (
+        "assembly_file",
+        "arch",
+        "include_warnings",
+        "function_filter",
+        "jobs",
+    ),
+}
+
+DEFAULT_CACHE_SIZE = 256
+
+
+def default_socket_path() -> str:
+    """Per-user socket path, under $XDG_RUNTIME_DIR when it is set."""
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, f"ct-analyzer-{os.getuid()}.sock")
+
+
+class ServerUnavailable(ConnectionError):
+    """No server is listening on the socket."""
+
+
+# =============================================================================
+# Result Cache
+# =============================================================================
+
+
+class ResultCache:
+    """
+    LRU cache of finished reports keyed by request and input file state.
+
+    Only inputs whose result depends on nothing but the file itself are
+    cached: assembly files and bytecode-analyzed languages. Compiled sources
+    are always rebuilt, since a header they include may have changed.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._reports: OrderedDict[tuple, AnalysisReport] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(method: str, params: dict) -> tuple | None:
+        """Cache key for a request, or None if its result may not be cached."""
+        path = params[ANALYSIS_PARAMS[method][0]]
+        if method == "analyze_source" and not is_bytecode_language(detect_language(path)):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        options = json.dumps(params, sort_keys=True)
+        return (method, options, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def get(self, key: tuple) -> AnalysisReport | None:
+        with self._lock:
+            report = self._reports.get(key)
+            if report is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._reports.move_to_end(key)
+            return report
+
+    def put(self, key: tuple, report: AnalysisReport) -> None:
+        with self._lock:
+            self._reports[key] = report
+            self._reports.move_to_end(key)
+            while len(self._reports) > self.maxsize:
+                self._reports.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reports.clear()
+
+    def __len__(self) -> int:
+        return len(self._reports)
+
+
+# =============================================================================
+# Server
+# =============================================================================
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle one request per connection."""
+
+    server: "AnalysisServer"
+
+    def handle(self) -> None:
+        stream = io.TextIOWrapper(self.wfile, encoding="utf-8", line_buffering=True)
+        try:
+            try:
+                request = json.loads(self.rfile.readline())
+                method = request["method"]
+                params = dict(request.get("params") or {})
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(stream, {"type": "error", "error": f"Malformed request: {e}"})
+                return
+
+            if method in ANALYSIS_PARAMS:
+                self.server.analyze(method, params, request.get("cwd"), stream)
+            else:
+                self._send(stream, self.server.control(method))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; nothing left to report to
+            pass
+        finally:
+            try:
+                stream.detach()
+            except ValueError:
+                pass
+
+    @staticmethod
+    def _send(stream: io.TextIOBase, record: dict) -> None:
+        stream.write(json.dumps(record) + "\n")
+
+
+class AnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Unix socket server answering analysis requests from a warm process.
+
+    Connections are handled on threads so "ping" and "stats" answer while an
+    analysis runs; the analyses themselves are serialized.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.socket_path = socket_path
+        self.results = ResultCache(cache_size)
+        self.started = time.time()
+        self.requests = 0
+        self._analysis_lock = threading.Lock()
+        _remove_stale_socket(socket_path)
+        # The socket inherits the umask; keep it private to this user
+        umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+    def analyze(self, method: str, params: dict, cwd: str | None, stream: io.TextIOBase) -> None:
+        """Run one analysis request, streaming NDJSON records to stream."""
+        allowed = ANALYSIS_PARAMS[method]
+        unknown = sorted(set(params) - set(allowed))
+        path = params.get(allowed[0])
+        options = dict(params)
+        error = None
+        if unknown or not path:
+            error = f"Unknown parameters: {', '.join(unknown)}" if unknown else "Missing input"
+        elif "limits" in options:
+            try:
+                options["limits"] = ToolLimits(**options["limits"])
+            except TypeError as e:
+                error = f"Invalid limits: {e}"
+        if error is not None:
+            stream.write(json.dumps({"type": "error", "error": error}) + "\n")
+            return
+
+        writer = NDJSONWriter(stream, path)
+        writer.start()
+        with self._analysis_lock:
+            self.requests += 1
+            previous = os.getcwd()
+            try:
+                if cwd:
+                    os.chdir(cwd)
+                key = ResultCache.key(method, params)
+                report = self.results.get(key) if key is not None else None
+                if report is not None:
+                    for violation in report.violations:
+                        writer.write(violation)
+                else:
+                    function = analyze_source if method == "analyze_source" else analyze_assembly
+                    report = function(**options, on_violation=writer.write)
+                    # A limit hit may not recur (e.g. a loaded machine), so is not cached
+                    if key is not None and report.limit_exceeded is None:
+                        self.results.put(key, report)
+            except Exception as e:
+                # Parameter values of the wrong type fail inside the analysis;
+                # the record stream the client is reading still gets its end
+                writer.abort(str(e) or type(e).__name__)
+                return
+            finally:
+                os.chdir(previous)
+        writer.finish(report)
+
+    def control(self, method: str) -> dict:
+        """Answer a non-analysis request."""
+        if method == "ping":
+            return {"type": "result", "pid": os.getpid()}
+        if method == "stats":
+            return {
+                "type": "result",
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self.started, 3),
+                "requests": self.requests,
+                "cached_reports": len(self.results),
+                "cache_hits": self.results.hits,
+                "cache_misses": self.results.misses,
+            }
+        if method == "clear_cache":
+            self.results.clear()
+            clear_toolchain_cache()
+            return {"type": "result"}
+        if method == "shutdown":
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {"type": "result"}
+        return {"type": "error", "error": f"Unknown method: {method}"}
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove a socket file left by a server that exited uncleanly."""
+    if not os.path.exists(socket_path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except ConnectionRefusedError:
+        os.unlink(socket_path)
+        return
+    except OSError:
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"A server is already listening on {socket_path}")
+
+
+# =============================================================================
+# Client
+# =============================================================================
+
+
+class AnalysisClient:
+    """
+    Thin client for a running analysis server.
+
+    The analyze methods mirror analyze_source() and analyze_assembly(),
+    including the on_violation callback, and return an AnalysisReport.
+    """
+
+    def __init__(self, socket_path: str | None = None, timeout: float | None = None):
+        self.socket_path = socket_path or default_socket_path()
+        self.timeout = timeout
+
+    def analyze_source(
+        self,
+        source_file: str,
+        on_violation: Callable[[Violation], None] | None = None,
+        **options,
+    ) -> AnalysisReport:
+        """Analyze a source file on the server; options as for analyze_source()."""
+        return self._analyze("analyze_source", source_file, options, on_violation)
+
+    def analyze_assembly(
+        self,
+        assembly_file: str,
+        arch: str,
+        on_violation: Callable[[Violation], None] | None = None,
+        **options,
+    ) -> AnalysisReport:
+        """Analyze an assembly file on the server; options as for analyze_assembly()."""
+        options["arch"] = arch
+        return self._analyze("analyze_assembly", assembly_file, options, on_violation)
+
+    def ping(self) -> dict:
+        return self._control("ping")
+
+    def stats(self) -> dict:
+        return self._control("stats")
+
+    def clear_cache(self) -> dict:
+        return self._control("clear_cache")
+
+    def shutdown(self) -> dict:
+        return self._control("shutdown")
+
+    def _analyze(
+        self,
+        method: str,
+        path: str,
+        options: dict,
+        on_violation: Callable[[Violation], None] | None,
+    ) -> AnalysisReport:
+        params = {ANALYSIS_PARAMS[method][0]: os.path.abspath(path)}
+        params.update((name, value) for name, value in options.items() if value is not None)
+        if "limits" in params:
+            params["limits"] = dataclasses.asdict(params["limits"])
+        violations = []
+        summary = None
+        for record in self._request(method, params):
+            kind = record.get("type")
+            if kind == "violation":
+                violation = violation_from_dict(record)
+                violations.append(violation)
+                if on_violation is not None:
+                    on_violation(violation)
+            elif kind == "summary":
+                summary = record
+            elif kind == "error":
+                raise RuntimeError(record["error"])
+        if summary is None:
+            raise RuntimeError("Server closed the connection before finishing the report")
+        limit = summary.get("limit_exceeded")
+        return AnalysisReport(
+            architecture=summary["architecture"],
+            compiler=summary["compiler"],
+            optimization=summary["optimization"],
+            source_file=str(path),
+            total_functions=summary["total_functions"],
+            total_instructions=summary["total_instructions"],
+            violations=violations,
+            limit_exceeded=limit and LimitEvent(**limit),
+        )
+
+    def _control(self, method: str) -> dict:
+        for record in self._request(method, {}):
+            if record.get("type") == "error":
+                raise RuntimeError(record["error"])
+            return record
+        raise RuntimeError("Server closed the connection without answering")
+
+    def _request(self, method: str, params: dict):
+        """Send one request and yield the records of the reply as they arrive."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            sock.close()
+            raise ServerUnavailable(f"No server listening on {self.socket_path}") from e
+        with sock, sock.makefile("rb") as replies:
+            request = {"method": method, "params": params, "cwd": os.getcwd()}
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            for line in replies:
+                yield json.loads(line)
+
+
+# =============================================================================
+# Command Line
+# =============================================================================
+
+
+def serve(socket_path: str | None = None, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+    """
+    Run the analysis server in the foreground until it is shut down.
+
+    Args:
+        socket_path: Unix socket to listen on (default: default_socket_path())
+        cache_size: Number of finished reports to keep
+    """
+    server = AnalysisServer(socket_path or default_socket_path(), cache_size)
+
+    def stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        print(f"ct-analyzer serving on {server.socket_path}", file=sys.stderr)
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve_main(argv: list[str] | None = None) -> int:
+    """Entry point for `ct-analyzer serve`."""
+    parser = argparse.ArgumentParser(
+        prog="ct-analyzer serve",
+        description="Serve analysis requests from a warm process on a Unix socket",
+    )
+    parser.add_argument(
+        "--socket", help=f"Unix socket path (default: {default_socket_path()})"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help="Number of finished reports to keep in memory",
+    )
+    parser.add_argument(
+        "--stop", action="store_true", help="Ask the running server to shut down and exit"
+    )
+    args = parser.parse_args(argv)
+
+    if args.stop:
+        try:
+            AnalysisClient(args.socket).shutdown()
+        except ServerUnavailable as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    try:
+        serve(args.socket, args.cache_size)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve_main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Sharding batch analysis across CI nodes.
+
+`--shard i/N` analyzes the i-th of N parts of a batch (a scanned directory
+or a `--changed-since` diff). Every node computes the same partition, so
+no coordination is needed:
+
+    ct-analyzer --json --shard 1/4 --timings merged.json src/ > shard1.json
+    ...
+    ct-analyzer merge shard*.json > merged.json
+
+Files are weighted by how long they took in a previous run (the "timings"
+recorded in batch JSON reports and carried over by `merge`), or by size
+when no timing is known, and assigned longest-first to the lightest shard
+so shards finish at about the same time.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import (
+        AnalysisReport,
+        LimitEvent,
+        OutputFormat,
+        format_report,
+        violation_from_dict,
+    )
+except ImportError:
+    from analyzer import (
+        AnalysisReport,
+        LimitEvent,
+        OutputFormat,
+        format_report,
+        violation_from_dict,
+    )
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Parse an "i/N" shard spec (1 <= i <= N).
+
+    Raises:
+        ValueError: The spec is malformed or out of range
+    """
+    index, _, count = spec.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Shard must be i/N, got: {spec}") from None
+    if not 1 <= index <= count:
+        raise ValueError(f"Shard index must be between 1 and {count}, got: {spec}")
+    return index, count
+
+
+def load_timings(path: str) -> dict[str, float]:
+    """
+    Per-file analysis times from a batch or merged JSON report.
+
+    A missing file yields no timings, so the first run can pass the path it
+    will later store the merged report at.
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {name: float(seconds) for name, seconds in (data.get("timings") or {}).items()}
+
+
+def file_weights(paths: list[str], timings: dict[str, float]) -> dict[str, float]:
+    """
+    Estimated analysis cost of each file.
+
+    Recorded timings are used where available. Other files are weighted by
+    size, scaled by the seconds per byte of the timed files so both kinds
+    of estimate are comparable.
+    """
+    sizes = {path: os.path.getsize(path) for path in paths}
+    names = {path: os.path.relpath(path) for path in paths}
+    timed = {path: timings[names[path]] for path in paths if names[path] in timings}
+    timed_bytes = sum(sizes[path] for path in timed)
+    rate = sum(timed.values()) / timed_bytes if timed and timed_bytes else 1.0
+    return {path: timed.get(path, sizes[path] * rate) for path in paths}
+
+
+def partition(weights: dict[str, float], count: int) -> list[list[str]]:
+    """
+    Split files into count shards of similar total weight.
+
+    Files are placed heaviest first onto the lightest shard (ties broken by
+    path and shard number), which depends only on the weights, so every
+    node computes the same partition. Each shard lists its files in path
+    order.
+    """
+    shards: list[list[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for path in sorted(weights, key=lambda path: (-weights[path], path)):
+        lightest = min(range(count), key=lambda index: (loads[index], index))
+        shards[lightest].append(path)
+        loads[lightest] += weights[path]
+    return [sorted(shard) for shard in shards]
+
+
+def select_shard(
+    targets: dict[str, object], spec: str, timings: dict[str, float] | None = None
+) -> dict[str, object]:
+    """The entries of targets (keyed by path) that belong to shard spec."""
+    index, count = parse_shard(spec)
+    shard = partition(file_weights(list(targets), timings or {}), count)[index - 1]
+    return {path: targets[path] for path in shard}
+
+
+# =============================================================================
+# Merging Shard Reports
+# =============================================================================
+
+# "(shard i/N)" suffix of batch report names
+_SHARD_SUFFIX = re.compile(r" \(shard \d+/\d+\)$")
+
+
+# Keys every --json report has; a failed run writes {"error": ...} instead
+REPORT_KEYS = ("source_file", "violations", "error_count", "warning_count", "passed")
+
+
+def check_report(document) -> None:
+    """
+    Check that a parsed document is a --json analysis report.
+
+    Raises:
+        ValueError: The document is an error record or not a report
+    """
+    if not isinstance(document, dict):
+        raise ValueError("not a --json report")
+    if "error" in document:
+        raise ValueError(f"the shard failed: {document['error']}")
+    missing = [key for key in REPORT_KEYS if key not in document]
+    if missing:
+        raise ValueError(f"not a --json report (missing {', '.join(missing)})")
+
+
+def _joined(values: list[str]) -> str:
+    names = sorted({name for value in values for name in value.split(", ") if name != "unknown"})
+    return ", ".join(names) or "unknown"
+
+
+def merge_reports(documents: list[dict]) -> AnalysisReport:
+    """
+    Combine per-shard JSON reports.
+
+    Args:
+        documents: Parsed `--json` reports
+
+    Returns:
+        The combined report. Its counts and result are recomputed from the
+        merged violations, and its timings and failed files are the union
+        of the shards'.
+
+    Raises:
+        ValueError: A document is not a report (see check_report)
+    """
+    for document in documents:
+        check_report(document)
+    violations = []
+    timings: dict[str, float] = {}
+    failed_files: dict[str, str] = {}
+    limit_exceeded = None
+    for document in documents:
+        violations.extend(violation_from_dict(v) for v in document.get("violations", []))
+        timings.update(document.get("timings") or {})
+        failed_files.update(document.get("failed_files") or {})
+        if limit_exceeded is None and document.get("limit_exceeded"):
+            limit_exceeded = LimitEvent(**document["limit_exceeded"])
+
+    return AnalysisReport(
+        architecture=_joined([d.get("architecture", "unknown") for d in documents]),
+        compiler=_joined([d.get("compiler", "unknown") for d in documents]),
+        optimization=_joined([d.get("optimization", "unknown") for d in documents]),
+        source_file=_joined(
+            [_SHARD_SUFFIX.sub("", d.get("source_file", "unknown")) for d in documents]
+        ),
+        total_functions=sum(d.get("total_functions", 0) for d in documents),
+        total_instructions=sum(d.get("total_instructions", 0) for d in documents),
+        violations=violations,
+        limit_exceeded=limit_exceeded,
+        suppressed=sum(d.get("suppressed", 0) for d in documents),
+        timings=dict(sorted(timings.items())),
+        failed_files=dict(sorted(failed_files.items())) or None,
+    )
+
+
+def merge_main(argv: list[str]) -> int:
+    """Command-line entry point for `ct-analyzer merge`."""
+    parser = argparse.ArgumentParser(
+        prog="ct-analyzer merge",
+        description="Combine per-shard --json reports into one report",
+    )
+    parser.add_argument("reports", nargs="+", help="JSON reports written with --shard")
+    parser.add_argument("--output", "-o", help="Write the merged report to a file")
+    args = parser.parse_args(argv)
+
+    documents = []
+    for path in args.reports:
+        try:
+            with open(path) as f:
+                document = json.load(f)
+            check_report(document)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot read {path}: {e}", file=sys.stderr)
+            return 1
+        documents.append(document)
+
+    report = merge_reports(documents)
+    text = format_report(report, OutputFormat.JSON)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0 if report.passed else 1
@@ -17,9 +17,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analyzer import (
     DANGEROUS_INSTRUCTIONS,
+    AnalysisReport,
     AssemblyParser,
     OutputFormat,
     Severity,
+    Violation,
     analyze_assembly,
     analyze_source,
     detect_language,
@@ -591,6 +593,31 @@ Frame size 16
         error_violations = [v for v in violations if v.severity == Severity.ERROR]
         self.assertGreater(len(error_violations), 0, "Should detect Div bytecode")
 
+    def test_parse_v8_node20_format(self):
+        """Parser should read lines with source positions, addresses and encodings."""
+        from script_analyzers import JavaScriptAnalyzer
+
+        v8_output = """
+[generated bytecode for function: reduce (0x34fae8a24871 <SharedFunctionInfo reduce>)]
+Bytecode length: 9
+Parameter count 3
+Register count 1
+Frame size 8
+ 1838 S> 0x34fae8a254e0 @    0 : 0b 04             Ldar a1
+         0x34fae8a254e2 @    2 : c4                Star0
+ 1838 E> 0x34fae8a254ee @    3 : 48 1a 32          ModSmi [26], [50]
+ 1845 S> 0x34fae8a254f2 @    6 : a9                Return
+Constant pool (size = 1)
+           0: 0x12a7c5294b79 <String[3]: #cwd>
+"""
+
+        analyzer = JavaScriptAnalyzer()
+        functions, violations = analyzer._parse_v8_bytecode(v8_output, "test.js")
+
+        self.assertEqual(functions, [{"name": "reduce", "instructions": 4}])
+        self.assertEqual([(v.mnemonic, v.address) for v in violations], [("MODSMI", "3")])
+        self.assertEqual(violations[0].instruction, "ModSmi [26], [50]")
+
     def test_parse_v8_modulo(self):
         """Parser should detect V8 modulo bytecodes."""
         from script_analyzers import JavaScriptAnalyzer
@@ -1393,5 +1420,2438 @@ console.log(vulnerableRandom());
                 raise
 
 
+class TestBinaryAnalyzer(unittest.TestCase):
+    """Test analysis of prebuilt ELF objects and archives.
+
+    These tests build a small object with gcc and may be skipped in
+    environments without a C toolchain.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.samples_dir = Path(__file__).parent / "test_samples"
+        cls.has_toolchain = all(
+            TestIntegration._check_compiler(tool) for tool in ("gcc", "objdump", "ar")
+        )
+
+    def _build_object(self, tmpdir):
+        obj = os.path.join(tmpdir, "decompose.o")
+        subprocess.run(
+            ["gcc", "-O2", "-g", "-c", str(self.samples_dir / "decompose_vulnerable.c"), "-o", obj],
+            check=True,
+            capture_output=True,
+        )
+        return obj
+
+    def test_archive_member_iteration(self):
+        """ar archives should yield their members, resolving GNU long names."""
+        from binary_analyzer import iter_archive_members
+
+        long_name = "a_very_long_member_name.o"
+        long_table = f"{long_name}/\n".encode()
+
+        def member(name, body):
+            header = f"{name:<16}{0:<12}{0:<6}{0:<6}{644:<8}{len(body):<10}`\n".encode()
+            return header + body + (b"\n" if len(body) % 2 else b"")
+
+        archive = (
+            b"!<arch>\n"
+            + member("//", long_table)
+            + member("short.o/", b"\x7fELF1")
+            + member("/0", b"\x7fELF22")
+        )
+
+        members = [(name, bytes(body)) for name, body in iter_archive_members(archive)]
+        self.assertEqual(members, [("short.o", b"\x7fELF1"), (long_name, b"\x7fELF22")])
+
+    def test_elf_function_symbols(self):
+        """The pure-Python ELF reader should find function symbols."""
+        if not self.has_toolchain:
+            self.skipTest("gcc/objdump/ar not available")
+
+        import tempfile
+
+        from binary_analyzer import ElfFile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with ElfFile.from_path(self._build_object(tmpdir)) as elf:
+                names = {s.name for s in elf.function_symbols()}
+
+                self.assertEqual(elf.arch, get_native_arch())
+                self.assertIn("decompose_vulnerable", names)
+                self.assertTrue(elf.has_debug_line())
+                mapping = elf._mapping
+
+            self.assertTrue(mapping.closed)
+            self.assertIsNone(elf._mapping)
+
+    def test_object_and_archive_detected(self):
+        """Division in prebuilt objects and archives should be detected with line info."""
+        if not self.has_toolchain:
+            self.skipTest("gcc/objdump/ar not available")
+        if get_native_arch() not in ("x86_64", "arm64"):
+            self.skipTest("Native architecture not covered by this test")
+
+        import tempfile
+
+        from binary_analyzer import analyze_binary
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            obj = self._build_object(tmpdir)
+            archive = os.path.join(tmpdir, "libdecompose.a")
+            subprocess.run(["ar", "rcs", archive, obj], check=True, capture_output=True)
+
+            for path in (obj, archive):
+                report = analyze_binary(path, function_filter="decompose_vulnerable")
+
+                self.assertEqual(report.total_functions, 1)
+                self.assertFalse(report.passed, f"{path} should fail analysis")
+                violation = report.violations[0]
+                self.assertEqual(violation.function, "decompose_vulnerable")
+                self.assertTrue(violation.address.startswith("0x"))
+                self.assertTrue(violation.file.endswith("decompose_vulnerable.c"))
+                self.assertIsNotNone(violation.line)
+
+
+class TestNativeDecoder(unittest.TestCase):
+    """Tests for the native machine-code scanner."""
+
+    RISCV_SOURCE = """
+.text
+.globl foo
+.type foo,@function
+foo:
+  c.addi a0, 1
+  div a0, a1, a2
+  c.nop
+  remu a0, a1, a2
+  c.jr ra
+.size foo, .-foo
+"""
+
+    ARM64_SOURCE = """
+.text
+.globl foo
+.type foo,@function
+foo:
+  udiv w0, w1, w2
+  ldr x0, =0x1ac20820
+  ret
+  .ltorg
+.size foo, .-foo
+"""
+
+    def _assemble(self, triple, source, mattr=None):
+        import shutil
+        import tempfile
+
+        if not shutil.which("llvm-mc"):
+            self.skipTest("llvm-mc not available")
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        src = Path(tmp) / "input.s"
+        obj = Path(tmp) / "input.o"
+        src.write_text(source)
+        cmd = ["llvm-mc", f"-triple={triple}", "-filetype=obj", str(src), "-o", str(obj)]
+        if mattr:
+            cmd.append(f"-mattr={mattr}")
+        if subprocess.run(cmd, capture_output=True).returncode != 0:
+            self.skipTest(f"llvm-mc cannot assemble for {triple}")
+        return str(obj)
+
+    def _scan(self, path):
+        from binary_analyzer import analyze_binary
+
+        report = analyze_binary(path, decoder="native", include_warnings=True)
+        return [(v.function, v.mnemonic, v.address) for v in report.violations], report
+
+    def test_rvc_boundaries_match_sequential_decode(self):
+        import native_decoder
+
+        if native_decoder.np is None:
+            self.skipTest("numpy not available")
+        halfwords = [0x0505, 0x4533, 0x02C5, 0x0001, 0x7533, 0x02C5, 0x8082, 0x0003]
+        for forced in ([], [3], [4]):
+            vectorized = native_decoder._rvc_boundaries(
+                native_decoder.np.array(halfwords, dtype=native_decoder.np.uint16), forced
+            )
+            sequential = native_decoder._rvc_boundaries_py(halfwords, forced)
+            self.assertEqual(vectorized.tolist(), sequential)
+
+    def test_riscv_compressed_stream(self):
+        path = self._assemble("riscv64", self.RISCV_SOURCE, "+m,+c")
+        hits, report = self._scan(path)
+        self.assertEqual(hits, [("foo", "DIV", "0x2"), ("foo", "REMU", "0x8")])
+        self.assertEqual(report.total_instructions, 5)
+
+    def test_arm64_skips_literal_pool(self):
+        path = self._assemble("aarch64", self.ARM64_SOURCE)
+        hits, _ = self._scan(path)
+        self.assertEqual(hits, [("foo", "UDIV", "0x0")])
+
+    def test_pure_python_fallback(self):
+        from unittest.mock import patch
+
+        import native_decoder
+
+        path = self._assemble("riscv64", self.RISCV_SOURCE, "+m,+c")
+        expected, _ = self._scan(path)
+        with patch.object(native_decoder, "np", None):
+            actual, _ = self._scan(path)
+        self.assertEqual(actual, expected)
+
+    def test_x86_length_decoder(self):
+        """The x86 decoder should size every instruction and name only the targets."""
+        from native_decoder import scan_x86
+
+        code = bytes.fromhex(
+            "f30f1efa"  # endbr64
+            "48b88877665544332211"  # movabs $imm64, %rax
+            "48f7f1"  # div %rcx (divq)
+            "f6fb"  # idiv %bl
+            "f20f5ec1"  # divsd %xmm1, %xmm0
+            "c5f851c1"  # vsqrtps %xmm1, %xmm0
+            "c4e17a5e0488"  # vdivss (%rax,%rcx,4), %xmm0, %xmm0
+            "62f174485e0401"  # vdivps (%rcx,%rax,1), %zmm1, %zmm0
+            "0f8410000000"  # je rel32
+            "66f7f1"  # div %cx (divw)
+            "c3"  # ret
+        )
+        count, hits = scan_x86(code + bytes(16), 0, len(code), True)
+        self.assertEqual(count, 11)
+        self.assertEqual(
+            [key for _, _, key in hits],
+            ["divq", "idivb", "divsd", "vsqrtps", "vdivss", "vdivps", "je", "divw"],
+        )
+        self.assertEqual(hits[0][:2], (14, 3))
+
+    def test_x86_native_matches_objdump(self):
+        """Native x86 scanning should report the same mnemonics as objdump."""
+        import tempfile
+
+        if not all(TestIntegration._check_compiler(tool) for tool in ("gcc", "objdump")):
+            self.skipTest("gcc/objdump not available")
+        from binary_analyzer import analyze_binary
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            obj = os.path.join(tmpdir, "decompose.o")
+            src = Path(__file__).parent / "test_samples" / "decompose_vulnerable.c"
+            subprocess.run(
+                ["gcc", "-O2", "-c", str(src), "-o", obj], check=True, capture_output=True
+            )
+            native = analyze_binary(obj, decoder="native", include_warnings=True)
+            objdump = analyze_binary(obj, include_warnings=True)
+
+        def found(report):
+            return sorted((v.function, v.address, v.mnemonic) for v in report.violations)
+
+        # objdump omits the size suffix on register operands ("idiv %ecx");
+        # both decoders report the table spelling
+        self.assertTrue(native.violations)
+        self.assertEqual(found(native), found(objdump))
+        self.assertIn("IDIV", {v.mnemonic for v in native.violations})
+
+
+class TestParallelParsing(unittest.TestCase):
+    """Test splitting large assembly files and byte-level parsing."""
+
+    ASSEMBLY = "\n".join(
+        [
+            "# crypto.c:1",
+            *[
+                line
+                for i in range(40)
+                for line in (
+                    f"\t.type\tfunc{i}, @function",
+                    f"func{i}:",
+                    "\tdivl %ecx" if i % 3 == 0 else "\tmovl %eax, %ebx",
+                    f"# crypto.c:{10 + i}" if i % 5 == 0 else "\taddl $1, %eax",
+                    "\tjne .L1",
+                    "\tret",
+                )
+            ],
+        ]
+    )
+
+    def _write(self):
+        import tempfile
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".s", delete=False) as f:
+            f.write(self.ASSEMBLY)
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+
+    def test_boundaries_fall_on_function_starts(self):
+        from analyzer import _function_boundaries, _match_function_start
+
+        data = self.ASSEMBLY.encode()
+        offsets = _function_boundaries(data, 8)
+        self.assertGreater(len(offsets), 3)
+        self.assertEqual((offsets[0], offsets[-1]), (0, len(data)))
+        for offset in offsets[1:-1]:
+            line = data[offset:].split(b"\n", 1)[0].decode().strip()
+            self.assertIsNotNone(_match_function_start(line))
+
+    def test_parallel_matches_sequential(self):
+        from analyzer import parse_assembly_file
+
+        path = self._write()
+        expected = AssemblyParser("x86_64", "unknown").parse(self.ASSEMBLY, include_warnings=True)
+        actual = parse_assembly_file(
+            path, "x86_64", include_warnings=True, jobs=3, min_parallel_size=0
+        )
+        self.assertEqual(actual, expected)
+        # Violations before a chunk's first location comment inherit the previous one
+        self.assertTrue(all(v.file == "crypto.c" for v in actual[1]))
+
+    def test_bytes_parser_matches_text_parser(self):
+        """parse_bytes should agree with parse on every supported line format."""
+        assembly = "\n".join(
+            [
+                "\tdivl %ecx",
+                "# crypto.c:3",
+                "decompose:",
+                "   0x1234   idivq %rsi",
+                "   crypto.c:10   0x1238   48f7fe   div %rcx",
+                "\t.cfi_startproc",
+                "\tje .L2",
+                "// comment",
+                "TEXT main.decompose(SB) crypto.go",
+                "  crypto.go:12\t0x4990\t48f7f1\t\tDIVQ CX",
+                "\t.type\tother, @function",
+                "other:  ",
+                "\tret\r",
+            ]
+        )
+        parser = AssemblyParser("x86_64", "gcc")
+        lines = assembly.encode().splitlines(keepends=True)
+        self.assertEqual(
+            parser.parse_bytes(lines, include_warnings=True),
+            parser.parse(assembly, include_warnings=True),
+        )
+
+    def test_mmap_and_text_modes_agree(self):
+        from analyzer import parse_assembly_file
+
+        path = self._write()
+        self.assertEqual(
+            parse_assembly_file(path, "x86_64", include_warnings=True, jobs=1),
+            parse_assembly_file(path, "x86_64", include_warnings=True, jobs=1, mmap_input=False),
+        )
+
+
+class TestViolationTable(unittest.TestCase):
+    """Test the columnar violation storage backing AnalysisReport."""
+
+    def _violation(self, address="0x1a2b", severity=Severity.ERROR, line=7):
+        return Violation(
+            function="decompose",
+            file="crypto.c",
+            line=line,
+            address=address,
+            instruction="idivl\t%ecx  # é",
+            mnemonic="IDIVL",
+            reason="IDIVL has data-dependent timing",
+            severity=severity,
+        )
+
+    def test_round_trip(self):
+        from analyzer import ViolationTable
+
+        # Plain, zero-padded, uppercase, mixed-case, empty, bytecode and oversized
+        addresses = ("0x1a2b", "0x00ff", "0xABCD", "0xAbCd", "", "IL_0004", "12", "0x" + "f" * 20)
+        originals = [self._violation(address) for address in addresses]
+        originals.append(self._violation(severity=Severity.WARNING, line=None))
+        table = ViolationTable(originals)
+        self.assertEqual(len(table), len(originals))
+        self.assertEqual(list(table), originals)
+        self.assertEqual(table[-1], originals[-1])
+        self.assertEqual(table[1:3], originals[1:3])
+        self.assertEqual(table, originals)
+
+    def test_rows_share_strings(self):
+        from analyzer import ViolationTable
+
+        table = ViolationTable([self._violation(), self._violation("0x10")])
+        self.assertIs(table[0].reason, table[1].reason)
+        self.assertIs(table[0].function, table[1].function)
+
+    def test_assignment_and_merge(self):
+        import pickle
+
+        from analyzer import ViolationTable
+
+        table = ViolationTable([self._violation()])
+        replacement = self._violation("0x99", Severity.WARNING, line=None)
+        table[0] = replacement
+        self.assertEqual(table[0], replacement)
+
+        other = pickle.loads(pickle.dumps(ViolationTable([self._violation("IL_1")])))
+        table.extend(other)
+        self.assertEqual(list(table), [replacement, self._violation("IL_1")])
+
+        table.extend(table)
+        self.assertEqual(list(table), [replacement, self._violation("IL_1")] * 2)
+        self.assertEqual(table.severity_count(Severity.WARNING), 2)
+
+    def test_rewrites_reuse_instruction_text(self):
+        import dataclasses
+
+        from analyzer import ViolationTable
+
+        table = ViolationTable([self._violation(), self._violation("0x10")])
+        size = len(table._text)
+        for count in range(200):
+            instruction = "idivl %ecx" + " " * (count % 7)
+            table[1] = dataclasses.replace(table[1], instruction=instruction)
+            self.assertEqual(table[1].instruction, instruction)
+            self.assertLessEqual(len(table._text), 2 * size + 20)
+        self.assertEqual(table[0], self._violation())
+
+    def test_report_stores_lists_columnar(self):
+        from analyzer import ViolationTable
+
+        report = AnalysisReport(
+            architecture="x86_64",
+            compiler="gcc",
+            optimization="O2",
+            source_file="crypto.c",
+            total_functions=1,
+            total_instructions=2,
+            violations=[self._violation(), self._violation(severity=Severity.WARNING)],
+        )
+        self.assertIsInstance(report.violations, ViolationTable)
+        self.assertEqual((report.error_count, report.warning_count), (1, 1))
+        self.assertEqual(len(report.by_severity(Severity.WARNING)), 1)
+        self.assertEqual(len(report.by_function("decompose")), 2)
+        report.violations = []
+        self.assertTrue(report.passed)
+
+    def test_counts_and_indexes_track_appends(self):
+        from analyzer import ViolationTable
+
+        table = ViolationTable([self._violation(), self._violation(severity=Severity.WARNING)])
+        self.assertEqual(table.severity_count(Severity.ERROR), 1)
+        self.assertEqual(table.rows(severity=Severity.WARNING), [1])
+
+        other = self._violation(severity=Severity.WARNING)
+        other.function = "other"
+        other.mnemonic = "JNE"
+        table.append(other)
+        table.extend(ViolationTable([self._violation()]))
+        self.assertEqual(table.severity_count(Severity.WARNING), 2)
+        self.assertEqual(table.rows(severity=Severity.WARNING), [1, 2])
+        self.assertEqual(table.rows(function="decompose", mnemonic="IDIVL"), [0, 1, 3])
+        self.assertEqual(table.rows(function="missing"), [])
+        self.assertEqual(table.counts_by("mnemonic"), {"IDIVL": 3, "JNE": 1})
+
+        table[0] = other
+        self.assertEqual(table.severity_count(Severity.ERROR), 1)
+        self.assertEqual(table.rows(function="other"), [0, 2])
+        self.assertEqual(len(table.filter_functions(lambda name: name == "decompose")), 2)
+
+
+class TestReportWriters(unittest.TestCase):
+    """Test the streaming report writers."""
+
+    ASSEMBLY = "\n".join(
+        [
+            "\t.type\tdecompose, @function",
+            "decompose:",
+            "# crypto.c:12",
+            "\tidivq %rsi",
+            "\tjne .L1",
+            "\tret",
+            "\t.type\tclean, @function",
+            "clean:",
+            "\tmovq %rdi, %rax",
+            "\tret",
+        ]
+    )
+
+    def _stream(self, format_type, include_warnings=True):
+        import io
+        import tempfile
+
+        from analyzer import analyze_assembly
+        from report_writers import get_report_writer
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".s", delete=False) as f:
+            f.write(self.ASSEMBLY)
+        self.addCleanup(os.unlink, f.name)
+
+        stream = io.StringIO()
+        writer = get_report_writer(format_type, stream, f.name)
+        writer.start()
+        report = analyze_assembly(
+            f.name, "x86_64", include_warnings=include_warnings, on_violation=writer.write
+        )
+        writer.finish(report)
+        return report, writer, stream.getvalue()
+
+    def test_ndjson_records(self):
+        import json
+
+        report, writer, output = self._stream(OutputFormat.NDJSON)
+        records = [json.loads(line) for line in output.splitlines()]
+
+        self.assertEqual(records[0]["type"], "header")
+        self.assertEqual(records[-1]["type"], "summary")
+        self.assertEqual(writer.count, len(report.violations))
+        violations = [r for r in records if r["type"] == "violation"]
+        self.assertEqual([v["mnemonic"] for v in violations], ["IDIVQ", "JNE"])
+        self.assertEqual(violations[0]["line"], 12)
+        self.assertEqual(violations[0]["severity"], "error")
+        self.assertEqual(records[-1]["error_count"], 1)
+        self.assertFalse(records[-1]["passed"])
+
+    def test_sarif_log(self):
+        import json
+
+        report, _writer, output = self._stream(OutputFormat.SARIF)
+        log = json.loads(output)
+
+        self.assertEqual(log["version"], "2.1.0")
+        run = log["runs"][0]
+        self.assertEqual([r["level"] for r in run["results"]], ["error", "warning"])
+        location = run["results"][0]["locations"][0]
+        self.assertEqual(location["physicalLocation"]["region"]["startLine"], 12)
+        self.assertEqual(location["logicalLocations"][0]["name"], "decompose")
+        self.assertEqual(run["properties"]["totalFunctions"], report.total_functions)
+
+    def test_sarif_errors_only(self):
+        import json
+
+        _report, writer, output = self._stream(OutputFormat.SARIF, include_warnings=False)
+        self.assertEqual(writer.count, 1)
+        self.assertEqual(len(json.loads(output)["runs"][0]["results"]), 1)
+
+    def test_text_and_github_match_batch_output(self):
+        report, _writer, output = self._stream(OutputFormat.TEXT)
+        batch = format_report(report, OutputFormat.TEXT)
+        for line in batch.splitlines():
+            if line.startswith(("[", "  Function:", "  Reason:")):
+                self.assertIn(line, output)
+        self.assertIn("Result: FAILED", output)
+
+        report, _writer, output = self._stream(OutputFormat.GITHUB)
+        lines = output.splitlines()
+        self.assertEqual(lines[:-1], format_report(report, OutputFormat.GITHUB).splitlines())
+        self.assertTrue(lines[-1].startswith("::notice::"))
+
+    def test_abort_closes_document(self):
+        """A failure after start() should still leave well-formed output."""
+        import io
+        import json
+        import tempfile
+
+        from analyzer import main
+        from report_writers import get_report_writer
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            missing = os.path.join(tmpdir, "missing.c")
+            sarif_path = os.path.join(tmpdir, "out.sarif")
+            ndjson_path = os.path.join(tmpdir, "out.ndjson")
+            self.assertEqual(main([missing, "--sarif", "--output", sarif_path]), 1)
+            self.assertEqual(main([missing, "--ndjson", "--output", ndjson_path]), 1)
+            with open(sarif_path) as f:
+                log = json.load(f)
+            with open(ndjson_path) as f:
+                records = [json.loads(line) for line in f]
+
+        invocation = log["runs"][0]["invocations"][0]
+        self.assertFalse(invocation["executionSuccessful"])
+        self.assertIn("missing.c", invocation["toolExecutionNotifications"][0]["message"]["text"])
+        self.assertEqual(log["runs"][0]["results"], [])
+        self.assertEqual([r["type"] for r in records], ["header", "error"])
+
+        stream = io.StringIO()
+        writer = get_report_writer(OutputFormat.NDJSON, stream, "x.s")
+        writer.start()
+        writer.finish(
+            AnalysisReport("x86_64", "gcc", "O2", "x.s", total_functions=0, total_instructions=0)
+        )
+        writer.abort("late")
+        self.assertNotIn("late", stream.getvalue())
+
+    def test_streamed_batch_counts_without_retaining(self):
+        """Streamed batch runs should count violations in the writer, not the report."""
+        import contextlib
+        import io
+        import json
+        import tempfile
+        from unittest.mock import patch
+
+        import analyzer
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name in ("a.py", "b.py"):
+                with open(os.path.join(tmpdir, name), "w") as f:
+                    f.write("def f(x, y):\n    return x / y\n")
+
+            batch = analyzer._analyze_batch
+            retained = []
+
+            def spy(*args, **kwargs):
+                report = batch(*args, **kwargs)
+                retained.append(len(report.violations))
+                return report
+
+            output = io.StringIO()
+            with patch.object(analyzer, "_analyze_batch", spy):
+                with contextlib.redirect_stdout(output):
+                    self.assertEqual(analyzer.main([tmpdir, "--ndjson"]), 1)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        violations = [r for r in records if r["type"] == "violation"]
+        self.assertEqual(len(violations), 2)
+        self.assertEqual(records[-1]["error_count"], 2)
+        self.assertFalse(records[-1]["passed"])
+        self.assertEqual(retained, [0])
+
+    def test_json_is_not_streamable(self):
+        import io
+
+        from report_writers import get_report_writer
+
+        with self.assertRaises(ValueError):
+            get_report_writer(OutputFormat.JSON, io.StringIO(), "x.s")
+
+
+class TestFunctionFilter(unittest.TestCase):
+    """Test --func filtering inside the parsers."""
+
+    ASSEMBLY = "\n".join(
+        [
+            "\t.type\tdecompose, @function",
+            "decompose:",
+            "# crypto.c:12",
+            "\tidivq %rsi",
+            "\tret",
+            "\t.type\tsign, @function",
+            "sign:",
+            "# crypto.c:30",
+            "\tdivl %ecx",
+            "\tdivl %ecx",
+            "\tret",
+            "\t.type\tdecompose_inner, @function",
+            "decompose_inner:",
+            "\tdivq %rcx",
+            "\tret",
+        ]
+    )
+
+    def test_predicate_caches_per_name(self):
+        from analyzer import compile_function_filter
+
+        self.assertIsNone(compile_function_filter(None))
+        self.assertIsNone(compile_function_filter(""))
+
+        matches = compile_function_filter("^decompose")
+        for _ in range(2):
+            self.assertTrue(matches("decompose"))
+            self.assertFalse(matches("sign"))
+
+    def test_excluded_functions_are_not_classified(self):
+        import dataclasses
+
+        from analyzer import compile_function_filter
+
+        class CountingDict(dict):
+            lookups = 0
+
+            def get(self, key, default=None):
+                CountingDict.lookups += 1
+                return super().get(key, default)
+
+        parser = AssemblyParser("x86_64", "gcc")
+        parser.rules = dataclasses.replace(parser.rules, errors=CountingDict(parser.rules.errors))
+        functions, violations = parser.parse(
+            self.ASSEMBLY, function_filter=compile_function_filter("^sign$")
+        )
+
+        # The .type directive and the label both start "sign"
+        expected = {"name": "sign", "instructions": 3, "file": "crypto.c", "lines": (30, 30)}
+        self.assertEqual(functions[-1], expected)
+        self.assertEqual({f["name"] for f in functions}, {"sign"})
+        self.assertEqual([v.mnemonic for v in violations], ["DIVL", "DIVL"])
+        self.assertEqual(violations[0].line, 30)
+        self.assertEqual(CountingDict.lookups, 3)
+
+    def test_filter_matches_post_filtering(self):
+        from analyzer import compile_function_filter
+
+        parser = AssemblyParser("x86_64", "gcc")
+        all_functions, all_violations = parser.parse(self.ASSEMBLY)
+        selects = compile_function_filter("decompose")
+        functions, violations = parser.parse(self.ASSEMBLY, function_filter=selects)
+        lines = [line.encode() + b"\n" for line in self.ASSEMBLY.split("\n")]
+        byte_functions, byte_violations = parser.parse_bytes(lines, function_filter=selects)
+
+        expected = all_violations.filter_functions(selects)
+        self.assertEqual(violations, expected)
+        self.assertEqual(byte_violations, expected)
+        self.assertEqual(functions, [f for f in all_functions if selects(f["name"])])
+        self.assertEqual(byte_functions, functions)
+
+    def test_analyze_assembly_filter_and_stream(self):
+        import tempfile
+
+        from analyzer import analyze_assembly
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".s", delete=False) as f:
+            f.write(self.ASSEMBLY)
+        self.addCleanup(os.unlink, f.name)
+
+        for mmap_input in (True, False):
+            streamed = []
+            report = analyze_assembly(
+                f.name,
+                "x86_64",
+                function_filter="inner",
+                mmap_input=mmap_input,
+                on_violation=streamed.append,
+            )
+            self.assertEqual(report.total_functions, 2)
+            self.assertEqual([v.function for v in report.violations], ["decompose_inner"])
+            self.assertEqual(streamed, list(report.violations))
+
+    def test_script_parser_skips_excluded_functions(self):
+        from script_analyzers import PythonAnalyzer
+
+        output = "\n".join(
+            [
+                "Disassembly of <code object fast at 0x7f>:",
+                "  3           0 LOAD_FAST                0 (a)",
+                "              2 BINARY_OP               11 (/)",
+                "Disassembly of <code object slow at 0x7f>:",
+                "  7           0 LOAD_FAST                0 (a)",
+                "              2 BINARY_OP                6 (%)",
+                "              4 RETURN_VALUE",
+            ]
+        )
+        functions, violations = PythonAnalyzer()._parse_dis_output(
+            output, "test.py", function_filter="slow"
+        )
+        self.assertEqual(functions, [{"name": "slow", "instructions": 3}])
+        self.assertEqual([v.function for v in violations], ["slow"])
+
+
+class TestAnalysisServer(unittest.TestCase):
+    """Test the Unix socket analysis server and its client."""
+
+    ASSEMBLY = "\n".join(
+        [
+            "decompose:",
+            "# crypto.c:12",
+            "\tidivq %rsi",
+            "\tjne .L1",
+            "\tret",
+        ]
+    )
+
+    def setUp(self):
+        import tempfile
+        import threading
+
+        from server import AnalysisClient, AnalysisServer
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        self.socket_path = os.path.join(directory, "ct.sock")
+        self.server = AnalysisServer(self.socket_path)
+        thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        thread.start()
+
+        def stop():
+            self.server.shutdown()
+            thread.join()
+            self.server.server_close()
+
+        self.addCleanup(stop)
+        self.client = AnalysisClient(self.socket_path, timeout=30)
+
+        self.assembly_path = os.path.join(directory, "crypto.s")
+        with open(self.assembly_path, "w") as f:
+            f.write(self.ASSEMBLY)
+        self.addCleanup(os.unlink, self.assembly_path)
+
+    def test_socket_is_private(self):
+        import stat
+
+        mode = stat.S_IMODE(os.stat(self.socket_path).st_mode)
+        self.assertEqual(mode & 0o077, 0)
+        self.assertEqual(self.client.ping()["pid"], os.getpid())
+
+    def test_remote_matches_local(self):
+        from analyzer import analyze_assembly
+
+        streamed = []
+        remote = self.client.analyze_assembly(
+            self.assembly_path, "x86_64", include_warnings=True, on_violation=streamed.append
+        )
+        local = analyze_assembly(self.assembly_path, "x86_64", include_warnings=True)
+
+        self.assertEqual(list(remote.violations), list(local.violations))
+        self.assertEqual(streamed, list(local.violations))
+        self.assertEqual(remote.total_functions, local.total_functions)
+        self.assertEqual(remote.error_count, 1)
+        self.assertEqual(remote.violations[0].severity, Severity.ERROR)
+
+    def test_results_are_cached_until_the_file_changes(self):
+        first = self.client.analyze_assembly(self.assembly_path, "x86_64")
+        second = self.client.analyze_assembly(self.assembly_path, "x86_64")
+        stats = self.client.stats()
+        self.assertEqual((stats["cache_hits"], stats["cache_misses"]), (1, 1))
+        self.assertEqual(list(first.violations), list(second.violations))
+
+        with open(self.assembly_path, "a") as f:
+            f.write("\n\tdivl %ecx\n")
+        third = self.client.analyze_assembly(self.assembly_path, "x86_64")
+        self.assertEqual(third.error_count, 2)
+        self.assertEqual(self.client.stats()["cache_misses"], 2)
+
+    def test_errors_are_reported(self):
+        with self.assertRaises(RuntimeError):
+            self.client.analyze_assembly(self.assembly_path + ".missing", "x86_64")
+        with self.assertRaises(RuntimeError):
+            self.client._control("no_such_method")
+        self.assertEqual(self.client.ping()["type"], "result")
+
+    def test_invalid_parameters_end_with_an_error(self):
+        bad = [{"limits": {"bogus": 1}}, {"limits": [1]}, {"arch": ["x86_64"]}]
+        for params in bad:
+            with self.subTest(params=params):
+                params = {"assembly_file": self.assembly_path, "arch": "x86_64", **params}
+                records = list(self.client._request("analyze_assembly", params))
+                self.assertEqual(records[-1]["type"], "error")
+        self.assertEqual(self.client.ping()["type"], "result")
+
+    def test_second_server_refuses_live_socket(self):
+        from server import AnalysisServer
+
+        with self.assertRaises(RuntimeError):
+            AnalysisServer(self.socket_path)
+
+    def test_unavailable_server(self):
+        from server import AnalysisClient, ServerUnavailable
+
+        with self.assertRaises(ServerUnavailable):
+            AnalysisClient(self.socket_path + ".missing").ping()
+
+
+class TestAsyncAnalysis(unittest.TestCase):
+    """Test the step-generator toolchain drivers and the asyncio API."""
+
+    @staticmethod
+    def _python(code):
+        from analyzer import ToolRun
+
+        return ToolRun([sys.executable, "-c", code])
+
+    def _steps(self, *codes):
+        """Run each snippet in turn, collecting stdout; a missing tool is recorded."""
+        from analyzer import ToolRun
+
+        outputs = []
+        for code in codes:
+            result = yield self._python(code)
+            outputs.append(result.stdout.strip())
+        try:
+            yield ToolRun(["ct-analyzer-no-such-tool"])
+        except FileNotFoundError:
+            outputs.append("missing")
+        return outputs
+
+    def test_sync_and_async_drivers_agree(self):
+        import asyncio
+
+        from analyzer import run_steps, run_steps_async
+
+        codes = ("print(1)", "print(2)")
+        expected = ["1", "2", "missing"]
+        self.assertEqual(run_steps(self._steps(*codes)), expected)
+        self.assertEqual(asyncio.run(run_steps_async(self._steps(*codes))), expected)
+
+    def test_timeout_kills_subprocess(self):
+        import asyncio
+        import time
+
+        from analyzer import run_steps_async
+
+        def steps():
+            yield self._python("import time; time.sleep(30)")
+
+        started = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            asyncio.run(run_steps_async(steps(), timeout=0.2))
+        self.assertLess(time.monotonic() - started, 10)
+
+    @unittest.skipUnless(os.path.isdir("/proc"), "Requires /proc")
+    def test_cancellation_kills_process_group_and_cleans_up(self):
+        import asyncio
+        import tempfile
+        import time
+
+        from analyzer import ToolRun, run_steps_async
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, directory)
+        pid_file = os.path.join(directory, "pid")
+        cleaned = []
+
+        def steps():
+            try:
+                # The shell's child must die with it
+                yield ToolRun(["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"])
+            finally:
+                cleaned.append(True)
+
+        async def run_and_cancel():
+            task = asyncio.create_task(run_steps_async(steps()))
+            while not os.path.exists(pid_file) or not os.path.getsize(pid_file):
+                await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        started = time.monotonic()
+        asyncio.run(run_and_cancel())
+        self.assertLess(time.monotonic() - started, 10)
+        with open(pid_file) as f:
+            child = int(f.read())
+        os.unlink(pid_file)
+        self.assertEqual(cleaned, [True])
+        for _ in range(100):
+            try:
+                with open(f"/proc/{child}/stat") as f:
+                    # Killed orphans may linger as zombies until reaped
+                    if f.read().rsplit(")", 1)[1].split()[0] == "Z":
+                        break
+            except FileNotFoundError:
+                break
+            time.sleep(0.01)
+        else:
+            self.fail("child process survived cancellation")
+
+    def test_semaphore_bounds_running_subprocesses(self):
+        import asyncio
+
+        from analyzer import run_steps_async
+
+        running = []
+        peak = []
+
+        class Tracking(asyncio.Semaphore):
+            async def acquire(self):
+                result = await super().acquire()
+                running.append(1)
+                peak.append(len(running))
+                return result
+
+            def release(self):
+                running.pop()
+                super().release()
+
+        def steps():
+            yield self._python("import time; time.sleep(0.05)")
+            yield self._python("pass")
+
+        async def run_all():
+            limit = Tracking(2)
+            await asyncio.gather(*(run_steps_async(steps(), limit=limit) for _ in range(6)))
+
+        asyncio.run(run_all())
+        self.assertEqual(len(peak), 12)
+        self.assertEqual(max(peak), 2)
+
+    def test_analyze_many_async(self):
+        import asyncio
+        import shutil
+
+        from analyzer import analyze_many_async, analyze_source
+
+        if shutil.which("gcc") is None:
+            self.skipTest("gcc not available")
+        sample = os.path.join(os.path.dirname(__file__), "test_samples", "decompose_vulnerable.c")
+        files = [sample, sample + ".missing", sample]
+        results = asyncio.run(analyze_many_async(files, concurrency=2, compiler="gcc"))
+
+        expected = analyze_source(sample, compiler="gcc")
+        self.assertIsInstance(results[1], FileNotFoundError)
+        for report in (results[0], results[2]):
+            self.assertEqual(list(report.violations), list(expected.violations))
+            self.assertEqual(report.total_functions, expected.total_functions)
+
+
+class TestToolLimits(unittest.TestCase):
+    """Test per-stage timeouts and resource limits for toolchain subprocesses."""
+
+    @staticmethod
+    def _python(code, stage="compile"):
+        from analyzer import ToolRun
+
+        return ToolRun([sys.executable, "-c", code], stage=stage)
+
+    def test_stage_timeouts_fall_back_to_default(self):
+        from analyzer import ToolLimits
+
+        limits = ToolLimits(timeouts={"compile": 5.0}, default_timeout=1.0)
+        self.assertEqual(limits.timeout_for("compile"), 5.0)
+        self.assertEqual(limits.timeout_for("probe"), 1.0)
+        self.assertIsNone(ToolLimits().timeout_for("compile"))
+        self.assertIsNone(ToolLimits().preexec_fn())
+
+    def test_timeout_raises_limit_event(self):
+        import time
+
+        from analyzer import ToolLimitExceeded, ToolLimits, run_steps
+
+        def steps():
+            yield self._python("import time; time.sleep(30)", stage="disassemble")
+
+        started = time.monotonic()
+        with self.assertRaises(ToolLimitExceeded) as caught:
+            run_steps(steps(), ToolLimits(timeouts={"disassemble": 0.2}))
+        self.assertLess(time.monotonic() - started, 10)
+        event = caught.exception.event
+        self.assertEqual((event.stage, event.kind, event.limit), ("disassemble", "timeout", 0.2))
+        self.assertIn(sys.executable, event.command)
+
+    def test_limit_is_thrown_into_generator(self):
+        import asyncio
+
+        from analyzer import ToolLimitExceeded, ToolLimits, run_steps, run_steps_async
+
+        def steps():
+            try:
+                yield self._python("import time; time.sleep(1)")
+            except ToolLimitExceeded as e:
+                return e.event.kind
+            return "finished"
+
+        limits = ToolLimits(default_timeout=0.2)
+        self.assertEqual(run_steps(steps(), limits), "timeout")
+        self.assertEqual(asyncio.run(run_steps_async(steps(), limits=limits)), "timeout")
+        # Untimed stages are unaffected
+        self.assertEqual(run_steps(steps(), ToolLimits(timeouts={"probe": 0.2})), "finished")
+
+    def test_job_budget_still_raises_timeout_error(self):
+        import asyncio
+
+        from analyzer import ToolLimits, run_steps_async
+
+        def steps():
+            yield self._python("import time; time.sleep(30)")
+
+        limits = ToolLimits(default_timeout=5.0)
+        with self.assertRaises(TimeoutError):
+            asyncio.run(run_steps_async(steps(), timeout=0.2, limits=limits))
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Requires Linux rlimits")
+    def test_cpu_limit(self):
+        from analyzer import ToolLimitExceeded, ToolLimits, run_steps
+
+        def steps():
+            yield self._python("while True: pass")
+
+        with self.assertRaises(ToolLimitExceeded) as caught:
+            run_steps(steps(), ToolLimits(cpu=1, default_timeout=30))
+        self.assertEqual(caught.exception.event.kind, "cpu")
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "Requires Linux rlimits")
+    def test_memory_limit(self):
+        from analyzer import ToolLimitExceeded, ToolLimits, run_steps
+
+        def steps():
+            yield self._python("data = bytearray(1 << 30)")
+
+        with self.assertRaises(ToolLimitExceeded) as caught:
+            run_steps(steps(), ToolLimits(memory=256 * 1024 * 1024))
+        self.assertEqual(caught.exception.event.kind, "memory")
+        self.assertIn("256 MB", caught.exception.event.describe())
+
+    def test_analyze_source_reports_limit(self):
+        import json
+        import shutil
+
+        from analyzer import OutputFormat, ToolLimits, analyze_source, format_report
+
+        if shutil.which("gcc") is None:
+            self.skipTest("gcc not available")
+        sample = os.path.join(os.path.dirname(__file__), "test_samples", "decompose_vulnerable.c")
+        limits = ToolLimits(timeouts={"compile": 0.0001})
+        report = analyze_source(sample, compiler="gcc", limits=limits)
+
+        self.assertFalse(report.passed)
+        self.assertEqual(len(report.violations), 0)
+        self.assertEqual(report.limit_exceeded.stage, "compile")
+        self.assertEqual(report.limit_exceeded.kind, "timeout")
+        data = json.loads(format_report(report, OutputFormat.JSON))
+        self.assertEqual(data["limit_exceeded"]["kind"], "timeout")
+        sarif = json.loads(format_report(report, OutputFormat.SARIF))
+        invocation = sarif["runs"][0]["invocations"][0]
+        self.assertFalse(invocation["executionSuccessful"])
+        self.assertIn("timed out", format_report(report, OutputFormat.TEXT))
+        self.assertIn("::error", format_report(report, OutputFormat.GITHUB))
+
+
+class TestBaseline(unittest.TestCase):
+    """Test baseline fingerprints and --baseline suppression."""
+
+    ASSEMBLY = [
+        "\t.type\tdecompose, @function",
+        "decompose:",
+        "\tidivl -20(%rbp)",
+        "\tidivl -20(%rbp)",
+        "\tjne .L3",
+        "\tret",
+    ]
+
+    @staticmethod
+    def _violation(function="f", instruction="divl -20(%rbp)", address="0x10"):
+        return Violation(
+            function=function,
+            file="crypto.c",
+            line=7,
+            address=address,
+            instruction=instruction,
+            mnemonic="DIVL",
+            reason="test",
+            severity=Severity.ERROR,
+        )
+
+    def _write(self, suffix, content=""):
+        import tempfile
+
+        with tempfile.NamedTemporaryFile(mode="w", suffix=suffix, delete=False) as f:
+            f.write(content)
+        self.addCleanup(lambda: os.path.exists(f.name) and os.unlink(f.name))
+        return f.name
+
+    def test_normalize_instruction(self):
+        from baseline import normalize_instruction
+
+        self.assertEqual(normalize_instruction("divl\t-20(%rbp)"), "divl N(%rbp)")
+        self.assertEqual(normalize_instruction("idivq %r8  # x"), "idivq %r8")
+        self.assertEqual(normalize_instruction("sdiv x0, x1, x19"), "sdiv x0, x1, x19")
+        self.assertEqual(normalize_instruction("jne .LBB0_3"), "jne .lN")
+
+    def test_fingerprint_ignores_location(self):
+        from baseline import fingerprint
+
+        base = fingerprint(self._violation())
+        self.assertEqual(fingerprint(self._violation(address="0x99")), base)
+        self.assertEqual(fingerprint(self._violation(instruction="divl -28(%rbp)")), base)
+        self.assertNotEqual(fingerprint(self._violation(function="g")), base)
+        self.assertNotEqual(fingerprint(self._violation(), occurrence=1), base)
+
+    def test_fingerprint_includes_file(self):
+        import dataclasses
+        import tempfile
+
+        from baseline import Fingerprinter, fingerprint
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, root)
+        violation = self._violation()
+        other = dataclasses.replace(violation, file="other.c")
+        absolute = dataclasses.replace(violation, file=os.path.join(root, "crypto.c"))
+        self.assertNotEqual(fingerprint(other, root=root), fingerprint(violation, root=root))
+        previous = os.getcwd()
+        os.chdir(root)
+        self.addCleanup(os.chdir, previous)
+        self.assertEqual(fingerprint(absolute, root=root), fingerprint(violation, root=root))
+
+        # The same instruction in two files is the first occurrence in each
+        fingerprinter = Fingerprinter(root=root)
+        first = fingerprinter(violation)
+        self.assertNotEqual(fingerprinter(other), first)
+        self.assertNotEqual(fingerprinter(violation), first)
+        unlocated = dataclasses.replace(violation, file="")
+        self.assertEqual(Fingerprinter("crypto.c", root)(unlocated), first)
+
+    def test_save_load_and_new_violations(self):
+        from baseline import Baseline
+
+        old = [self._violation(), self._violation(), self._violation(function="g")]
+        path = self._write(".bin")
+        Baseline.from_violations(old).save(path)
+        loaded = Baseline.load(path)
+        self.assertEqual(len(loaded), 3)
+
+        # A third identical division in f is new; the first two are not
+        current = [self._violation(address=hex(a)) for a in (0x20, 0x30, 0x40)]
+        new = loaded.new_violations(current)
+        self.assertEqual([v.address for v in new], ["0x40"])
+
+    def test_rejects_other_files(self):
+        from baseline import Baseline
+
+        with self.assertRaises(ValueError):
+            Baseline.load(self._write(".bin", "not a baseline"))
+        with self.assertRaisesRegex(ValueError, "--update-baseline"):
+            Baseline.load(self._write(".bin", "CTBASE1\n"))
+
+    def test_cli_reports_only_new_violations(self):
+        import contextlib
+        import io
+        import json
+
+        from analyzer import main
+
+        baseline = self._write(".bin")
+        assembly = self._write(".s", "\n".join(self.ASSEMBLY))
+        options = ["--assembly", "--arch", "x86_64", "--baseline", baseline]
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main([*options, "--update-baseline", assembly]), 0)
+
+        with open(assembly, "w") as f:
+            f.write("\n".join([*self.ASSEMBLY[:4], "\tdivq %rcx", *self.ASSEMBLY[4:]]))
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main([*options, "--json", assembly]), 1)
+        data = json.loads(output.getvalue())
+        self.assertEqual([v["mnemonic"] for v in data["violations"]], ["DIVQ"])
+        self.assertEqual(data["suppressed"], 2)
+
+        # Streamed output is filtered as violations arrive
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main([*options, "--ndjson", assembly]), 1)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        violations = [r["mnemonic"] for r in records if r["type"] == "violation"]
+        self.assertEqual(violations, ["DIVQ"])
+        self.assertEqual(records[-1]["suppressed"], 2)
+
+
+class TestChangedSince(unittest.TestCase):
+    """Test git-diff-aware selection of changed sources and functions."""
+
+    DIFF = "\n".join(
+        [
+            "diff --git a/src/crypto.c b/src/crypto.c",
+            "--- a/src/crypto.c",
+            "+++ b/src/crypto.c",
+            "@@ -10,2 +10,3 @@ int f(void)",
+            "@@ -40 +41 @@ int g(void)",
+            "@@ -50,3 +51,0 @@ int h(void)",
+            "diff --git a/old.py b/old.py",
+            "--- a/old.py",
+            "+++ /dev/null",
+            "@@ -1,3 +0,0 @@",
+        ]
+    )
+
+    @staticmethod
+    def _violation(function, line, file="crypto.c"):
+        return Violation(
+            function=function,
+            file=file,
+            line=line,
+            address="",
+            instruction="divl %ecx",
+            mnemonic="DIVL",
+            reason="test",
+            severity=Severity.ERROR,
+        )
+
+    def test_parse_diff(self):
+        from changes import parse_diff
+
+        changes = parse_diff(self.DIFF, "/repo")
+        self.assertEqual(changes, {"/repo/src/crypto.c": [(10, 12), (41, 41), (51, 52)]})
+
+        quoted = '+++ "b/src/a\\"b.c"\n@@ -1 +1 @@\n'
+        self.assertEqual(parse_diff(quoted, "/repo"), {'/repo/src/a"b.c': [(1, 1)]})
+        with self.assertRaises(ValueError):
+            parse_diff("+++ src/crypto.c\n@@ -1 +1 @@\n", "/repo")
+
+        # Added lines that start with "++ " are content, not file headers
+        for added in ("+++ weird", "+++ b/evil.c"):
+            with self.subTest(added=added):
+                diff = self.DIFF.replace("@@ -40 +41 @@ int g(void)", f"@@ -40 +41 @@\n{added}")
+                self.assertEqual(parse_diff(diff, "/repo"), changes)
+
+    def test_changed_lines_ignore_prefix_config(self):
+        import shutil
+        import tempfile
+
+        from changes import changed_lines_since
+
+        if shutil.which("git") is None:
+            self.skipTest("git not available")
+        repo = os.path.realpath(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, repo)
+
+        def git(*args):
+            subprocess.run(["git", "-C", repo, *args], check=True, capture_output=True)
+
+        path = os.path.join(repo, "m.py")
+        with open(path, "w") as f:
+            f.write("a = 1\n")
+        git("init", "-q")
+        git("add", ".")
+        git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init")
+        git("config", "diff.noprefix", "true")
+        with open(path, "a") as f:
+            f.write("b = 2\n")
+        self.assertEqual(changed_lines_since("HEAD", cwd=repo), {path: [(2, 2)]})
+        git("config", "diff.noprefix", "false")
+        git("config", "diff.mnemonicPrefix", "true")
+        self.assertEqual(changed_lines_since("HEAD", cwd=repo), {path: [(2, 2)]})
+
+    def test_restrict_with_parser_spans(self):
+        from analyzer import restrict_to_changed_lines
+
+        functions = [
+            {"name": "f", "instructions": 9, "file": "src/crypto.c", "lines": (5, 15)},
+            {"name": "g", "instructions": 9, "file": "src/crypto.c", "lines": (20, 30)},
+            {"name": "inlined", "instructions": 9, "file": "runtime.c", "lines": (1, 99)},
+            {"name": "unlocated", "instructions": 9},
+        ]
+        violations = [self._violation(f["name"], None) for f in functions]
+        kept = restrict_to_changed_lines(violations, [(12, 12)], functions, "/repo/src/crypto.c")
+        self.assertEqual([v.function for v in kept], ["f", "unlocated"])
+
+    def test_restrict_with_violation_lines_only(self):
+        from analyzer import restrict_to_changed_lines
+
+        violations = [self._violation("a", 2), self._violation("b", 6), self._violation("b", 7)]
+        self.assertEqual(
+            [v.function for v in restrict_to_changed_lines(violations, [(6, 6)])], ["b", "b"]
+        )
+        # A change between the two is attributed to both
+        self.assertEqual(len(restrict_to_changed_lines(violations, [(4, 4)])), 3)
+        self.assertEqual(restrict_to_changed_lines(violations, []), [])
+
+    def test_go_listing_locations(self):
+        parser = AssemblyParser("x86_64", "go")
+        listing = "\n".join(
+            [
+                "TEXT main.d(SB) /src/m.go",
+                "  m.go:4\t0x1000\t4889c1\t\tMOVQ AX, CX",
+                "  m.go:5\t0x1003\t4899\t\tCQO",
+                "  m.go:5\t0x1005\t48f7f9\t\tIDIVQ CX",
+                "  m.go:6\t0x1008\tc3\t\tRET",
+            ]
+        )
+        for functions, violations in (
+            parser.parse(listing),
+            parser.parse_bytes(line.encode() for line in listing.split("\n")),
+        ):
+            self.assertEqual(functions[0]["lines"], (4, 6))
+            self.assertEqual(functions[0]["file"], "m.go")
+            self.assertEqual((violations[0].file, violations[0].line), ("m.go", 5))
+
+    def test_cli_analyzes_changed_functions_only(self):
+        import contextlib
+        import io
+        import json
+        import shutil
+        import tempfile
+
+        from analyzer import main
+
+        if shutil.which("git") is None:
+            self.skipTest("git not available")
+        repo = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, repo)
+        previous = os.getcwd()
+        os.chdir(repo)
+        self.addCleanup(os.chdir, previous)
+
+        def git(*args):
+            subprocess.run(["git", *args], check=True, capture_output=True)
+
+        source = "def a(x, y):\n    return x / y\n\n\ndef b(x, y):\n    return x % y\n"
+        with open("m.py", "w") as f:
+            f.write(source)
+        with open("untouched.py", "w") as f:
+            f.write("def c(x, y):\n    return x / y\n")
+        git("init", "-q")
+        git("add", ".")
+        git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init")
+        with open("m.py", "w") as f:
+            f.write(source.replace("x % y", "(x % y) + 0"))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["--changed-since", "HEAD", "--json"]), 1)
+        report = json.loads(output.getvalue())
+        self.assertEqual([v["function"] for v in report["violations"]], ["b"])
+        self.assertEqual(report["source_file"], "changes since HEAD")
+
+
+class TestSharding(unittest.TestCase):
+    """Test deterministic sharding of batch runs and merging of shard reports."""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        previous = os.getcwd()
+        os.chdir(self.root)
+        self.addCleanup(os.chdir, previous)
+
+    def _write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return os.path.abspath(path)
+
+    def test_parse_shard(self):
+        from sharding import parse_shard
+
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ("0/4", "5/4", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(spec)
+
+    def test_partition_is_balanced_and_deterministic(self):
+        from sharding import partition
+
+        weights = {"a": 5.0, "b": 4.0, "c": 3.0, "d": 3.0, "e": 2.0, "f": 1.0}
+        shards = partition(weights, 2)
+        self.assertEqual(shards, partition(dict(reversed(list(weights.items()))), 2))
+        self.assertEqual(sorted(path for shard in shards for path in shard), sorted(weights))
+        loads = [sum(weights[path] for path in shard) for shard in shards]
+        self.assertEqual(loads, [9.0, 9.0])
+        self.assertEqual(partition({"a": 1.0}, 3), [["a"], [], []])
+
+    def test_weights_prefer_timings(self):
+        from sharding import file_weights
+
+        small = self._write("small.py", "x = 1\n")
+        large = self._write("large.py", "x = 1\n" * 100)
+        untimed = self._write("untimed.py", "x = 1\n" * 10)
+        weights = file_weights([small, large, untimed], {"small.py": 3.0, "large.py": 1.0})
+        self.assertEqual((weights[small], weights[large]), (3.0, 1.0))
+        # Untimed files are scaled by the timed files' seconds per byte
+        self.assertAlmostEqual(weights[untimed], 60 * 4.0 / 606)
+
+    def test_merge_reports(self):
+        from analyzer import violation_to_dict
+        from sharding import merge_reports
+
+        violation = violation_to_dict(
+            Violation(
+                function="f",
+                file="a.c",
+                line=3,
+                address="",
+                instruction="divl %ecx",
+                mnemonic="DIVL",
+                reason="test",
+                severity=Severity.ERROR,
+            )
+        )
+        shard = {
+            "architecture": "x86_64",
+            "compiler": "gcc",
+            "optimization": "O2",
+            "total_functions": 2,
+            "total_instructions": 10,
+            "suppressed": 1,
+        }
+        counts = {"error_count": 1, "warning_count": 0, "passed": False}
+        passed = {"error_count": 0, "warning_count": 0, "passed": True}
+        documents = [
+            dict(
+                shard,
+                **counts,
+                source_file="src (shard 1/2)",
+                violations=[violation],
+                timings={"b": 1},
+            ),
+            dict(shard, **passed, source_file="src (shard 2/2)", violations=[], timings={"a": 2}),
+        ]
+        report = merge_reports(documents)
+        self.assertEqual(report.source_file, "src")
+        self.assertEqual((report.total_functions, report.total_instructions), (4, 20))
+        self.assertEqual((report.error_count, report.suppressed), (1, 2))
+        self.assertEqual(report.timings, {"a": 2, "b": 1})
+        self.assertFalse(report.passed)
+
+    def test_cli_shards_cover_a_directory_scan(self):
+        import contextlib
+        import io
+        import json
+
+        from analyzer import main
+
+        for index in range(4):
+            self._write(f"src/m{index}.py", f"def f{index}(x, y):\n    return x / y\n")
+        self._write("src/.hidden/skipped.py", "def g(x, y):\n    return x / y\n")
+        self._write("src/header.h", "int x;\n")
+
+        for index in (1, 2):
+            argv = ["--json", "-o", f"s{index}.json", "--shard", f"{index}/2", "src"]
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(argv), 1)
+        shards = []
+        for index in (1, 2):
+            with open(f"s{index}.json") as f:
+                shards.append(set(json.load(f)["timings"]))
+        self.assertFalse(shards[0] & shards[1])
+        self.assertEqual(shards[0] | shards[1], {f"src/m{index}.py" for index in range(4)})
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["merge", "s1.json", "s2.json", "-o", "merged.json"]), 1)
+        with open("merged.json") as f:
+            merged = json.load(f)
+        self.assertEqual(merged["source_file"], "src")
+        self.assertEqual(merged["error_count"], 4)
+        self.assertEqual(len(merged["timings"]), 4)
+
+    def test_batch_continues_past_failed_files(self):
+        import contextlib
+        import io
+        import json
+
+        from analyzer import main
+        from sharding import merge_reports
+
+        self._write("src/ok.py", "def f(x, y):\n    return x / y\n")
+        self._write("src/bad.py", "def f(:\n")
+        self._write("src/clean.py", "def g(x):\n    return x\n")
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["--json", "src"]), 1)
+        report = json.loads(output.getvalue())
+        self.assertEqual(list(report["failed_files"]), ["src/bad.py"])
+        self.assertIn("SyntaxError", report["failed_files"]["src/bad.py"])
+        self.assertEqual(report["error_count"], 1)
+        self.assertEqual(len(report["timings"]), 3)
+
+        # A failed file fails the run even without violations
+        os.unlink("src/ok.py")
+        for option in ("--json", "--ndjson"):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                self.assertEqual(main([option, "src"]), 1)
+        summary = json.loads(output.getvalue().splitlines()[-1])
+        self.assertFalse(summary["passed"])
+        self.assertEqual(list(summary["failed_files"]), ["src/bad.py"])
+        self.assertFalse(merge_reports([report]).passed)
+
+    def test_merge_rejects_failed_shards(self):
+        import contextlib
+        import io
+        import json
+
+        from analyzer import main
+        from sharding import merge_reports
+
+        with self.assertRaisesRegex(ValueError, "missing"):
+            merge_reports([{"violations": []}])
+
+        self._write("ok.json", json.dumps({"source_file": "src", "violations": []}))
+        self._write("failed.json", json.dumps({"error": "git failed: bad revision"}))
+        # A failed shard writes an error record, which must not merge as passing
+        for name, problem in (("failed.json", "bad revision"), ("ok.json", "error_count")):
+            stderr = io.StringIO()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+                self.assertEqual(main(["merge", name]), 1)
+            self.assertIn(name, stderr.getvalue())
+            self.assertIn(problem, stderr.getvalue())
+
+
+class TestParserBenchmarks(unittest.TestCase):
+    """Test the synthetic corpora and baseline comparison of the parser benchmarks."""
+
+    def test_corpora_are_deterministic_and_parse_as_generated(self):
+        from benchmarks.corpus import generate, styles_for
+
+        for arch in DANGEROUS_INSTRUCTIONS:
+            for style in styles_for(arch):
+                with self.subTest(arch=arch, style=style):
+                    corpus = generate(arch, style, 2000)
+                    self.assertEqual(corpus.text, generate(arch, style, 2000).text)
+                    self.assertGreaterEqual(corpus.lines, 2000)
+                    self.assertGreater(corpus.errors, 0)
+                    parser = AssemblyParser(arch, "go" if style == "go" else "gcc")
+                    _functions, violations = parser.parse(corpus.text, include_warnings=True)
+                    errors = sum(1 for v in violations if v.severity == Severity.ERROR)
+                    self.assertEqual(
+                        (errors, len(violations) - errors), (corpus.errors, corpus.warnings)
+                    )
+        with self.assertRaises(ValueError):
+            generate("x86_64", "arm", 10)
+
+    def test_measure_and_compare(self):
+        from benchmarks.bench_parser import measure, result_key
+        from benchmarks.harness import compare
+
+        result = measure("x86_64", "gas", "10k", repeat=1)
+        self.assertGreater(result["lines_per_sec"], 0)
+        self.assertGreater(result["peak_bytes"], 0)
+        self.assertGreater(result["allocated_blocks"], 0)
+
+        baseline = {"results": [dict(result)]}
+        self.assertEqual(compare([result], baseline, result_key), [])
+        slower = dict(result, lines_per_sec=result["lines_per_sec"] // 2)
+        bigger = dict(result, peak_bytes=result["peak_bytes"] * 2)
+        self.assertEqual(len(compare([slower], baseline, result_key)), 1)
+        self.assertEqual(len(compare([bigger], baseline, result_key)), 1)
+        self.assertEqual(compare([dict(result, arch="i386")], baseline, result_key), [])
+
+
+class TestScriptBenchmarks(unittest.TestCase):
+    """Test the script analyzer benchmarks on recorded tool output."""
+
+    def test_every_workload_runs_without_toolchains(self):
+        from benchmarks.bench_scripts import WORKLOADS, measure
+
+        for workload in WORKLOADS:
+            with self.subTest(workload=workload.name):
+                result = measure(workload, scale=0, repeat=1, memory=False)
+                self.assertEqual(result["name"], workload.name)
+                self.assertGreater(result["lines"], 0)
+                self.assertGreater(result["lines_per_sec"], 0)
+
+    def test_recorded_fixtures_contain_violations(self):
+        from benchmarks.bench_scripts import WORKLOADS, measure
+
+        expected = {"vld", "v8", "dis", "yarv", "javap", "il", "scan-python", "scan-java"}
+        for workload in WORKLOADS:
+            if workload.name in expected:
+                with self.subTest(workload=workload.name):
+                    result = measure(workload, scale=0, repeat=1)
+                    self.assertGreater(result["violations"], 0)
+                    self.assertGreater(result["peak_bytes"], 0)
+
+
+class TestToolStore(unittest.TestCase):
+    """Test recording and replaying toolchain subprocesses."""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def _store(self, mode):
+        from analyzer import set_tool_store
+        from replay import ToolStore
+
+        store = ToolStore(os.path.join(self.root, "store"), mode)
+        previous = set_tool_store(store)
+        self.addCleanup(set_tool_store, previous)
+        return store
+
+    def _directory(self, name):
+        path = os.path.join(self.root, name)
+        os.makedirs(path)
+        return path
+
+    def test_replays_output_files_into_new_directories(self):
+        from unittest import mock
+
+        from analyzer import ToolRun, run_tool
+
+        script = 'echo built in "$0"; echo ok > "$0/out.txt"'
+        first = self._directory("first")
+        self._store("record")
+        completed = run_tool(ToolRun(["sh", "-c", script, first]))
+        self.assertEqual(completed.stdout.strip(), f"built in {first}")
+
+        second = self._directory("second")
+        store = self._store("replay")
+        with mock.patch("subprocess.Popen", side_effect=AssertionError("spawned")):
+            replayed = run_tool(ToolRun(["sh", "-c", script, second]))
+        self.assertEqual(replayed.stdout.strip(), f"built in {second}")
+        with open(os.path.join(second, "out.txt")) as f:
+            self.assertEqual(f.read(), "ok\n")
+        self.assertEqual((store.hits, store.misses), (1, 0))
+
+    def test_inputs_are_keyed_by_content(self):
+        from analyzer import ToolRun, run_tool
+        from replay import ToolNotRecorded
+
+        source = os.path.join(self.root, "input.txt")
+        with open(source, "w") as f:
+            f.write("one\n")
+        self._store("cache")
+        self.assertEqual(run_tool(ToolRun(["cat", source])).stdout, "one\n")
+
+        store = self._store("replay")
+        self.assertEqual(run_tool(ToolRun(["cat", source])).stdout, "one\n")
+        with open(source, "w") as f:
+            f.write("two\n")
+        with self.assertRaises(ToolNotRecorded):
+            run_tool(ToolRun(["cat", source]))
+        self.assertEqual(store.hits, 1)
+
+    def test_cache_is_keyed_by_tool_binary(self):
+        import shutil
+
+        from analyzer import ToolRun, run_tool
+
+        tool = os.path.join(self.root, "tool")
+        shutil.copy(shutil.which("true"), tool)
+        request = ToolRun([tool, "--flag"])
+        store = self._store("cache")
+        run_tool(request)
+        run_tool(request)
+        self.assertEqual((store.hits, store.misses), (1, 1))
+
+        # An upgraded tool runs again in cache mode but still replays by name
+        stat = os.stat(tool)
+        os.utime(tool, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        run_tool(request)
+        self.assertEqual((store.hits, store.misses), (1, 2))
+        store = self._store("replay")
+        run_tool(request)
+        self.assertEqual(store.hits, 1)
+
+    def test_replayed_analysis_matches_recorded(self):
+        import asyncio
+        from unittest import mock
+
+        from analyzer import analyze_source_async
+
+        sample = Path(__file__).parent / "test_samples" / "vulnerable.py"
+        self._store("record")
+        recorded = analyze_source(str(sample), include_warnings=True)
+
+        self._store("replay")
+        with mock.patch("subprocess.Popen", side_effect=AssertionError("spawned")):
+            replayed = analyze_source(str(sample), include_warnings=True)
+        self.assertEqual(len(replayed.violations), len(recorded.violations))
+        self.assertGreater(len(recorded.violations), 0)
+
+        replayed = asyncio.run(analyze_source_async(str(sample), include_warnings=True))
+        self.assertEqual(len(replayed.violations), len(recorded.violations))
+
+    def test_cli_replay_without_recording_fails(self):
+        import contextlib
+        import io
+
+        from analyzer import main
+
+        sample = Path(__file__).parent / "test_samples" / "vulnerable.py"
+        store = os.path.join(self.root, "empty")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["--replay", store, str(sample)]), 1)
+        self.assertIn("No recorded run", stderr.getvalue())
+
+
+class TestInstructionRules(unittest.TestCase):
+    """Test the compiled instruction lookup and its spelling folding."""
+
+    ARM_ASSEMBLY = """
+reduce:
+    cmp r0, r1
+    bhs .L2
+    beq.w .L3
+    it eq
+    udiveq r0, r0, r1
+    vdivne.f64 d0, d1, d2
+    bl helper
+    b .L4
+"""
+
+    def _parse_both(self, arch, assembly):
+        parser = AssemblyParser(arch, "clang")
+        _functions, violations = parser.parse(assembly, include_warnings=True)
+        lines = [line.encode() + b"\n" for line in assembly.split("\n")]
+        _functions, byte_violations = parser.parse_bytes(lines, include_warnings=True)
+        self.assertEqual(violations, byte_violations)
+        return violations
+
+    def test_arm_condition_codes_and_qualifiers(self):
+        violations = self._parse_both("arm", self.ARM_ASSEMBLY)
+        found = [(v.mnemonic, v.severity) for v in violations]
+        self.assertEqual(
+            found,
+            [
+                ("BHS", Severity.WARNING),
+                ("BEQ.W", Severity.WARNING),
+                ("UDIVEQ", Severity.ERROR),
+                ("VDIVNE.F64", Severity.ERROR),
+            ],
+        )
+        arm = DANGEROUS_INSTRUCTIONS["arm"]
+        self.assertEqual(violations[2].reason, arm["errors"]["udiv"])
+        self.assertEqual(violations[0].reason, arm["warnings"]["bcs"])
+
+    def test_canonical_spelling(self):
+        from analyzer import instruction_rules
+
+        x86 = instruction_rules("x86_64")
+        self.assertEqual(x86.canonical("idivl"), "idiv")
+        self.assertEqual(x86.canonical("idiv"), "idiv")
+        self.assertEqual(x86.canonical("divsd"), "divsd")
+        self.assertEqual(instruction_rules("arm").canonical("udiveq.w"), "udiv")
+        self.assertEqual(instruction_rules("arm64").canonical("b.cs"), "b.cs")
+
+    def test_arm64_condition_aliases(self):
+        assembly = "check:\n    b.hs .L1\n    b.lo .L2\n    b .L3\n    udiv w0, w1, w2\n"
+        violations = self._parse_both("arm64", assembly)
+        self.assertEqual([v.mnemonic for v in violations], ["B.HS", "B.LO", "UDIV"])
+
+    def test_single_probe_respects_warnings(self):
+        parser = AssemblyParser("arm", "gcc")
+        self.assertIsNone(parser.classify("bhs.w"))
+        self.assertEqual(parser.classify("bhs.w", include_warnings=True)[0], Severity.WARNING)
+        self.assertEqual(parser.classify("sdivgt.w")[0], Severity.ERROR)
+        for mnemonic in ("b", "bl", "bx", "b.w", "mov"):
+            self.assertIsNone(parser.classify(mnemonic, include_warnings=True), mnemonic)
+
+    def test_att_size_suffixes(self):
+        from analyzer import instruction_rules
+
+        i386 = instruction_rules("i386").everything
+        self.assertIn("fdivs", i386)
+        self.assertIn("fidivl", i386)
+        self.assertNotIn("jle" + "l", i386)
+        # Table entries keep their own reasons
+        x86 = DANGEROUS_INSTRUCTIONS["x86_64"]["errors"]
+        self.assertEqual(instruction_rules("x86_64").errors["divl"][1], x86["divl"])
+
+    def test_rules_are_shared(self):
+        from analyzer import instruction_rules
+
+        self.assertIs(instruction_rules("aarch64"), instruction_rules("arm64"))
+        self.assertIs(AssemblyParser("arm64", "gcc").rules, instruction_rules("arm64"))
+        self.assertEqual(instruction_rules("sparc").everything, {})
+
+
+class TestRulePacks(unittest.TestCase):
+    """Test rule pack loading, laziness and custom packs."""
+
+    def setUp(self):
+        import tempfile
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def _write_pack(self, name, target, tables, version=1):
+        import json
+
+        path = os.path.join(self.directory.name, name)
+        document = {"format": "ct-analyzer-rules", "version": version, "target": target}
+        document["tables"] = tables
+        with open(path, "w") as f:
+            json.dump(document, f)
+        return path
+
+    def test_builtin_tables(self):
+        from script_analyzers import DANGEROUS_KOTLIN_BYTECODES, DANGEROUS_PHP_OPCODES
+
+        self.assertIn("div", DANGEROUS_PHP_OPCODES["errors"])
+        self.assertIn("idiv", DANGEROUS_KOTLIN_BYTECODES["errors"])
+        architectures = {"arm", "arm64", "i386", "ppc64le", "riscv64", "s390x", "x86_64"}
+        self.assertEqual(set(DANGEROUS_INSTRUCTIONS), architectures)
+        # Equal reasons are one string
+        warnings = list(DANGEROUS_INSTRUCTIONS["x86_64"]["warnings"].values())
+        self.assertTrue(all(reason is warnings[0] for reason in warnings))
+
+    def test_packs_are_read_on_first_lookup(self):
+        from unittest import mock
+
+        import rulepacks
+
+        packs = rulepacks.RulePacks()
+        tables = rulepacks.TargetTables("instructions", packs)
+        with mock.patch.object(rulepacks, "read_pack", wraps=rulepacks.read_pack) as read:
+            self.assertIn("arm64", tables)
+            self.assertNotIn("mips", tables)
+            self.assertEqual(len(list(tables)), 7)
+            self.assertEqual(read.call_count, 0)
+            self.assertIn("div", tables["x86_64"]["errors"])
+            tables["x86_64"]
+            self.assertEqual(read.call_count, 1)
+
+    def test_custom_packs_merge_and_add_targets(self):
+        import rulepacks
+
+        extra = {"entries": {"imul": "IMUL is flagged by policy", "div": "custom reason"}}
+        self._write_pack("x86.json", "x86_64", {"instructions": {"errors": [extra]}})
+        mips = {"instructions": {"errors": [{"entries": {"div": "DIV is variable-time"}}]}}
+        self._write_pack("mips.json", "mips", mips)
+
+        packs = rulepacks.RulePacks()
+        builtin = packs.table("instructions", "x86_64")
+        self.assertEqual(sorted(packs.add(self.directory.name)), ["mips", "x86_64"])
+        merged = packs.table("instructions", "x86_64")
+        self.assertEqual(merged["errors"]["imul"], "IMUL is flagged by policy")
+        self.assertEqual(merged["errors"]["div"], "custom reason")
+        self.assertIn("je", merged["warnings"])
+        # The parsed built-in pack is not modified
+        self.assertNotIn("imul", builtin["errors"])
+        self.assertEqual(packs.targets("instructions")[-1], "mips")
+        self.assertEqual(packs.table("instructions", "mips")["warnings"], {})
+
+    def test_compiled_cache_is_cleared_by_add(self):
+        import rulepacks
+
+        packs = rulepacks.RulePacks()
+        builds = []
+        for _ in range(2):
+            packs.compiled("key", lambda: builds.append(1) or len(builds))
+        self.assertEqual(builds, [1])
+        packs.add(self._write_pack("empty.json", "x86_64", {}))
+        self.assertEqual(packs.compiled("key", lambda: 2), 2)
+
+    def test_invalid_packs(self):
+        from rulepacks import RulePackError, read_pack
+
+        with self.assertRaisesRegex(RulePackError, "version"):
+            read_pack(self._write_pack("future.json", "x86_64", {}, version=2))
+        with self.assertRaisesRegex(RulePackError, "severity"):
+            read_pack(self._write_pack("bad.json", "x86_64", {"instructions": {"fatal": []}}))
+
+    def test_cli_rules(self):
+        import json
+
+        pack = self._write_pack(
+            "policy.json",
+            "x86_64",
+            {"instructions": {"errors": [{"entries": {"imul": "IMUL is flagged by policy"}}]}},
+        )
+        assembly = os.path.join(self.directory.name, "f.s")
+        with open(assembly, "w") as f:
+            f.write("f:\n    imull %eax, %ebx\n")
+        analyzer_path = str(Path(__file__).parent.parent / "analyzer.py")
+        command = [sys.executable, analyzer_path, "--assembly", "--arch", "x86_64", "--json"]
+
+        result = subprocess.run([*command, "--rules", pack, assembly], capture_output=True)
+        self.assertEqual(result.returncode, 1)
+        self.assertEqual(json.loads(result.stdout)["violations"][0]["mnemonic"], "IMULL")
+
+        # The server does not see the packs, so the analysis stays local
+        socket_path = os.path.join(self.directory.name, "absent.sock")
+        result = subprocess.run(
+            [*command, "--rules", pack, "--server", socket_path, assembly],
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("custom rule packs", result.stderr)
+        self.assertEqual(json.loads(result.stdout)["violations"][0]["mnemonic"], "IMULL")
+
+        env = dict(os.environ, CT_ANALYZER_RULES=assembly)
+        result = subprocess.run([*command, assembly], capture_output=True, text=True, env=env)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn("cannot load rules", result.stderr)
+
+
+class TestStartup(unittest.TestCase):
+    """Test that the command line imports only what the invoked path needs."""
+
+    # Modules only other paths need (toolchains, script languages, batches, ...)
+    DEFERRED = {
+        "asyncio",
+        "baseline",
+        "binary_analyzer",
+        "changes",
+        "differential",
+        "pathlib",
+        "replay",
+        "report_writers",
+        "script_analyzers",
+        "server",
+        "sharding",
+        "subprocess",
+        "tempfile",
+        "watch",
+    }
+
+    def test_library_import(self):
+        from benchmarks.bench_startup import imported_modules
+
+        modules = imported_modules("import", "")
+        self.assertIn("analyzer", modules)
+        self.assertEqual(self.DEFERRED & set(modules), set())
+        self.assertNotIn("argparse", modules)
+        self.assertNotIn("json", modules)
+
+    def test_assembly_analysis_imports(self):
+        import tempfile
+
+        from benchmarks.bench_startup import SMALL_ASSEMBLY, imported_modules
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "small.s")
+            with open(path, "w") as f:
+                f.write(SMALL_ASSEMBLY)
+            modules = imported_modules("assembly", path)
+        self.assertIn("argparse", modules)
+        self.assertIn("rulepacks", modules)
+        self.assertEqual(self.DEFERRED & set(modules), set())
+
+
+class TestDebugLineDirectives(unittest.TestCase):
+    """Test source locations from .file/.loc directives (-g output)."""
+
+    ASSEMBLY = "\n".join(
+        [
+            '\t.file\t"crypto.c"',
+            '\t.file 0 "/src" "crypto.c" md5 0x0123456789abcdef',
+            '\t.file 1 "crypto.c"',
+            '\t.file 2 "/usr/include/inline\\\\util.h"',
+            "\t.type\treduce, @function",
+            "reduce:",
+            "\t.loc 1 10 5",
+            "\tmovl %edi, %eax",
+            "\t.loc 1 12 14 is_stmt 0",
+            "\tidivl %esi",
+            "\t.loc 2 40 3",
+            "\tdivq %rcx",
+            "\t.loc 1 0 0",
+            "\tret",
+            "\t.type\tselect, @function",
+            "select:",
+            "\t.loc\t0 20 3 prologue_end",
+            "\tidivl %ecx",
+        ]
+    )
+
+    def test_violations_located_by_loc(self):
+        parser = AssemblyParser("x86_64", "gcc")
+        functions, violations = parser.parse(self.ASSEMBLY)
+        self.assertEqual(
+            [(v.function, v.file, v.line) for v in violations],
+            [
+                ("reduce", "crypto.c", 12),
+                ("reduce", "/usr/include/inline\\util.h", 40),
+                ("select", "/src/crypto.c", 20),
+            ],
+        )
+        # A function's span covers the lines of its first file; line 0 is skipped
+        reduce = [f for f in functions if f["name"] == "reduce"][-1]
+        self.assertEqual((reduce["file"], reduce["lines"]), ("crypto.c", (10, 12)))
+
+    def test_file_names_are_shared(self):
+        _functions, violations = AssemblyParser("x86_64", "gcc").parse(
+            self.ASSEMBLY + "\n\t.loc 1 13 1\n\tdivl %ecx"
+        )
+        self.assertIs(violations[0].file, violations[-1].file)
+
+    def test_bytes_parser_matches_text_parser(self):
+        parser = AssemblyParser("x86_64", "gcc")
+        lines = self.ASSEMBLY.encode().splitlines(keepends=True)
+        self.assertEqual(parser.parse_bytes(lines), parser.parse(self.ASSEMBLY))
+
+    def test_assembler_string_escapes(self):
+        from analyzer import _assembler_string, _file_directive
+
+        self.assertEqual(_assembler_string(b"caf\\303\\251.c"), "café.c")
+        self.assertEqual(_assembler_string(b'a\\"b\\\\c'), 'a"b\\c')
+        self.assertIsNone(_file_directive(b'.file "crypto.c"'))
+        self.assertEqual(_file_directive(b'.file 3 "/abs/x.c" "y.c"'), (3, "/abs/x.c/y.c"))
+        self.assertEqual(_file_directive(b'.file 3 "/src" "/abs/y.c"'), (3, "/abs/y.c"))
+
+    def test_split_file_chunks_share_the_file_table(self):
+        import tempfile
+
+        from analyzer import parse_assembly_file
+
+        body = ['\t.file 1 "crypto.c"']
+        for i in range(30):
+            body += [f"\t.type\tf{i}, @function", f"f{i}:", f"\t.loc 1 {100 + i} 1", "\tdivl %ecx"]
+        assembly = "\n".join(body)
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".s", delete=False) as f:
+            f.write(assembly)
+        self.addCleanup(os.unlink, f.name)
+
+        expected = AssemblyParser("x86_64", "gcc").parse(assembly)
+        actual = parse_assembly_file(f.name, "x86_64", jobs=3, min_parallel_size=0)
+        self.assertEqual(actual, expected)
+        self.assertEqual([v.line for v in actual[1]], list(range(100, 130)))
+
+    def test_debug_info_adds_line_tables(self):
+        from analyzer import ClangCompiler, GCCCompiler, GoCompiler
+
+        self.assertEqual(GCCCompiler.DEBUG_FLAGS, ["-g1"])
+        self.assertEqual(ClangCompiler.DEBUG_FLAGS, ["-gline-tables-only"])
+        self.assertEqual(GoCompiler.DEBUG_FLAGS, [])
+
+        for name in ("gcc", "clang"):
+            try:
+                subprocess.run([name, "--version"], capture_output=True, check=True)
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                continue
+            sample = Path(__file__).parent / "test_samples" / "decompose_vulnerable.c"
+            report = analyze_source(str(sample), compiler=name, debug_info=True)
+            self.assertTrue(report.violations)
+            for violation in report.violations:
+                self.assertTrue(violation.file.endswith("decompose_vulnerable.c"), violation)
+                self.assertGreater(violation.line, 0)
+            return
+        self.skipTest("No C compiler available")
+
+
+class TestFunctionBodies(unittest.TestCase):
+    """Test parsing each distinct function body once across configurations."""
+
+    @staticmethod
+    def _assembly(first_label, cfi):
+        return "\n".join(
+            [
+                '\t.file 1 "crypto.c"',
+                "\t.type\treduce, @function",
+                "reduce:",
+                *(["\t.cfi_startproc"] if cfi else []),
+                "\t.loc 1 3 5",
+                f"\tjne .L{first_label}",
+                "\tidivl %esi",
+                f".L{first_label}:",
+                "\tret",
+                "\t.type\tselect, @function",
+                "select:",
+                "\tdivl %ecx",
+                "\t.section .debug_str",
+                f'\t.string "GNU C -O{first_label}"',
+            ]
+        )
+
+    def test_identical_bodies_parsed_once(self):
+        from differential import FunctionBodies
+
+        bodies = FunctionBodies("x86_64", include_warnings=True)
+        parser = AssemblyParser("x86_64", "gcc")
+        signatures = []
+        # Label numbering, .cfi directives and debug data differ; the code does not
+        for label, cfi in ((2, False), (7, True)):
+            text = self._assembly(label, cfi)
+            functions, violations, signature = bodies.analyze(text)
+            self.assertEqual((functions, violations), parser.parse(text, include_warnings=True))
+            signatures.append(signature)
+        self.assertEqual(bodies.total, 6)
+        self.assertEqual(bodies.parsed, 3)
+        self.assertEqual(signatures[0], signatures[1])
+        # Each configuration keeps its own instruction text
+        self.assertEqual(violations[0].instruction, "jne .L7")
+        self.assertEqual((violations[1].file, violations[1].line), ("crypto.c", 3))
+
+    def test_comparison_groups_identical_configurations(self):
+        from differential import CompilerComparison, format_comparison
+
+        report = TestCompilerComparison._report
+        comparison = CompilerComparison(
+            "crypto.c",
+            {
+                "O2": report("gcc", ("reduce", "IDIVL", 3, Severity.ERROR)),
+                "O3": report("gcc", ("reduce", "IDIVL", 3, Severity.ERROR)),
+                "Os": report("gcc", ("reduce", "IDIVL", 3, Severity.ERROR)),
+            },
+            identical={"reduce": [["O2", "O3"]]},
+            bodies=6,
+            parsed_bodies=4,
+        )
+        self.assertEqual(comparison.groups("reduce"), [["O2", "O3"], ["Os"]])
+        text = format_comparison(comparison, OutputFormat.TEXT)
+        self.assertIn("reduce: (identical in O2/O3)", text)
+        self.assertIn("distinct and parsed: 4", text)
+
+
+class TestCompilerComparison(unittest.TestCase):
+    """Test --compilers differential analysis."""
+
+    @staticmethod
+    def _report(compiler, *violations):
+        report = AnalysisReport("x86_64", compiler, "O2", "crypto.c", 2, 10)
+        report.violations = [
+            Violation(function, "crypto.c", line, "", mnemonic.lower(), mnemonic, "", severity)
+            for function, mnemonic, line, severity in violations
+        ]
+        return report
+
+    def _comparison(self):
+        from differential import CompilerComparison
+
+        return CompilerComparison(
+            "crypto.c",
+            {
+                "gcc": self._report(
+                    "gcc",
+                    ("reduce", "IDIVL", 3, Severity.ERROR),
+                    ("select", "JE", 9, Severity.WARNING),
+                ),
+                "clang": self._report("clang", ("reduce", "IDIVL", 3, Severity.ERROR)),
+            },
+        )
+
+    def test_violations_aligned_per_function(self):
+        comparison = self._comparison()
+        self.assertEqual(comparison.functions(), ["reduce", "select"])
+        self.assertEqual(
+            {name: len(vs) for name, vs in comparison.violations("select").items()},
+            {"gcc": 1, "clang": 0},
+        )
+        self.assertEqual([v.mnemonic for v in comparison.unique("gcc")], ["JE"])
+        self.assertEqual(comparison.unique("clang"), [])
+        self.assertFalse(comparison.passed)
+
+    def test_json_lists_unique_instructions(self):
+        import json
+
+        from differential import format_comparison
+
+        document = json.loads(format_comparison(self._comparison(), OutputFormat.JSON))
+        self.assertEqual(list(document["configurations"]), ["gcc", "clang"])
+        select = document["functions"][1]
+        self.assertEqual(select["unique"], {"gcc": ["JE"], "clang": []})
+        self.assertEqual(document["functions"][0]["unique"], {"gcc": [], "clang": []})
+
+        text = format_comparison(self._comparison(), OutputFormat.TEXT)
+        self.assertIn("[only gcc]", text)
+        self.assertIn("Only under gcc: 1", text)
+        with self.assertRaises(ValueError):
+            format_comparison(self._comparison(), OutputFormat.SARIF)
+
+    def test_parse_names_and_labels(self):
+        from differential import configuration_labels, parse_names
+
+        self.assertEqual(parse_names("gcc, clang,gcc"), ["gcc", "clang"])
+        self.assertEqual(configuration_labels([("gcc", "O2"), ("clang", "O2")]), ["gcc", "clang"])
+        self.assertEqual(configuration_labels([(None, "O2"), (None, "O3")]), ["O2", "O3"])
+        self.assertEqual(
+            configuration_labels([("gcc", "O2"), ("clang", "O3")]), ["gcc -O2", "clang -O3"]
+        )
+
+    def test_cli_rejects_other_modes(self):
+        import io
+        from contextlib import redirect_stderr
+
+        from analyzer import main
+
+        for argv in (
+            ["--compilers", "gcc,clang", "--compiler", "gcc", "crypto.c"],
+            ["--compilers", "gcc,clang", "--assembly", "crypto.s"],
+            ["--compilers", "gcc,clang", "--sarif", "crypto.c"],
+            ["--compilers", "gcc", "crypto.c"],
+            ["--opt-levels", "O2,O2", "crypto.c"],
+        ):
+            with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+                main(argv)
+
+    def test_compilers_run_concurrently(self):
+        """Two toolchains (gcc, and gcc posing as clang) analyze one file in one pass."""
+        import shutil
+        import tempfile
+        from unittest import mock
+
+        from analyzer import clear_toolchain_cache
+        from differential import compare_compilers
+
+        try:
+            subprocess.run(["gcc", "--version"], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            self.skipTest("gcc required")
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        clang = os.path.join(directory, "clang")
+        with open(clang, "w") as f:
+            f.write(
+                f"#!{sys.executable}\n"
+                "import os, sys\n"
+                "args = [a for a in sys.argv[1:] if not a.startswith('--target=')]\n"
+                "args = ['-g1' if a == '-gline-tables-only' else a for a in args]\n"
+                "os.execvp('gcc', ['gcc', *args])\n"
+            )
+        os.chmod(clang, 0o755)
+        sample = Path(__file__).parent / "test_samples" / "decompose_vulnerable.c"
+
+        clear_toolchain_cache()
+        self.addCleanup(clear_toolchain_cache)
+        path = directory + os.pathsep + os.environ.get("PATH", "")
+        with mock.patch.dict(os.environ, {"PATH": path}):
+            comparison = compare_compilers(str(sample), ["gcc", "clang"], debug_info=True)
+
+        self.assertEqual(list(comparison.reports), ["gcc", "clang"])
+        self.assertEqual(comparison.reports["clang"].compiler, "clang")
+        self.assertTrue(comparison.functions())
+        # Same code from both: nothing is unique to either
+        self.assertEqual(comparison.unique("gcc"), [])
+        self.assertEqual(comparison.unique("clang"), [])
+
+
+class TestWatch(unittest.TestCase):
+    """Test --watch change detection and incremental deltas."""
+
+    DIVIDE = "int reduce(int a, int b) { return a / b; }\n"
+    SELECT = "int pick(int c, int a, int b) { return (-c & a) | ((c - 1) & b); }\n"
+    MODULO = "int wrap(int a, int b) { return a % b; }\n"
+
+    def _require_gcc(self):
+        if not TestIntegration._check_compiler("gcc"):
+            self.skipTest("gcc not available")
+
+    def test_collect_changes_merges_burst(self):
+        import tempfile
+
+        from watch import InotifyWatcher, PollingWatcher, collect_changes
+
+        watchers = [lambda roots: PollingWatcher(roots, interval=0.05)]
+        if sys.platform.startswith("linux"):
+            watchers.append(InotifyWatcher)
+        for open_watcher in watchers:
+            with tempfile.TemporaryDirectory() as tmpdir:
+                path = os.path.join(os.path.realpath(tmpdir), "crypto.c")
+                Path(path).write_text(self.SELECT)
+                watcher = open_watcher([os.path.realpath(tmpdir)])
+                with self.subTest(watcher=watcher.name):
+                    try:
+                        # A backup-and-rename save, then a rewrite
+                        os.rename(path, path + "~")
+                        Path(path).write_text(self.DIVIDE)
+                        Path(path).write_text(self.DIVIDE + self.SELECT)
+                        changed = collect_changes(watcher, debounce=0.2)
+                        self.assertIn(path, changed)
+                        self.assertEqual(watcher.poll(0.1), set())
+                    finally:
+                        watcher.close()
+
+    def test_polling_survives_removed_directories(self):
+        import shutil
+        import tempfile
+        from unittest import mock
+
+        from watch import PollingWatcher
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = os.path.realpath(tmpdir)
+            build = os.path.join(root, "build")
+            os.makedirs(os.path.join(build, "obj"))
+            Path(build, "obj", "a.c").write_text(self.SELECT)
+            watcher = PollingWatcher([root], interval=0.01)
+            walk = os.walk
+
+            def walk_then_remove(top, *args, **kwargs):
+                # build/ is removed between the walk listing it and yielding it
+                for entry in walk(top, *args, **kwargs):
+                    if entry[0] == build:
+                        shutil.rmtree(build)
+                    yield entry
+
+            with mock.patch("os.walk", walk_then_remove):
+                changed = watcher.poll(0.1)
+            self.assertEqual(changed, {os.path.join(build, "obj", "a.c")})
+
+    def test_targets(self):
+        import tempfile
+
+        from watch import WatchSession
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = os.path.realpath(tmpdir)
+            os.mkdir(os.path.join(root, ".git"))
+            for name in ("a.c", "b.py", "ct.h", "notes.txt", ".git/c.c"):
+                Path(root, name).write_text("")
+            session = WatchSession([root], arch="x86_64")
+            a, b = os.path.join(root, "a.c"), os.path.join(root, "b.py")
+            ignored = [os.path.join(root, name) for name in ("notes.txt", ".git/c.c")]
+            self.assertEqual(session.targets([a, b, *ignored]), ([a, b], False))
+            # A header re-analyzes the C and C++ sources only
+            header = os.path.join(root, "ct.h")
+            self.assertEqual(session.targets([header]), ([a], True))
+            self.assertEqual(session.targets(["/elsewhere/d.c"]), ([], False))
+
+    def test_deltas(self):
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "crypto.c")
+            Path(path).write_text(self.DIVIDE + self.SELECT)
+            self._require_gcc()
+            from watch import WatchSession
+
+            session = WatchSession([tmpdir], arch="x86_64", compiler="gcc")
+
+            first = session.analyze(path)
+            self.assertTrue(first.initial)
+            self.assertEqual([v.function for v in first.new], ["reduce"])
+
+            # Moving reduce() does not report it again
+            Path(path).write_text("\n\n" + self.SELECT + self.DIVIDE + self.MODULO)
+            delta = session.analyze(path)
+            self.assertEqual([v.function for v in delta.new], ["wrap"])
+            self.assertEqual(delta.fixed, [])
+            self.assertEqual(delta.violations, 2)
+
+            Path(path).write_text(self.SELECT + self.MODULO)
+            delta = session.analyze(path)
+            self.assertEqual(([v.function for v in delta.fixed], delta.new), (["reduce"], []))
+
+            Path(path).write_text("int broken(")
+            delta = session.analyze(path)
+            self.assertIn("Compilation failed", delta.error)
+            # The last good state is kept: fixing the error reports no change
+            Path(path).write_text(self.SELECT + self.MODULO)
+            self.assertFalse(session.analyze(path).changed)
+
+            os.unlink(path)
+            delta = session.analyze(path)
+            self.assertTrue(delta.removed)
+            self.assertEqual([v.function for v in delta.fixed], ["wrap"])
+
+    def test_format_delta(self):
+        import json
+
+        from watch import FileDelta, format_delta
+
+        violation = Violation(
+            "reduce", "crypto.c", 3, "", "idivl\t%esi", "IDIVL", "", Severity.ERROR
+        )
+        delta = FileDelta("crypto.c", new=[violation], violations=1, seconds=0.2)
+        text = format_delta(delta)
+        self.assertIn("crypto.c: 1 new, 0 fixed, 1 violation (0.20s)", text)
+        self.assertIn("  + [ERROR] IDIVL in reduce (crypto.c:3): idivl %esi", text)
+        record = json.loads(format_delta(delta, OutputFormat.NDJSON))
+        self.assertEqual((record["type"], record["new"][0]["mnemonic"]), ("delta", "IDIVL"))
+        error = FileDelta("crypto.c", error="Compilation failed")
+        self.assertIn("crypto.c: Error: Compilation failed", format_delta(error))
+
+    def test_watch_reports_saves(self):
+        import io
+        import tempfile
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self._require_gcc()
+            from watch import watch
+
+            path = os.path.join(tmpdir, "crypto.c")
+            Path(path).write_text(self.SELECT)
+            out = io.StringIO()
+            watch(
+                [tmpdir],
+                out,
+                rounds=1,
+                on_ready=lambda: Path(path).write_text(self.SELECT + self.DIVIDE),
+                arch="x86_64",
+                compiler="gcc",
+            )
+            lines = out.getvalue().splitlines()
+            self.assertRegex(lines[0], r"crypto\.c: 0 violations$")
+            self.assertRegex(lines[1], r"crypto\.c: 1 new, 0 fixed, 1 violation")
+            self.assertIn("IDIVL in reduce", lines[2])
+
+    def test_cli_rejects_other_modes(self):
+        import io
+        from contextlib import redirect_stderr
+
+        from analyzer import main
+
+        for argv in (
+            ["--watch", "--assembly", "--arch", "x86_64", "crypto.s"],
+            ["--watch", "--opt-levels", "O2,O3", "crypto.c"],
+            ["--watch", "--json", "crypto.c"],
+        ):
+            with self.assertRaises(SystemExit), redirect_stderr(io.StringIO()):
+                main(argv)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+# /// script
+# requires-python = ">=3.10"
+# ///
+"""
+Watch mode: re-analyze sources as they are saved and report what changed.
+
+    ct-analyzer --watch crypto.c
+    ct-analyzer --watch --tool-cache .ct-tools src/
+
+Every source file under the watched paths is analyzed once; after that,
+each save re-analyzes only the files it touched and prints the violations
+that appeared or disappeared, rather than the full report:
+
+    [14:02:11] crypto.c: 1 new, 1 fixed, 2 violations (0.21s)
+      + [ERROR] IDIVL in reduce (crypto.c:14): idivl %ecx
+      - [ERROR] DIVL in select (crypto.c:31): divl %esi
+
+Changes are detected with inotify on Linux (through ctypes, no extra
+dependency) and by polling file modification times elsewhere. A burst of
+events, such as an editor writing a backup and renaming the new file into
+place, is collected until the tree has been quiet for DEBOUNCE seconds
+and handled as one round.
+
+Violations are compared by their baseline fingerprints (see baseline.py),
+which leave out addresses and line numbers, so an edit in one function
+does not report the untouched ones as fixed and new again. Each file keeps
+the parsed function bodies of its last compile (see
+differential.FunctionBodies), so only the functions whose code changed
+are parsed again. The compile itself goes through the tool store as usual:
+with --tool-cache, reverting a file replays the stored compile. Headers are
+not analyzed on their own; saving one re-analyzes every watched C and C++
+source without the tool store, which does not track included headers.
+"""
+
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TextIO
+
+# Import shared types from main analyzer
+try:
+    from .analyzer import (
+        AnalysisReport,
+        OutputFormat,
+        Severity,
+        ToolLimits,
+        Violation,
+        analyze_source,
+        detect_language,
+        get_native_arch,
+        is_bytecode_language,
+        normalize_arch,
+        run_steps,
+        set_tool_store,
+        violation_to_dict,
+    )
+    from .baseline import Fingerprinter
+    from .changes import HEADER_SUFFIXES, scan_sources, select_sources
+    from .differential import FunctionBodies, _configuration_steps
+except ImportError:
+    from analyzer import (
+        AnalysisReport,
+        OutputFormat,
+        Severity,
+        ToolLimits,
+        Violation,
+        analyze_source,
+        detect_language,
+        get_native_arch,
+        is_bytecode_language,
+        normalize_arch,
+        run_steps,
+        set_tool_store,
+        violation_to_dict,
+    )
+    from baseline import Fingerprinter
+    from changes import HEADER_SUFFIXES, scan_sources, select_sources
+    from differential import FunctionBodies, _configuration_steps
+
+
+# Seconds without events that end a burst of changes
+DEBOUNCE = 0.1
+# Seconds between scans when inotify is not available
+POLL_INTERVAL = 0.25
+
+
+def _hidden(path: str, root: str) -> bool:
+    """Whether path lies in a hidden directory (.git, .venv, ...) below root."""
+    parts = os.path.relpath(path, root).split(os.sep)
+    return any(part.startswith(".") for part in parts[:-1])
+
+
+def _walk(root: str) -> Iterable[tuple[str, list[str]]]:
+    """(directory, file names) for root and every directory below it, skipping hidden ones."""
+    # os.walk skips directories removed while it runs
+    for directory, directories, files in os.walk(root):
+        directories[:] = [d for d in directories if not d.startswith(".")]
+        yield directory, files
+
+
+def _walk_directories(root: str) -> Iterable[str]:
+    """root and every directory below it, skipping hidden ones."""
+    return (directory for directory, _files in _walk(root))
+
+
+# =============================================================================
+# Change Detection
+# =============================================================================
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+# File events that can change a source: written, renamed into place, removed
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+# struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len]
+_EVENT_HEADER = struct.Struct("=iIII")
+
+
+class InotifyWatcher:
+    """
+    Change detection with Linux inotify, through ctypes.
+
+    A file root is watched through its directory, so editors that save by
+    renaming a new file over the old one are seen. Directories created
+    under a directory root are watched as they appear.
+
+    Raises:
+        OSError: inotify is not available (not Linux, or out of watches)
+    """
+
+    name = "inotify"
+
+    def __init__(self, roots: list[str]):
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        try:
+            init, self._add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError:
+            raise OSError("inotify is not available") from None
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._get_errno = ctypes.get_errno
+        self.roots = roots
+        # Watch descriptor -> directory
+        self._directories: dict[int, str] = {}
+        try:
+            for root in roots:
+                if os.path.isdir(root):
+                    self._watch_tree(root)
+                else:
+                    self._watch(os.path.dirname(root))
+        except OSError:
+            self.close()
+            raise
+
+    def _watch(self, directory: str) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd < 0:
+            raise OSError(self._get_errno(), f"cannot watch {directory}")
+        self._directories[wd] = directory
+
+    def _watch_tree(self, root: str) -> None:
+        for directory in _walk_directories(root):
+            self._watch(directory)
+
+    def poll(self, timeout: float | None = None) -> set[str]:
+        """
+        Paths changed since the last call, waiting up to timeout seconds
+        (None: until something changes) for the first event.
+
+        A directory in the result means anything below it may have changed.
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        data = b""
+        while True:
+            try:
+                data += os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+        changed = set()
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset : offset + length]
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; rescan everything
+                changed.update(self.roots)
+                continue
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+                continue
+            directory = self._directories.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(raw_name.rstrip(b"\0")))
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                if not os.path.basename(path).startswith("."):
+                    try:
+                        self._watch_tree(path)
+                    except OSError:
+                        pass  # Already removed again
+            changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Change detection by comparing file modification times and sizes."""
+
+    name = "polling"
+
+    def __init__(self, roots: list[str], interval: float = POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self._state = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        state = {}
+        for root in self.roots:
+            if os.path.isdir(root):
+                paths = (
+                    os.path.join(directory, name)
+                    for directory, files in _walk(root)
+                    for name in files
+                )
+            else:
+                paths = [root]
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if not os.path.isdir(path):
+                    state[path] = (st.st_mtime_ns, st.st_size)
+        return state
+
+    def poll(self, timeout: float | None = None) -> set[str]:
+        """Paths changed since the last call; see InotifyWatcher.poll."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0))
+            time.sleep(wait)
+            state = self._scan()
+            changed = {
+                path
+                for path in state.keys() | self._state.keys()
+                if state.get(path) != self._state.get(path)
+            }
+            self._state = state
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def open_watcher(roots: list[str], polling: bool = False):
+    """An InotifyWatcher for roots, or a PollingWatcher where inotify is unavailable."""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except OSError:
+            pass
+    return PollingWatcher(roots)
+
+
+def collect_changes(watcher, debounce: float = DEBOUNCE) -> set[str]:
+    """Wait for a change, then gather events until none arrive for debounce seconds."""
+    changed = watcher.poll(None)
+    while True:
+        more = watcher.poll(debounce)
+        if not more:
+            return changed
+        changed |= more
+
+
+# =============================================================================
+# Incremental Analysis
+# =============================================================================
+
+
+@dataclass
+class FileDelta:
+    """How one file's violations changed in a round of watch mode."""
+
+    path: str
+    new: list[Violation] = field(default_factory=list)
+    fixed: list[Violation] = field(default_factory=list)
+    # Violations reported for the file now
+    violations: int = 0
+    seconds: float = 0.0
+    # First analysis of the file: every violation is in new
+    initial: bool = False
+    removed: bool = False
+    # Why analysis failed; the previous violations are kept
+    error: str | None = None
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.new or self.fixed)
+
+
+class WatchSession:
+    """
+    The violations of every watched source as of its last analysis, and
+    the deltas as files change.
+
+    Args:
+        roots: Source files and directories to watch
+        arch, compiler, optimization, include_warnings, function_filter,
+        extra_flags, limits, debug_info: As for analyze_source();
+            compiler and extra_flags apply to C and C++ sources only
+    """
+
+    def __init__(
+        self,
+        roots: list[str],
+        arch: str | None = None,
+        compiler: str | None = None,
+        optimization: str = "O2",
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+        extra_flags: list[str] | None = None,
+        limits: ToolLimits | None = None,
+        debug_info: bool = False,
+    ):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.arch = normalize_arch(arch or get_native_arch())
+        self.compiler = compiler
+        self.optimization = optimization
+        self.include_warnings = include_warnings
+        self.function_filter = function_filter
+        self.extra_flags = extra_flags
+        self.limits = limits
+        self.debug_info = debug_info
+        # Path -> fingerprint -> violation, as of the last successful analysis
+        self._violations: dict[str, dict[int, Violation]] = {}
+        # Path -> parsed function bodies of its last compile
+        self._bodies: dict[str, FunctionBodies] = {}
+
+    def sources(self) -> list[str]:
+        """Every analyzable source under the roots, in path order."""
+        found = {}
+        for root in self.roots:
+            if os.path.isdir(root):
+                found.update(scan_sources(root))
+            else:
+                found[root] = None
+        return sorted(found)
+
+    def _watched(self, path: str) -> bool:
+        for root in self.roots:
+            if path == root:
+                return True
+            if os.path.isdir(root) and path.startswith(root + os.sep):
+                return not _hidden(path, root)
+        return False
+
+    def targets(self, changed: Iterable[str]) -> tuple[list[str], bool]:
+        """
+        The sources to re-analyze for a set of changed paths.
+
+        Returns:
+            (paths in order, whether a header changed)
+        """
+        paths = set()
+        headers = False
+        for path in changed:
+            path = os.path.abspath(path)
+            if not self._watched(path):
+                continue
+            if os.path.isdir(path):
+                paths.update(scan_sources(path))
+            elif path.lower().endswith(HEADER_SUFFIXES):
+                headers = True
+            elif path in self._violations or select_sources({path: None}):
+                paths.add(path)
+        if headers:
+            paths.update(p for p in self.sources() if detect_language(p) in ("c", "cpp"))
+        return sorted(paths), headers
+
+    def _report(self, path: str) -> AnalysisReport:
+        language = detect_language(path)
+        native_c = language in ("c", "cpp")
+        compiler = self.compiler if native_c else None
+        extra_flags = self.extra_flags if native_c else None
+        if is_bytecode_language(language):
+            return analyze_source(
+                path,
+                include_warnings=self.include_warnings,
+                function_filter=self.function_filter,
+                limits=self.limits,
+            )
+        bodies = self._bodies.get(path)
+        if bodies is None:
+            bodies = self._bodies[path] = FunctionBodies(
+                self.arch, self.include_warnings, self.function_filter
+            )
+        report, _signatures = run_steps(
+            _configuration_steps(
+                bodies,
+                path,
+                self.arch,
+                compiler,
+                self.optimization,
+                extra_flags,
+                self.debug_info,
+            ),
+            self.limits,
+        )
+        bodies.forget_unused()
+        return report
+
+    def analyze(self, path: str, rebuild: bool = False) -> FileDelta:
+        """
+        Analyze one source again and compare with its previous violations.
+
+        Args:
+            path: Source file
+            rebuild: Run the compiler even if a tool store holds the run
+                (an included header changed)
+        """
+        path = os.path.abspath(path)
+        previous = self._violations.get(path)
+        if not os.path.isfile(path):
+            self._violations.pop(path, None)
+            self._bodies.pop(path, None)
+            fixed = list(previous.values()) if previous else []
+            return FileDelta(path, fixed=fixed, removed=True)
+
+        started = time.perf_counter()
+        store = set_tool_store(None) if rebuild else None
+        try:
+            report = self._report(path)
+        except (FileNotFoundError, RuntimeError, ValueError) as e:
+            report, error = None, str(e)
+        finally:
+            if rebuild:
+                set_tool_store(store)
+        seconds = time.perf_counter() - started
+        if report is not None and report.limit_exceeded is not None:
+            error = report.limit_exceeded.describe()
+            report = None
+        if report is None:
+            return FileDelta(path, violations=len(previous or ()), seconds=seconds, error=error)
+
+        fingerprint = Fingerprinter(path)
+        current = {fingerprint(v): v for v in report.violations}
+        self._violations[path] = current
+        if previous is None:
+            return FileDelta(
+                path, list(current.values()), [], len(current), seconds, initial=True
+            )
+        return FileDelta(
+            path,
+            new=[v for key, v in current.items() if key not in previous],
+            fixed=[v for key, v in previous.items() if key not in current],
+            violations=len(current),
+            seconds=seconds,
+        )
+
+    def update(self, changed: Iterable[str]) -> Iterable[FileDelta]:
+        """Re-analyze the sources affected by changed paths, yielding each delta."""
+        paths, headers = self.targets(changed)
+        for path in paths:
+            yield self.analyze(path, rebuild=headers)
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+
+def _display_path(path: str) -> str:
+    """path relative to the working directory, if it is below it."""
+    relative = os.path.relpath(path)
+    return path if relative.startswith(os.pardir) else relative
+
+
+def _violation_line(marker: str, v: Violation) -> str:
+    severity = "ERROR" if v.severity == Severity.ERROR else "WARN"
+    where = f" ({v.file}:{v.line})" if v.file and v.line else ""
+    instruction = " ".join(v.instruction.split())
+    return f"  {marker} [{severity}] {v.mnemonic} in {v.function}{where}: {instruction}"
+
+
+def format_delta(delta: FileDelta, format_type: OutputFormat = OutputFormat.TEXT) -> str:
+    """
+    Format one file's delta: a text block, or one NDJSON record.
+
+    Text output lists the new (+) and fixed (-) violations under a summary
+    line; the first analysis of a file prints only the summary.
+    """
+    name = _display_path(delta.path)
+    if format_type == OutputFormat.NDJSON:
+        import json
+
+        if delta.error is not None:
+            return json.dumps({"type": "error", "file": name, "error": delta.error})
+        return json.dumps(
+            {
+                "type": "delta",
+                "file": name,
+                "initial": delta.initial,
+                "removed": delta.removed,
+                "new": [violation_to_dict(v) for v in delta.new],
+                "fixed": [violation_to_dict(v) for v in delta.fixed],
+                "violations": delta.violations,
+                "seconds": round(delta.seconds, 3),
+            }
+        )
+
+    stamp = time.strftime("%H:%M:%S")
+    if delta.error is not None:
+        return f"[{stamp}] {name}: Error: {delta.error}"
+    if delta.removed:
+        return f"[{stamp}] {name}: removed"
+    count = f"{delta.violations} violation{'' if delta.violations == 1 else 's'}"
+    if delta.initial:
+        return f"[{stamp}] {name}: {count}"
+    if not delta.changed:
+        return f"[{stamp}] {name}: no change, {count} ({delta.seconds:.2f}s)"
+    lines = [
+        f"[{stamp}] {name}: {len(delta.new)} new, {len(delta.fixed)} fixed, {count} "
+        f"({delta.seconds:.2f}s)"
+    ]
+    lines.extend(_violation_line("+", v) for v in delta.new)
+    lines.extend(_violation_line("-", v) for v in delta.fixed)
+    return "\n".join(lines)
+
+
+def watch(
+    roots: list[str],
+    out: TextIO = sys.stdout,
+    format_type: OutputFormat = OutputFormat.TEXT,
+    debounce: float = DEBOUNCE,
+    polling: bool = False,
+    rounds: int | None = None,
+    on_ready: Callable[[], None] | None = None,
+    **options,
+) -> None:
+    """
+    Analyze the sources under roots, then re-analyze them as they change
+    and write each delta to out, until interrupted.
+
+    Args:
+        roots: Source files and directories
+        out: Stream for the deltas
+        format_type: OutputFormat.TEXT or OutputFormat.NDJSON
+        debounce: Seconds without events that end a burst of changes
+        polling: Poll modification times even where inotify is available
+        rounds: Stop after this many rounds that re-analyzed a source
+            (default: never)
+        on_ready: Called once the initial analysis is done and changes
+            are being watched
+        **options: Keyword arguments for WatchSession
+
+    Raises:
+        FileNotFoundError: A root does not exist
+    """
+    for root in roots:
+        if not os.path.exists(root):
+            raise FileNotFoundError(f"Path not found: {root}")
+    session = WatchSession(roots, **options)
+    # Watch before the first analysis, so saves made during it are not missed
+    watcher = open_watcher(session.roots, polling)
+    try:
+        sources = session.sources()
+        for path in sources:
+            print(format_delta(session.analyze(path), format_type), file=out, flush=True)
+        print(
+            f"Watching {len(sources)} source files ({watcher.name}); press Ctrl-C to stop",
+            file=sys.stderr,
+        )
+        if on_ready is not None:
+            on_ready()
+        while rounds is None or rounds > 0:
+            analyzed = False
+            for delta in session.update(collect_changes(watcher, debounce)):
+                print(format_delta(delta, format_type), file=out, flush=True)
+                analyzed = True
+            if analyzed and rounds is not None:
+                rounds -= 1
+    finally:
+        watcher.close()